@@ -0,0 +1,4 @@
+"""Standalone performance benchmarks.
+
+Run one with ``uv run python -m benchmarks.<name> --help``. They are not collected by pytest.
+"""
@@ -0,0 +1,116 @@
+"""Delegation resolution: the ``next()``-scan loop of ``cmd_gen_mtl_vote_list`` and one-by-one delegate
+fetches of ``get_mtlap_votes`` vs ``DelegationGraph`` and ``fetch_missing_delegates``.
+
+Holders are synthetic: a share of them delegates to a random holder (chains and cycles included),
+some to accounts outside the set that have to be fetched with a simulated Horizon latency.
+
+    uv run python -m benchmarks.delegation --holders 50000
+    uv run python -m benchmarks.delegation --holders 50000 --delegating 0.05 --skip-legacy
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from other.mytypes import MyShareHolder
+from other.stellar.delegation import DelegationGraph, fetch_missing_delegates
+
+
+def _synthetic(count: int, delegating: float, outside: float) -> tuple[list[MyShareHolder], dict[str, str]]:
+    rng = random.Random(1)
+    holders = [MyShareHolder(account_id=f"G{n:055d}", balance_rect=rng.randint(1, 5000)) for n in range(count)]
+    delegates = {}
+    for holder in holders:
+        if rng.random() < delegating:
+            if rng.random() < outside:
+                delegates[holder.account_id] = f"X{rng.randrange(count):055d}"
+            else:
+                delegates[holder.account_id] = rng.choice(holders).account_id
+    return holders, delegates
+
+
+def _legacy_vote_list(holders: list[MyShareHolder], delegate_list: dict[str, str]) -> None:
+    """The pre-change multi-step delegation of ``cmd_gen_mtl_vote_list``."""
+    for _ in range(3):
+        changes_made = False
+        for shareholder in holders:
+            if shareholder.account_id in delegate_list:
+                delegate_id = delegate_list[shareholder.account_id]
+                delegate = next((s for s in holders if s.account_id == delegate_id), None)
+                if delegate:
+                    delegate.balance_delegated += shareholder.balance + shareholder.balance_delegated
+                    shareholder.balance_delegated = 0
+                    shareholder.balance_mtl = 0
+                    shareholder.balance_rect = 0
+                    changes_made = True
+        if not changes_made:
+            break
+
+
+def _graph_vote_list(holders: list[MyShareHolder], delegate_list: dict[str, str]) -> None:
+    graph = DelegationGraph({sh.account_id: delegate_list.get(sh.account_id) for sh in holders})
+    by_id = {sh.account_id: sh for sh in holders}
+    for shareholder in holders:
+        root = graph.root_of(shareholder.account_id)
+        if root != shareholder.account_id:
+            by_id[root].balance_delegated += shareholder.balance_mtl + shareholder.balance_rect
+            shareholder.balance_mtl = 0
+            shareholder.balance_rect = 0
+    graph.tree()
+
+
+async def _fetch_delegates(nodes: dict[str, dict], latency: float, concurrent: bool) -> int:
+    calls = 0
+
+    async def fetch(account_id: str) -> dict:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(latency)
+        return {"delegate": None}
+
+    if concurrent:
+        await fetch_missing_delegates(nodes, lambda node: node["delegate"], fetch)
+        return calls
+    # get_mtlap_votes before: rescan everything, fetch each missing delegate in turn
+    find_new = True
+    while find_new:
+        find_new = False
+        for account in list(nodes):
+            delegate = nodes[account]["delegate"]
+            if delegate and delegate not in nodes:
+                find_new = True
+                nodes[delegate] = await fetch(delegate)
+    return calls
+
+
+def main(holders_count: int, delegating: float, outside: float, latency: float, skip_legacy: bool) -> None:
+    holders, delegates = _synthetic(holders_count, delegating, outside)
+    print(f"holders: {holders_count}, delegating: {len(delegates)}")
+
+    if not skip_legacy:
+        legacy_holders = [MyShareHolder(sh.account_id, balance_rect=sh.balance_rect) for sh in holders]
+        started = time.perf_counter()
+        _legacy_vote_list(legacy_holders, delegates)
+        print(f"vote list, next() scan : {time.perf_counter() - started:8.3f} s")
+    started = time.perf_counter()
+    _graph_vote_list(holders, delegates)
+    print(f"vote list, graph       : {time.perf_counter() - started:8.3f} s")
+
+    for concurrent in (False, True):
+        nodes = {sh.account_id: {"delegate": delegates.get(sh.account_id)} for sh in holders}
+        started = time.perf_counter()
+        calls = asyncio.run(_fetch_delegates(nodes, latency, concurrent))
+        label = "concurrent" if concurrent else "sequential"
+        print(f"delegate fetch, {label}: {time.perf_counter() - started:8.3f} s, {calls} requests")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--holders", type=int, default=50000)
+    parser.add_argument("--delegating", type=float, default=0.02, help="share of holders with a delegate")
+    parser.add_argument("--outside", type=float, default=0.1, help="share of delegates outside the holder set")
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated Horizon latency per account, s")
+    parser.add_argument("--skip-legacy", action="store_true", help="skip the quadratic next() scan")
+    args = parser.parse_args()
+    main(args.holders, args.delegating, args.outside, args.latency, args.skip_legacy)
@@ -0,0 +1,123 @@
+"""Submitting ``--transactions`` packed dividend transactions to a local fake Horizon that takes ``--latency`` seconds
+to land each one: the old ``cmd_send_by_list_id`` loop (load account, sign, submit, one at a time) vs
+``DividendSubmitter`` with local sequences and ``--window`` transactions in flight.
+
+The fake queues a transaction when its sequence follows the last queued one, so a window above one only helps where
+stellar-core accepts several transactions of one account per ledger.
+
+    uv run python -m benchmarks.dividend_submit --transactions 100 --latency 0.05
+    uv run python -m benchmarks.dividend_submit --transactions 100 --latency 0.05 --window 8
+"""
+
+import argparse
+import asyncio
+import time
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from stellar_sdk import Account, Asset, Keypair, TransactionBuilder, TransactionEnvelope
+
+from db.repositories import FinanceRepository
+from other.config_reader import config
+from other.stellar.dividend_submit import DividendSubmitter
+from other.stellar.horizon_client import HorizonClient, set_horizon_client
+from other.stellar.payment_service import stellar_async_submit
+from other.stellar.sdk_utils import get_network_passphrase, load_account_async
+from shared.infrastructure.database.models import Base, TDivList, TTransaction
+
+SIGNER = Keypair.random()
+
+
+class Horizon:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.sequence = self.queued = 1000
+        self.ledger: set[str] = set()
+
+    async def account(self, request: web.Request) -> web.Response:
+        return web.json_response({"id": SIGNER.public_key, "sequence": str(self.sequence)})
+
+    async def transaction(self, request: web.Request) -> web.Response:
+        if request.match_info["tx_hash"] in self.ledger:
+            return web.json_response({"hash": request.match_info["tx_hash"], "successful": True})
+        return web.json_response({"status": 404}, status=404)
+
+    async def submit(self, request: web.Request) -> web.Response:
+        envelope = TransactionEnvelope.from_xdr((await request.post())["tx"], get_network_passphrase())
+        if envelope.transaction.sequence != self.queued + 1:
+            body = {"status": 400, "extras": {"result_codes": {"transaction": "tx_bad_seq"}}}
+            return web.json_response(body, status=400)
+        self.queued += 1
+        await asyncio.sleep(self.latency)
+        self.sequence = envelope.transaction.sequence
+        self.ledger.add(envelope.hash_hex())
+        return web.json_response({"hash": envelope.hash_hex(), "successful": True})
+
+
+def _pack(session: Session, count: int, ops: int) -> None:
+    session.add(TDivList(id=1, memo="div", pay_type=0))
+    destinations = [Keypair.random().public_key for _ in range(ops)]
+    for _ in range(count):
+        tb = TransactionBuilder(Account(SIGNER.public_key, 1), network_passphrase=get_network_passphrase())
+        for destination in destinations:
+            tb.append_payment_op(destination=destination, amount="1", asset=Asset.native())
+        tb.add_text_memo("div").set_timeout(3600)
+        session.add(TTransaction(xdr=tb.build().to_xdr(), id_div_list=1, xdr_id=0))
+    session.commit()
+
+
+async def _sequential(session: Session) -> None:
+    """cmd_send_by_list_id before DividendSubmitter."""
+    for db_transaction in FinanceRepository(session).load_transactions(1):
+        transaction = TransactionEnvelope.from_xdr(db_transaction.xdr, network_passphrase=get_network_passphrase())
+        div_account = await load_account_async(transaction.transaction.source.account_id)
+        transaction.transaction.sequence = div_account.sequence + 1
+        transaction.sign(SIGNER)
+        await stellar_async_submit(transaction.to_xdr())
+        db_transaction.was_send = 1
+    session.commit()
+
+
+async def main(transactions: int, ops: int, latency: float, window: int) -> None:
+    horizon = Horizon(latency)
+    app = web.Application()
+    app.router.add_get("/accounts/{account_id}", horizon.account)
+    app.router.add_get("/transactions/{tx_hash}", horizon.transaction)
+    app.router.add_post("/transactions", horizon.submit)
+    server = TestServer(app)
+    await server.start_server()
+    config.stellar_testnet = False
+    config.horizon_url = str(server.make_url("")).rstrip("/")
+    client = HorizonClient()
+    set_horizon_client(client)
+
+    print(f"transactions={transactions} ops={ops} latency={latency * 1000:.0f} ms window={window}")
+    runs = (
+        ("sequential", _sequential),
+        (f"window {window}", lambda session: DividendSubmitter(session, window=window, sign_key=SIGNER.secret).run(1)),
+    )
+    for name, submit in runs:
+        session = sessionmaker(bind=create_engine("sqlite://"))()
+        Base.metadata.create_all(session.get_bind(), tables=[TDivList.__table__, TTransaction.__table__])
+        _pack(session, transactions, ops)
+        started = time.perf_counter()
+        await submit(session)
+        elapsed = time.perf_counter() - started
+        assert FinanceRepository(session).count_unsent_transactions(1) == 0
+        print(f"{name:<12}: {elapsed:7.2f} s {transactions / elapsed:8.1f} tx/s")
+
+    set_horizon_client(None)
+    await client.shutdown()
+    await server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transactions", type=int, default=100)
+    parser.add_argument("--ops", type=int, default=100, help="payments per transaction")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds until a submitted transaction lands")
+    parser.add_argument("--window", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main(args.transactions, args.ops, args.latency, args.window))
@@ -0,0 +1,103 @@
+"""Holder backup: pretty-printed ``all.last.json`` + per-balance Python loop vs ``HolderColumns`` + vectorized stats.
+
+Accounts are synthetic Horizon records, or a real ``all.last.json`` export (``--json``).
+
+    uv run python -m benchmarks.holder_backup --accounts 50000
+    uv run python -m benchmarks.holder_backup --json backup/all.last.json
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from other.stellar.holder_columns import HolderColumns, calculate_holder_statistics
+
+ISSUER = "GACKTN5DAZGWXRWB2WLM6OPBDHAMT6SJNGLJZPQMEZBUR4JUGBX2UK7V"
+CODES = ("MTL", "MTLRECT", "EURMTL", "USDM", "SATSMTL", "MTLAP", "MTLFARM", "BTCMTL")
+
+
+def _synthetic(count: int) -> list[dict]:
+    rng = random.Random(1)
+    accounts = []
+    for n in range(count):
+        balances = [{"asset_type": "native", "balance": f"{rng.uniform(1, 100):.7f}"}]
+        for code in CODES:
+            if rng.random() < 0.4:
+                balances.append(
+                    {
+                        "asset_type": "credit_alphanum12",
+                        "asset_code": code,
+                        "asset_issuer": ISSUER,
+                        "balance": f"{rng.uniform(0, 1000):.7f}",
+                    }
+                )
+        accounts.append({"account_id": f"G{n:055d}", "sequence": "1", "balances": balances, "data": {}})
+    return accounts
+
+
+def _legacy_statistics(path: Path) -> dict:
+    """The pre-change ``calculate_statistics``: parse the whole JSON, loop over every balance."""
+    with open(path) as file:
+        accounts = json.load(file)
+    counts = {"USDM": 0, "SATSMTL": 0, "EURMTL": 0, "MTLAP": 0, "EURMTL_NONE_ZERO": 0}
+    amounts = []
+    for account in accounts:
+        has = set()
+        mtl = 0.0
+        for balance in account.get("balances", []):
+            code = balance.get("asset_code", "")
+            amount = float(balance.get("balance", "0"))
+            has.add(code)
+            if code == "EURMTL" and amount > 0:
+                counts["EURMTL_NONE_ZERO"] += 1
+            if code == "MTLAP" and amount > 0:
+                counts["MTLAP"] += 1
+            if code in ("MTL", "MTLRECT"):
+                mtl += amount
+        if mtl > 1:
+            amounts.append(mtl)
+            for code in ("USDM", "SATSMTL", "EURMTL"):
+                counts[code] += code in has
+    return {**counts, "MTL_MTLRECT": len(amounts), "Median": np.median(amounts) if amounts else 0}
+
+
+def _size(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.iterdir()) if path.is_dir() else path.stat().st_size
+
+
+def main(accounts_count: int, json_path: Optional[Path]) -> None:
+    accounts = json.loads(json_path.read_text()) if json_path else _synthetic(accounts_count)
+    print(f"accounts: {len(accounts)}")
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = Path(tmp) / "all.last.json"
+        started = time.perf_counter()
+        with open(legacy_path, "w") as fp:
+            json.dump(accounts, fp, indent=2)
+        write = time.perf_counter() - started
+        started = time.perf_counter()
+        _legacy_statistics(legacy_path)
+        stats = time.perf_counter() - started
+        print(f"json   : write {write:7.3f} s, stats {stats:7.3f} s, {_size(legacy_path) / 1e6:8.1f} MB")
+
+        columns_path = Path(tmp) / "holders.last"
+        started = time.perf_counter()
+        HolderColumns.from_accounts(accounts).save(columns_path)
+        write = time.perf_counter() - started
+        started = time.perf_counter()
+        calculate_holder_statistics(HolderColumns.load(columns_path))
+        stats = time.perf_counter() - started
+        print(f"columns: write {write:7.3f} s, stats {stats:7.3f} s, {_size(columns_path) / 1e6:8.1f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=20000, help="synthetic accounts when --json is not given")
+    parser.add_argument("--json", type=Path, help="existing all.last.json export")
+    args = parser.parse_args()
+    main(args.accounts, args.json)
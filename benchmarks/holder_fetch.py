@@ -0,0 +1,143 @@
+"""MTL + MTLRECT holder crawl: sequential crawl with ``account not in accounts`` merge vs ``fetch_holders``.
+
+Pages are served by a local Horizon stand-in with a fixed per-page latency, from recorded page fixtures
+(one JSON list of account records per asset, see ``--record``) or from synthetic accounts.
+
+    uv run python -m benchmarks.holder_fetch --record benchmarks/fixtures/holders   # once, needs Horizon access
+    uv run python -m benchmarks.holder_fetch --fixtures benchmarks/fixtures/holders --latency 0.15
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Optional
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from stellar_sdk import Asset, Keypair
+
+from other.config_reader import config
+from other.stellar.constants import MTLAssets
+from other.stellar.holders import fetch_holders, iter_holder_pages
+from other.stellar.horizon_client import HorizonClient, set_horizon_client
+
+ASSETS = (MTLAssets.mtl_asset, MTLAssets.mtlrect_asset)
+
+
+def _asset_key(asset: Asset) -> str:
+    return f"{asset.code}:{asset.issuer}"
+
+
+def _synthetic(holders: int, overlap: float) -> dict[str, list[dict]]:
+    ids = sorted(Keypair.random().public_key for _ in range(holders))
+    shared = int(holders * overlap)
+    split = (holders + shared) // 2
+    by_asset = {ASSETS[0]: ids[:split], ASSETS[1]: ids[split - shared :]}
+    # Horizon returns the full account record whichever asset was queried
+    accounts = {
+        account_id: {
+            "id": account_id,
+            "account_id": account_id,
+            "paging_token": account_id,
+            "sequence": "1",
+            "balances": [{"asset_type": "native", "balance": "5.0000000"}],
+            "data": {},
+            "signers": [{"key": account_id, "weight": 1, "type": "ed25519_public_key"}],
+        }
+        for account_id in ids
+    }
+    for asset, asset_ids in by_asset.items():
+        for account_id in asset_ids:
+            accounts[account_id]["balances"].append(
+                {
+                    "asset_type": "credit_alphanum4",
+                    "asset_code": asset.code,
+                    "asset_issuer": asset.issuer,
+                    "balance": "10.0000000",
+                }
+            )
+    return {
+        _asset_key(asset): [accounts[account_id] for account_id in asset_ids] for asset, asset_ids in by_asset.items()
+    }
+
+
+def _load_fixtures(path: Path) -> dict[str, list[dict]]:
+    return {_asset_key(asset): json.loads((path / f"{asset.code}.json").read_text()) for asset in ASSETS}
+
+
+async def _record(path: Path) -> None:
+    path.mkdir(parents=True, exist_ok=True)
+    for asset in ASSETS:
+        records = [record async for page in iter_holder_pages(asset) for record in page]
+        (path / f"{asset.code}.json").write_text(json.dumps(records))
+        print(f"recorded {len(records)} {asset.code} holders")
+
+
+async def _serve(holders: dict[str, list[dict]], latency: float) -> TestServer:
+    async def accounts(request: web.Request) -> web.Response:
+        await asyncio.sleep(latency)
+        asset = request.query["asset"]
+        cursor = request.query.get("cursor", "")
+        limit = int(request.query.get("limit", 10))
+        records = [r for r in holders.get(asset, []) if r["paging_token"] > cursor][:limit]
+        next_cursor = records[-1]["paging_token"] if records else cursor
+        next_href = f"{request.url.origin()}/accounts?asset={asset}&cursor={next_cursor}&limit={limit}"
+        return web.json_response({"_embedded": {"records": records}, "_links": {"next": {"href": next_href}}})
+
+    for records in holders.values():
+        records.sort(key=lambda r: r["paging_token"])
+    app = web.Application()
+    app.router.add_get("/accounts", accounts)
+    server = TestServer(app)
+    await server.start_server()
+    return server
+
+
+async def _legacy() -> list[dict]:
+    """The pre-change ``stellar_get_all_mtl_holders``: assets one after another, O(n^2) merge."""
+    accounts: list[dict] = []
+    for asset in ASSETS:
+        asset_accounts = [record async for page in iter_holder_pages(asset) for record in page]
+        for account in asset_accounts:
+            if account not in accounts:
+                accounts.append(account)
+    return accounts
+
+
+async def _concurrent() -> list[dict]:
+    return await fetch_holders(*ASSETS)
+
+
+async def main(fixtures: Optional[Path], record: Optional[Path], holders: int, overlap: float, latency: float):
+    if record:
+        await _record(record)
+        return
+
+    data = _load_fixtures(fixtures) if fixtures else _synthetic(holders, overlap)
+    server = await _serve(data, latency)
+    config.horizon_url = str(server.make_url("")).rstrip("/")
+    client = HorizonClient()
+    set_horizon_client(client)
+    try:
+        sizes = {key.split(":")[0]: len(records) for key, records in data.items()}
+        print(f"holders per asset={sizes} page latency={latency * 1000:.0f} ms")
+        for name, crawl in (("sequential", _legacy), ("concurrent", _concurrent)):
+            started = time.perf_counter()
+            result = await crawl()
+            print(f"{name:<10}: {time.perf_counter() - started:8.3f} s {len(result):8d} unique holders")
+    finally:
+        await client.shutdown()
+        await server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", type=Path, help="directory with recorded MTL.json / MTLRECT.json")
+    parser.add_argument("--record", type=Path, help="record holder pages from HORIZON_URL into this directory")
+    parser.add_argument("--holders", type=int, default=6000, help="synthetic accounts when no fixtures are given")
+    parser.add_argument("--overlap", type=float, default=0.3, help="share of synthetic accounts holding both assets")
+    parser.add_argument("--latency", type=float, default=0.1, help="seconds per Horizon page")
+    args = parser.parse_args()
+    asyncio.run(main(args.fixtures, args.record, args.holders, args.overlap, args.latency))
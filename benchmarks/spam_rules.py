@@ -0,0 +1,123 @@
+"""Local spam rules over a message corpus: old per-word regexes vs ``SpamRuleEngine``, and the LLM-call rate.
+
+The corpus is a text file with one message per line (``\\n`` inside a message is written as ``\\\\n``) or, without
+``--corpus``, a synthetic mix of chat messages and copy-paste spam. The LLM is a stand-in that only counts calls.
+
+    uv run python -m benchmarks.spam_rules --messages 20000 --repeats 0.4
+    uv run python -m benchmarks.spam_rules --corpus data/spam_corpus.txt
+"""
+
+import argparse
+import asyncio
+import random
+import re
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from other.spam_rules import SpamRuleEngine, SpamVerdictCache, spam_phrases
+
+HAM = [
+    "Кто знает, где в Баре обменять EURMTL на евро?",
+    "Доброе утро! Сегодня встреча в Будве в 18:00",
+    "Спасибо, получил выплату по дивидендам",
+    "Подскажите, как добавить trustline на MTLAP в Lobstr",
+    "Голосование по новому совету закончится завтра",
+]
+SPAM = [
+    "Ищу людей в команду, доход от 300$ в день, без опыта, пишите в лс",
+    "Нужны 2-3 человека на удалённый проект, подробности в личку",
+    "Пpибыль 5oo$ в нeдeлю, пишитe @manager",
+    "Предлагаю сотрудничество, всё расскажу в личных сообщениях",
+]
+
+
+def _legacy_is_mixed_word(word: str) -> bool:
+    contains_cyrillic = bool(re.search("[а-яА-Я]", word))
+    contains_digit = bool(re.search("[0-9@]", word))
+    contains_latin = bool(re.search("[a-zA-Z]", word))
+    return contains_cyrillic and (contains_digit or contains_latin)
+
+
+def _legacy_contains_spam_phrases(text: str, threshold: int = 3) -> bool:
+    words = re.findall(r"\b\w+\b", text.lower())
+    count = sum(phrase in words for phrase in spam_phrases)
+    if "+" in text:
+        count += 1
+    return count >= threshold
+
+
+def _legacy_match(text: str) -> Optional[str]:
+    """The pre-change rule steps of ``check_spam``."""
+    if sum(_legacy_is_mixed_word(word) for word in text.split()) >= 3:
+        return "mixed"
+    if _legacy_contains_spam_phrases(text):
+        return "spam_phrases"
+    return None
+
+
+def _synthetic(messages: int, repeats: float, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    corpus: list[str] = []
+    for n in range(messages):
+        if corpus and rng.random() < repeats:
+            # Copy-paste: the same spam again, maybe with different case and spacing
+            text = rng.choice(corpus)
+            corpus.append(text.upper() if rng.random() < 0.3 else text.replace(" ", "  ", 1))
+            continue
+        base = rng.choice(SPAM if rng.random() < 0.3 else HAM)
+        corpus.append(f"{base} #{n}")
+    return corpus
+
+
+def _load(path: Path) -> list[str]:
+    lines = path.read_text(encoding="utf-8").splitlines()
+    return [line.replace("\\n", "\n") for line in lines if line.strip()]
+
+
+def _rate(name: str, corpus: list[str], match: Callable[[str], Optional[str]], rounds: int) -> list[str]:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        passed = [text for text in corpus if match(text) is None]
+    elapsed = time.perf_counter() - started
+    print(f"{name:<8}: {len(corpus) * rounds / elapsed:12,.0f} msgs/sec, {len(passed)} of {len(corpus)} reach the LLM")
+    return passed
+
+
+async def _llm_calls(passed: list[str]) -> int:
+    async def llm(text: str) -> int:
+        await asyncio.sleep(0)
+        return 0
+
+    cache = SpamVerdictCache()
+    for text in passed:
+        await cache.get_or_check(text, llm)
+    return cache.llm_calls
+
+
+def main(corpus_path: Optional[Path], messages: int, repeats: float, rounds: int, seed: int) -> None:
+    corpus = _load(corpus_path) if corpus_path else _synthetic(messages, repeats, seed)
+    engine = SpamRuleEngine()
+    print(f"corpus: {len(corpus)} messages, {rounds} rounds")
+
+    legacy_passed = _rate("legacy", corpus, _legacy_match, rounds)
+    passed = _rate("engine", corpus, engine.match, rounds)
+    if len(passed) != len(legacy_passed):
+        print(f"note: {len(legacy_passed) - len(passed)} messages now caught by multi-word phrases")
+
+    calls = asyncio.run(_llm_calls(passed))
+    print(f"LLM calls without cache: {len(legacy_passed) / len(corpus):7.1%}")
+    print(f"LLM calls with cache   : {calls / len(corpus):7.1%} ({calls} calls)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, help="text file, one message per line")
+    parser.add_argument("--messages", type=int, default=10000, help="synthetic corpus size")
+    parser.add_argument(
+        "--repeats", type=float, default=0.3, help="share of synthetic messages that repeat earlier ones"
+    )
+    parser.add_argument("--rounds", type=int, default=3, help="passes over the corpus for msgs/sec")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    main(args.corpus, args.messages, args.repeats, args.rounds, args.seed)
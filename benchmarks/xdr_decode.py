@@ -0,0 +1,96 @@
+"""Rendering ``--envelopes`` distinct ``--ops``-operation envelopes on the event loop (the old ``decode_xdr``) vs
+in ``XdrDecoder`` worker processes, plus a repeat of the same envelopes served from the cache.
+
+Stall is the longest gap seen by a 1 ms ticker running on the loop while the envelopes are decoded; every figure is
+the median over ``--rounds`` rounds of fresh envelopes.
+
+    uv run python -m benchmarks.xdr_decode --ops 100 --envelopes 50
+    uv run python -m benchmarks.xdr_decode --ops 100 --envelopes 200 --workers 4
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from stellar_sdk import Account, Asset, Keypair, Network, TransactionBuilder
+
+from other.stellar.xdr_decoder import XdrDecoder
+
+
+def _envelopes(count: int, ops: int) -> list[str]:
+    source = Keypair.random().public_key
+    destinations = [Keypair.random().public_key for _ in range(10)]
+    envelopes = []
+    for n in range(count):
+        tb = TransactionBuilder(
+            source_account=Account(account=source, sequence=n + 1),
+            network_passphrase=Network.PUBLIC_NETWORK_PASSPHRASE,
+            base_fee=100,
+        )
+        tb.set_timeout(0)
+        for op in range(ops):
+            tb.append_payment_op(destination=destinations[op % 10], amount=str(op + 1), asset=Asset.native())
+        envelopes.append(tb.build().to_xdr())
+    return envelopes
+
+
+async def _measure(decoder: XdrDecoder, envelopes: list[str], concurrency: int) -> tuple[float, float]:
+    stall = 0.0
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal stall
+        while not done.is_set():
+            before = time.perf_counter()
+            await asyncio.sleep(0.001)
+            stall = max(stall, time.perf_counter() - before - 0.001)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def decode(xdr: str):
+        async with semaphore:
+            await decoder.render(xdr)
+
+    ticking = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    await asyncio.gather(*(decode(xdr) for xdr in envelopes))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await ticking
+    return elapsed, stall
+
+
+async def main(ops: int, count: int, workers: int, concurrency: int, rounds: int) -> None:
+    print(f"ops={ops} envelopes={count} xdr={len(_envelopes(1, ops)[0])} chars workers={workers} rounds={rounds}")
+
+    pool = XdrDecoder(workers=workers, inline_size=0, timeout=120)
+    pool.start()
+    await pool.render(_envelopes(1, 1)[0])  # wait for the workers to finish importing
+
+    modes = {"event loop": XdrDecoder(workers=0, cache_size=0), "process pool": pool, "cached": pool}
+    results: dict[str, list[tuple[float, float]]] = {name: [] for name in modes}
+    for _ in range(rounds):
+        envelopes = _envelopes(count, ops)
+        for name, decoder in modes.items():
+            results[name].append(await _measure(decoder, envelopes, concurrency))
+    pool.close()
+
+    for name, measured in results.items():
+        elapsed = statistics.median(elapsed for elapsed, _ in measured)
+        stall = statistics.median(stall for _, stall in measured)
+        print(
+            f"{name:<12}: {elapsed * 1000 / count:8.2f} ms/envelope {count / elapsed:8.1f} envelopes/s "
+            f"max stall {stall * 1000:8.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ops", type=int, default=100)
+    parser.add_argument("--envelopes", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=8, help="decodes in flight at once")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.ops, args.envelopes, args.workers, args.concurrency, args.rounds))
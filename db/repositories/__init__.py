@@ -1,9 +1,14 @@
+from .base import AsyncBaseRepository as AsyncBaseRepository
 from .base import BaseRepository as BaseRepository
+from .chats import AsyncChatsRepository as AsyncChatsRepository
 from .chats import ChatsRepository as ChatsRepository
 from .chats import ChatDTO as ChatDTO
 from .chats import ChatUserDTO as ChatUserDTO
+from .config import AsyncConfigRepository as AsyncConfigRepository
 from .config import ConfigRepository as ConfigRepository
+from .config_entries import ConfigEntriesRepository as ConfigEntriesRepository
 from .finance import FinanceRepository as FinanceRepository
+from .messages import AsyncMessageRepository as AsyncMessageRepository
 from .messages import MessageRepository as MessageRepository
 from .payments import PaymentsRepository as PaymentsRepository
 from .wallets import WalletsRepository as WalletsRepository
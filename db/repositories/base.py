@@ -1,6 +1,22 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 
+def dialect_insert(dialect_name: str, model):
+    """INSERT construct that supports ON CONFLICT for the given dialect (PostgreSQL in prod, SQLite in tests)."""
+    if dialect_name == "postgresql":
+        return postgresql.insert(model)
+    if dialect_name == "sqlite":
+        return sqlite.insert(model)
+    raise ValueError(f"ON CONFLICT upserts need PostgreSQL or SQLite, got dialect {dialect_name!r}")
+
+
 class BaseRepository:
     def __init__(self, session: Session):
         self.session = session
+
+
+class AsyncBaseRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
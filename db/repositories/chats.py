@@ -2,9 +2,9 @@ from datetime import datetime, timedelta, UTC
 from typing import List, Optional, Dict
 
 from pydantic import BaseModel, Field
-from sqlalchemy import select, delete, and_
+from sqlalchemy import select, delete, and_, func
 
-from db.repositories.base import BaseRepository
+from db.repositories.base import AsyncBaseRepository, BaseRepository, dialect_insert
 from other.pyro_tools import GroupMember
 from shared.infrastructure.database.models import Chat, ChatMember, BotUsers, BotUserChats
 
@@ -29,8 +29,17 @@ class ChatDTO(BaseModel):
     admins: List[int] = Field(default_factory=list)
 
 
+# PostgreSQL caps a statement at 32767 bind parameters
+UPSERT_CHUNK_SIZE = 1000
+
+
 class ChatsRepository(BaseRepository):
     def update_chat_info(self, chat_id: int, members: List[GroupMember], clear_users: bool = False) -> bool:
+        """Sync the full member list of a chat with set-based statements.
+
+        Existing members are prefetched with one IN query per chunk, unchanged rows are skipped,
+        new/changed ones are written with INSERT ... ON CONFLICT, and the admin list is diffed in memory.
+        """
         now = datetime.now(UTC)
 
         # Получаем текущую информацию о чате
@@ -47,55 +56,77 @@ class ChatsRepository(BaseRepository):
             chat.admins = []
 
         chat.last_updated = now
+        admin_ids = set(chat.admins or [])
 
-        # Ensure chat.admins is a list
-        if chat.admins is None:
-            chat.admins = []
-
-        admin_ids = set(chat.admins)
+        # The same user can only appear once; the last entry wins as in the row-by-row version
+        members_by_id = {member.user_id: member for member in members}
+        dialect_name = self.session.get_bind().dialect.name
 
-        for member in members:
-            # Check user existence in BotUsers
-            user_result = self.session.execute(select(BotUsers).where(BotUsers.user_id == member.user_id))
-            user_record = user_result.scalar_one_or_none()
-
-            if not user_record:
-                new_user = BotUsers(user_id=member.user_id, user_name=member.username, user_type=0)
-                self.session.add(new_user)
-                # No need to flush every time, but maybe safer for FKs if we weren't using bulk approach.
-                # Here we are adding one by one.
-
-            # Check member existence
-            existing_member = self.session.execute(
-                select(ChatMember).where(and_(ChatMember.chat_id == chat_id, ChatMember.user_id == member.user_id))
-            ).scalar_one_or_none()
-
-            member_metadata = {"username": member.username, "full_name": member.full_name, "is_admin": member.is_admin}
-
-            if existing_member:
-                existing_member.metadata_ = member_metadata
-                if existing_member.left_at:
-                    existing_member.left_at = None
-            else:
-                new_member = ChatMember(
-                    chat_id=chat_id, user_id=member.user_id, created_at=now, metadata_=member_metadata
-                )
-                self.session.add(new_member)
+        user_ids = list(members_by_id)
+        for start in range(0, len(user_ids), UPSERT_CHUNK_SIZE):
+            chunk = [members_by_id[user_id] for user_id in user_ids[start : start + UPSERT_CHUNK_SIZE]]
+            self._sync_member_chunk(dialect_name, chat_id, chunk, now)
 
+        for member in members_by_id.values():
             if member.is_admin:
                 admin_ids.add(member.user_id)
             else:
                 admin_ids.discard(member.user_id)
 
-        chat.admins = list(admin_ids)
-        # Flush or commit is handled by caller or context manager, but mongo.py did commit.
-        # We will let the service/caller handle commit if possible, or do it here if we strictly follow mongo.py behavior.
-        # mongo.py methods committed. To match behavior, I should probably not commit if I want a clean repo pattern,
-        # but since I am replacing logic that expects side effects, I might need to be careful.
-        # Ideally Repositories don't commit. Unit of Work does.
-        # But for now, let's assume the calling code (Session context) will commit.
+        if chat.admins is None or admin_ids != set(chat.admins):
+            chat.admins = list(admin_ids)
+        # Commit is handled by the caller (DatabaseService / handler session)
         return True
 
+    def _sync_member_chunk(self, dialect_name: str, chat_id: int, chunk: List[GroupMember], now: datetime) -> None:
+        chunk_ids = [member.user_id for member in chunk]
+        existing = {
+            row.user_id: row
+            for row in self.session.execute(
+                select(ChatMember.user_id, ChatMember.metadata_, ChatMember.left_at).where(
+                    and_(ChatMember.chat_id == chat_id, ChatMember.user_id.in_(chunk_ids))
+                )
+            )
+        }
+
+        changed_rows = []
+        for member in chunk:
+            member_metadata = {"username": member.username, "full_name": member.full_name, "is_admin": member.is_admin}
+            current = existing.get(member.user_id)
+            if current is not None and current.metadata_ == member_metadata and current.left_at is None:
+                continue
+            changed_rows.append(
+                {
+                    "chat_id": chat_id,
+                    "user_id": member.user_id,
+                    "created_at": now,
+                    "left_at": None,
+                    "metadata_": member_metadata,
+                }
+            )
+
+        if not changed_rows:
+            return
+
+        # Members already in chat_members are already in bot_users (FK)
+        new_users = [
+            {"user_id": row["user_id"], "user_name": row["metadata_"]["username"], "user_type": 0}
+            for row in changed_rows
+            if row["user_id"] not in existing
+        ]
+        if new_users:
+            users_stmt = dialect_insert(dialect_name, BotUsers).on_conflict_do_nothing(
+                index_elements=[BotUsers.user_id]
+            )
+            self.session.execute(users_stmt, new_users)
+
+        members_stmt = dialect_insert(dialect_name, ChatMember)
+        members_stmt = members_stmt.on_conflict_do_update(
+            index_elements=[ChatMember.chat_id, ChatMember.user_id],
+            set_={"metadata": members_stmt.excluded.metadata, "left_at": None},
+        )
+        self.session.execute(members_stmt, changed_rows)
+
     def add_user_to_chat(self, chat_id: int, member: GroupMember) -> bool:
         now = datetime.now(UTC)
 
@@ -359,3 +390,82 @@ class ChatsRepository(BaseRepository):
         else:
             chat = Chat(chat_id=chat_id, title=title, username=username, created_at=now, last_updated=now)
             self.session.add(chat)
+
+
+class AsyncChatsRepository(AsyncBaseRepository):
+    """AsyncSession counterpart of ChatsRepository for the per-update bot_users paths."""
+
+    async def upsert_bot_users(self, users: List[tuple[int, Optional[str], int]]) -> None:
+        """Write (user_id, user_name, user_type) rows with INSERT ... ON CONFLICT DO UPDATE.
+
+        Same semantics as save_bot_user: an empty user_name keeps the stored one.
+        """
+        insert_stmt = dialect_insert(self.session.bind.dialect.name, BotUsers)
+        stmt = insert_stmt.on_conflict_do_update(
+            index_elements=[BotUsers.user_id],
+            set_={
+                "user_type": insert_stmt.excluded.user_type,
+                "user_name": func.coalesce(insert_stmt.excluded.user_name, BotUsers.user_name),
+            },
+        )
+        for start in range(0, len(users), UPSERT_CHUNK_SIZE):
+            chunk = users[start : start + UPSERT_CHUNK_SIZE]
+            await self.session.execute(
+                stmt,
+                [
+                    {"user_id": user_id, "user_name": user_name or None, "user_type": user_type}
+                    for user_id, user_name, user_type in chunk
+                ],
+            )
+
+    async def save_bot_user(self, user_id: int, user_name: Optional[str], user_type: int = 0) -> None:
+        user = await self.get_user_by_id(user_id)
+
+        if user is None:
+            self.session.add(BotUsers(user_id=user_id, user_name=user_name, user_type=user_type))
+        else:
+            if user_name:
+                user.user_name = user_name
+            user.user_type = user_type
+
+    async def get_user_by_id(self, user_id: int) -> Optional[BotUsers]:
+        result = await self.session.execute(select(BotUsers).where(BotUsers.user_id == user_id))
+        return result.scalar_one_or_none()
+
+    async def get_user_id(self, user_name: str) -> int:
+        if not user_name.startswith("@"):
+            try:
+                return int(user_name)
+            except ValueError:
+                raise ValueError("Invalid user ID or username format. Use a numeric ID or @username.")
+
+        username = user_name[1:]
+        result = (
+            await self.session.execute(select(BotUsers.user_id).where(BotUsers.user_name == username).limit(1))
+        ).scalar_one_or_none()
+        if not result:
+            raise ValueError(f"User @{username} not found in the database.")
+        return result
+
+    async def load_bot_users(self) -> List[BotUsers]:
+        result = await self.session.execute(select(BotUsers))
+        return list(result.scalars().all())
+
+    async def save_user_type(self, user_id: int, user_type: int) -> None:
+        user = await self.get_user_by_id(user_id)
+        if user:
+            user.user_type = user_type
+        else:
+            self.session.add(BotUsers(user_id=user_id, user_name=None, user_type=user_type))
+
+    async def update_user_chat_date(self, user_id: int, chat_id: int) -> None:
+        existing_record = (
+            await self.session.execute(
+                select(BotUserChats).where(and_(BotUserChats.user_id == user_id, BotUserChats.chat_id == chat_id))
+            )
+        ).scalar_one_or_none()
+
+        if existing_record:
+            existing_record.dt_last = datetime.now()
+        else:
+            self.session.add(BotUserChats(user_id=user_id, chat_id=chat_id, dt_last=datetime.now()))
@@ -1,13 +1,117 @@
 import json
 from enum import Enum
-from typing import Any, Dict, List, Union
+from typing import Any, Callable, Dict, List, Union
 
-from sqlalchemy import select, delete, and_
+from loguru import logger
+from sqlalchemy import select, delete, and_, event
+from sqlalchemy.orm import Session
 
-from db.repositories.base import BaseRepository
+from db.repositories.base import AsyncBaseRepository, BaseRepository
 from shared.infrastructure.database.models import BotConfig, KVStore, BotTable
 
 
+# Called with (chat_id, chat_key value, chat_value) for every bot_config write once its transaction commits
+BotConfigListener = Callable[[int, Union[int, str], Any], None]
+_bot_config_listeners: List[BotConfigListener] = []
+_PENDING_CHANGES = "bot_config_changes"
+
+
+def add_bot_config_listener(listener: BotConfigListener) -> None:
+    """Register a callback for committed bot_config writes made through any ConfigRepository."""
+    if listener not in _bot_config_listeners:
+        _bot_config_listeners.append(listener)
+
+
+def remove_bot_config_listener(listener: BotConfigListener) -> None:
+    if listener in _bot_config_listeners:
+        _bot_config_listeners.remove(listener)
+
+
+def _record_change(session: Any, chat_id: int, chat_key_value: Union[int, str], chat_value: Any) -> None:
+    if _bot_config_listeners:
+        session.info.setdefault(_PENDING_CHANGES, []).append((chat_id, chat_key_value, chat_value))
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_committed_changes(session: Session) -> None:
+    for change in session.info.pop(_PENDING_CHANGES, ()):
+        for listener in list(_bot_config_listeners):
+            try:
+                listener(*change)
+            except Exception as e:
+                logger.error(f"bot_config listener failed for chat {change[0]}: {e}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_rolled_back_changes(session: Session) -> None:
+    session.info.pop(_PENDING_CHANGES, None)
+
+
+def _chat_key_value(chat_key: Union[int, Enum, str]) -> Union[int, str]:
+    if isinstance(chat_key, int):
+        return chat_key
+    if isinstance(chat_key, Enum):
+        return chat_key.value
+    return chat_key
+
+
+def decode_bot_value(val: Any) -> Any:
+    """Convert a stored bot_config value into the format callers expect."""
+    # logic from mongo.py to handle different formats (json string vs dict vs wrapper dict)
+    if isinstance(val, dict) and "value" in val and len(val) == 1:
+        return val["value"]
+
+    if isinstance(val, (dict, list)):
+        try:
+            return json.dumps(val)
+        except TypeError:
+            return str(val)
+
+    if isinstance(val, str):
+        stripped = val.strip()
+        if stripped and stripped[0] in '{"[' or stripped.startswith('"'):
+            try:
+                parsed = json.loads(val)
+                if isinstance(parsed, (dict, list)):
+                    return json.dumps(parsed)
+                if isinstance(parsed, str):
+                    return parsed
+            except json.JSONDecodeError:
+                pass
+    return val
+
+
+def prepare_chat_value(value: Any) -> Any:
+    """Normalize a value before it is written to bot_config."""
+    if value is None:
+        return None
+
+    if isinstance(value, str):
+        stripped = value.strip()
+        if stripped and stripped[0] in '{"[' or stripped.startswith('"'):
+            try:
+                parsed = json.loads(value)
+                # Double parse check from original code
+                if isinstance(parsed, str):
+                    inner_stripped = parsed.strip()
+                    if inner_stripped and inner_stripped[0] in '{"[' or inner_stripped.startswith('"'):
+                        try:
+                            parsed = json.loads(parsed)
+                        except json.JSONDecodeError:
+                            pass
+
+                if isinstance(parsed, dict) and set(parsed.keys()) == {"value"} and isinstance(parsed["value"], str):
+                    try:
+                        parsed = json.loads(parsed["value"])
+                    except json.JSONDecodeError:
+                        pass
+                return parsed
+            except json.JSONDecodeError:
+                pass
+        return value
+    return value
+
+
 class ConfigRepository(BaseRepository):
     def save_bot_value(self, chat_id: int, chat_key: Union[int, Enum, str], chat_value: Any) -> None:
         if isinstance(chat_key, int):
@@ -17,6 +121,7 @@ class ConfigRepository(BaseRepository):
         else:
             chat_key_value = chat_key
         chat_key_name = chat_key.name if isinstance(chat_key, Enum) else None
+        _record_change(self.session, chat_id, chat_key_value, chat_value)
 
         if chat_value is None:
             stmt = delete(BotConfig).where(and_(BotConfig.chat_id == chat_id, BotConfig.chat_key == chat_key_value))
@@ -38,41 +143,14 @@ class ConfigRepository(BaseRepository):
                 self.session.add(new_record)
 
     def load_bot_value(self, chat_id: int, chat_key: Union[int, Enum, str], default_value: Any = "") -> Any:
-        if isinstance(chat_key, int):
-            chat_key_value = chat_key
-        elif isinstance(chat_key, Enum):
-            chat_key_value = chat_key.value
-        else:
-            chat_key_value = chat_key
+        chat_key_value = _chat_key_value(chat_key)
 
         record = self.session.execute(
             select(BotConfig).where(and_(BotConfig.chat_id == chat_id, BotConfig.chat_key == chat_key_value))
         ).scalar_one_or_none()
 
         if record and record.chat_value is not None:
-            # logic from mongo.py to handle different formats (json string vs dict vs wrapper dict)
-            val = record.chat_value
-            if isinstance(val, dict) and "value" in val and len(val) == 1:
-                return val["value"]
-
-            if isinstance(val, (dict, list)):
-                try:
-                    return json.dumps(val)
-                except TypeError:
-                    return str(val)
-
-            if isinstance(val, str):
-                stripped = val.strip()
-                if stripped and stripped[0] in '{"[' or stripped.startswith('"'):
-                    try:
-                        parsed = json.loads(val)
-                        if isinstance(parsed, (dict, list)):
-                            return json.dumps(parsed)
-                        if isinstance(parsed, str):
-                            return parsed
-                    except json.JSONDecodeError:
-                        pass
-            return val
+            return decode_bot_value(record.chat_value)
 
         return default_value
 
@@ -84,6 +162,28 @@ class ConfigRepository(BaseRepository):
         result = self.session.execute(select(BotConfig.chat_id).where(BotConfig.chat_key == chat_key_value))
         return [row[0] for row in result.fetchall()]
 
+    def load_chat_values(self, chat_id: int) -> Dict[int, Any]:
+        """All bot_config values of one chat in a single query, decoded like load_bot_value."""
+        rows = self.session.execute(
+            select(BotConfig.chat_key, BotConfig.chat_value).where(BotConfig.chat_id == chat_id)
+        )
+        return {row.chat_key: decode_bot_value(row.chat_value) for row in rows if row.chat_value is not None}
+
+    def load_key_values(self, chat_key: Union[int, Enum, str]) -> Dict[int, Any]:
+        """One key across every chat in a single query: {chat_id: decoded value}."""
+        rows = self.session.execute(
+            select(BotConfig.chat_id, BotConfig.chat_value).where(BotConfig.chat_key == _chat_key_value(chat_key))
+        )
+        return {row.chat_id: decode_bot_value(row.chat_value) for row in rows if row.chat_value is not None}
+
+    def load_all_values(self) -> Dict[int, Dict[int, Any]]:
+        """Snapshot of the whole bot_config table: {chat_id: {chat_key: decoded value}}."""
+        snapshot: Dict[int, Dict[int, Any]] = {}
+        for row in self.session.execute(select(BotConfig.chat_id, BotConfig.chat_key, BotConfig.chat_value)):
+            if row.chat_value is not None:
+                snapshot.setdefault(row.chat_id, {})[row.chat_key] = decode_bot_value(row.chat_value)
+        return snapshot
+
     def get_chat_dict_by_key(self, chat_key: Union[int, Enum, str], return_json: bool = False) -> Dict[int, Any]:
         chat_key_value = (
             chat_key if isinstance(chat_key, int) else (chat_key.value if isinstance(chat_key, Enum) else chat_key)
@@ -145,8 +245,10 @@ class ConfigRepository(BaseRepository):
             new_val[dict_key] = dict_value
             record.chat_value = new_val
         else:
-            new_record = BotConfig(chat_id=chat_id, chat_key=chat_key_value, chat_value={dict_key: dict_value})
+            new_val = {dict_key: dict_value}
+            new_record = BotConfig(chat_id=chat_id, chat_key=chat_key_value, chat_value=new_val)
             self.session.add(new_record)
+        _record_change(self.session, chat_id, chat_key_value, new_val)
 
     def get_dict_value(
         self, chat_id: int, chat_key: Union[int, Enum, str], dict_key: str, default_value: Any = None
@@ -217,34 +319,56 @@ class ConfigRepository(BaseRepository):
         return record if record is not None else default_value
 
     def _prepare_chat_value(self, value: Any) -> Any:
-        if value is None:
-            return None
+        return prepare_chat_value(value)
 
-        if isinstance(value, str):
-            stripped = value.strip()
-            if stripped and stripped[0] in '{"[' or stripped.startswith('"'):
-                try:
-                    parsed = json.loads(value)
-                    # Double parse check from original code
-                    if isinstance(parsed, str):
-                        inner_stripped = parsed.strip()
-                        if inner_stripped and inner_stripped[0] in '{"[' or inner_stripped.startswith('"'):
-                            try:
-                                parsed = json.loads(parsed)
-                            except json.JSONDecodeError:
-                                pass
 
-                    if (
-                        isinstance(parsed, dict)
-                        and set(parsed.keys()) == {"value"}
-                        and isinstance(parsed["value"], str)
-                    ):
-                        try:
-                            parsed = json.loads(parsed["value"])
-                        except json.JSONDecodeError:
-                            pass
-                    return parsed
-                except json.JSONDecodeError:
-                    pass
-            return value
-        return value
+class AsyncConfigRepository(AsyncBaseRepository):
+    """AsyncSession counterpart of ConfigRepository for the hot bot_config paths."""
+
+    async def save_bot_value(self, chat_id: int, chat_key: Union[int, Enum, str], chat_value: Any) -> None:
+        chat_key_value = _chat_key_value(chat_key)
+        chat_key_name = chat_key.name if isinstance(chat_key, Enum) else None
+        _record_change(self.session, chat_id, chat_key_value, chat_value)
+
+        if chat_value is None:
+            await self.session.execute(
+                delete(BotConfig).where(and_(BotConfig.chat_id == chat_id, BotConfig.chat_key == chat_key_value))
+            )
+            return
+
+        prepared_value = prepare_chat_value(chat_value)
+        existing_record = (
+            await self.session.execute(
+                select(BotConfig).where(and_(BotConfig.chat_id == chat_id, BotConfig.chat_key == chat_key_value))
+            )
+        ).scalar_one_or_none()
+
+        if existing_record:
+            existing_record.chat_key_name = chat_key_name
+            existing_record.chat_value = prepared_value
+        else:
+            self.session.add(
+                BotConfig(
+                    chat_id=chat_id, chat_key=chat_key_value, chat_key_name=chat_key_name, chat_value=prepared_value
+                )
+            )
+
+    async def load_bot_value(self, chat_id: int, chat_key: Union[int, Enum, str], default_value: Any = "") -> Any:
+        chat_key_value = _chat_key_value(chat_key)
+        chat_value = (
+            await self.session.execute(
+                select(BotConfig.chat_value).where(
+                    and_(BotConfig.chat_id == chat_id, BotConfig.chat_key == chat_key_value)
+                )
+            )
+        ).scalar_one_or_none()
+
+        if chat_value is not None:
+            return decode_bot_value(chat_value)
+        return default_value
+
+    async def get_chat_ids_by_key(self, chat_key: Union[int, Enum, str]) -> List[int]:
+        result = await self.session.execute(
+            select(BotConfig.chat_id).where(BotConfig.chat_key == _chat_key_value(chat_key))
+        )
+        return [row[0] for row in result.fetchall()]
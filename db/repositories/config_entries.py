@@ -0,0 +1,87 @@
+from enum import Enum
+from typing import Any, Dict, Optional, Union
+
+from sqlalchemy import and_, delete, select
+
+from db.repositories.base import BaseRepository, dialect_insert
+from shared.infrastructure.database.models import ConfigEntry
+
+# {chat_key: {scope: {entry: value}}}
+ConfigEntries = Dict[int, Dict[str, Dict[str, Any]]]
+
+
+def _chat_key_value(chat_key: Union[int, Enum]) -> int:
+    return chat_key.value if isinstance(chat_key, Enum) else chat_key
+
+
+def entries_to_list(entries: Dict[str, Any]) -> list[str]:
+    """Ordered list stored as {item: position} (topic admins)."""
+    return sorted(entries, key=lambda item: entries[item])
+
+
+def list_to_entries(items: list[str]) -> Dict[str, int]:
+    return {item: position for position, item in enumerate(dict.fromkeys(items))}
+
+
+class ConfigEntriesRepository(BaseRepository):
+    """
+    Keyed settings stored one row per (chat_key, scope, entry) in ``config_entries``.
+
+    Replaces whole-dict JSON blobs under chat_id 0 in ``bot_config``: a change
+    writes or deletes only its own rows, and ``load_all`` reads every key at once.
+    """
+
+    def load_all(self) -> ConfigEntries:
+        """Every entry of every key in a single query."""
+        entries: ConfigEntries = {}
+        rows = self.session.execute(
+            select(ConfigEntry.chat_key, ConfigEntry.scope, ConfigEntry.entry, ConfigEntry.value)
+        )
+        for row in rows:
+            entries.setdefault(row.chat_key, {}).setdefault(row.scope, {})[row.entry] = row.value
+        return entries
+
+    def load_scope(self, chat_key: Union[int, Enum], scope: str) -> Dict[str, Any]:
+        rows = self.session.execute(
+            select(ConfigEntry.entry, ConfigEntry.value).where(
+                and_(ConfigEntry.chat_key == _chat_key_value(chat_key), ConfigEntry.scope == scope)
+            )
+        )
+        return {row.entry: row.value for row in rows}
+
+    def upsert(self, chat_key: Union[int, Enum], scope: str, entry: str, value: Any) -> None:
+        self.upsert_many(chat_key, {scope: {entry: value}})
+
+    def upsert_many(self, chat_key: Union[int, Enum], scopes: Dict[str, Dict[str, Any]]) -> None:
+        rows = [
+            {"chat_key": _chat_key_value(chat_key), "scope": scope, "entry": entry, "value": value}
+            for scope, entries in scopes.items()
+            for entry, value in entries.items()
+        ]
+        if not rows:
+            return
+        insert_stmt = dialect_insert(self.session.bind.dialect.name, ConfigEntry)
+        stmt = insert_stmt.on_conflict_do_update(
+            index_elements=[ConfigEntry.chat_key, ConfigEntry.scope, ConfigEntry.entry],
+            set_={"value": insert_stmt.excluded.value},
+        )
+        self.session.execute(stmt, rows)
+
+    def delete(self, chat_key: Union[int, Enum], scope: Optional[str] = None, entry: Optional[str] = None) -> None:
+        """Delete one entry, a whole scope, or (without ``scope``) every entry of the key."""
+        condition = ConfigEntry.chat_key == _chat_key_value(chat_key)
+        if scope is not None:
+            condition = and_(condition, ConfigEntry.scope == scope)
+        if entry is not None:
+            condition = and_(condition, ConfigEntry.entry == entry)
+        self.session.execute(delete(ConfigEntry).where(condition))
+
+    def replace_scope(self, chat_key: Union[int, Enum], scope: str, entries: Dict[str, Any]) -> None:
+        """Make ``scope`` hold exactly ``entries``; other scopes are not touched."""
+        self.delete(chat_key, scope)
+        self.upsert_many(chat_key, {scope: entries})
+
+    def replace_key(self, chat_key: Union[int, Enum], scopes: Dict[str, Dict[str, Any]]) -> None:
+        """Make the key hold exactly ``scopes`` (for values that are always regenerated whole)."""
+        self.delete(chat_key)
+        self.upsert_many(chat_key, scopes)
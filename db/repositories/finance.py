@@ -1,10 +1,17 @@
+from datetime import date, datetime, time, timedelta
 from typing import List, Optional, Tuple, cast
 
-from sqlalchemy import select, func, and_, desc, cast as sql_cast, Float, Date
+from sqlalchemy import select, func, and_, desc
 
 from db.repositories.base import BaseRepository
 from shared.infrastructure.database.models import TPayments, TDivList, TTransaction, TWatchList, TLedgers, TOperations
 
+# t_transaction.was_send values still waiting for the ledger: 0 not signed yet, 2 signed with a recorded
+# sequence and hash (see other/stellar/dividend_submit.py)
+UNSENT_STATES = (0, 2)
+# in the ledger with tx_failed: the payments were not made and are never resubmitted automatically
+FAILED_STATE = 3
+
 
 class FinanceRepository(BaseRepository):
     def get_total_user_div(self) -> float:
@@ -34,13 +41,24 @@ class FinanceRepository(BaseRepository):
 
     def count_unsent_transactions(self, list_id: int) -> int:
         result = self.session.execute(
-            select(func.count()).where(and_(TTransaction.was_send == 0, TTransaction.id_div_list == list_id))
+            select(func.count()).where(
+                and_(TTransaction.was_send.in_(UNSENT_STATES), TTransaction.id_div_list == list_id)
+            )
+        ).scalar()
+        return result if result is not None else 0
+
+    def count_failed_transactions(self, list_id: int) -> int:
+        result = self.session.execute(
+            select(func.count()).where(and_(TTransaction.was_send == FAILED_STATE, TTransaction.id_div_list == list_id))
         ).scalar()
         return result if result is not None else 0
 
     def load_transactions(self, list_id: int) -> List[TTransaction]:
+        """Transactions still to submit, in the order they were packed."""
         result = self.session.execute(
-            select(TTransaction).where(and_(TTransaction.was_send == 0, TTransaction.id_div_list == list_id))
+            select(TTransaction)
+            .where(and_(TTransaction.was_send.in_(UNSENT_STATES), TTransaction.id_div_list == list_id))
+            .order_by(TTransaction.id)
         )
         return cast(List[TTransaction], result.scalars().all())
 
@@ -70,14 +88,14 @@ class FinanceRepository(BaseRepository):
     def get_new_effects_for_token(self, token: str, last_id: str, amount: float) -> List[TOperations]:
         assert len(token) <= 32, "Length of 'token' should not exceed 32 characters"
 
-        base_query = (
-            select(TOperations)
-            .where(TOperations.operation != "trustline_created")
-            .where(
-                (TOperations.code1 == token) & (sql_cast(TOperations.amount1, Float) > amount)
-                | (TOperations.code2 == token) & (sql_cast(TOperations.amount2, Float) > amount)
-            )
-        )
+        side1 = (TOperations.code1 == token) & (TOperations.amount1 > amount)
+        side2 = (TOperations.code2 == token) & (TOperations.amount2 > amount)
+        if last_id != "-1":
+            # Ids grow with dt: the dt of last_id turns each side into a short (code, dt) index range
+            last_dt = self.session.execute(select(TOperations.dt).where(TOperations.id == last_id)).scalar()
+            if last_dt is not None:
+                side1, side2 = side1 & (TOperations.dt >= last_dt), side2 & (TOperations.dt >= last_dt)
+        base_query = select(TOperations).where(TOperations.operation != "trustline_created").where(side1 | side2)
 
         if last_id == "-1":
             stmt = base_query.order_by(desc(TOperations.id)).limit(1)
@@ -97,28 +115,16 @@ class FinanceRepository(BaseRepository):
         return cast(List[TOperations], result.scalars().all())
 
     def get_last_trade_operation(self, asset_code: str = "MTL", minimal_sum: float = 0) -> float:
-        stmt = (
-            select(TOperations)
-            .where(
-                (TOperations.operation == "trade")
-                & (
-                    and_(
-                        (TOperations.code1 == asset_code),
-                        (TOperations.code2 == "EURMTL"),
-                        (sql_cast(TOperations.amount1, Float) > minimal_sum),
-                    )
-                    | and_(
-                        (TOperations.code1 == "EURMTL"),
-                        (TOperations.code2 == asset_code),
-                        (sql_cast(TOperations.amount2, Float) > minimal_sum),
-                    )
-                )
-            )
-            .order_by(desc(TOperations.dt))
-            .limit(1)
+        # One lookup per side of the pair, each walking its (code, dt) index backwards: as a single OR
+        # the planner may pick the index on "EURMTL", which matches a large part of the table
+        last_trade = select(TOperations).where(TOperations.operation == "trade").order_by(desc(TOperations.dt)).limit(1)
+        sides = (
+            and_(TOperations.code1 == asset_code, TOperations.code2 == "EURMTL", TOperations.amount1 > minimal_sum),
+            and_(TOperations.code1 == "EURMTL", TOperations.code2 == asset_code, TOperations.amount2 > minimal_sum),
         )
+        trades = [trade for side in sides if (trade := self.session.execute(last_trade.where(side)).scalar())]
 
-        operation = self.session.execute(stmt).scalar_one_or_none()
+        operation = max(trades, key=lambda trade: trade.dt, default=None)
         if operation:
             try:
                 if operation.code2 == asset_code:
@@ -130,11 +136,12 @@ class FinanceRepository(BaseRepository):
                 return 0.0
         return 0.0
 
-    def get_operations_by_asset(self, asset_code: str, dt_filter) -> List[TOperations]:
-        stmt = (
-            select(TOperations)
-            .where((TOperations.code1 == asset_code) | (TOperations.code2 == asset_code))
-            .where(sql_cast(TOperations.dt, Date) == dt_filter)
+    def get_operations_by_asset(self, asset_code: str, dt_filter: date) -> List[TOperations]:
+        # A range on dt instead of CAST(dt AS DATE) keeps the (code, dt) indexes usable
+        day_start = datetime.combine(dt_filter, time.min)
+        in_day = (TOperations.dt >= day_start) & (TOperations.dt < day_start + timedelta(days=1))
+        stmt = select(TOperations).where(
+            ((TOperations.code1 == asset_code) & in_day) | ((TOperations.code2 == asset_code) & in_day)
         )
         result = self.session.execute(stmt)
         return cast(List[TOperations], result.scalars().all())
@@ -1,9 +1,9 @@
 from datetime import datetime, timedelta
-from typing import List, cast
+from typing import List, Optional, cast
 
-from sqlalchemy import select, and_
+from sqlalchemy import func, select, and_, update
 
-from db.repositories.base import BaseRepository
+from db.repositories.base import AsyncBaseRepository, BaseRepository
 from shared.infrastructure.database.models import TMessage, TSavedMessages, TSummary
 from other.constants import MTLChats
 
@@ -99,3 +99,99 @@ class MessageRepository(BaseRepository):
 
     def send_admin_message(self, msg: str) -> None:
         self.add_message(MTLChats.ITolstov, msg)
+
+
+class AsyncMessageRepository(AsyncBaseRepository):
+    """AsyncSession counterpart of MessageRepository for outbox and saved-message writes."""
+
+    async def add_message(
+        self,
+        user_id: int,
+        text: str,
+        use_alarm: int = 0,
+        update_id: int = None,
+        button_json: str = None,
+        topic_id: int = 0,
+    ) -> None:
+        self.session.add(
+            TMessage(
+                user_id=user_id,
+                text=text,
+                use_alarm=use_alarm,
+                update_id=update_id,
+                button_json=button_json,
+                topic_id=topic_id,
+            )
+        )
+
+    async def load_new_messages(self, limit: int = 10) -> List[TMessage]:
+        result = await self.session.execute(select(TMessage).where(TMessage.was_send == 0).limit(limit))
+        return cast(List[TMessage], result.scalars().all())
+
+    async def claim_new_messages(
+        self,
+        owner: str,
+        lease_seconds: float,
+        limit: int = 50,
+        exclude_chat_ids: Optional[List[int]] = None,
+    ) -> List[TMessage]:
+        """
+        Lease unsent rows to ``owner`` for ``lease_seconds``; the caller commits the claim right away.
+
+        Chats with a live lease are skipped, so a chat is worked through by one sender at a time.
+        Rows of a sender that died are claimed again once their lease expires (at-least-once).
+        """
+        now = datetime.now()
+        leased_chats = select(TMessage.user_id).where(
+            TMessage.was_send == 0, TMessage.sending_until > now, TMessage.user_id.is_not(None)
+        )
+        stmt = select(TMessage).where(TMessage.was_send == 0, TMessage.user_id.notin_(leased_chats))
+        if exclude_chat_ids:
+            stmt = stmt.where(TMessage.user_id.notin_(exclude_chat_ids))
+        result = await self.session.execute(stmt.order_by(TMessage.id).limit(limit).with_for_update(skip_locked=True))
+        records = cast(List[TMessage], result.scalars().all())
+        if records:
+            await self.session.execute(
+                update(TMessage)
+                .where(TMessage.id.in_([record.id for record in records]))
+                .values(sending_owner=owner, sending_until=now + timedelta(seconds=lease_seconds))
+            )
+        return records
+
+    async def set_send_status(self, message_ids: List[int], was_send: int) -> None:
+        if message_ids:
+            await self.session.execute(
+                update(TMessage)
+                .where(TMessage.id.in_(message_ids))
+                .values(was_send=was_send, sending_owner=None, sending_until=None)
+            )
+
+    async def release_messages(self, message_ids: List[int], until: Optional[datetime] = None) -> None:
+        """Give back rows that were claimed but not sent; with ``until`` their chat stays skipped until then."""
+        if message_ids:
+            await self.session.execute(
+                update(TMessage)
+                .where(TMessage.id.in_(message_ids), TMessage.was_send == 0)
+                .values(sending_owner=None, sending_until=until)
+            )
+
+    async def get_outbox_stats(self) -> tuple[int, Optional[datetime]]:
+        """Number of unsent rows and dt_add of the oldest one."""
+        row = (
+            await self.session.execute(select(func.count(), func.min(TMessage.dt_add)).where(TMessage.was_send == 0))
+        ).one()
+        return row[0], row[1]
+
+    async def save_message(
+        self, user_id: int, username: str, chat_id: int, thread_id: int, text: str, summary_id: int = None
+    ) -> None:
+        self.session.add(
+            TSavedMessages(
+                user_id=user_id,
+                username=username,
+                chat_id=chat_id,
+                thread_id=thread_id,
+                text=text[:4000],
+                summary_id=summary_id,
+            )
+        )
@@ -1,4 +1,6 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from other.config_reader import config
@@ -6,6 +8,38 @@ from other.config_reader import config
 engine = create_engine(config.postgres_url, pool_pre_ping=True)
 SessionPool = sessionmaker(bind=engine)
 
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
 
 def create_session():
     return SessionPool()
+
+
+def to_async_url(url: str) -> str:
+    """Return the same database URL with its asyncio driver (asyncpg / aiosqlite)."""
+    parsed = make_url(url)
+    async_driver = _ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if async_driver is None or parsed.drivername == async_driver:
+        return url
+    return parsed.set(drivername=async_driver).render_as_string(hide_password=False)
+
+
+def create_async_session_pool(url: str | None = None, **engine_kwargs) -> async_sessionmaker[AsyncSession]:
+    """Create an AsyncSession factory on top of an asyncpg-backed AsyncEngine.
+
+    Connections are opened lazily, so building the pool at startup is free.
+    """
+    async_url = to_async_url(url or config.postgres_url)
+    if make_url(async_url).get_backend_name() == "postgresql":
+        engine_kwargs.setdefault("pool_pre_ping", True)
+        engine_kwargs.setdefault("max_overflow", 50)
+    async_engine = create_async_engine(async_url, **engine_kwargs)
+    return async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+
+async def dispose_async_session_pool(async_session_pool: async_sessionmaker[AsyncSession]) -> None:
+    """Close every pooled connection of the engine behind ``async_session_pool``."""
+    await async_session_pool.kw["bind"].dispose()
@@ -4,6 +4,18 @@ from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject
 
 
+def handler_wants(data: Dict[str, Any], name: str) -> bool:
+    """Check whether the resolved handler declares ``name`` (or **kwargs).
+
+    Inner middlewares run after filters, so ``data["handler"]`` is the HandlerObject
+    that is about to be called. Without it we cannot tell and assume the argument is needed.
+    """
+    handler = data.get("handler")
+    if handler is None:
+        return True
+    return handler.varkw or name in handler.params
+
+
 class DbSessionMiddleware(BaseMiddleware):
     def __init__(self, session_pool):
         super().__init__()
@@ -15,8 +27,34 @@ class DbSessionMiddleware(BaseMiddleware):
         event: TelegramObject,
         data: Dict[str, Any],
     ) -> Any:
+        if not handler_wants(data, "session"):
+            return await handler(event, data)
+
         with self.session_pool() as session:
             data["session"] = session
             result = await handler(event, data)
             session.commit()
             return result
+
+
+class AsyncDbSessionMiddleware(BaseMiddleware):
+    """Injects an AsyncSession as ``async_session`` for handlers that declare it."""
+
+    def __init__(self, async_session_pool):
+        super().__init__()
+        self.async_session_pool = async_session_pool
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        if not handler_wants(data, "async_session"):
+            return await handler(event, data)
+
+        async with self.async_session_pool() as session:
+            data["async_session"] = session
+            result = await handler(event, data)
+            await session.commit()
+            return result
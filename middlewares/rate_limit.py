@@ -0,0 +1,84 @@
+from typing import Final, Optional
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import (
+    AnswerCallbackQuery,
+    AnswerInlineQuery,
+    ApproveChatJoinRequest,
+    BanChatMember,
+    BanChatSenderChat,
+    DeclineChatJoinRequest,
+    DeleteMessage,
+    DeleteMessages,
+    Response,
+    RestrictChatMember,
+    SendChatAction,
+    TelegramMethod,
+    UnbanChatMember,
+)
+from aiogram.methods.base import TelegramType
+
+from services.telegram_rate_limiter import RequestPriority, TelegramRateLimiter, get_request_priority
+
+# Moderation actions and answers: served first, not limited per chat
+HIGH_PRIORITY_METHODS: Final = (
+    AnswerCallbackQuery,
+    AnswerInlineQuery,
+    ApproveChatJoinRequest,
+    BanChatMember,
+    BanChatSenderChat,
+    DeclineChatJoinRequest,
+    DeleteMessage,
+    DeleteMessages,
+    RestrictChatMember,
+    UnbanChatMember,
+)
+# API methods that post or change messages and count against flood limits
+THROTTLED_PREFIXES: Final = ("send", "copy", "forward", "edit")
+# Throttled globally but not messages: they must not use up the chat's message tokens
+CHAT_BUCKET_EXEMPT_METHODS: Final = (SendChatAction,)
+
+
+class RateLimitRequestMiddleware(BaseRequestMiddleware):
+    """Passes outgoing calls through TelegramRateLimiter; read-only calls (getX) are not delayed."""
+
+    __slots__ = ("limiter",)
+
+    def __init__(self, limiter: Optional[TelegramRateLimiter] = None) -> None:
+        self.limiter = limiter or TelegramRateLimiter()
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        priority = method_priority(method)
+        if priority is None:
+            return await make_request(bot, method)
+
+        chat_id = getattr(method, "chat_id", None)
+        await self.limiter.acquire(None if is_chat_bucket_exempt(method) else chat_id, priority)
+        try:
+            return await make_request(bot, method)
+        except TelegramRetryAfter as e:
+            self.limiter.pause(chat_id, e.retry_after)
+            raise
+
+
+def method_priority(method: TelegramMethod) -> Optional[RequestPriority]:
+    """Priority of a throttled call, or None when the call is not rate limited."""
+    if isinstance(method, HIGH_PRIORITY_METHODS):
+        return RequestPriority.HIGH
+    if not method.__api_method__.startswith(THROTTLED_PREFIXES):
+        return None
+    return get_request_priority()
+
+
+def is_chat_bucket_exempt(method: TelegramMethod) -> bool:
+    return isinstance(method, CHAT_BUCKET_EXEMPT_METHODS)
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Any, Awaitable, Callable, Dict, cast
+from typing import Any, Awaitable, Callable, Dict, Optional
 from aiogram import BaseMiddleware
 from aiogram.types import Message, TelegramObject
 import redis.asyncio.client
@@ -47,6 +47,7 @@ class ThrottlingMiddleware(BaseMiddleware):
         self.rate_limit = limit
         self.prefix = key_prefix
         self.throttle_manager = ThrottleManager(redis=redis)
+        self._limits_cache: dict[Any, tuple[Optional[float], str, Optional[float], str]] = {}
 
         super(ThrottlingMiddleware, self).__init__()
 
@@ -59,6 +60,11 @@ class ThrottlingMiddleware(BaseMiddleware):
         if not isinstance(event, Message):
             return await handler(event, data)
 
+        # Fast path: handlers without a limit (or with rate 0) never touch Redis
+        user_limit, _, chat_limit, _ = self._handler_limits(data)
+        if not user_limit and not chat_limit:
+            return await handler(event, data)
+
         try:
             await self.on_process_event(event, data)
         except CancelHandler:
@@ -72,13 +78,7 @@ class ThrottlingMiddleware(BaseMiddleware):
         event: Message,
         data: Dict[str, Any],
     ) -> Any:
-        # User level throttling
-        user_limit = getattr(data["handler"].callback, "throttling_rate_limit", None)
-        user_key = getattr(data["handler"].callback, "throttling_key", f"{self.prefix}_message")
-
-        # Chat level throttling
-        chat_limit = getattr(data["handler"].callback, "chat_throttling_rate_limit", None)
-        chat_key = getattr(data["handler"].callback, "chat_throttling_key", f"{self.prefix}_chat_message")
+        user_limit, user_key, chat_limit, chat_key = self._handler_limits(data)
 
         # Use ThrottleManager.throttle method.
         try:
@@ -97,6 +97,22 @@ class ThrottlingMiddleware(BaseMiddleware):
             # Cancel current handler
             raise CancelHandler()
 
+    def _handler_limits(self, data: Dict[str, Any]) -> tuple[Optional[float], str, Optional[float], str]:
+        """(user limit, user key, chat limit, chat key) of the handler, read once per callback."""
+        callback = data["handler"].callback
+        limits = self._limits_cache.get(callback)
+        if limits is None:
+            limits = (
+                # User level throttling
+                getattr(callback, "throttling_rate_limit", None),
+                getattr(callback, "throttling_key", f"{self.prefix}_message"),
+                # Chat level throttling
+                getattr(callback, "chat_throttling_rate_limit", None),
+                getattr(callback, "chat_throttling_key", f"{self.prefix}_chat_message"),
+            )
+            self._limits_cache[callback] = limits
+        return limits
+
     @staticmethod
     async def event_throttled(event: Message, throttled: Throttled):
         # Calculate how many times is left till the block ends
@@ -107,14 +123,32 @@ class ThrottlingMiddleware(BaseMiddleware):
         await event.answer(f"Too many events.\nTry again in {delta:.2f} seconds.")
 
 
-class ThrottleManager:
-    bucket_keys = ["RATE_LIMIT", "DELTA", "LAST_CALL", "EXCEEDED_COUNT"]
+# GCRA with burst 1: one call per `rate` seconds. A single EVALSHA per check, so
+# concurrent updates cannot interleave, and every bucket expires once it is idle.
+THROTTLE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local ttl = math.ceil(rate * 1000) + 1000
+local tat = tonumber(redis.call('HGET', KEYS[1], 'tat') or '0')
+if tat > now then
+    local exceeded = redis.call('HINCRBY', KEYS[1], 'exceeded', 1)
+    redis.call('PEXPIRE', KEYS[1], ttl)
+    return {0, tostring(tat - now), exceeded}
+end
+redis.call('HSET', KEYS[1], 'tat', tostring(now + rate), 'exceeded', 0)
+redis.call('PEXPIRE', KEYS[1], ttl)
+return {1, '0', 0}
+"""
+
 
+class ThrottleManager:
     def __init__(self, redis: redis.asyncio.client.Redis):
         self.redis = redis
+        # redis-py Script: EVALSHA, falls back to EVAL (and caches the script) on NOSCRIPT
+        self._script = redis.register_script(THROTTLE_SCRIPT)
 
     async def throttle(self, key: str, rate: float, user_id: int | None = None, chat_id: int | None = None):
-        if rate == 0:
+        if rate <= 0:
             return True  # No throttling applied
 
         now = time.time()
@@ -123,33 +157,20 @@ class ThrottleManager:
         else:
             bucket_name = f"throttle_{key}_{chat_id}"
 
-        hmget = cast(Any, self.redis.hmget)
-        data = await hmget(bucket_name, self.bucket_keys)
-        data = {
-            k: float(v.decode()) if isinstance(v, bytes) else v for k, v in zip(self.bucket_keys, data) if v is not None
-        }
-
-        # Calculate
-        called = data.get("LAST_CALL", now)
-        delta = now - called
-        result = delta >= rate or delta <= 0
-
-        # Save result
-        data["RATE_LIMIT"] = rate
-        data["LAST_CALL"] = now
-        data["DELTA"] = delta
-        if not result:
-            data["EXCEEDED_COUNT"] += 1
-        else:
-            data["EXCEEDED_COUNT"] = 1
-
-        hset = cast(Any, self.redis.hset)
-        await hset(bucket_name, mapping=data)
-
-        if not result:
-            raise Throttled(key=key, chat=chat_id, user=user_id, **data)
-
-        return result
+        allowed, wait, exceeded = await self._script(keys=[bucket_name], args=[now, rate])
+        if not int(allowed):
+            wait = float(wait.decode() if isinstance(wait, bytes) else wait)
+            raise Throttled(
+                key=key,
+                chat=chat_id,
+                user=user_id,
+                RATE_LIMIT=rate,
+                LAST_CALL=now,
+                DELTA=rate - wait,
+                EXCEEDED_COUNT=int(exceeded),
+            )
+
+        return True
 
 
 class Throttled(Exception):
@@ -11,6 +11,7 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from middlewares.retry import logger
 from other.config_reader import config
 from services.app_context import app_context
+from services.deferred_delete import get_deferred_delete_scheduler
 
 scheduler: AsyncIOScheduler
 
@@ -123,12 +124,18 @@ def add_text(lines, num_line, text):
 
 async def cmd_sleep_and_delete(message: Message, sleep_time=3 * 60):
     """
-    Asynchronous function that sleeps for a specified time and then attempts to delete a message.
+    Delete a message after a specified time.
+
+    Queued in the persistent DeferredDeleteScheduler when it is running, otherwise
+    a task sleeps and then attempts the delete.
     Args:
         message (Message): The message to be deleted.
         sleep_time: The time to sleep in seconds.
     """
-    # asyncio.ensure_future(cmd_sleep_and_delete_task(message, sleep_time))
+    scheduler = get_deferred_delete_scheduler()
+    if scheduler is not None:
+        await scheduler.schedule_message(message, sleep_time or 0)
+        return None
     return asyncio.create_task(cmd_sleep_and_delete_task(message, sleep_time))
 
 
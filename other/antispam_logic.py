@@ -9,7 +9,8 @@ from start import add_bot_users
 from other.constants import MTLChats, BotValueTypes
 from services.app_context import app_context
 from shared.domain.user import SpamStatus
-from other.spam_cheker import is_mixed_word, contains_spam_phrases, combo_check_spammer, lols_check_spammer
+from other.spam_rules import get_spam_rule_engine, get_spam_verdict_cache
+from other.spam_reputation import get_spam_reputation_service
 from other.open_ai_tools import talk_check_spam
 
 
@@ -144,13 +145,15 @@ async def check_spam(message, session=None):
     rules_name = "xz"
     process_message = False
 
-    if await combo_check_spammer(user_id):
+    reputation = await get_spam_reputation_service().check(user_id)
+
+    if reputation.cas:
         process_message = True
-        rules_name = f'<a href="https://cas.chat/query?u={user_id}">CAS ban</a>'
+        rules_name = reputation.cas_reason
 
-    if await lols_check_spammer(user_id):
+    if reputation.lols:
         process_message = True
-        rules_name = (f'<a href="https://lols.bot/?u={user_id}">LOLS base</a>',)
+        rules_name = reputation.lols_reason
 
     if not process_message and message.entities:
         custom_emoji_count = 0
@@ -171,18 +174,14 @@ async def check_spam(message, session=None):
         rules_name = "external_reply"
 
     if not process_message:
-        words = message.text.split()
-        mixed_word_count = sum(is_mixed_word(word) for word in words)
-        if mixed_word_count >= 3:
+        local_rule = get_spam_rule_engine().match(message.text)
+        if local_rule:
             process_message = True
-            rules_name = "mixed"
-
-    if not process_message and contains_spam_phrases(message.text):
-        process_message = True
-        rules_name = "spam_phrases"
+            rules_name = local_rule
 
     if not process_message:
-        spam_persent = await talk_check_spam(message.text)
+        # Copy-paste spam is judged by the LLM once per text
+        spam_persent = await get_spam_verdict_cache().get_or_check(message.text, talk_check_spam)
         logger.info(f"{spam_persent} {message.text}")
         if spam_persent and spam_persent > 69:
             process_message = True
@@ -0,0 +1,97 @@
+# other/chat_memory.py
+"""Per-chat conversation memory for the LLM: one capped Redis list per chat, token counts stored per entry."""
+
+import json
+import time
+from typing import Any, Callable, Optional
+
+# Redis list of JSON entries {"role", "content", "tokens", "ts"}, oldest first
+CHAT_MEMORY_KEY_PREFIX = "chat_memory:"
+
+# Same accounting as num_tokens_from_messages for gpt-3.5/gpt-4
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+
+# Drop the first ARGV[1] entries only if the one at ARGV[1]-1 is still ARGV[2], the last entry
+# the caller dropped: a concurrent load that trimmed first (or a cap from append) moved it
+TRIM_HEAD_SCRIPT = """
+local count = tonumber(ARGV[1])
+if redis.call('LINDEX', KEYS[1], count - 1) == ARGV[2] then
+    redis.call('LTRIM', KEYS[1], count, -1)
+    return 1
+end
+return 0
+"""
+
+
+class ChatMemory:
+    """
+    Conversation history of a chat, trimmed to a token budget.
+
+    Each entry keeps its own token count (computed once with ``count_tokens`` on
+    save), so trimming to ``max_tokens`` is a running total instead of
+    re-encoding the history. Entries older than ``ttl`` are ignored and the list
+    is capped at ``max_entries``; every operation is one pipelined round trip on
+    one key (plus a compare-and-trim script when ``load`` drops entries),
+    independent of how many keys the shared Redis holds.
+    """
+
+    def __init__(
+        self,
+        redis: Any,
+        count_tokens: Callable[[str], int],
+        max_tokens: int = 4000,
+        ttl: int = 2 * 3600,
+        max_entries: int = 200,
+    ):
+        self._redis = redis
+        self._count_tokens = count_tokens
+        self.max_tokens = max_tokens
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._trim_head = redis.register_script(TRIM_HEAD_SCRIPT)
+
+    @staticmethod
+    def key(chat_id: int) -> str:
+        return f"{CHAT_MEMORY_KEY_PREFIX}{chat_id}"
+
+    async def append(self, chat_id: int, content: str, role: str = "user") -> None:
+        tokens = TOKENS_PER_MESSAGE + self._count_tokens(role) + self._count_tokens(content)
+        entry = json.dumps({"role": role, "content": content, "tokens": tokens, "ts": time.time()})
+        key = self.key(chat_id)
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.rpush(key, entry)
+            pipe.ltrim(key, -self.max_entries, -1)
+            pipe.expire(key, self.ttl)
+            await pipe.execute()
+
+    async def load(self, chat_id: int) -> list[dict[str, str]]:
+        """Messages (``role``/``content``) from oldest to newest that fit into ``max_tokens``."""
+        key = self.key(chat_id)
+        raw_entries = await self._redis.lrange(key, 0, -1)
+        entries = [json.loads(raw) for raw in raw_entries]
+
+        expired_before = time.time() - self.ttl
+        start = 0
+        while start < len(entries) and entries[start]["ts"] < expired_before:
+            start += 1
+        total = TOKENS_PER_REPLY + sum(entry["tokens"] for entry in entries[start:])
+        while total > self.max_tokens and start < len(entries):
+            total -= entries[start]["tokens"]
+            start += 1
+
+        if start:
+            # Dropped entries are never needed again; a plain LTRIM would drop them twice under concurrent loads
+            await self._trim_head(keys=[key], args=[start, raw_entries[start - 1]])
+        return [{"role": entry["role"], "content": entry["content"]} for entry in entries[start:]]
+
+    async def pop_last(self, chat_id: int) -> Optional[dict[str, str]]:
+        """Remove the newest entry (e.g. a question the LLM failed to answer)."""
+        raw = await self._redis.rpop(self.key(chat_id))
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        return {"role": entry["role"], "content": entry["content"]}
+
+    async def clear(self, chat_id: int) -> None:
+        await self._redis.delete(self.key(chat_id))
@@ -33,11 +33,33 @@ class Settings(BaseSettings):
     sentry_report_dsn: str
     horizon_url: str
     stellar_testnet: bool = False
+    # Shared Horizon client (other/stellar/horizon_client.py)
+    horizon_pool_size: int = 50
+    horizon_max_concurrency: int = 20
+    horizon_timeout: float = 180.0
+    horizon_max_retries: int = 3
+    # Dividend transactions signed ahead and in flight at once (other/stellar/dividend_submit.py)
+    dividend_submit_window: int = 4
+    # Holder snapshots shared by dividend calculators (other/stellar/holder_snapshot.py)
+    holder_snapshot_dir: str | None = None
+    holder_snapshot_max_age: float = 600.0
+    # Also write backup/all.*.json next to the columnar holder backup (scripts/mtl_backup.py)
+    holder_backup_json: bool = False
+    # CAS/LOLS verdict cache in Redis (other/spam_reputation.py), seconds
+    spam_reputation_positive_ttl: int = 7 * 24 * 3600
+    spam_reputation_negative_ttl: int = 3600
     coinmarketcap: SecretStr
     # mongodb_url: str
     pyro_api_id: int = 0
     pyro_api_hash: SecretStr | None = None
     grist_token: str
+    # Account names from Grist for decoded transactions (other/stellar/name_resolver.py), seconds
+    grist_names_ttl: float = 600.0
+    # decode_xdr rendering (other/stellar/xdr_decoder.py): worker processes (0 = on the event loop),
+    # per-envelope timeout in seconds and the largest accepted XDR in characters
+    xdr_decode_workers: int = 2
+    xdr_decode_timeout: float = 10.0
+    xdr_decode_max_size: int = 200_000
     miniapps_key: str | None = None
     test_mode: bool = True
 
@@ -46,6 +68,11 @@ class Settings(BaseSettings):
     webhook_public_url: str | None = None  # http://skynet_bot:8081/webhook
     webhook_port: int = 8081
     notifier_auth_token: str | None = None  # Bearer token for notifier API
+    # Webhook ingestion queue: accepted payloads beyond the queue size get 503, workers drain it
+    webhook_queue_size: int = 1000
+    webhook_workers: int = 4
+    # How long a delivered transaction is remembered in Redis to drop notifier retries, seconds
+    webhook_dedup_ttl: int = 7 * 24 * 3600
 
     model_config = SettingsConfigDict(
         env_file=dotenv_path,
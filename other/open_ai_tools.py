@@ -1,13 +1,15 @@
 import asyncio
 import json
 import random
-from datetime import datetime, date
+from datetime import date
+from functools import lru_cache
 
 import httpx
 import tiktoken
 from redis.asyncio import Redis
 from loguru import logger
 from openai import AsyncOpenAI
+from other.chat_memory import ChatMemory
 from other.config_reader import config
 from other.gspread_tools import gs_save_new_task
 
@@ -15,7 +17,20 @@ MAX_TOKENS = 4000
 save_time_long = 60 * 60 * 2
 redis = Redis.from_url(config.redis_url)
 openai_key = config.openai_key.get_secret_value()
-enc = tiktoken.encoding_for_model("gpt-3.5-turbo")
+
+
+@lru_cache(maxsize=None)
+def _encoding(model):
+    """Один tiktoken-энкодер на модель на весь процесс."""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        logger.warning("Модель не найдена, используется кодировка cl100k_base.")
+        return tiktoken.get_encoding("cl100k_base")
+
+
+enc = _encoding("gpt-3.5-turbo")
+chat_memory = ChatMemory(redis, lambda text: len(enc.encode(text)), max_tokens=MAX_TOKENS, ttl=save_time_long)
 
 # client = OpenAI(api_key=openai_key)
 aclient = AsyncOpenAI(
@@ -33,23 +48,12 @@ extra_headers = {
 
 
 async def save_to_redis(chat_id, msg, is_answer=False):
-    data_name = f"{chat_id}:{round(datetime.now().timestamp())}"
-    j = {"content": msg}
-    if is_answer:
-        j["role"] = "assistant"
-    else:
-        j["role"] = "user"
-    await redis.set(data_name, json.dumps(j))
-    await redis.expire(data_name, save_time_long)
+    await chat_memory.append(chat_id, msg, role="assistant" if is_answer else "user")
 
 
 def num_tokens_from_messages(messages, model="gpt-3.5-turbo"):
     """Возвращает количество токенов, используемых списком сообщений."""
-    try:
-        encoding = tiktoken.encoding_for_model(model)
-    except KeyError:
-        print("Предупреждение: модель не найдена. Используется кодировка cl100k_base.")
-        encoding = tiktoken.get_encoding("cl100k_base")
+    encoding = _encoding(model)
 
     if "gpt-3.5-turbo" in model or "gpt-4" in model:
         # Для моделей gpt-3.5-turbo и gpt-4
@@ -73,44 +77,12 @@ def num_tokens_from_messages(messages, model="gpt-3.5-turbo"):
 
 
 async def load_from_redis(chat_id):
-    keys = await redis.keys(f"{chat_id}:*")
-    messages = []
-
-    for key in keys:
-        value = await redis.get(key)
-        message = json.loads(value)
-        _, timestamp = key.decode().split(":")
-        messages.append((float(timestamp), message))
-
-    # Сортируем сообщения по времени (от самых старых к самым новым)
-    messages.sort(key=lambda x: x[0])
-
-    # Подсчитываем токены
-    model = "gpt-3.5-turbo"  # Или используйте другую модель, если необходимо
-    formatted_messages = [msg[1] for msg in messages]  # Форматируем сообщения для подсчета токенов
-    total_tokens = num_tokens_from_messages(formatted_messages, model=model)
-    logger.info(f"Total tokens: {total_tokens}")
-
-    # Удаляем старые сообщения, если количество токенов превышает максимальное значение
-    while total_tokens > MAX_TOKENS and messages:
-        messages.pop(0)
-        total_tokens = num_tokens_from_messages([msg[1] for msg in messages], model=model)
-        logger.info(f"Total tokens after removing: {total_tokens}")
-
-    return [msg[1] for msg in messages]  # Возвращаем только данные сообщений
+    # История уже обрезана по MAX_TOKENS, токены посчитаны при сохранении
+    return await chat_memory.load(chat_id)
 
 
 async def delete_last_redis(chat_id):
-    keys = await redis.keys(f"{chat_id}:*")
-
-    if not keys:  # проверяем, есть ли ключи
-        return
-
-    # Извлекаем timestamp из каждого ключа и сортируем ключи по времени
-    keys.sort(key=lambda key: float(key.decode().split(":")[1]))
-
-    # Удаляем ключ с наибольшим значением времени (т.е. последний ключ)
-    await redis.delete(keys[-1])
+    await chat_memory.pop_last(chat_id)
 
 
 async def talk(chat_id, msg, gpt_maxi=False, googleit=False):
@@ -0,0 +1,101 @@
+# other/sheet_writer.py
+"""Batched Google Sheets writes: collect cell and range updates, send one values:batchUpdate per spreadsheet."""
+
+import asyncio
+import json
+from typing import Any, Optional
+
+from gspread.exceptions import APIError
+from loguru import logger
+
+# Quota exceeded and transient backend errors
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503})
+
+
+def a1_range(sheet_title: str, range_name: str) -> str:
+    """``'Sheet name'!D3`` - quotes in the title are doubled as the API requires."""
+    escaped = sheet_title.replace("'", "''")
+    return f"'{escaped}'!{range_name}"
+
+
+class SheetWriter:
+    """
+    Collects writes for one spreadsheet and commits them together.
+
+    Each ``update`` / ``cell`` call only records the write; ``commit`` sends one
+    ``values_batch_update`` per value input option (RAW / USER_ENTERED), so a
+    report costs one or two API calls instead of one per cell. A later write to
+    the same range replaces the earlier one. Quota errors are retried with
+    exponential backoff. With ``dry_run`` nothing is sent and ``render`` shows
+    the planned writes.
+
+    Commit before reading cells whose value depends on the pending writes.
+    """
+
+    def __init__(self, spreadsheet: Any, dry_run: bool = False, max_attempts: int = 5, base_delay: float = 2.0):
+        self.spreadsheet = spreadsheet
+        self.dry_run = dry_run
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self._pending: dict[str, dict[str, list[list[Any]]]] = {}
+        self.committed: list[dict] = []
+
+    def update(self, worksheet: Any, range_name: str, values: list[list[Any]], value_input_option: str = "RAW") -> None:
+        """Queue ``values`` for ``range_name`` of ``worksheet`` (a worksheet object or its title)."""
+        title = worksheet if isinstance(worksheet, str) else worksheet.title
+        self._pending.setdefault(value_input_option, {})[a1_range(title, range_name)] = values
+
+    def cell(self, worksheet: Any, range_name: str, value: Any, value_input_option: str = "RAW") -> None:
+        self.update(worksheet, range_name, [[value]], value_input_option)
+
+    @property
+    def pending_count(self) -> int:
+        return sum(len(ranges) for ranges in self._pending.values())
+
+    def render(self) -> list[str]:
+        """The pending writes as ``'Sheet'!D3 = [[1.0]]`` lines."""
+        return [
+            f"{range_name} = {json.dumps(values, ensure_ascii=False, default=str)}"
+            for ranges in self._pending.values()
+            for range_name, values in ranges.items()
+        ]
+
+    async def commit(self) -> list[dict]:
+        """Send everything queued so far. Returns the request bodies."""
+        bodies = [
+            {
+                "valueInputOption": option,
+                "data": [{"range": range_name, "values": values} for range_name, values in ranges.items()],
+            }
+            for option, ranges in self._pending.items()
+            if ranges
+        ]
+        if self.dry_run:
+            for line in self.render():
+                logger.info(f"[dry-run] {line}")
+        self._pending = {}
+        for body in bodies:
+            if not self.dry_run:
+                await self._send(body)
+            self.committed.append(body)
+        return bodies
+
+    async def _send(self, body: dict) -> None:
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                await self.spreadsheet.values_batch_update(body=body)
+                return
+            except APIError as e:
+                if e.code not in RETRY_STATUS_CODES or attempt == self.max_attempts:
+                    raise
+                delay = self.base_delay * 2 ** (attempt - 1)
+                logger.warning(f"Sheets batch update failed with {e.code}, retry {attempt} in {delay:.0f}s")
+                await asyncio.sleep(delay)
+
+    async def __aenter__(self) -> "SheetWriter":
+        return self
+
+    async def __aexit__(self, exc_type: Optional[type], exc: Optional[BaseException], tb: Any) -> None:
+        # Do not write half a report when building it failed
+        if exc_type is None:
+            await self.commit()
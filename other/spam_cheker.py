@@ -1,101 +1,28 @@
 import asyncio
-import re
 
-import aiohttp
-from loguru import logger
+from other.spam_reputation import get_spam_reputation_service
+from other.spam_rules import SpamRuleEngine, get_spam_rule_engine
 
 
 def is_mixed_word(word):
-    # Проверяем наличие русских букв
-    contains_cyrillic = bool(re.search("[а-яА-Я]", word))
-    # Проверяем наличие цифр
-    contains_digit = bool(re.search("[0-9@]", word))
-    # Проверяем наличие латинских букв
-    contains_latin = bool(re.search("[a-zA-Z]", word))
-
-    # Считаем слово "смешанным", если оно содержит русские буквы и (цифры или латинские буквы)
-    return contains_cyrillic and (contains_digit or contains_latin)
-
-
-spam_phrases = [
-    "команду",
-    "команда",
-    "доход",
-    "без опыта",
-    "лс",
-    "личку",
-    "прибыль",
-    "проект",
-    "предложение",
-    "тестирование",
-    "день",
-    "заработка",
-    "заработок",
-    "процент",
-    "пишите",
-    "18",
-    "связкизарабатывать",
-    "подробности",
-]
-
-for i in range(1, 20):
-    spam_phrases.append(f"{i}oo")
-    spam_phrases.append(f"{i}оо")
+    """Word has Cyrillic letters and (digits, "@" or Latin letters)."""
+    return get_spam_rule_engine().mixed_word_count(word) > 0
 
 
 def contains_spam_phrases(text, phrases=None, threshold=3):
     if phrases is None:
-        phrases = spam_phrases
-
-    words = re.findall(r"\b\w+\b", text.lower())
-
-    count = sum(phrase in words for phrase in phrases)
-    if "+" in text:
-        count += 1
-    # print(f'count: {count}')
-    return count >= threshold
+        return get_spam_rule_engine().phrase_score(text) >= threshold
+    return SpamRuleEngine(phrases).phrase_score(text) >= threshold
 
 
 async def combo_check_spammer(user_id):
-    try:
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(f"https://api.cas.chat/check?user_id={user_id}", timeout=10) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if data.get("ok"):
-                            # return data.get('result', False)
-                            return True
-                    else:
-                        logger.error(f"API request failed with status code: {response.status}")
-            except aiohttp.ClientError as e:
-                logger.error(f"Network error occurred: {str(e)}")
-            except asyncio.TimeoutError:
-                logger.error("Request timed out")
-    except Exception as e:
-        logger.error(f"Unexpected error in combo_check_spam: {str(e)}")
-    return False
+    """User is in the CAS ban list (cached, see other.spam_reputation)."""
+    return await get_spam_reputation_service().is_cas_banned(user_id)
 
 
 async def lols_check_spammer(user_id):
-    try:
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(f"https://api.lols.bot/account?id={user_id}", timeout=10) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        # {"ok":true,"user_id":8099459603,"banned":true}
-                        if data.get("ok") and data.get("banned"):
-                            return True
-                    else:
-                        logger.error(f"API request failed with status code: {response.status}")
-            except aiohttp.ClientError as e:
-                logger.error(f"Network error occurred: {str(e)}")
-            except asyncio.TimeoutError:
-                logger.error("Request timed out")
-    except Exception as e:
-        logger.error(f"Unexpected error in combo_check_spam: {str(e)}")
-    return False
+    """User is in the LOLS ban base (cached, see other.spam_reputation)."""
+    return await get_spam_reputation_service().is_lols_banned(user_id)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,230 @@
+# other/spam_reputation.py
+"""CAS and LOLS spammer lookups: concurrent, pooled, cached in Redis, coalesced per user."""
+
+import asyncio
+import json
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+
+import aiohttp
+from loguru import logger
+
+CAS_URL = "https://api.cas.chat/check"
+LOLS_URL = "https://api.lols.bot/account"
+
+# Redis key prefix for cached verdicts
+REPUTATION_KEY_PREFIX = "spam_rep:"
+
+
+@dataclass(frozen=True, slots=True)
+class ReputationVerdict:
+    """What the external ban lists say about a user."""
+
+    user_id: int
+    cas: bool = False
+    lols: bool = False
+
+    @property
+    def is_spammer(self) -> bool:
+        return self.cas or self.lols
+
+    @property
+    def cas_reason(self) -> str:
+        return f'<a href="https://cas.chat/query?u={self.user_id}">CAS ban</a>'
+
+    @property
+    def lols_reason(self) -> str:
+        return f'<a href="https://lols.bot/?u={self.user_id}">LOLS base</a>'
+
+
+class SpamReputationService:
+    """
+    Looks a user up in CAS and LOLS at the same time over one pooled session.
+
+    Verdicts are cached in Redis: spammers for ``positive_ttl``, clean users for
+    ``negative_ttl`` (a clean user can be listed later). A verdict where a source
+    failed is not cached. Concurrent lookups of the same user share one request
+    pair, and ``check_many`` resolves a whole join wave with one MGET.
+    """
+
+    def __init__(
+        self,
+        redis: Any = None,
+        positive_ttl: int = 7 * 24 * 3600,
+        negative_ttl: int = 3600,
+        timeout: float = 10.0,
+        pool_size: int = 20,
+        max_concurrency: int = 20,
+        cas_url: str = CAS_URL,
+        lols_url: str = LOLS_URL,
+    ):
+        self._redis = redis
+        self.cas_url = cas_url
+        self.lols_url = lols_url
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._pool_size = pool_size
+        self._max_concurrency = max_concurrency
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight: dict[int, asyncio.Future] = {}
+        self.cache_hits = 0
+        self.lookups = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    async def check(self, user_id: int) -> ReputationVerdict:
+        """CAS and LOLS verdict for one user."""
+        cached = await self._cache_get([user_id])
+        if user_id in cached:
+            return cached[user_id]
+        return await self._lookup(user_id)
+
+    async def check_many(self, user_ids: Iterable[int]) -> dict[int, ReputationVerdict]:
+        """Verdicts for a batch of users (e.g. a join raid): cached ones first, the rest concurrently."""
+        user_ids = list(dict.fromkeys(user_ids))
+        verdicts = await self._cache_get(user_ids)
+        missing = [user_id for user_id in user_ids if user_id not in verdicts]
+        for verdict in await asyncio.gather(*(self._lookup(user_id) for user_id in missing)):
+            verdicts[verdict.user_id] = verdict
+        return verdicts
+
+    async def is_cas_banned(self, user_id: int) -> bool:
+        return (await self.check(user_id)).cas
+
+    async def is_lols_banned(self, user_id: int) -> bool:
+        return (await self.check(user_id)).lols
+
+    def get_metrics(self) -> dict[str, int]:
+        return {
+            "cache_hits": self.cache_hits,
+            "lookups": self.lookups,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "in_flight": len(self._inflight),
+        }
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _lookup(self, user_id: int) -> ReputationVerdict:
+        future = self._inflight.get(user_id)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[user_id] = future
+        try:
+            verdict = await self._fetch(user_id)
+            future.set_result(verdict)
+            return verdict
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(user_id, None)
+
+    async def _fetch(self, user_id: int) -> ReputationVerdict:
+        self.lookups += 1
+        session = await self._get_session()
+        assert self._semaphore is not None
+        async with self._semaphore:
+            cas, lols = await asyncio.gather(
+                self._query(session, self.cas_url, {"user_id": str(user_id)}),
+                self._query(session, self.lols_url, {"id": str(user_id)}),
+            )
+        verdict = ReputationVerdict(
+            user_id,
+            cas=bool(cas and cas.get("ok")),
+            lols=bool(lols and lols.get("ok") and lols.get("banned")),
+        )
+        if cas is not None and lols is not None:
+            await self._cache_set(verdict)
+        elif verdict.is_spammer:
+            # One list is enough to ban; remember it even though the other one failed
+            await self._cache_set(verdict)
+        return verdict
+
+    async def _query(self, session: aiohttp.ClientSession, url: str, params: dict[str, str]) -> Optional[dict]:
+        """Decoded JSON body, or None when the source did not answer."""
+        try:
+            async with session.get(url, params=params) as response:
+                if response.status != 200:
+                    logger.error(f"{url} failed with status code: {response.status}")
+                    self.errors += 1
+                    return None
+                return await response.json(content_type=None)
+        except asyncio.TimeoutError:
+            logger.error(f"{url} request timed out")
+        except (aiohttp.ClientError, ValueError) as e:
+            logger.error(f"{url} error: {e}")
+        self.errors += 1
+        return None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Session and semaphore belong to one event loop (tests run a loop per case)
+            self._loop = loop
+            self._session = None
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self._pool_size), timeout=self._timeout
+            )
+        return self._session
+
+    async def _cache_get(self, user_ids: list[int]) -> dict[int, ReputationVerdict]:
+        if self._redis is None or not user_ids:
+            return {}
+        try:
+            raw_values = await self._redis.mget([f"{REPUTATION_KEY_PREFIX}{user_id}" for user_id in user_ids])
+        except Exception as e:
+            logger.warning(f"Spam reputation cache read failed: {e}")
+            return {}
+        verdicts = {}
+        for user_id, raw in zip(user_ids, raw_values):
+            if raw is not None:
+                data = json.loads(raw)
+                verdicts[user_id] = ReputationVerdict(user_id, cas=data["cas"], lols=data["lols"])
+        self.cache_hits += len(verdicts)
+        return verdicts
+
+    async def _cache_set(self, verdict: ReputationVerdict) -> None:
+        if self._redis is None:
+            return
+        ttl = self.positive_ttl if verdict.is_spammer else self.negative_ttl
+        try:
+            await self._redis.set(
+                f"{REPUTATION_KEY_PREFIX}{verdict.user_id}",
+                json.dumps({"cas": verdict.cas, "lols": verdict.lols}),
+                ex=ttl,
+            )
+        except Exception as e:
+            logger.warning(f"Spam reputation cache write failed: {e}")
+
+
+_spam_reputation_service: Optional[SpamReputationService] = None
+
+
+def get_spam_reputation_service() -> SpamReputationService:
+    """The process-wide reputation service (created without Redis cache on first use)."""
+    global _spam_reputation_service
+    if _spam_reputation_service is None:
+        _spam_reputation_service = SpamReputationService()
+    return _spam_reputation_service
+
+
+def set_spam_reputation_service(service: Optional[SpamReputationService]) -> None:
+    global _spam_reputation_service
+    _spam_reputation_service = service
@@ -0,0 +1,240 @@
+# other/spam_rules.py
+"""Local spam rules compiled once, plus a content-hash cache for LLM spam verdicts."""
+
+import asyncio
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Iterable, Optional, Sequence
+
+spam_phrases = [
+    "команду",
+    "команда",
+    "доход",
+    "без опыта",
+    "лс",
+    "личку",
+    "прибыль",
+    "проект",
+    "предложение",
+    "тестирование",
+    "день",
+    "заработка",
+    "заработок",
+    "процент",
+    "пишите",
+    "18",
+    "связкизарабатывать",
+    "подробности",
+]
+
+for i in range(1, 20):
+    spam_phrases.append(f"{i}oo")
+    spam_phrases.append(f"{i}оо")
+
+# Same tokens as the old ``re.findall(r"\b\w+\b", text.lower())``
+_TOKEN_RE = re.compile(r"\b\w+\b")
+
+# A whitespace-separated word with a Cyrillic letter and a digit, "@" or a Latin letter, in one scan
+_MIXED_WORD_RE = re.compile(r"(?<!\S)(?=\S*[а-яА-Я])(?=\S*[0-9@a-zA-Z])\S+")
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+class PhraseAutomaton:
+    """
+    Aho-Corasick automaton over word tokens.
+
+    Phrases are tokenized the same way as messages, so matches are always whole
+    words and multi-word phrases ("без опыта") match across token boundaries.
+    One pass over the message tokens finds every phrase.
+    """
+
+    def __init__(self, phrases: Iterable[str]):
+        self.phrases: list[tuple[str, ...]] = []
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[frozenset[int]] = [frozenset()]
+
+        outputs: list[set[int]] = [set()]
+        for phrase in dict.fromkeys(phrases):
+            tokens = tuple(tokenize(phrase))
+            if not tokens:
+                continue
+            phrase_id = len(self.phrases)
+            self.phrases.append(tokens)
+            state = 0
+            for token in tokens:
+                next_state = self._goto[state].get(token)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][token] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    outputs.append(set())
+                state = next_state
+            outputs[state].add(phrase_id)
+
+        # Breadth-first fail links; every state also reports what its fail state reports
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for token, child in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(token, 0)
+                outputs[child] |= outputs[self._fail[child]]
+                queue.append(child)
+        self._out = [frozenset(found) for found in outputs]
+
+    def find(self, tokens: Sequence[str]) -> set[int]:
+        """Ids (indexes in ``phrases``) of every phrase present in ``tokens``."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: set[int] = set()
+        state = 0
+        for token in tokens:
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            if out[state]:
+                found |= out[state]
+        return found
+
+
+class SpamRuleEngine:
+    """The local ``check_spam`` rules ("mixed", "spam_phrases") with patterns compiled once."""
+
+    def __init__(self, phrases: Iterable[str] = spam_phrases, phrase_threshold: int = 3, mixed_threshold: int = 3):
+        self.phrase_threshold = phrase_threshold
+        self.mixed_threshold = mixed_threshold
+        self._automaton = PhraseAutomaton(phrases)
+
+    def mixed_word_count(self, text: str) -> int:
+        return len(_MIXED_WORD_RE.findall(text))
+
+    def phrase_score(self, text: str) -> int:
+        """Number of distinct spam phrases in ``text``, plus one for a "+"."""
+        score = len(self._automaton.find(tokenize(text)))
+        if "+" in text:
+            score += 1
+        return score
+
+    def match(self, text: str) -> Optional[str]:
+        """Name of the first rule ``text`` trips, or None."""
+        if self.mixed_word_count(text) >= self.mixed_threshold:
+            return "mixed"
+        if self.phrase_score(text) >= self.phrase_threshold:
+            return "spam_phrases"
+        return None
+
+
+def content_hash(text: str) -> str:
+    """Hash of the text with case and whitespace normalised, so copy-paste variants collide."""
+    return hashlib.sha1(" ".join(text.lower().split()).encode()).hexdigest()
+
+
+class SpamVerdictCache:
+    """
+    Remembers LLM spam probabilities by ``content_hash``.
+
+    Copy-paste spam sent to several chats (or by several accounts) costs one LLM
+    call; concurrent checks of the same text wait for the call in flight. Entries
+    expire after ``ttl`` seconds and the least recently used ones are dropped
+    beyond ``max_size``.
+    """
+
+    def __init__(self, max_size: int = 10_000, ttl: float = 24 * 3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, int]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.llm_calls = 0
+        self.coalesced = 0
+
+    def get(self, text: str) -> Optional[int]:
+        key = content_hash(text)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, probability = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return probability
+
+    def put(self, text: str, probability: int) -> None:
+        key = content_hash(text)
+        self._entries[key] = (time.monotonic() + self.ttl, probability)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def get_or_check(self, text: str, check: Callable[[str], Awaitable[Optional[int]]]) -> Optional[int]:
+        """Cached spam probability for ``text``, calling ``check`` (the LLM) only on a miss."""
+        cached = self.get(text)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        key = content_hash(text)
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            self.llm_calls += 1
+            probability = await check(text)
+            if probability is not None:
+                self.put(text, probability)
+            future.set_result(probability)
+            return probability
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def get_metrics(self) -> dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "llm_calls": self.llm_calls,
+            "coalesced": self.coalesced,
+        }
+
+
+_spam_rule_engine: Optional[SpamRuleEngine] = None
+_spam_verdict_cache: Optional[SpamVerdictCache] = None
+
+
+def get_spam_rule_engine() -> SpamRuleEngine:
+    """The engine over ``spam_phrases``, compiled on first use."""
+    global _spam_rule_engine
+    if _spam_rule_engine is None:
+        _spam_rule_engine = SpamRuleEngine()
+    return _spam_rule_engine
+
+
+def get_spam_verdict_cache() -> SpamVerdictCache:
+    global _spam_verdict_cache
+    if _spam_verdict_cache is None:
+        _spam_verdict_cache = SpamVerdictCache()
+    return _spam_verdict_cache
+
+
+def set_spam_verdict_cache(cache: Optional[SpamVerdictCache]) -> None:
+    global _spam_verdict_cache
+    _spam_verdict_cache = cache
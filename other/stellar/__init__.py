@@ -7,15 +7,24 @@ organized by responsibility:
 
 - constants: MTL addresses, assets, configuration
 - sdk_utils: Low-level SDK operations (keypair, signing, server)
+- horizon_client: Shared Horizon HTTP client (pooling, retries, latency)
 - address_utils: Address resolution and federation
+- name_resolver: Account names from cached Grist tables
 - balance_utils: Balance queries and account info
+- holders: Concurrent, paged holder crawls
+- holder_snapshot: Cached holder/balance snapshots for dividend calculators
+- holder_columns: Columnar holder backups and vectorized holder statistics
 - payment_service: Payment operations and submissions
 - dividend_calc: Dividend calculation logic
+- dividend_submit: Pipelined, resumable submission of dividend transactions
 - exchange_utils: Exchange operations and swaps
 - asset_xdr: Asset-specific XDR generation (dividends, payments)
 - monitoring: Transaction monitoring and detection
 - xdr_utils: XDR decoding and transaction utilities
+- xdr_render: Pure rendering of transaction envelopes (runs in worker processes)
+- xdr_decoder: Process-pool offload and content-addressed cache for decode_xdr
 - voting_utils: Voting and governance utilities
+- delegation: Delegation graph (chain resolution, cycle breaking, delegate fetching)
 - display_commands: Display and show commands for data presentation
 - utils: General utilities (alarm parsing, batch messaging)
 """
@@ -39,14 +48,27 @@ from .sdk_utils import (
     decode_xdr_envelope,
 )
 
+# Horizon client
+from .horizon_client import (
+    HorizonClient,
+    get_horizon_client,
+    set_horizon_client,
+)
+
 # Address utilities
 from .address_utils import (
     find_stellar_public_key,
     find_stellar_federation_address,
     resolve_account,
     address_id_to_username,
+    address_ids_to_usernames,
     shorten_address,
 )
+from .name_resolver import (
+    AccountNameResolver,
+    get_account_name_resolver,
+    set_account_name_resolver,
+)
 
 # Balance utilities
 from .balance_utils import (
@@ -61,6 +83,26 @@ from .balance_utils import (
     check_mtlap,
 )
 
+# Holder crawls
+from .holders import (
+    iter_holder_pages,
+    iter_pool_pages,
+    iter_holders,
+    fetch_holders,
+)
+from .holder_snapshot import (
+    HolderBalances,
+    HolderSnapshot,
+    HolderSnapshotStore,
+    take_snapshot,
+    get_holder_snapshot_store,
+    set_holder_snapshot_store,
+)
+from .holder_columns import (
+    HolderColumns,
+    calculate_holder_statistics,
+)
+
 # Payment operations
 from .payment_service import (
     send_payment_async,
@@ -90,9 +132,11 @@ from .dividend_commands import (
     cmd_calc_usdm_sum,
     cmd_gen_xdr,
     cmd_send_by_list_id,
+    cmd_count_failed_by_list_id,
     get_liquidity_pools_for_asset,
     cmd_gen_data_xdr,
 )
+from .dividend_submit import DividendSubmitError, DividendSubmitter
 
 # Exchange utilities
 from .exchange_utils import (
@@ -133,6 +177,12 @@ from .xdr_utils import (
     stellar_get_transaction_builder,
     decode_data_value,
 )
+from .xdr_decoder import (
+    XdrDecoder,
+    XdrTooLargeError,
+    get_xdr_decoder,
+    set_xdr_decoder,
+)
 
 # Voting and governance
 from .voting_utils import (
@@ -145,6 +195,10 @@ from .voting_utils import (
     check_mtla_delegate,
     stellar_add_mtl_holders_info,
 )
+from .delegation import (
+    DelegationGraph,
+    fetch_missing_delegates,
+)
 
 # Display commands
 from .display_commands import (
@@ -178,11 +232,19 @@ __all__ = [
     "stellar_sign",
     "gen_new",
     "decode_xdr_envelope",
+    # Horizon client
+    "HorizonClient",
+    "get_horizon_client",
+    "set_horizon_client",
     # Address
     "find_stellar_public_key",
     "find_stellar_federation_address",
     "resolve_account",
     "address_id_to_username",
+    "address_ids_to_usernames",
+    "AccountNameResolver",
+    "get_account_name_resolver",
+    "set_account_name_resolver",
     "shorten_address",
     # Balance
     "stellar_get_account",
@@ -194,6 +256,19 @@ __all__ = [
     "get_pool_info",
     "get_pool_balances",
     "check_mtlap",
+    # Holders
+    "iter_holder_pages",
+    "iter_pool_pages",
+    "iter_holders",
+    "fetch_holders",
+    "HolderBalances",
+    "HolderSnapshot",
+    "HolderSnapshotStore",
+    "take_snapshot",
+    "get_holder_snapshot_store",
+    "set_holder_snapshot_store",
+    "HolderColumns",
+    "calculate_holder_statistics",
     # Payment
     "send_payment_async",
     "stellar_async_submit",
@@ -216,8 +291,11 @@ __all__ = [
     "cmd_calc_usdm_sum",
     "cmd_gen_xdr",
     "cmd_send_by_list_id",
+    "cmd_count_failed_by_list_id",
     "get_liquidity_pools_for_asset",
     "cmd_gen_data_xdr",
+    "DividendSubmitter",
+    "DividendSubmitError",
     # Exchange
     "stellar_get_offers",
     "stellar_get_orders_sum",
@@ -246,6 +324,10 @@ __all__ = [
     "cmd_check_fee",
     "stellar_get_transaction_builder",
     "decode_data_value",
+    "XdrDecoder",
+    "XdrTooLargeError",
+    "get_xdr_decoder",
+    "set_xdr_decoder",
     # Voting and governance
     "cmd_get_new_vote_all_mtl",
     "get_mtlap_votes",
@@ -254,6 +336,8 @@ __all__ = [
     "gen_vote_xdr",
     "cmd_get_blacklist",
     "check_mtla_delegate",
+    "DelegationGraph",
+    "fetch_missing_delegates",
     "stellar_add_mtl_holders_info",
     # Display commands
     "cmd_show_bim",
@@ -2,7 +2,7 @@
 """Address resolution, federation, and key extraction utilities."""
 
 import re
-from typing import Optional
+from typing import Iterable, Optional
 
 from stellar_sdk.sep.federation import resolve_account_id_async
 
@@ -79,70 +79,63 @@ def shorten_address(address: str) -> str:
     return f"{address[:4]}..{address[-4:]}"
 
 
-async def address_id_to_username(key: str, full_data: bool = False, grist_manager=None, global_data=None) -> str:
+async def address_ids_to_usernames(
+    keys: Iterable[str], full_data: bool = False, grist_manager=None, global_data=None
+) -> dict[str, str]:
     """
-    Convert Stellar address to human-readable username.
+    Convert many Stellar addresses to usernames in one pass.
 
-    Looks up address in Grist tables and global data to find username.
+    Looks addresses up in global data first, then in the cached Grist name tables
+    (see ``AccountNameResolver``), so a whole transaction costs no Grist requests
+    once the tables are loaded.
 
     Args:
-        key: Stellar public key
+        keys: Stellar public keys (duplicates and empty values are skipped)
         full_data: Whether to perform full lookup or just shorten
         grist_manager: Optional Grist manager for table lookups
         global_data: Optional global data for name list cache
 
     Returns:
-        Username or shortened address if not found
+        Dictionary of key -> username, or shortened address if not found
     """
-    if not key:
-        return key
-
+    keys = [key for key in dict.fromkeys(keys) if key]
     if not full_data:
-        return shorten_address(key)
+        return {key: shorten_address(key) for key in keys}
 
+    names = {}
     # Check global name list first (cache)
     if global_data and hasattr(global_data, "name_list"):
-        if key in global_data.name_list:
-            return global_data.name_list[key]
+        names = {key: global_data.name_list[key] for key in keys if key in global_data.name_list}
 
-    # Try Grist lookup if manager provided
-    if grist_manager:
+    rest = [key for key in keys if key not in names]
+    if grist_manager and rest:
         try:
-            # Check MTLA users
-            from other.grist_tools import MTLGrist
-
-            user = await grist_manager.load_table_data(MTLGrist.MTLA_USERS, filter_dict={"Stellar": [key]})
-            if user:
-                name = user[0]["Telegram"]
-                if global_data and hasattr(global_data, "name_list"):
-                    global_data.name_list[key] = name
-                return name
-
-            # Check EURMTL users
-            user = await grist_manager.load_table_data(MTLGrist.EURMTL_users, filter_dict={"account_id": [key]})
-            if user:
-                name = user[0]["username"]
-                if global_data and hasattr(global_data, "name_list"):
-                    global_data.name_list[key] = name
-                return name
-
-            # Check EURMTL accounts
-            user = await grist_manager.load_table_data(MTLGrist.EURMTL_accounts, filter_dict={"account_id": [key]})
-            if user:
-                name = user[0]["description"]
-                if global_data and hasattr(global_data, "name_list"):
-                    global_data.name_list[key] = name
-                return name
-
-            # Check EURMTL assets (issuer lookup)
-            user = await grist_manager.load_table_data(MTLGrist.EURMTL_assets, filter_dict={"issuer": [key]})
-            if user:
-                name = "Issuer of " + user[0]["code"]
-                if global_data and hasattr(global_data, "name_list"):
-                    global_data.name_list[key] = name
-                return name
+            from .name_resolver import get_account_name_resolver
+
+            names.update(await get_account_name_resolver(grist_manager).resolve(rest))
         except Exception:
             pass
 
-    # Return shortened address as fallback
-    return f"{shorten_address(key)} не найден, возможно скам"
+    # Shortened address as fallback
+    return {key: names.get(key) or f"{shorten_address(key)} не найден, возможно скам" for key in keys}
+
+
+async def address_id_to_username(key: str, full_data: bool = False, grist_manager=None, global_data=None) -> str:
+    """
+    Convert Stellar address to human-readable username.
+
+    Looks up address in global data and the cached Grist tables to find username.
+
+    Args:
+        key: Stellar public key
+        full_data: Whether to perform full lookup or just shorten
+        grist_manager: Optional Grist manager for table lookups
+        global_data: Optional global data for name list cache
+
+    Returns:
+        Username or shortened address if not found
+    """
+    if not key:
+        return key
+    names = await address_ids_to_usernames([key], full_data, grist_manager, global_data)
+    return names[key]
@@ -3,13 +3,13 @@
 
 from typing import Optional
 
-import aiohttp
 from stellar_sdk import Asset
-from stellar_sdk.client.aiohttp_client import AiohttpClient
 from stellar_sdk.server_async import ServerAsync
 
 from other.config_reader import config
 from .constants import MTLAssets
+from .holders import fetch_holders
+from .horizon_client import get_horizon_client
 
 
 async def stellar_get_account(account_id: str) -> dict:
@@ -22,9 +22,7 @@ async def stellar_get_account(account_id: str) -> dict:
     Returns:
         Account data dict or error dict with 'type' key
     """
-    async with aiohttp.ClientSession() as session:
-        async with session.get(f"{config.horizon_url}/accounts/{account_id}") as resp:
-            return await resp.json()
+    return await get_horizon_client().get_json(f"{config.horizon_url}/accounts/{account_id}")
 
 
 async def stellar_get_issuer_assets(account_id: str) -> dict:
@@ -37,22 +35,20 @@ async def stellar_get_issuer_assets(account_id: str) -> dict:
     Returns:
         Dict of {asset_code: total_amount}
     """
-    async with aiohttp.ClientSession() as session:
-        async with session.get(f"{config.horizon_url}/assets?limit=200&asset_issuer={account_id}") as resp:
-            data = await resp.json()
-            assets = {}
-            if data.get("type"):  # Error response
-                return {}
-            else:
-                for balance in data["_embedded"]["records"]:
-                    balances = balance["balances"]
-                    assets[balance["asset_code"]] = (
-                        float(balances["authorized"])
-                        + float(balance.get("claimable_balances_amount", 0))
-                        + float(balance.get("liquidity_pools_amount", 0))
-                        + float(balance.get("contracts_amount", 0))
-                    )
-                return assets
+    data = await get_horizon_client().get_json(f"{config.horizon_url}/assets?limit=200&asset_issuer={account_id}")
+    assets = {}
+    if data.get("type"):  # Error response
+        return {}
+    else:
+        for balance in data["_embedded"]["records"]:
+            balances = balance["balances"]
+            assets[balance["asset_code"]] = (
+                float(balances["authorized"])
+                + float(balance.get("claimable_balances_amount", 0))
+                + float(balance.get("liquidity_pools_amount", 0))
+                + float(balance.get("contracts_amount", 0))
+            )
+        return assets
 
 
 async def get_balances(
@@ -113,19 +109,7 @@ async def stellar_get_holders(asset: Asset = MTLAssets.mtl_asset, mini: bool = F
     Returns:
         List of account records
     """
-    client = AiohttpClient(request_timeout=3 * 60)
-    async with ServerAsync(horizon_url=config.horizon_url, client=client) as server:
-        accounts = []
-        accounts_call_builder = server.accounts().for_asset(asset).limit(200)
-
-        page_records = await accounts_call_builder.call()
-        while page_records["_embedded"]["records"]:
-            accounts.extend(page_records["_embedded"]["records"])
-            page_records = await accounts_call_builder.next()
-            if mini:
-                return accounts
-
-        return accounts
+    return await fetch_holders(asset, mini=mini)
 
 
 async def stellar_get_token_amount(asset: Asset = MTLAssets.mtl_asset) -> str:
@@ -138,7 +122,7 @@ async def stellar_get_token_amount(asset: Asset = MTLAssets.mtl_asset) -> str:
     Returns:
         Total token supply as string
     """
-    async with ServerAsync(horizon_url=config.horizon_url) as server:
+    async with ServerAsync(horizon_url=config.horizon_url, client=get_horizon_client()) as server:
         assets = await server.assets().for_code(asset.code).for_issuer(asset.issuer).call()
         return assets["_embedded"]["records"][0]["amount"]
 
@@ -150,28 +134,21 @@ async def stellar_get_all_mtl_holders() -> list:
     Returns:
         List of unique account records
     """
-    accounts = []
-    for asset in (MTLAssets.mtl_asset, MTLAssets.mtlrect_asset):
-        asset_accounts = await stellar_get_holders(asset)
-        for account in asset_accounts:
-            if account not in accounts:
-                accounts.append(account)
-    return accounts
+    return await fetch_holders(MTLAssets.mtl_asset, MTLAssets.mtlrect_asset)
 
 
-async def get_pool_info(pool_id: str, session) -> dict:
+async def get_pool_info(pool_id: str, session=None) -> dict:
     """
     Get liquidity pool information from Horizon.
 
     Args:
         pool_id: Liquidity pool ID
-        session: aiohttp ClientSession
+        session: Unused, kept for backward compatibility (the shared Horizon client is used)
 
     Returns:
         Pool information dict
     """
-    async with session.get(f"{config.horizon_url}/liquidity_pools/{pool_id}") as resp:
-        return await resp.json()
+    return await get_horizon_client().get_json(f"{config.horizon_url}/liquidity_pools/{pool_id}")
 
 
 async def get_pool_balances(address: str) -> list:
@@ -194,42 +171,41 @@ async def get_pool_balances(address: str) -> list:
     account = await stellar_get_account(address)
     pools = []
 
-    async with aiohttp.ClientSession() as session:
-        for balance in account["balances"]:
-            if balance["asset_type"] == "liquidity_pool_shares":
-                pool_id = balance["liquidity_pool_id"]
-                user_shares = float(balance["balance"])
-
-                # Get pool details
-                pool_info = await get_pool_info(pool_id, session)
-                total_shares = float(pool_info["total_shares"])
-
-                # Calculate user's share percentage
-                user_share_percentage = user_shares / total_shares
-
-                # Extract reserve information
-                reserves = pool_info["reserves"]
-                token1 = reserves[0]
-                token2 = reserves[1]
-
-                # Calculate user's token amounts
-                user_token1_amount = float(token1["amount"]) * user_share_percentage
-                user_token2_amount = float(token2["amount"]) * user_share_percentage
-
-                # Build pool name
-                token1_code = token1["asset"].split(":")[0]
-                token2_code = token2["asset"].split(":")[0]
-                pool_name = f"{token1_code}-{token2_code}"
-
-                pools.append(
-                    {
-                        "pool_id": pool_id,
-                        "name": pool_name,
-                        "shares": user_shares,
-                        "token1_amount": user_token1_amount,
-                        "token2_amount": user_token2_amount,
-                    }
-                )
+    for balance in account["balances"]:
+        if balance["asset_type"] == "liquidity_pool_shares":
+            pool_id = balance["liquidity_pool_id"]
+            user_shares = float(balance["balance"])
+
+            # Get pool details
+            pool_info = await get_pool_info(pool_id)
+            total_shares = float(pool_info["total_shares"])
+
+            # Calculate user's share percentage
+            user_share_percentage = user_shares / total_shares
+
+            # Extract reserve information
+            reserves = pool_info["reserves"]
+            token1 = reserves[0]
+            token2 = reserves[1]
+
+            # Calculate user's token amounts
+            user_token1_amount = float(token1["amount"]) * user_share_percentage
+            user_token2_amount = float(token2["amount"]) * user_share_percentage
+
+            # Build pool name
+            token1_code = token1["asset"].split(":")[0]
+            token2_code = token2["asset"].split(":")[0]
+            pool_name = f"{token1_code}-{token2_code}"
+
+            pools.append(
+                {
+                    "pool_id": pool_id,
+                    "name": pool_name,
+                    "shares": user_shares,
+                    "token1_amount": user_token1_amount,
+                    "token2_amount": user_token2_amount,
+                }
+            )
 
     return pools
 
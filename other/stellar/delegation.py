@@ -0,0 +1,143 @@
+# other/stellar/delegation.py
+"""Delegation graph: chains resolved to their final delegate in one pass, with cycle breaking."""
+
+import asyncio
+from typing import Awaitable, Callable, Iterable, Mapping, Optional, TypeVar
+
+T = TypeVar("T")
+
+DELEGATE_FETCH_CONCURRENCY = 10
+
+# Node states while resolving
+_NEW, _ON_PATH, _DONE = 0, 1, 2
+
+
+class DelegationGraph:
+    """
+    Accounts and whom they delegate to, resolved once into roots.
+
+    Every account is a node indexed by ``account_id``; a node's root is the end of
+    its delegation chain. A delegate that is not a node (unknown or filtered out
+    account) is ignored, so the delegator is its own root. A cycle is broken at the
+    node that closes it: its delegate is dropped and it becomes the root of the
+    chain (the same node ``check_mtla_delegate`` cut when walking in input order).
+    """
+
+    def __init__(self, delegates: Mapping[str, Optional[str]]):
+        self.accounts = list(delegates)
+        self.index = {account: n for n, account in enumerate(self.accounts)}
+        self.delegates = dict(delegates)
+        self.broken: list[str] = []
+        self._delegate = [self.index.get(delegate, -1) if delegate else -1 for delegate in delegates.values()]
+        self._root = self._resolve()
+        self._members: dict[int, list[int]] = {}
+        for node, root in enumerate(self._root):
+            if node != root:
+                self._members.setdefault(root, []).append(node)
+
+    def _resolve(self) -> list[int]:
+        delegate = self._delegate
+        root = list(range(len(delegate)))
+        state = [_NEW] * len(delegate)
+        for start in range(len(delegate)):
+            path: list[int] = []
+            node = start
+            while state[node] == _NEW:
+                state[node] = _ON_PATH
+                path.append(node)
+                node = delegate[node]
+                if node < 0:
+                    node = path[-1]
+                    break
+                if state[node] == _ON_PATH:
+                    closer = path[-1]
+                    delegate[closer] = -1
+                    self.broken.append(self.accounts[closer])
+                    node = closer
+                    break
+            end = root[node]
+            for member in path:
+                root[member] = end
+                state[member] = _DONE
+        return root
+
+    def __len__(self) -> int:
+        return len(self.accounts)
+
+    def __contains__(self, account: str) -> bool:
+        return account in self.index
+
+    @property
+    def missing(self) -> set[str]:
+        """Delegates that are not nodes of the graph."""
+        return {delegate for delegate in self.delegates.values() if delegate and delegate not in self.index}
+
+    def delegate_of(self, account: str) -> Optional[str]:
+        """The effective direct delegate: None for roots, including nodes whose cycle was broken."""
+        delegate = self._delegate[self.index[account]]
+        return self.accounts[delegate] if delegate >= 0 else None
+
+    def root_of(self, account: str) -> str:
+        return self.accounts[self._root[self.index[account]]]
+
+    def chain(self, account: str) -> list[str]:
+        """``account`` followed by each delegate up to its root."""
+        node = self.index[account]
+        chain = [self.accounts[node]]
+        while self._delegate[node] >= 0:
+            node = self._delegate[node]
+            chain.append(self.accounts[node])
+        return chain
+
+    def delegators(self, account: str) -> list[str]:
+        """Every account whose chain ends at ``account``, direct or not, in input order."""
+        return [self.accounts[node] for node in self._members.get(self.index[account], [])]
+
+    def tree(self) -> dict[str, list[str]]:
+        """Root -> all its delegators, for roots that have any."""
+        return {
+            self.accounts[root]: [self.accounts[node] for node in members] for root, members in self._members.items()
+        }
+
+    def resolved(self) -> dict[str, str]:
+        """Delegator -> root, for every account whose delegation reaches another node."""
+        return {self.accounts[node]: self.accounts[root] for node, root in enumerate(self._root) if node != root}
+
+
+async def fetch_missing_delegates(
+    nodes: dict[str, T],
+    delegate_of: Callable[[T], Optional[str]],
+    fetch: Callable[[str], Awaitable[Optional[T]]],
+    concurrency: int = DELEGATE_FETCH_CONCURRENCY,
+) -> set[str]:
+    """
+    Add the delegates missing from ``nodes``, and theirs, fetching each round concurrently.
+
+    ``fetch`` returns the node for an account id, or None when it does not exist.
+    Returns the ids that could not be fetched; delegations to them stay unresolved.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    unavailable: set[str] = set()
+
+    async def load(account_id: str) -> Optional[T]:
+        async with semaphore:
+            return await fetch(account_id)
+
+    def wanted(values: Iterable[T]) -> set[str]:
+        return {
+            delegate
+            for value in values
+            if (delegate := delegate_of(value)) and delegate not in nodes and delegate not in unavailable
+        }
+
+    missing = wanted(nodes.values())
+    while missing:
+        batch = sorted(missing)
+        loaded = await asyncio.gather(*(load(account_id) for account_id in batch))
+        for account_id, node in zip(batch, loaded):
+            if node is None:
+                unavailable.add(account_id)
+            else:
+                nodes[account_id] = node
+        missing = wanted(node for node in loaded if node is not None)
+    return unavailable
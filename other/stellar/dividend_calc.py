@@ -10,7 +10,7 @@ from stellar_sdk import Asset
 from other.config_reader import config
 from other.web_tools import http_session_manager
 from .constants import MTLAddresses, MTLAssets
-from .balance_utils import stellar_get_holders
+from .holder_snapshot import get_holder_snapshot_store
 
 
 @dataclass
@@ -98,26 +98,16 @@ async def calculate_eurmtl_dividends(
     exclude.add(MTLAddresses.public_div)
 
     # Get all EURMTL holders
-    holders = await stellar_get_holders(MTLAssets.eurmtl_asset)
+    snapshot = await get_holder_snapshot_store().get(MTLAssets.eurmtl_asset)
 
     # Calculate balances for eligible holders
     eligible_holders = []
-    for holder in holders:
-        address = holder["account_id"]
-        if address in exclude:
+    for holder in snapshot.holders(MTLAssets.eurmtl_asset):
+        if holder.account_id in exclude:
             continue
-
-        for balance in holder.get("balances", []):
-            if balance.get("asset_code") == "EURMTL" and balance.get("asset_issuer") == MTLAddresses.public_issuer:
-                bal = Decimal(balance["balance"])
-                if bal > Decimal("0"):
-                    eligible_holders.append(
-                        {
-                            "address": address,
-                            "balance": bal,
-                        }
-                    )
-                break
+        bal = holder.amount(MTLAssets.eurmtl_asset) or Decimal("0")
+        if bal > Decimal("0"):
+            eligible_holders.append({"address": holder.account_id, "balance": bal})
 
     total_balance = sum(h["balance"] for h in eligible_holders)
 
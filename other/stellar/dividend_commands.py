@@ -12,18 +12,19 @@ from typing import Optional
 
 from loguru import logger
 from sqlalchemy.orm import Session
-from stellar_sdk import Asset, TransactionBuilder, TransactionEnvelope
-from stellar_sdk.client.aiohttp_client import AiohttpClient
-from stellar_sdk.server_async import ServerAsync
+from stellar_sdk import Asset, TransactionBuilder
 
 from db.repositories import FinanceRepository
 from other.config_reader import config
-from .sdk_utils import load_account_async, get_network_passphrase, get_server, get_horizon_url
+from .sdk_utils import get_network_passphrase, get_server
 from other.loguru_tools import safe_catch_async
 from shared.infrastructure.database.models import TDivList, TPayments, TTransaction
 
-from .balance_utils import get_balances, stellar_get_holders, stellar_get_all_mtl_holders, stellar_get_issuer_assets
+from .balance_utils import get_balances, stellar_get_issuer_assets
+from .holder_snapshot import get_holder_snapshot_store
+from .holders import iter_pool_pages
 from .constants import BASE_FEE, PACK_COUNT, MTLAddresses, MTLAssets
+from .dividend_submit import DividendSubmitter
 from .payment_service import stellar_async_submit
 from .sdk_utils import stellar_sign
 from .xdr_utils import decode_data_value, stellar_get_transaction_builder
@@ -112,27 +113,21 @@ async def get_liquidity_pools_for_asset(asset: Asset) -> list:
     Returns:
         List of pool dicts with reserves_dict added
     """
-    async with ServerAsync(horizon_url=get_horizon_url(), client=AiohttpClient(request_timeout=3 * 60)) as server:
-        pools = []
-        pools_call_builder = server.liquidity_pools().for_reserves([asset]).limit(200)
+    pools = []
+    async for records in iter_pool_pages(asset):
+        for pool in records:
+            # Remove _links from results
+            pool.pop("_links", None)
 
-        page_records = await pools_call_builder.call()
-        while page_records["_embedded"]["records"]:
-            for pool in page_records["_embedded"]["records"]:
-                # Remove _links from results
-                pool.pop("_links", None)
+            # Convert reserves list to reserves_dict
+            reserves_dict = {reserve["asset"]: reserve["amount"] for reserve in pool["reserves"]}
+            pool["reserves_dict"] = reserves_dict
 
-                # Convert reserves list to reserves_dict
-                reserves_dict = {reserve["asset"]: reserve["amount"] for reserve in pool["reserves"]}
-                pool["reserves_dict"] = reserves_dict
+            # Remove original reserves list
+            pool.pop("reserves", None)
 
-                # Remove original reserves list
-                pool.pop("reserves", None)
-
-                pools.append(pool)
-
-            page_records = await pools_call_builder.next()
-        return pools
+            pools.append(pool)
+    return pools
 
 
 def cmd_create_list(session: Session, memo: str, pay_type: int) -> int:
@@ -172,26 +167,21 @@ async def cmd_calc_bim_pays(session: Session, list_id: int, test_sum: int = 0) -
         div_sum = int(float(div_sum["EURMTL"]) / 2)  # 50%
         logger.info(f"div_sum = {div_sum}")
 
-    accounts = await stellar_get_holders(MTLAssets.mtlap_asset)
+    snapshot = await get_holder_snapshot_store().get(MTLAssets.mtlap_asset)
 
     secretary = "GCPOWDQQDVSAQGJXZW3EWPPJ5JCF4KTTHBYNB4U54AKQVDLZXLLYMXY7"
 
     valid_accounts = [
         account
-        for account in accounts
-        if account["account_id"] != secretary
-        and (await get_balances(account["account_id"], account_json=account)).get("EURMTL") is not None
-    ]
-    one_mtlap_accounts = [
-        account
-        for account in valid_accounts
-        if 1 <= (await get_balances(account["account_id"], account_json=account))["MTLAP"] < 2
-    ]
-    two_or_more_mtlap_accounts = [
-        account
-        for account in valid_accounts
-        if (await get_balances(account["account_id"], account_json=account))["MTLAP"] >= 2
+        for account in snapshot.holders(MTLAssets.mtlap_asset)
+        if account.account_id != secretary and account.balance_by_code("EURMTL") is not None
     ]
+    one_mtlap_accounts = {
+        account.account_id for account in valid_accounts if 1 <= (account.balance_by_code("MTLAP") or 0) < 2
+    }
+    two_or_more_mtlap_accounts = {
+        account.account_id for account in valid_accounts if (account.balance_by_code("MTLAP") or 0) >= 2
+    }
 
     amount_for_one_mtlap_accounts = int(div_sum * 0.2)
     amount_for_two_or_more_mtlap_accounts = int(div_sum * 0.8)
@@ -207,15 +197,14 @@ async def cmd_calc_bim_pays(session: Session, list_id: int, test_sum: int = 0) -
 
     mtl_accounts = []
     for account in valid_accounts:
-        balances = await get_balances(account["account_id"], account_json=account)
-        bls = balances["EURMTL"]
-        if account in two_or_more_mtlap_accounts:
+        bls = account.balance_by_code("EURMTL")
+        if account.account_id in two_or_more_mtlap_accounts:
             div = sdiv_two_mtlap
-        elif account in one_mtlap_accounts:
+        elif account.account_id in one_mtlap_accounts:
             div = sdiv_one_mtlap
         else:
             div = 0
-        mtl_accounts.append([account["account_id"], bls, div, div, list_id])
+        mtl_accounts.append([account.account_id, bls, div, div, list_id])
 
     mtl_accounts.sort(key=lambda x: x[0], reverse=True)
     payments = [
@@ -244,20 +233,14 @@ async def cmd_calc_divs(session: Session, div_list_id: int, donate_list_id: int,
     div_accounts = []
     donates = []
 
-    # Get all accounts with MTL
-    accounts = await stellar_get_all_mtl_holders()
+    # All MTL and MTLRECT holders, parsed once
+    snapshot = await get_holder_snapshot_store().get(MTLAssets.mtl_asset, MTLAssets.mtlrect_asset)
+    accounts = snapshot.holders(MTLAssets.mtl_asset, MTLAssets.mtlrect_asset)
 
     # Calculate total MTL and MTLRECT sum
     mtl_sum = 0.0
     for account in accounts:
-        balances = account["balances"]
-        for balance in balances:
-            if balance["asset_type"][0:15] == "credit_alphanum":
-                if balance["asset_issuer"] == MTLAddresses.public_issuer:
-                    if balance["asset_code"] == "MTL":
-                        mtl_sum += float(balance["balance"])
-                    elif balance["asset_code"] == "MTLRECT":
-                        mtl_sum += float(balance["balance"])
+        mtl_sum += (account.balance(MTLAssets.mtl_asset) or 0) + (account.balance(MTLAssets.mtlrect_asset) or 0)
 
     # Determine distribution amount
     if test_sum > 0:
@@ -275,31 +258,20 @@ async def cmd_calc_divs(session: Session, div_list_id: int, donate_list_id: int,
 
     # Process each account
     for account in accounts:
-        balances = account["balances"]
-        balance_mtl = 0
-        balance_rect = 0
-        eur = 0
-        # check all balance
-        for balance in balances:
-            if balance["asset_type"][0:15] == "credit_alphanum":
-                if balance["asset_issuer"] == MTLAddresses.public_issuer:
-                    if balance["asset_code"] == "MTL":
-                        balance_mtl = round(float(balance["balance"]), 7)
-                    elif balance["asset_code"] == "MTLRECT":
-                        balance_rect = round(float(balance["balance"]), 7)
-                    elif balance["asset_code"] == "EURMTL":
-                        eur = 1
+        balance_mtl = round(account.balance(MTLAssets.mtl_asset) or 0, 7)
+        balance_rect = round(account.balance(MTLAssets.mtlrect_asset) or 0, 7)
+        eur = 1 if account.balance(MTLAssets.eurmtl_asset) is not None else 0
 
         total_balance = balance_mtl + balance_rect
         div = round(div_sum / mtl_sum * total_balance, 7)
-        donates.extend(get_donate_list(account))
+        donates.extend(get_donate_list(account.to_record()))
 
         if (
             (eur > 0)
             and (div > 0.0001)
-            and (account["account_id"] not in [MTLAddresses.public_issuer, MTLAddresses.public_pawnshop])
+            and (account.account_id not in [MTLAddresses.public_issuer, MTLAddresses.public_pawnshop])
         ):
-            div_accounts.append([account["account_id"], total_balance, div, div, div_list_id])
+            div_accounts.append([account.account_id, total_balance, div, div, div_list_id])
 
     # calc donate
     donate_list = []
@@ -368,6 +340,23 @@ async def cmd_calc_usdm_divs(session: Session, div_list_id: int, test_sum: int =
     pass
 
 
+async def _usdm_holder_balances(div_list_id: int) -> tuple[list, float]:
+    """
+    USDM held directly or through liquidity pools, per holder.
+
+    Returns:
+        ([address, balance, 0, 0, div_list_id] rows, total balance)
+    """
+    snapshot = await get_holder_snapshot_store().get(MTLAssets.usdm_asset, pool_assets=[MTLAssets.usdm_asset])
+    div_accounts = []
+    total_calc_sum = 0.0
+    for account in snapshot.holders(MTLAssets.usdm_asset):
+        token_balance = snapshot.pooled_balance(account, MTLAssets.usdm_asset)
+        div_accounts.append([account.account_id, token_balance, 0, 0, div_list_id])
+        total_calc_sum += token_balance
+    return div_accounts, total_calc_sum
+
+
 @safe_catch_async
 async def cmd_calc_usdm_usdm_divs(
     session: Session, div_list_id: int, test_sum: int = 0, test_for_address: Optional[str] = None
@@ -386,7 +375,6 @@ async def cmd_calc_usdm_usdm_divs(
     Returns:
         List of [address, balance, calc_div, final_div, list_id] lists
     """
-    div_accounts = []
     if test_sum > 0:
         div_sum = test_sum
     else:
@@ -405,36 +393,7 @@ async def cmd_calc_usdm_usdm_divs(
         logger.info(f"div_sum = {div_sum}")
         return []
 
-    accounts = await stellar_get_holders(MTLAssets.usdm_asset)
-    pools = await get_liquidity_pools_for_asset(MTLAssets.usdm_asset)
-    total_calc_sum = 0
-
-    for account in accounts:
-        balances = account["balances"]
-        token_balance = 0
-        for balance in balances:
-            if (
-                balance["asset_type"] == "credit_alphanum4"
-                and balance["asset_code"] == MTLAssets.usdm_asset.code
-                and balance["asset_issuer"] == MTLAssets.usdm_asset.issuer
-            ):
-                token_balance += float(balance["balance"])
-            elif balance["asset_type"] == "liquidity_pool_shares":
-                # Find pool by ID and calculate USDM share for account
-                pool_id = balance["liquidity_pool_id"]
-                pool_share = float(balance["balance"])
-                for pool in pools:
-                    if pool["id"] == pool_id:
-                        usdm_amount = float(
-                            pool["reserves_dict"].get(MTLAssets.usdm_asset.code + ":" + MTLAssets.usdm_asset.issuer, 0)
-                        )
-                        total_shares = float(pool["total_shares"])
-                        # Calculate USDM share in pool belonging to account
-                        if total_shares > 0 and pool_share > 0:
-                            token_balance += (pool_share / total_shares) * usdm_amount
-
-        div_accounts.append([account["account_id"], token_balance, 0, 0, div_list_id])
-        total_calc_sum += token_balance
+    div_accounts, total_calc_sum = await _usdm_holder_balances(div_list_id)
 
     div_accounts_dict = {account[0]: account[1] for account in div_accounts}
 
@@ -555,7 +514,6 @@ async def cmd_calc_usdm_daily(
     Returns:
         List of [address, balance, calc_div, final_div, list_id] lists
     """
-    div_accounts = []
     if test_sum > 0:
         div_sum = test_sum
     else:
@@ -565,34 +523,7 @@ async def cmd_calc_usdm_daily(
         logger.info(f"div_sum = {div_sum}")
         raise ValueError("Dividend sum too high")
 
-    accounts = await stellar_get_holders(MTLAssets.usdm_asset)
-    pools = await get_liquidity_pools_for_asset(MTLAssets.usdm_asset)
-    total_calc_sum = 0
-
-    for account in accounts:
-        balances = account["balances"]
-        token_balance = 0
-        for balance in balances:
-            if (
-                balance["asset_type"] == "credit_alphanum4"
-                and balance["asset_code"] == MTLAssets.usdm_asset.code
-                and balance["asset_issuer"] == MTLAssets.usdm_asset.issuer
-            ):
-                token_balance += float(balance["balance"])
-            elif balance["asset_type"] == "liquidity_pool_shares":
-                pool_id = balance["liquidity_pool_id"]
-                pool_share = float(balance["balance"])
-                for pool in pools:
-                    if pool["id"] == pool_id:
-                        usdm_amount = float(
-                            pool["reserves_dict"].get(MTLAssets.usdm_asset.code + ":" + MTLAssets.usdm_asset.issuer, 0)
-                        )
-                        total_shares = float(pool["total_shares"])
-                        if total_shares > 0 and pool_share > 0:
-                            token_balance += (pool_share / total_shares) * usdm_amount
-
-        div_accounts.append([account["account_id"], token_balance, 0, 0, div_list_id])
-        total_calc_sum += token_balance
+    div_accounts, total_calc_sum = await _usdm_holder_balances(div_list_id)
 
     if total_calc_sum <= 0:
         logger.warning("No positive USDM balances found for daily dividend calculation")
@@ -689,6 +620,10 @@ async def cmd_send_by_list_id(session: Session, list_id: int) -> int:
     """
     Send all pending payments for a dividend list.
 
+    Sequence numbers are assigned locally and submissions are pipelined
+    (``DIVIDEND_SUBMIT_WINDOW``); an interrupted run resumes from the recorded
+    per-transaction state, see ``DividendSubmitter``.
+
     Args:
         session: Database session
         list_id: Dividend list ID to send payments for
@@ -696,16 +631,21 @@ async def cmd_send_by_list_id(session: Session, list_id: int) -> int:
     Returns:
         Number of remaining unsent transactions
     """
-    for db_transaction in FinanceRepository(session).load_transactions(list_id):
-        transaction = TransactionEnvelope.from_xdr(db_transaction.xdr, network_passphrase=get_network_passphrase())
-        div_account = await load_account_async(transaction.transaction.source.account_id)
-        sequence = div_account.sequence + 1
-        transaction.transaction.sequence = sequence
-        transaction.sign(config.private_sign.get_secret_value())
-        transaction_resp = await stellar_async_submit(transaction.to_xdr())
-        logger.info(transaction_resp)
-        db_transaction.was_send = 1
-        db_transaction.xdr_id = sequence
-    session.commit()
+    return await DividendSubmitter(session, window=config.dividend_submit_window).run(list_id)
+
 
-    return FinanceRepository(session).count_unsent_transactions(list_id)
+def cmd_count_failed_by_list_id(session: Session, list_id: int) -> int:
+    """
+    Count the transactions of a dividend list that landed with ``tx_failed``.
+
+    Their payments were not made and ``cmd_send_by_list_id`` does not retry them,
+    so a non-zero result has to be reported and sorted out by hand.
+
+    Args:
+        session: Database session
+        list_id: Dividend list ID
+
+    Returns:
+        Number of failed transactions
+    """
+    return FinanceRepository(session).count_failed_transactions(list_id)
@@ -0,0 +1,190 @@
+# other/stellar/dividend_submit.py
+"""Pipelined, resumable submission of the packed dividend transactions of a ``t_transaction`` list."""
+
+import asyncio
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy.orm import Session
+from stellar_sdk import TransactionEnvelope
+from stellar_sdk.exceptions import BadRequestError, BadResponseError, NotFoundError
+from stellar_sdk.exceptions import ConnectionError as StellarConnectionError
+from stellar_sdk.server_async import ServerAsync
+
+from db.repositories import FinanceRepository
+from other.config_reader import config
+from shared.infrastructure.database.models import TTransaction
+
+from .sdk_utils import get_network_passphrase, get_server_async
+
+# t_transaction.was_send states
+PENDING = 0  # no sequence number yet
+SENT = 1  # in the ledger
+SIGNED = 2  # sequence (xdr_id) and hash (tx_hash) recorded, may or may not have reached Horizon
+FAILED = 3  # in the ledger with tx_failed: the sequence number and fee are spent, payments are not made
+
+
+class DividendSubmitError(Exception):
+    """A transaction was rejected in a way retrying will not fix; the run stops and can be resumed."""
+
+
+def _result_code(error: BadRequestError) -> Optional[str]:
+    extras = error.extras or {}
+    return (extras.get("result_codes") or {}).get("transaction")
+
+
+class DividendSubmitter:
+    """
+    Signs and submits the unsent transactions of a dividend list from one source account.
+
+    The source sequence is loaded once and numbers are assigned locally. Each
+    transaction's sequence and hash are committed (``SIGNED``) before it is
+    submitted, so after a crash ``run`` checks those hashes on Horizon instead of
+    paying twice. Up to ``window`` transactions are signed ahead and in flight at once.
+
+    ``tx_bad_seq`` (a predecessor has not landed yet) and timeouts are retried up
+    to ``max_attempts`` times, checking the hash first. ``tx_failed`` marks the
+    transaction ``FAILED`` and the run goes on; those rows are never resubmitted
+    and are counted in ``failed`` and ``FinanceRepository.count_failed_transactions``
+    so the caller can report them. Any other rejection raises
+    ``DividendSubmitError`` and leaves the list resumable.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        window: int = 4,
+        max_attempts: int = 10,
+        retry_delay: float = 2.0,
+        sign_key: Optional[str] = None,
+    ):
+        self.session = session
+        self.window = max(1, window)
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.sign_key = sign_key
+        self.submitted = 0
+        self.retries = 0
+        self.failed = 0
+
+    async def run(self, list_id: int) -> int:
+        """Submit every unsent transaction of ``list_id``; returns how many are still unsent."""
+        repo = FinanceRepository(self.session)
+        rows = repo.load_transactions(list_id)
+        if rows:
+            async with get_server_async() as server:
+                await self._submit_rows(server, rows)
+        return repo.count_unsent_transactions(list_id)
+
+    async def _submit_rows(self, server: ServerAsync, rows: list[TTransaction]) -> None:
+        source = self._envelope(rows[0]).transaction.source.account_id
+        account_sequence = await self._account_sequence(server, source)
+
+        signed = [row for row in rows if row.was_send == SIGNED]
+        for row in signed:
+            await self._reconcile(server, row, account_sequence)
+        self.session.commit()
+        rows = [row for row in rows if row.was_send in (PENDING, SIGNED)]
+        next_sequence = max([account_sequence] + [row.xdr_id for row in rows if row.was_send == SIGNED]) + 1
+
+        queue: asyncio.Queue[Optional[tuple[TTransaction, str]]] = asyncio.Queue(maxsize=self.window)
+        try:
+            async with asyncio.TaskGroup() as group:
+                group.create_task(self._sign_ahead(rows, next_sequence, queue))
+                for _ in range(self.window):
+                    group.create_task(self._submit_worker(server, source, queue))
+        except ExceptionGroup as errors:
+            # The other workers were cancelled; their rows stay SIGNED for the next run
+            self.session.commit()
+            raise errors.exceptions[0]
+
+    async def _sign_ahead(
+        self, rows: list[TTransaction], next_sequence: int, queue: asyncio.Queue[Optional[tuple[TTransaction, str]]]
+    ) -> None:
+        # Resubmitted (SIGNED) rows keep their numbers and come first, new ones continue after them
+        for row in sorted(rows, key=lambda r: (r.was_send != SIGNED, r.xdr_id or 0, r.id)):
+            if row.was_send == PENDING:
+                row.xdr_id = next_sequence
+                next_sequence += 1
+            xdr, row.tx_hash = self._sign(row)
+            row.was_send = SIGNED
+            # Persisted before it can reach Horizon: a crash from here on is resolved by the hash
+            self.session.commit()
+            await queue.put((row, xdr))
+        for _ in range(self.window):
+            await queue.put(None)
+
+    async def _submit_worker(
+        self, server: ServerAsync, source: str, queue: asyncio.Queue[Optional[tuple[TTransaction, str]]]
+    ) -> None:
+        while (item := await queue.get()) is not None:
+            row, xdr = item
+            await self._submit(server, source, row, xdr)
+            self.session.commit()
+
+    async def _submit(self, server: ServerAsync, source: str, row: TTransaction, xdr: str) -> None:
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                response = await server.submit_transaction(xdr, skip_memo_required_check=True)
+                row.was_send = SENT
+                self.submitted += 1
+                logger.info(f"Dividend transaction {row.id} seq {row.xdr_id} sent: {response.get('hash')}")
+                return
+            except BadRequestError as e:
+                code = _result_code(e)
+                if code == "tx_failed":
+                    row.was_send = FAILED
+                    self.failed += 1
+                    logger.error(f"Dividend transaction {row.id} seq {row.xdr_id} failed: {e.extras}")
+                    return
+                if code != "tx_bad_seq":
+                    raise DividendSubmitError(f"Transaction {row.id} seq {row.xdr_id} rejected: {code or e}") from e
+            except (BadResponseError, StellarConnectionError, asyncio.TimeoutError) as e:
+                # 504 and dropped connections: the transaction may still be in the ledger
+                logger.warning(f"Dividend transaction {row.id} seq {row.xdr_id}: {e!r}")
+
+            if await self._reconcile(server, row, await self._account_sequence(server, source)):
+                return
+            if row.was_send == PENDING:
+                raise DividendSubmitError(f"Sequence of transaction {row.id} was used by another one, re-run to resign")
+            self.retries += 1
+            await asyncio.sleep(self.retry_delay * attempt)
+        raise DividendSubmitError(f"Transaction {row.id} seq {row.xdr_id} not accepted after {self.max_attempts} tries")
+
+    async def _reconcile(self, server: ServerAsync, row: TTransaction, account_sequence: int) -> bool:
+        """
+        Settle a ``SIGNED`` row from Horizon: ``SENT``/``FAILED`` if its hash is in the
+        ledger, back to ``PENDING`` if its sequence was spent by something else.
+        Returns True when the row no longer needs submitting.
+        """
+        try:
+            record = await server.transactions().transaction(row.tx_hash).call()
+        except NotFoundError:
+            record = None
+        if record is not None:
+            if record.get("successful", True):
+                row.was_send = SENT
+            else:
+                row.was_send = FAILED
+                self.failed += 1
+                logger.error(f"Dividend transaction {row.id} seq {row.xdr_id} is in the ledger as failed")
+            return True
+        if account_sequence >= row.xdr_id:
+            # This envelope can never be applied now, so a new sequence number is safe
+            logger.warning(f"Sequence {row.xdr_id} of dividend transaction {row.id} was used elsewhere")
+            row.was_send, row.xdr_id, row.tx_hash = PENDING, 0, None
+        return False
+
+    @staticmethod
+    async def _account_sequence(server: ServerAsync, source: str) -> int:
+        return (await server.load_account(source)).sequence
+
+    def _envelope(self, row: TTransaction) -> TransactionEnvelope:
+        return TransactionEnvelope.from_xdr(row.xdr, network_passphrase=get_network_passphrase())
+
+    def _sign(self, row: TTransaction) -> tuple[str, str]:
+        envelope = self._envelope(row)
+        envelope.transaction.sequence = row.xdr_id
+        envelope.signatures = []
+        envelope.sign(self.sign_key or config.private_sign.get_secret_value())
+        return envelope.to_xdr(), envelope.hash_hex()
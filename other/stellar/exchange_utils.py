@@ -6,10 +6,10 @@ from typing import Optional
 from loguru import logger
 from stellar_sdk import Asset, Network, TransactionBuilder, Price
 from stellar_sdk.exceptions import NotFoundError
-from stellar_sdk.client.aiohttp_client import AiohttpClient
 from stellar_sdk.server_async import ServerAsync
 
 from other.config_reader import config
+from .horizon_client import get_horizon_client
 from .constants import BASE_FEE, EXCHANGE_BOTS, MTLAssets
 
 
@@ -23,7 +23,7 @@ async def stellar_get_offers(account_id: str) -> list[dict]:
     Returns:
         List of offer dicts
     """
-    async with ServerAsync(horizon_url=config.horizon_url, client=AiohttpClient()) as server:
+    async with ServerAsync(horizon_url=config.horizon_url, client=get_horizon_client()) as server:
         call = await server.offers().for_account(account_id).limit(200).call()
         return call["_embedded"]["records"]
 
@@ -79,7 +79,7 @@ async def get_asset_swap_spread(
     Returns:
         Tuple of (destination_amount_sell_to_buy, source_amount_buy_to_sell, average)
     """
-    async with ServerAsync(horizon_url=config.horizon_url, client=AiohttpClient()) as server:
+    async with ServerAsync(horizon_url=config.horizon_url, client=get_horizon_client()) as server:
         # Calculate amount received when selling
         sell_to_buy = (
             await server.strict_send_paths(
@@ -129,7 +129,7 @@ async def stellar_get_receive_path(send_asset: Asset, send_sum: str, receive_ass
         List of intermediate path assets (empty if direct)
     """
     try:
-        async with ServerAsync(horizon_url=config.horizon_url, client=AiohttpClient()) as server:
+        async with ServerAsync(horizon_url=config.horizon_url, client=get_horizon_client()) as server:
             call_result = await server.strict_send_paths(send_asset, send_sum, [receive_asset]).call()
 
         if len(call_result["_embedded"]["records"]) > 0:
@@ -172,7 +172,7 @@ async def build_swap_xdr(
     Returns:
         Unsigned transaction XDR
     """
-    async with ServerAsync(horizon_url=config.horizon_url, client=AiohttpClient()) as server:
+    async with ServerAsync(horizon_url=config.horizon_url, client=get_horizon_client()) as server:
         source_account = await server.load_account(source_address)
 
     transaction = TransactionBuilder(
@@ -205,7 +205,7 @@ async def build_cancel_offers_xdr(
     Returns:
         Transaction XDR or None if no offers
     """
-    async with ServerAsync(horizon_url=config.horizon_url, client=AiohttpClient()) as server:
+    async with ServerAsync(horizon_url=config.horizon_url, client=get_horizon_client()) as server:
         root_account = await server.load_account(public_key)
         call = await server.offers().for_account(public_key).limit(200).call()
 
@@ -247,7 +247,7 @@ async def stellar_remove_orders(public_key: str, xdr: Optional[str] = None) -> O
     """
     from .xdr_utils import stellar_get_transaction_builder
 
-    async with ServerAsync(horizon_url=config.horizon_url, client=AiohttpClient()) as server:
+    async with ServerAsync(horizon_url=config.horizon_url, client=get_horizon_client()) as server:
         if xdr:
             transaction = stellar_get_transaction_builder(xdr)
         else:
@@ -304,7 +304,7 @@ async def stellar_get_trade_cost(asset: Asset) -> float:
         float: Average trade price or 0 if no trades found
     """
     try:
-        async with ServerAsync(horizon_url=config.horizon_url, client=AiohttpClient()) as server:
+        async with ServerAsync(horizon_url=config.horizon_url, client=get_horizon_client()) as server:
             # Get last 100 trades for the asset pair
             trades = (
                 await server.trades().for_asset_pair(asset, MTLAssets.eurmtl_asset).limit(100).order(desc=True).call()
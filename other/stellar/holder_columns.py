@@ -0,0 +1,148 @@
+# other/stellar/holder_columns.py
+"""Columnar holder backups (one .npy per column, memory-mapped on read) and vectorized holder statistics."""
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+
+STROOPS_PER_UNIT = 10_000_000
+
+# Column files of a backup directory
+_COLUMNS = ("account_ids", "assets", "account", "asset", "stroops")
+
+
+def to_stroops(balance: str) -> int:
+    """Horizon balance string ("12.3456700") as int64 stroops, without float rounding."""
+    whole, _, fraction = balance.partition(".")
+    stroops = int(whole) * STROOPS_PER_UNIT
+    if fraction:
+        value = int(fraction[:7].ljust(7, "0"))
+        stroops += -value if whole.startswith("-") else value
+    return stroops
+
+
+def _balance_asset_key(balance: dict) -> str:
+    asset_type = balance["asset_type"]
+    if asset_type == "native":
+        return "native"
+    if asset_type == "liquidity_pool_shares":
+        return f"pool:{balance['liquidity_pool_id']}"
+    return f"{balance['asset_code']}:{balance['asset_issuer']}"
+
+
+@dataclass(frozen=True)
+class HolderColumns:
+    """
+    Holder balances as parallel arrays, one row per (account, asset) balance.
+
+    ``account`` and ``asset`` index into ``account_ids`` and ``assets``
+    (``native``, ``CODE:ISSUER`` or ``pool:<id>``); ``stroops`` is the balance
+    in int64 stroops. Written once per crawl with ``save`` and opened with
+    ``load`` as memory maps, so reports read only the columns they touch.
+    Account ids are stored as 56-byte ASCII (``S56``).
+    """
+
+    account_ids: np.ndarray
+    assets: np.ndarray
+    account: np.ndarray
+    asset: np.ndarray
+    stroops: np.ndarray
+
+    @classmethod
+    def from_accounts(cls, accounts: Iterable[dict]) -> "HolderColumns":
+        """Build from Horizon account records (as returned by ``fetch_holders``)."""
+        account_ids: list[str] = []
+        asset_index: dict[str, int] = {}
+        account_column: list[int] = []
+        asset_column: list[int] = []
+        stroops_column: list[int] = []
+        for row, record in enumerate(accounts):
+            account_ids.append(record["account_id"])
+            for balance in record.get("balances", []):
+                key = _balance_asset_key(balance)
+                account_column.append(row)
+                asset_column.append(asset_index.setdefault(key, len(asset_index)))
+                stroops_column.append(to_stroops(balance["balance"]))
+        return cls(
+            account_ids=np.array(account_ids, dtype="S56"),
+            assets=np.array(list(asset_index), dtype=str),
+            account=np.array(account_column, dtype=np.int32),
+            asset=np.array(asset_column, dtype=np.int32),
+            stroops=np.array(stroops_column, dtype=np.int64),
+        )
+
+    def save(self, directory: Path) -> Path:
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in _COLUMNS:
+            tmp_path = directory / f"{name}.tmp.npy"
+            np.save(tmp_path, getattr(self, name))
+            os.replace(tmp_path, directory / f"{name}.npy")
+        return directory
+
+    @classmethod
+    def load(cls, directory: Path, mmap: bool = True) -> "HolderColumns":
+        mode: Any = "r" if mmap else None
+        return cls(**{name: np.load(directory / f"{name}.npy", mmap_mode=mode) for name in _COLUMNS})
+
+    @property
+    def asset_codes(self) -> np.ndarray:
+        """Code of every entry in ``assets`` ("" for native and pool shares)."""
+        return np.array(
+            [key.split(":")[0] if ":" in key and not key.startswith("pool:") else "" for key in self.assets]
+        )
+
+    def rows_with_code(self, *codes: str) -> np.ndarray:
+        """Row mask: balances of any asset with one of ``codes``, whatever the issuer."""
+        return np.isin(self.asset_codes, codes)[self.asset]
+
+    def balances_by_code(self, *codes: str) -> np.ndarray:
+        """Per account, the summed balance of assets with these codes (units, float64)."""
+        mask = self.rows_with_code(*codes)
+        totals = np.bincount(self.account[mask], weights=self.stroops[mask], minlength=len(self.account_ids))
+        return totals / STROOPS_PER_UNIT
+
+    def accounts_with_code(self, code: str, positive: bool = False) -> np.ndarray:
+        """Per account mask: has a trustline (or, with ``positive``, a non-zero balance) for ``code``."""
+        mask = self.rows_with_code(code)
+        if positive:
+            mask &= self.stroops > 0
+        has = np.zeros(len(self.account_ids), dtype=bool)
+        has[self.account[mask]] = True
+        return has
+
+    def per_asset_holders(self) -> dict[str, int]:
+        """Number of accounts with a positive balance, by asset key."""
+        counts = np.bincount(self.asset[self.stroops > 0], minlength=len(self.assets))
+        return {str(key): int(count) for key, count in zip(self.assets, counts)}
+
+
+def calculate_holder_statistics(columns: HolderColumns) -> dict[str, Any]:
+    """
+    The IND_ALL report numbers: among accounts with more than 1 MTL+MTLRECT, how many hold
+    EURMTL/SATSMTL/USDM trustlines and their median MTL+MTLRECT; plus non-zero EURMTL and MTLAP
+    balances over all accounts (MTLAP minus the issuer's own).
+    """
+    mtl_mtlrect = columns.balances_by_code("MTL", "MTLRECT")
+    holders = mtl_mtlrect > 1
+    positive = columns.stroops > 0
+    return {
+        "USDM": int((holders & columns.accounts_with_code("USDM")).sum()),
+        "SATSMTL": int((holders & columns.accounts_with_code("SATSMTL")).sum()),
+        "EURMTL": int((holders & columns.accounts_with_code("EURMTL")).sum()),
+        "MTL_MTLRECT": int(holders.sum()),
+        "Median": float(np.median(mtl_mtlrect[holders])) if holders.any() else 0,
+        "MTLAP": int((columns.rows_with_code("MTLAP") & positive).sum()) - 1,
+        "EURMTL_NONE_ZERO": int((columns.rows_with_code("EURMTL") & positive).sum()),
+    }
+
+
+def link_latest(target: Path, link: Path) -> None:
+    """Point ``link`` (e.g. ``holders.last``) at ``target`` atomically."""
+    tmp_link = link.with_name(f"{link.name}.tmp")
+    if tmp_link.is_symlink() or tmp_link.exists():
+        tmp_link.unlink()
+    tmp_link.symlink_to(target.name)
+    os.replace(tmp_link, link)
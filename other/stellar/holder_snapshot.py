@@ -0,0 +1,269 @@
+# other/stellar/holder_snapshot.py
+"""Holder/balance snapshots shared by the dividend calculators."""
+
+import asyncio
+import gzip
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from loguru import logger
+from stellar_sdk import Asset
+
+from other.config_reader import config
+from .holders import iter_holders, iter_pool_pages
+from .horizon_client import get_horizon_client
+
+
+def asset_key(asset: Asset) -> str:
+    """Horizon notation: ``native`` or ``CODE:ISSUER``."""
+    return "native" if asset.is_native() else f"{asset.code}:{asset.issuer}"
+
+
+@dataclass(slots=True)
+class HolderBalances:
+    """One account parsed once: balances by asset key, pool shares by pool id, data entries.
+
+    ``amounts`` keeps Horizon's amount strings next to the float ``balances`` for
+    callers that need exact sums (dividends).
+    """
+
+    account_id: str
+    balances: dict[str, float]
+    pool_shares: dict[str, float] = field(default_factory=dict)
+    data: dict[str, str] = field(default_factory=dict)
+    amounts: dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_record(cls, record: dict) -> "HolderBalances":
+        amounts: dict[str, str] = {}
+        pool_shares: dict[str, float] = {}
+        for balance in record.get("balances", []):
+            asset_type = balance["asset_type"]
+            if asset_type == "native":
+                amounts["native"] = balance["balance"]
+            elif asset_type == "liquidity_pool_shares":
+                pool_shares[balance["liquidity_pool_id"]] = float(balance["balance"])
+            else:
+                amounts[f"{balance['asset_code']}:{balance['asset_issuer']}"] = balance["balance"]
+        balances = {key: float(amount) for key, amount in amounts.items()}
+        return cls(record["account_id"], balances, pool_shares, dict(record.get("data") or {}), amounts)
+
+    def balance(self, asset: Asset) -> Optional[float]:
+        """Balance of ``asset``, None without a trustline."""
+        return self.balances.get(asset_key(asset))
+
+    def amount(self, asset: Asset) -> Optional[Decimal]:
+        """Exact balance of ``asset``, None without a trustline."""
+        key = asset_key(asset)
+        if key in self.amounts:
+            return Decimal(self.amounts[key])
+        # Built without amount strings (older saved snapshot): repr of the float
+        balance = self.balances.get(key)
+        return None if balance is None else Decimal(repr(balance))
+
+    def balance_by_code(self, code: str) -> Optional[float]:
+        """Balance of a credit asset with this code, whatever the issuer; the last one wins, as in ``get_balances``."""
+        prefix = f"{code}:"
+        matches = [value for key, value in self.balances.items() if key.startswith(prefix)]
+        return matches[-1] if matches else None
+
+    def to_record(self) -> dict:
+        """Horizon-shaped dict for helpers that take account records (e.g. ``get_donate_list``)."""
+        return {"account_id": self.account_id, "data": self.data}
+
+
+@dataclass(slots=True)
+class PoolReserves:
+    pool_id: str
+    total_shares: float
+    reserves: dict[str, float]
+
+
+@dataclass
+class HolderSnapshot:
+    """Holders of ``assets`` (plus pools around ``pool_assets``) at one ledger."""
+
+    assets: list[str]
+    pool_assets: list[str]
+    ledger: Optional[int]
+    taken_at: datetime
+    accounts: dict[str, HolderBalances]
+    pools: dict[str, PoolReserves] = field(default_factory=dict)
+
+    def covers(self, assets: Iterable[str], pool_assets: Iterable[str]) -> bool:
+        return set(assets) <= set(self.assets) and set(pool_assets) <= set(self.pool_assets)
+
+    def holders(self, *assets: Asset) -> list[HolderBalances]:
+        """Accounts with a trustline to any of ``assets``, in crawl order."""
+        keys = [asset_key(asset) for asset in assets]
+        return [account for account in self.accounts.values() if any(key in account.balances for key in keys)]
+
+    def pooled_balance(self, account: HolderBalances, asset: Asset) -> float:
+        """Direct balance plus the account's share of ``asset`` locked in liquidity pools."""
+        key = asset_key(asset)
+        total = account.balances.get(key, 0.0)
+        for pool_id, shares in account.pool_shares.items():
+            pool = self.pools.get(pool_id)
+            if pool and pool.total_shares > 0 and shares > 0:
+                total += shares / pool.total_shares * pool.reserves.get(key, 0.0)
+        return total
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "assets": self.assets,
+            "pool_assets": self.pool_assets,
+            "ledger": self.ledger,
+            "taken_at": self.taken_at.isoformat(),
+            "accounts": [[a.account_id, a.balances, a.pool_shares, a.data, a.amounts] for a in self.accounts.values()],
+            "pools": [[p.pool_id, p.total_shares, p.reserves] for p in self.pools.values()],
+        }
+
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]) -> "HolderSnapshot":
+        return cls(
+            assets=raw["assets"],
+            pool_assets=raw["pool_assets"],
+            ledger=raw["ledger"],
+            taken_at=datetime.fromisoformat(raw["taken_at"]),
+            accounts={row[0]: HolderBalances(*row) for row in raw["accounts"]},
+            pools={row[0]: PoolReserves(*row) for row in raw["pools"]},
+        )
+
+    def save(self, directory: Path) -> Path:
+        codes = "-".join(key.split(":")[0] for key in self.assets)
+        path = directory / f"{codes}_{self.ledger or 'na'}_{self.taken_at:%Y%m%dT%H%M%S}.json.gz"
+        directory.mkdir(parents=True, exist_ok=True)
+        with gzip.open(path, "wt", encoding="utf-8") as fp:
+            json.dump(self.to_dict(), fp)
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "HolderSnapshot":
+        with gzip.open(path, "rt", encoding="utf-8") as fp:
+            return cls.from_dict(json.load(fp))
+
+
+async def take_snapshot(assets: Iterable[Asset], pool_assets: Iterable[Asset] = ()) -> HolderSnapshot:
+    """Crawl holders of ``assets`` and pools of ``pool_assets`` concurrently, parsing pages as they arrive."""
+    assets, pool_assets = list(assets), list(pool_assets)
+    ledger = await _latest_ledger()
+    taken_at = datetime.now(timezone.utc)
+
+    async def crawl_accounts() -> dict[str, HolderBalances]:
+        accounts: dict[str, HolderBalances] = {}
+        async for record in iter_holders(*assets):
+            accounts[record["account_id"]] = HolderBalances.from_record(record)
+        return accounts
+
+    async def crawl_pools(asset: Asset) -> list[PoolReserves]:
+        pools = []
+        async for records in iter_pool_pages(asset):
+            for pool in records:
+                reserves = {reserve["asset"]: float(reserve["amount"]) for reserve in pool["reserves"]}
+                pools.append(PoolReserves(pool["id"], float(pool["total_shares"]), reserves))
+        return pools
+
+    accounts, *pool_lists = await asyncio.gather(crawl_accounts(), *(crawl_pools(asset) for asset in pool_assets))
+    return HolderSnapshot(
+        assets=[asset_key(asset) for asset in assets],
+        pool_assets=[asset_key(asset) for asset in pool_assets],
+        ledger=ledger,
+        taken_at=taken_at,
+        accounts=accounts,
+        pools={pool.pool_id: pool for pools in pool_lists for pool in pools},
+    )
+
+
+async def _latest_ledger() -> Optional[int]:
+    try:
+        root = await get_horizon_client().get_json(f"{config.horizon_url}/")
+        return int(root["history_latest_ledger"])
+    except Exception as e:
+        logger.warning(f"Horizon latest ledger unavailable: {e}")
+        return None
+
+
+class HolderSnapshotStore:
+    """
+    Serves dividend calculators from one crawl.
+
+    A request is answered by the freshest cached snapshot covering its assets and
+    pools if it is younger than ``max_age`` seconds; concurrent misses share one
+    crawl. With ``directory`` set, every new snapshot is written there, and
+    ``pin()`` replays a saved one regardless of age.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_age: float = 600.0):
+        self.directory = Path(directory) if directory else None
+        self.max_age = max_age
+        self._snapshots: list[tuple[float, HolderSnapshot]] = []
+        self._pinned: list[HolderSnapshot] = []
+        self._lock = asyncio.Lock()
+        self.crawl_count = 0
+
+    async def get(
+        self, *assets: Asset, pool_assets: Iterable[Asset] = (), max_age: Optional[float] = None
+    ) -> HolderSnapshot:
+        pool_assets = list(pool_assets)
+        keys = [asset_key(asset) for asset in assets]
+        pool_keys = [asset_key(asset) for asset in pool_assets]
+        max_age = self.max_age if max_age is None else max_age
+
+        snapshot = self._find(keys, pool_keys, max_age)
+        if snapshot:
+            return snapshot
+        async with self._lock:
+            # Another caller may have crawled while we waited
+            snapshot = self._find(keys, pool_keys, max_age)
+            if snapshot:
+                return snapshot
+            snapshot = await take_snapshot(assets, pool_assets)
+            self.crawl_count += 1
+            self._snapshots = [(t, s) for t, s in self._snapshots if time.monotonic() - t < self.max_age]
+            self._snapshots.append((time.monotonic(), snapshot))
+
+        if self.directory:
+            path = await asyncio.to_thread(snapshot.save, self.directory)
+            logger.info(
+                f"Holder snapshot {keys} at ledger {snapshot.ledger}: {len(snapshot.accounts)} accounts, {path}"
+            )
+        return snapshot
+
+    def pin(self, snapshot: HolderSnapshot) -> None:
+        """Serve ``snapshot`` for the assets it covers until ``clear()``, e.g. to replay a past calculation."""
+        self._pinned.append(snapshot)
+
+    def clear(self) -> None:
+        self._snapshots.clear()
+        self._pinned.clear()
+
+    def _find(self, keys: list[str], pool_keys: list[str], max_age: float) -> Optional[HolderSnapshot]:
+        for snapshot in reversed(self._pinned):
+            if snapshot.covers(keys, pool_keys):
+                return snapshot
+        now = time.monotonic()
+        for created, snapshot in reversed(self._snapshots):
+            if now - created < max_age and snapshot.covers(keys, pool_keys):
+                return snapshot
+        return None
+
+
+_holder_snapshot_store: Optional[HolderSnapshotStore] = None
+
+
+def get_holder_snapshot_store() -> HolderSnapshotStore:
+    """The process-wide snapshot store (created from settings on first use)."""
+    global _holder_snapshot_store
+    if _holder_snapshot_store is None:
+        _holder_snapshot_store = HolderSnapshotStore(config.holder_snapshot_dir, config.holder_snapshot_max_age)
+    return _holder_snapshot_store
+
+
+def set_holder_snapshot_store(store: Optional[HolderSnapshotStore]) -> None:
+    global _holder_snapshot_store
+    _holder_snapshot_store = store
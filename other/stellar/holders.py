@@ -0,0 +1,103 @@
+# other/stellar/holders.py
+"""Concurrent, paged holder crawls with de-duplication by account_id."""
+
+import asyncio
+from typing import AsyncIterator
+
+from stellar_sdk import Asset
+from stellar_sdk.server_async import ServerAsync
+
+from other.config_reader import config
+from .horizon_client import get_horizon_client
+from .sdk_utils import get_horizon_url
+
+HOLDERS_PAGE_LIMIT = 200
+
+_DONE = object()
+
+
+async def iter_holder_pages(asset: Asset, limit: int = HOLDERS_PAGE_LIMIT) -> AsyncIterator[list[dict]]:
+    """
+    Yield the account records holding ``asset`` page by page.
+
+    Pages follow Horizon cursors, so one asset is crawled sequentially; the caller
+    can start working on the first page while the next one is in flight.
+    """
+    async with ServerAsync(horizon_url=config.horizon_url, client=get_horizon_client()) as server:
+        call_builder = server.accounts().for_asset(asset).limit(limit)
+        page = await call_builder.call()
+        while records := page["_embedded"]["records"]:
+            yield records
+            page = await call_builder.next()
+
+
+async def iter_pool_pages(asset: Asset, limit: int = HOLDERS_PAGE_LIMIT) -> AsyncIterator[list[dict]]:
+    """Yield the liquidity pools with ``asset`` in their reserves page by page."""
+    async with ServerAsync(horizon_url=get_horizon_url(), client=get_horizon_client()) as server:
+        call_builder = server.liquidity_pools().for_reserves([asset]).limit(limit)
+        page = await call_builder.call()
+        while records := page["_embedded"]["records"]:
+            yield records
+            page = await call_builder.next()
+
+
+async def iter_holders(*assets: Asset, limit: int = HOLDERS_PAGE_LIMIT) -> AsyncIterator[dict]:
+    """
+    Crawl the holders of several assets concurrently and yield each account once.
+
+    Accounts are yielded as soon as their page arrives, in arrival order; an account
+    holding several of the assets is yielded for the first page it appears on.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=len(assets) * 2)
+
+    async def crawl(asset: Asset) -> None:
+        try:
+            async for records in iter_holder_pages(asset, limit):
+                await queue.put(records)
+        except Exception as e:
+            await queue.put(e)
+            return
+        await queue.put(_DONE)
+
+    tasks = [asyncio.create_task(crawl(asset)) for asset in assets]
+    seen: set[str] = set()
+    running = len(tasks)
+    try:
+        while running:
+            item = await queue.get()
+            if item is _DONE:
+                running -= 1
+                continue
+            if isinstance(item, Exception):
+                raise item
+            for account in item:
+                if account["account_id"] not in seen:
+                    seen.add(account["account_id"])
+                    yield account
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def fetch_holders(*assets: Asset, limit: int = HOLDERS_PAGE_LIMIT, mini: bool = False) -> list[dict]:
+    """
+    Holders of all ``assets`` fetched concurrently, unique by account_id.
+
+    The result is ordered by asset, then by Horizon page order, so it does not
+    depend on which crawl finished first.
+    """
+
+    async def collect(asset: Asset) -> list[dict]:
+        accounts: list[dict] = []
+        async for records in iter_holder_pages(asset, limit):
+            accounts.extend(records)
+            if mini:
+                break
+        return accounts
+
+    merged: dict[str, dict] = {}
+    for accounts in await asyncio.gather(*(collect(asset) for asset in assets)):
+        for account in accounts:
+            merged.setdefault(account["account_id"], account)
+    return list(merged.values())
@@ -0,0 +1,172 @@
+# other/stellar/horizon_client.py
+"""App-scoped Horizon HTTP client: one keep-alive pool, retries and latency counters."""
+
+import asyncio
+import json
+import random
+import time
+from contextlib import suppress
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+from loguru import logger
+from stellar_sdk.client.aiohttp_client import AiohttpClient
+from stellar_sdk.client.response import Response
+from stellar_sdk.exceptions import ConnectionError as StellarConnectionError
+
+RETRY_STATUSES = frozenset({429, 503})
+
+
+def endpoint_name(url: str) -> str:
+    """Horizon path with ids collapsed, e.g. /accounts/G.../offers -> accounts/:id/offers."""
+    segments = [s for s in urlsplit(url).path.split("/") if s]
+    return "/".join(":id" if len(s) > 20 or s.isdigit() else s for s in segments) or "/"
+
+
+class HorizonClient(AiohttpClient):
+    """
+    Shared AiohttpClient for every Horizon call of the process.
+
+    Keeps one aiohttp session (keep-alive pool of ``pool_size`` connections), caps
+    in-flight requests, retries GETs on 429/503 and connection errors with exponential
+    backoff (honouring Retry-After) and counts latency per endpoint. POSTs are sent
+    once: a resubmitted transaction that was applied the first time only comes back
+    as tx_bad_seq, so submit retries belong to the caller.
+
+    ``ServerAsync.__aexit__`` closes its client, so ``close()`` is a no-op here and
+    the pool is released only by ``shutdown()``.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 50,
+        max_concurrency: int = 20,
+        request_timeout: float = 3 * 60,
+        post_timeout: float = 60,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 10.0,
+    ):
+        super().__init__(pool_size=pool_size, request_timeout=request_timeout, post_timeout=post_timeout)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stats: dict[str, dict[str, float]] = {}
+
+    async def get(self, url: str, params: Optional[dict[str, str]] = None) -> Response:
+        return await self._request("GET", url, lambda: super(HorizonClient, self).get(url, params))
+
+    async def post(
+        self,
+        url: str,
+        data: Optional[dict[str, str]] = None,
+        json_data: Optional[dict[str, Any]] = None,
+    ) -> Response:
+        return await self._request("POST", url, lambda: super(HorizonClient, self).post(url, data, json_data))
+
+    async def get_json(self, url: str, params: Optional[dict[str, str]] = None) -> Any:
+        """GET a Horizon resource and decode the body, error documents included."""
+        response = await self.get(url, params)
+        return json.loads(response.text)
+
+    async def close(self) -> None:
+        """Kept open on purpose: the pool outlives every ServerAsync using it."""
+
+    async def shutdown(self) -> None:
+        """Release pooled connections; the next request opens a new session."""
+        await super().close()
+        self._session = None
+        self._sse_session = None
+
+    def get_metrics(self) -> dict[str, Any]:
+        return {
+            endpoint: {
+                "count": int(stats["count"]),
+                "errors": int(stats["errors"]),
+                "retries": int(stats["retries"]),
+                "avg_ms": round(stats["total"] / stats["count"] * 1000, 1) if stats["count"] else 0.0,
+                "max_ms": round(stats["max"] * 1000, 1),
+            }
+            for endpoint, stats in sorted(self._stats.items())
+        }
+
+    async def _request(self, method: str, url: str, send) -> Response:
+        await self._bind_loop()
+        assert self._semaphore is not None
+        stats = self._stats.setdefault(
+            f"{method} {endpoint_name(url)}", {"count": 0, "errors": 0, "retries": 0, "total": 0.0, "max": 0.0}
+        )
+        max_retries = self.max_retries if method == "GET" else 0
+
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            try:
+                async with self._semaphore:
+                    response = await send()
+            except StellarConnectionError:
+                self._observe(stats, time.monotonic() - started, error=True)
+                if attempt >= max_retries:
+                    raise
+                delay = self._delay(attempt, None)
+            else:
+                retryable = response.status_code in RETRY_STATUSES
+                self._observe(stats, time.monotonic() - started, error=response.status_code >= 400)
+                if not retryable or attempt >= max_retries:
+                    return response
+                delay = self._delay(attempt, response.headers.get("Retry-After"))
+
+            attempt += 1
+            stats["retries"] += 1
+            logger.warning(f"Horizon {method} {endpoint_name(url)} retry {attempt}/{max_retries} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    def _delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass
+        return min(self.backoff * 2**attempt, self.max_backoff) * random.uniform(0.5, 1.0)
+
+    async def _bind_loop(self) -> None:
+        # The session and semaphore belong to one event loop (tests run a loop per case)
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            # Detach before awaiting, so concurrent requests open a fresh session
+            stale = [session for session in (self._session, self._sse_session) if session is not None]
+            self._session = None
+            self._sse_session = None
+            for session in stale:
+                # Sockets of a loop that is already closed cannot be closed cleanly; drop them anyway
+                with suppress(RuntimeError):
+                    await session.close()
+
+    @staticmethod
+    def _observe(stats: dict[str, float], elapsed: float, error: bool) -> None:
+        stats["count"] += 1
+        stats["total"] += elapsed
+        stats["max"] = max(stats["max"], elapsed)
+        if error:
+            stats["errors"] += 1
+
+
+_horizon_client: Optional[HorizonClient] = None
+
+
+def get_horizon_client() -> HorizonClient:
+    """The process-wide Horizon client (created with defaults on first use)."""
+    global _horizon_client
+    if _horizon_client is None:
+        _horizon_client = HorizonClient()
+    return _horizon_client
+
+
+def set_horizon_client(client: Optional[HorizonClient]) -> None:
+    global _horizon_client
+    _horizon_client = client
@@ -0,0 +1,125 @@
+# other/stellar/name_resolver.py
+"""Account names from Grist: the four lookup tables cached in memory, refreshed in the background."""
+
+import asyncio
+import time
+from typing import Any, Callable, Iterable, Optional
+
+from loguru import logger
+
+from other.config_reader import config
+from other.grist_tools import GristTableConfig, MTLGrist, grist_manager
+
+# (table, key column, name of a record), by precedence: the first table with a name wins
+NAME_TABLES: list[tuple[GristTableConfig, str, Callable[[dict], Any]]] = [
+    (MTLGrist.MTLA_USERS, "Stellar", lambda record: record.get("Telegram")),
+    (MTLGrist.EURMTL_users, "account_id", lambda record: record.get("username")),
+    (MTLGrist.EURMTL_accounts, "account_id", lambda record: record.get("description")),
+    (MTLGrist.EURMTL_assets, "issuer", lambda record: record.get("code") and f"Issuer of {record['code']}"),
+]
+
+
+class AccountNameResolver:
+    """
+    Resolves Stellar addresses to names from the Grist user, account and asset tables.
+
+    The tables are loaded whole, concurrently, on first use and kept as one dict.
+    After ``ttl`` seconds the next lookup still answers from memory and starts a
+    background refresh; a table that fails to load keeps its previous rows. If no
+    table loads, the index is left as it was: the first load raises the Grist
+    error instead of caching an empty index, a refresh is retried on a later lookup.
+    """
+
+    def __init__(self, grist: Any = grist_manager, ttl: float = 600.0):
+        self.grist = grist
+        self.ttl = ttl
+        self._tables: dict[str, dict[str, str]] = {}
+        self._names: dict[str, str] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    async def resolve(self, keys: Iterable[str]) -> dict[str, str]:
+        """Names of the known ``keys``; unknown ones are left out."""
+        await self._ensure_loaded()
+        found = {}
+        for key in dict.fromkeys(keys):
+            name = self._names.get(key)
+            if name:
+                self.hits += 1
+                found[key] = name
+            else:
+                self.misses += 1
+        return found
+
+    async def name(self, key: str) -> Optional[str]:
+        return (await self.resolve([key])).get(key)
+
+    async def refresh(self) -> None:
+        """Reload all tables at once; rebuild the name index from whatever loaded."""
+        loaded = await asyncio.gather(
+            *(self.grist.fetch_data(table) for table, _, _ in NAME_TABLES), return_exceptions=True
+        )
+        errors = [records for records in loaded if isinstance(records, BaseException)]
+        self.refresh_errors += len(errors)
+        if len(errors) == len(NAME_TABLES):
+            logger.warning(f"Grist names: no table refreshed: {errors[0]}")
+            if self._loaded_at is None:
+                raise errors[0]
+            return
+        for (table, key_column, name_of), records in zip(NAME_TABLES, loaded):
+            if isinstance(records, BaseException):
+                logger.warning(f"Grist names: {table.table_name} not refreshed: {records}")
+                continue
+            names: dict[str, str] = {}
+            for record in records:
+                key, name = record.get(key_column), name_of(record)
+                if key and name:
+                    names.setdefault(key, name)
+            self._tables[f"{table.access_id}/{table.table_name}"] = names
+        index: dict[str, str] = {}
+        for table, _, _ in reversed(NAME_TABLES):
+            index.update(self._tables.get(f"{table.access_id}/{table.table_name}", {}))
+        self._names = index
+        self._loaded_at = time.monotonic()
+        self.refreshes += 1
+
+    def get_metrics(self) -> dict[str, Any]:
+        return {
+            "names": len(self._names),
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "age": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at is not None else None,
+        }
+
+    async def _ensure_loaded(self) -> None:
+        if self._loaded_at is None:
+            async with self._lock:
+                if self._loaded_at is None:
+                    await self.refresh()
+        elif time.monotonic() - self._loaded_at > self.ttl and (
+            self._refresh_task is None or self._refresh_task.done()
+        ):
+            self._refresh_task = asyncio.create_task(self.refresh())
+
+
+_name_resolver: Optional[AccountNameResolver] = None
+
+
+def get_account_name_resolver(grist: Any = None) -> AccountNameResolver:
+    """The shared resolver (over ``grist_manager`` unless another Grist client is given)."""
+    global _name_resolver
+    if _name_resolver is None or (grist is not None and _name_resolver.grist is not grist):
+        _name_resolver = AccountNameResolver(grist or grist_manager, ttl=config.grist_names_ttl)
+    return _name_resolver
+
+
+def set_account_name_resolver(resolver: Optional[AccountNameResolver]) -> None:
+    global _name_resolver
+    _name_resolver = resolver
@@ -9,10 +9,10 @@ from stellar_sdk import (
     TransactionBuilder,
     TransactionEnvelope,
 )
-from stellar_sdk.client.aiohttp_client import AiohttpClient
 from stellar_sdk.server_async import ServerAsync
 
 from other.config_reader import config
+from .horizon_client import get_horizon_client
 from .sdk_utils import get_private_sign
 
 
@@ -32,7 +32,7 @@ async def send_payment_async(
     Returns:
         Transaction response dict
     """
-    async with ServerAsync(horizon_url=config.horizon_url, client=AiohttpClient()) as async_server:
+    async with ServerAsync(horizon_url=config.horizon_url, client=get_horizon_client()) as async_server:
         source_account = await async_server.load_account(source_address)
 
     builder = TransactionBuilder(
@@ -63,7 +63,7 @@ async def stellar_async_submit(xdr: str) -> dict:
     Returns:
         Submission response dict
     """
-    async with ServerAsync(horizon_url=config.horizon_url, client=AiohttpClient()) as server:
+    async with ServerAsync(horizon_url=config.horizon_url, client=get_horizon_client()) as server:
         transaction = TransactionEnvelope.from_xdr(xdr, network_passphrase=Network.PUBLIC_NETWORK_PASSPHRASE)
         return await server.submit_transaction(transaction)
 
@@ -78,7 +78,7 @@ async def stellar_sync_submit(xdr: str) -> dict:
     Returns:
         Submission response dict
     """
-    async with ServerAsync(horizon_url=config.horizon_url, client=AiohttpClient()) as server:
+    async with ServerAsync(horizon_url=config.horizon_url, client=get_horizon_client()) as server:
         transaction = TransactionEnvelope.from_xdr(xdr, network_passphrase=Network.PUBLIC_NETWORK_PASSPHRASE)
         return await server.submit_transaction(transaction)
 
@@ -99,7 +99,7 @@ async def build_batch_payment_xdr(
     Returns:
         Unsigned transaction XDR
     """
-    async with ServerAsync(horizon_url=config.horizon_url, client=AiohttpClient()) as server:
+    async with ServerAsync(horizon_url=config.horizon_url, client=get_horizon_client()) as server:
         source_account = await server.load_account(source_address)
 
     builder = TransactionBuilder(
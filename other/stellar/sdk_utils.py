@@ -10,10 +10,10 @@ from stellar_sdk import (
     TransactionEnvelope,
     FeeBumpTransactionEnvelope,
 )
-from stellar_sdk.client.aiohttp_client import AiohttpClient
 from stellar_sdk.server_async import ServerAsync
 
 from other.config_reader import config
+from .horizon_client import get_horizon_client
 
 
 # ============ Stellar Network Configuration ============
@@ -45,7 +45,7 @@ def get_server() -> Server:
 
 def get_server_async() -> ServerAsync:
     """Get asynchronous Stellar Horizon server connection."""
-    return ServerAsync(horizon_url=get_horizon_url(), client=AiohttpClient())
+    return ServerAsync(horizon_url=get_horizon_url(), client=get_horizon_client())
 
 
 async def load_account_async(account_id: str):
@@ -58,7 +58,7 @@ async def load_account_async(account_id: str):
     Returns:
         Account object from Horizon
     """
-    async with ServerAsync(horizon_url=get_horizon_url(), client=AiohttpClient()) as server:
+    async with ServerAsync(horizon_url=get_horizon_url(), client=get_horizon_client()) as server:
         return await server.load_account(account_id)
 
 
@@ -4,6 +4,7 @@
 import math
 from copy import deepcopy
 from datetime import datetime, timedelta
+from typing import Optional
 
 from loguru import logger
 from stellar_sdk import Account, TransactionBuilder
@@ -15,6 +16,7 @@ from other.mytypes import MyShareHolder
 
 from .constants import BASE_FEE, MTLAddresses, MTLAssets
 from .balance_utils import stellar_get_account, stellar_get_all_mtl_holders, stellar_get_holders
+from .delegation import DelegationGraph, fetch_missing_delegates
 from .xdr_utils import decode_data_value
 
 
@@ -185,7 +187,8 @@ async def cmd_gen_mtl_vote_list(trim_count: int = 20, delegate_list: dict = None
 
     Args:
         trim_count: Maximum number of shareholders to return
-        delegate_list: Optional pre-existing delegation mapping
+        delegate_list: Optional pre-existing delegation mapping; on return it holds
+            delegator -> final delegate for every applied delegation
 
     Returns:
         List of MyShareHolder objects sorted by voting power
@@ -250,34 +253,19 @@ async def cmd_gen_mtl_vote_list(trim_count: int = 20, delegate_list: dict = None
                 if data_name in ("delegate", "mtl_delegate"):
                     delegate_list[shareholder.account_id] = decode_data_value(data_value)
 
-    # Multi-step delegation
-    max_steps = 3  # Maximum delegation steps
-
-    for step in range(max_steps):
-        changes_made = False
-        temp_delegate_list = delegate_list.copy()  # Create copy for safe modification
-
-        for shareholder in shareholder_list:
-            if shareholder.account_id in temp_delegate_list:
-                delegate_id = temp_delegate_list[shareholder.account_id]
-                delegate = next((s for s in shareholder_list if s.account_id == delegate_id), None)
-
-                if delegate:
-                    delegate.balance_delegated += shareholder.balance + shareholder.balance_delegated
-                    shareholder.balance_delegated = 0
-                    shareholder.balance_mtl = 0
-                    shareholder.balance_rect = 0
-                    changes_made = True
-
-        # Update delegate_list only after iteration completes
-        delegate_list = temp_delegate_list
-
-        # If no changes were made, break the loop
-        if not changes_made:
-            break
+    # Delegation: each chain's balance goes to its final delegate, cycles are broken
+    graph = DelegationGraph({sh.account_id: delegate_list.get(sh.account_id) for sh in shareholder_list})
+    shareholders = {sh.account_id: sh for sh in shareholder_list}
+    for shareholder in shareholder_list:
+        root = graph.root_of(shareholder.account_id)
+        if root != shareholder.account_id:
+            shareholders[root].balance_delegated += shareholder.balance_mtl + shareholder.balance_rect
+            shareholder.balance_mtl = 0
+            shareholder.balance_rect = 0
 
-    # Clear delegate_list after all steps complete
+    # Report who ended up voting for whom
     delegate_list.clear()
+    delegate_list.update(graph.resolved())
 
     # Delete blacklist user
     bl = await cmd_get_blacklist()
@@ -520,6 +508,28 @@ def gen_vote_xdr(
     return xdr
 
 
+def _mtlap_vote_node(account: dict) -> dict:
+    """Voting info of an MTLAP holder record: delegate, MTLAP balance and own right to vote."""
+    delegate = None
+    if account.get("data") and account["data"].get("mtla_a_delegate"):
+        delegate = decode_data_value(account["data"]["mtla_a_delegate"])
+    vote = 0
+    for balance in account.get("balances") or []:
+        if (
+            balance.get("asset_code")
+            and balance["asset_code"] == MTLAssets.mtlap_asset.code
+            and balance["asset_issuer"] == MTLAssets.mtlap_asset.issuer
+        ):
+            vote = int(float(balance["balance"]))
+            break
+    return {"delegate": delegate, "vote": vote, "can_vote": vote >= 2}
+
+
+async def _fetch_mtlap_vote_node(account_id: str) -> Optional[dict]:
+    account = await stellar_get_account(account_id)
+    return _mtlap_vote_node(account) if account.get("id") else None
+
+
 async def get_mtlap_votes() -> dict:
     """
     Get MTLAP governance votes with delegation resolution.
@@ -533,71 +543,41 @@ async def get_mtlap_votes() -> dict:
             'delegate': delegate account or None,
             'vote': MTLAP balance,
             'can_vote': True if can participate in governance,
-            'delegated_list': list of accounts that delegated to this one
+            'was_delegate': final delegate of the chain (delegators only),
+            'delegated_list': accounts with MTLAP whose chain ends here
         }
     """
     result = {}
     # Build tree based on holders
     accounts = await stellar_get_holders(MTLAssets.mtlap_asset)
     for account in accounts:
-        delegate = None
-        if account["data"] and account["data"].get("mtla_a_delegate"):
-            delegate = decode_data_value(account["data"]["mtla_a_delegate"])
-        vote = 0
-        for balance in account["balances"]:
-            if (
-                balance.get("asset_code")
-                and balance["asset_code"] == MTLAssets.mtlap_asset.code
-                and balance["asset_issuer"] == MTLAssets.mtlap_asset.issuer
-            ):
-                vote = int(float(balance["balance"]))
-                break
-        result[account["id"]] = {"delegate": delegate, "vote": vote, "can_vote": vote >= 2}
-
-    # Add accounts that don't exist yet
-    find_new = True
-    while find_new:
-        find_new = False
-        for account in list(result):
-            if result[account]["delegate"] and result[account]["delegate"] not in result:
-                find_new = True
-                new_account = await stellar_get_account(result[account]["delegate"])
-                delegate = None
-                if new_account.get("data") and new_account["data"].get("mtla_a_delegate"):
-                    delegate = decode_data_value(new_account["data"]["mtla_a_delegate"])
-                vote = 0
-                balances = new_account.get("balances")
-                if balances:
-                    for balance in balances:
-                        if (
-                            balance.get("asset_code")
-                            and balance["asset_code"] == MTLAssets.mtlap_asset.code
-                            and balance["asset_issuer"] == MTLAssets.mtlap_asset.issuer
-                        ):
-                            vote = int(float(balance["balance"]))
-                            break
-                result[new_account["id"]] = {"delegate": delegate, "vote": vote, "can_vote": vote >= 2}
+        result[account["id"]] = _mtlap_vote_node(account)
 
-    for account in list(result):
-        check_mtla_delegate(account, result)
+    # Add delegates that don't hold MTLAP
+    unavailable = await fetch_missing_delegates(result, lambda node: node["delegate"], _fetch_mtlap_vote_node)
+    if unavailable:
+        logger.warning(f"MTLAP delegates not found: {sorted(unavailable)}")
 
-    # Check if account can vote
-    for account in list(result):
-        if not result[account]["can_vote"]:
-            # Check if there are delegators with 2 or more tokens
-            if "delegated_list" in result[account]:
-                for delegator in result[account]["delegated_list"]:
-                    if result[delegator]["vote"] >= 2:
-                        result[account]["can_vote"] = True
-                        break
+    graph = DelegationGraph({account: info["delegate"] for account, info in result.items()})
+    for account in graph.broken:
+        result[account]["delegate"] = None
+    for account, root in graph.resolved().items():
+        result[account]["was_delegate"] = root
+    for root, delegators in graph.tree().items():
+        delegated_list = [delegator for delegator in delegators if result[delegator]["vote"] > 0]
+        if delegated_list:
+            result[root]["delegated_list"] = delegated_list
+            # Can vote on behalf of delegators with 2 or more tokens
+            if any(result[delegator]["vote"] >= 2 for delegator in delegated_list):
+                result[root]["can_vote"] = True
 
     # Remove accounts that cannot vote
     for account in list(result):
         if not result[account]["can_vote"]:
             del result[account]
 
-    del result["GDGC46H4MQKRW3TZTNCWUU6R2C7IPXGN7HQLZBJTNQO6TW7ZOS6MSECR"]
-    del result["GCNVDZIHGX473FEI7IXCUAEXUJ4BGCKEMHF36VYP5EMS7PX2QBLAMTLA"]
+    result.pop("GDGC46H4MQKRW3TZTNCWUU6R2C7IPXGN7HQLZBJTNQO6TW7ZOS6MSECR", None)
+    result.pop("GCNVDZIHGX473FEI7IXCUAEXUJ4BGCKEMHF36VYP5EMS7PX2QBLAMTLA", None)
 
     return result
 
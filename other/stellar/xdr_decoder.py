@@ -0,0 +1,178 @@
+# other/stellar/xdr_decoder.py
+"""Runs ``render_xdr`` off the event loop in a process pool, with a content-addressed result cache."""
+
+import asyncio
+import hashlib
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import suppress
+from typing import Any, List, Optional
+
+from loguru import logger
+
+from other.config_reader import config
+from .xdr_render import RenderedXdr, render_xdr
+
+
+class XdrTooLargeError(ValueError):
+    """The envelope is longer than ``XdrDecoder.max_size`` characters."""
+
+
+class XdrDecoder:
+    """
+    Parses and renders transaction envelopes in ``workers`` spawned processes.
+
+    Results are kept in an LRU of ``cache_size`` entries keyed by the SHA-256 of
+    the XDR and the rendering options, and concurrent requests for the same key
+    share one render. Envelopes shorter than ``inline_size`` are rendered on the
+    loop (a pool round-trip costs more than they do); so is everything when
+    ``workers`` is 0. A render that exceeds ``timeout`` raises ``TimeoutError``
+    while its worker finishes in the background.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        timeout: float = 10.0,
+        max_size: int = 200_000,
+        inline_size: int = 4096,
+        cache_size: int = 1024,
+    ):
+        self.workers = workers
+        self.timeout = timeout
+        self.max_size = max_size
+        self.inline_size = inline_size
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, RenderedXdr] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.hits = 0
+        self.coalesced = 0
+        self.inline_renders = 0
+        self.pool_renders = 0
+        self.timeouts = 0
+        self.too_large = 0
+
+    async def render(
+        self,
+        xdr: str,
+        filter_sum: int = -1,
+        filter_operation: Optional[List[str]] = None,
+        ignore_operation: Optional[List[str]] = None,
+        filter_asset=None,
+        filter_account: Optional[str] = None,
+    ) -> RenderedXdr:
+        """``render_xdr`` of ``xdr`` from the cache, the loop or the pool."""
+        if len(xdr) > self.max_size:
+            self.too_large += 1
+            raise XdrTooLargeError(f"XDR of {len(xdr)} characters exceeds {self.max_size}")
+        args = (xdr, filter_sum, filter_operation, ignore_operation, filter_asset, filter_account)
+        key = self._key(*args)
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return cached
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            rendered = await self._render(args)
+            self._cache[key] = rendered
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            future.set_result(rendered)
+            return rendered
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # Mark the exception as retrieved when nobody else was waiting
+                future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def start(self) -> None:
+        """Spawn the worker processes now instead of on the first large envelope."""
+        if self.workers > 0:
+            pool = self._get_pool()
+            for _ in range(self.workers):
+                pool.submit(int)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def get_metrics(self) -> dict[str, Any]:
+        return {
+            "cached": len(self._cache),
+            "hits": self.hits,
+            "coalesced": self.coalesced,
+            "inline": self.inline_renders,
+            "pool": self.pool_renders,
+            "timeouts": self.timeouts,
+            "too_large": self.too_large,
+        }
+
+    @staticmethod
+    def _key(xdr, filter_sum, filter_operation, ignore_operation, filter_asset, filter_account) -> str:
+        asset = f"{filter_asset.code}:{filter_asset.issuer}" if filter_asset is not None else ""
+        options = repr((filter_sum, filter_operation or [], ignore_operation or [], asset, filter_account))
+        return hashlib.sha256(f"{xdr}\0{options}".encode()).hexdigest()
+
+    async def _render(self, args: tuple) -> RenderedXdr:
+        if self.workers <= 0 or len(args[0]) < self.inline_size:
+            self.inline_renders += 1
+            return render_xdr(*args)
+        self.pool_renders += 1
+        loop = asyncio.get_running_loop()
+        try:
+            return await asyncio.wait_for(loop.run_in_executor(self._get_pool(), render_xdr, *args), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.warning(f"XDR render of {len(args[0])} characters timed out after {self.timeout} s")
+            raise
+        except BrokenProcessPool:
+            # A worker died (OOM, killed); the next render starts a fresh pool
+            logger.warning("XDR render pool is broken, restarting it")
+            self.close()
+            raise
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: forking a process that runs an event loop and threads is not safe
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+
+_xdr_decoder: Optional[XdrDecoder] = None
+
+
+def get_xdr_decoder() -> XdrDecoder:
+    """The shared decoder, configured from ``XDR_DECODE_*`` settings."""
+    global _xdr_decoder
+    if _xdr_decoder is None:
+        _xdr_decoder = XdrDecoder(
+            workers=config.xdr_decode_workers,
+            timeout=config.xdr_decode_timeout,
+            max_size=config.xdr_decode_max_size,
+        )
+    return _xdr_decoder
+
+
+def set_xdr_decoder(decoder: Optional[XdrDecoder]) -> None:
+    global _xdr_decoder
+    if _xdr_decoder is not None and _xdr_decoder is not decoder:
+        with suppress(Exception):
+            _xdr_decoder.close()
+    _xdr_decoder = decoder
@@ -0,0 +1,350 @@
+# other/stellar/xdr_render.py
+"""CPU-bound half of ``decode_xdr``: parse an envelope and render its lines with account placeholders.
+
+Runs in the ``XdrDecoder`` worker processes, so it has no I/O and returns only picklable values.
+Account names are filled in afterwards by ``decode_xdr`` on the event loop.
+"""
+
+from typing import List, NamedTuple, Optional, Union
+
+from loguru import logger
+from stellar_sdk import FeeBumpTransactionEnvelope, Network, TextMemo, TransactionEnvelope
+
+# Operation types that carry meaningful amounts and can be filtered by filter_sum.
+# When filter_sum > 0, operations NOT in this set are skipped entirely.
+AMOUNT_OPERATIONS = {
+    "Payment",
+    "ManageSellOffer",
+    "ManageBuyOffer",
+    "PathPaymentStrictSend",
+    "PathPaymentStrictReceive",
+    "CreatePassiveSellOffer",
+    "Clawback",
+}
+
+
+class AccountRef(NamedTuple):
+    """Place in a rendered line where the name of ``account_id`` goes."""
+
+    account_id: str
+
+
+Line = tuple[Union[str, AccountRef], ...]
+
+
+class RenderedXdr(NamedTuple):
+    """Lines of a decoded transaction (empty when nothing passed the filters) and the accounts they name."""
+
+    lines: List[Line]
+    accounts: List[str]
+
+
+def good_operation(operation, operation_name: str, filter_operation: list, ignore_operation: list) -> bool:
+    """
+    Check if operation matches filter criteria.
+
+    Args:
+        operation: Stellar operation object
+        operation_name: Name of operation type to check
+        filter_operation: List of operation names to include (empty means all)
+        ignore_operation: List of operation names to exclude
+
+    Returns:
+        True if operation should be processed
+    """
+    if operation_name in ignore_operation:
+        return False
+    elif type(operation).__name__ == operation_name:
+        return (not filter_operation) or (operation_name in filter_operation)
+    return False
+
+
+def render_xdr(
+    xdr: str,
+    filter_sum: int = -1,
+    filter_operation: Optional[List[str]] = None,
+    ignore_operation: Optional[List[str]] = None,
+    filter_asset=None,
+    filter_account: Optional[str] = None,
+) -> RenderedXdr:
+    """Parse ``xdr`` and render the ``decode_xdr`` lines; arguments are those of ``decode_xdr``."""
+    if ignore_operation is None:
+        ignore_operation = []
+    if filter_operation is None:
+        filter_operation = []
+    result: List[Line] = []
+    data_exist = False
+
+    if FeeBumpTransactionEnvelope.is_fee_bump_transaction_envelope(xdr):
+        fee_transaction = FeeBumpTransactionEnvelope.from_xdr(xdr, network_passphrase=Network.PUBLIC_NETWORK_PASSPHRASE)
+        transaction = fee_transaction.transaction.inner_transaction_envelope
+    else:
+        transaction = TransactionEnvelope.from_xdr(xdr, network_passphrase=Network.PUBLIC_NETWORK_PASSPHRASE)
+
+    tx_source_id = transaction.transaction.source.account_id
+
+    # Skip mass transactions (e.g. airdrop-style 50+ operations) unless the tx was
+    # initiated by the monitored account (filter_account).
+    if (
+        "MASS" in ignore_operation
+        and len(transaction.transaction.operations) >= 50
+        and (not filter_account or tx_source_id != filter_account)
+    ):
+        return RenderedXdr([], [])
+
+    # If filter_account is the tx source, show all operations (no per-op filtering needed)
+    filter_ops_by_account = filter_account and tx_source_id != filter_account
+
+    result.append(("Операции с аккаунта ", AccountRef(tx_source_id)))
+
+    if transaction.transaction.memo.__class__ == TextMemo:
+        memo = transaction.transaction.memo
+        result.append((f'  Memo "{memo.memo_text.decode()}"\n',))
+    result.append((f"  Всего {len(transaction.transaction.operations)} операций\n",))
+
+    for idx, operation in enumerate(transaction.transaction.operations):
+        # When filter_sum is active, skip operations without meaningful amounts
+        if filter_sum > 0 and type(operation).__name__ not in AMOUNT_OPERATIONS:
+            continue
+
+        # When filter_account is set and tx source is different,
+        # only show operations where filter_account is directly involved
+        if filter_ops_by_account:
+            op_source_id = operation.source.account_id if operation.source else tx_source_id
+            op_accounts = {op_source_id}
+            if hasattr(operation, "destination"):
+                dest = operation.destination
+                if hasattr(dest, "account_id"):
+                    op_accounts.add(dest.account_id)
+                elif isinstance(dest, str):
+                    op_accounts.add(dest)
+            if hasattr(operation, "from_") and operation.from_:
+                op_accounts.add(operation.from_.account_id)
+            if hasattr(operation, "trustor") and operation.trustor:
+                op_accounts.add(operation.trustor)
+            if filter_account not in op_accounts:
+                continue
+
+        result.append((f"Операция {idx} - {type(operation).__name__}",))
+        if operation.source:
+            result.append(("*** для аккаунта ", AccountRef(operation.source.account_id)))
+
+        if good_operation(operation, "Payment", filter_operation, ignore_operation):
+            if "SPAM" in ignore_operation and operation.asset.code == "XLM" and operation.amount < "0.1":
+                continue
+            if float(operation.amount) > filter_sum:
+                if (filter_asset is None) or (operation.asset == filter_asset):
+                    data_exist = True
+                    result.append(
+                        (
+                            f"    Перевод {operation.amount} {operation.asset.code} на аккаунт ",
+                            AccountRef(operation.destination.account_id),
+                        )
+                    )
+            continue
+
+        if good_operation(operation, "SetOptions", filter_operation, ignore_operation):
+            data_exist = True
+            if operation.signer:
+                result.append(
+                    (
+                        "    Изменяем подписанта ",
+                        AccountRef(operation.signer.signer_key.encoded_signer_key),
+                        f" новые голоса : {operation.signer.weight}",
+                    )
+                )
+            if operation.med_threshold:
+                data_exist = True
+                result.append((f"Установка нового требования. Нужно будет {operation.med_threshold} голосов",))
+            if operation.home_domain:
+                data_exist = True
+                result.append((f"Установка нового домена {operation.home_domain}",))
+            continue
+
+        if good_operation(operation, "ChangeTrust", filter_operation, ignore_operation):
+            data_exist = True
+            if operation.asset.type == "liquidity_pool_shares":
+                if operation.limit == "0":
+                    result.append(
+                        (
+                            f"    Закрываем линию доверия к пулу {operation.asset.asset_a.code}/{operation.asset.asset_b.code}",
+                        )
+                    )
+                else:
+                    result.append(
+                        (
+                            f"    Открываем линию доверия к пулу {operation.asset.asset_a.code}/{operation.asset.asset_b.code}",
+                        )
+                    )
+            else:
+                issuer = AccountRef(operation.asset.issuer)
+                if operation.limit == "0":
+                    result.append((f"    Закрываем линию доверия к токену {operation.asset.code} от аккаунта ", issuer))
+                else:
+                    result.append((f"    Открываем линию доверия к токену {operation.asset.code} от аккаунта ", issuer))
+            continue
+
+        if good_operation(operation, "CreateClaimableBalance", filter_operation, ignore_operation):
+            data_exist = True
+            result.append((f"  Спам {operation.asset.code}",))
+            result.append(("  Остальные операции игнорируются.",))
+            break
+
+        if good_operation(operation, "ManageSellOffer", filter_operation, ignore_operation):
+            if float(operation.amount) > filter_sum:
+                data_exist = True
+                result.append(
+                    (
+                        f"    Офер на продажу {operation.amount} {operation.selling.code} по цене {operation.price.n / operation.price.d} {operation.buying.code}",
+                    )
+                )
+            continue
+
+        if good_operation(operation, "CreatePassiveSellOffer", filter_operation, ignore_operation):
+            if float(operation.amount) > filter_sum:
+                data_exist = True
+                result.append(
+                    (
+                        f"    Пассивный офер на продажу {operation.amount} {operation.selling.code} по цене {operation.price.n / operation.price.d} {operation.buying.code}",
+                    )
+                )
+            continue
+
+        if good_operation(operation, "ManageBuyOffer", filter_operation, ignore_operation):
+            if float(operation.amount) > filter_sum:
+                data_exist = True
+                result.append(
+                    (
+                        f"    Офер на покупку {operation.amount} {operation.buying.code} по цене {operation.price.n / operation.price.d} {operation.selling.code}",
+                    )
+                )
+            continue
+
+        if good_operation(operation, "PathPaymentStrictSend", filter_operation, ignore_operation):
+            if (float(operation.dest_min) > filter_sum) and (float(operation.send_amount) > filter_sum):
+                if (filter_asset is None) or (filter_asset in [operation.send_asset, operation.dest_asset]):
+                    data_exist = True
+                    result.append(
+                        (
+                            "    Покупка ",
+                            AccountRef(operation.destination.account_id),
+                            f", шлем {operation.send_asset.code} {operation.send_amount} в обмен на {operation.dest_asset.code} min {operation.dest_min} ",
+                        )
+                    )
+            continue
+
+        if good_operation(operation, "PathPaymentStrictReceive", filter_operation, ignore_operation):
+            if (float(operation.send_max) > filter_sum) and (float(operation.dest_amount) > filter_sum):
+                if (filter_asset is None) or (filter_asset in [operation.send_asset, operation.dest_asset]):
+                    data_exist = True
+                    result.append(
+                        (
+                            "    Продажа ",
+                            AccountRef(operation.destination.account_id),
+                            f", Получаем {operation.send_asset.code} max {operation.send_max} в обмен на {operation.dest_asset.code} {operation.dest_amount} ",
+                        )
+                    )
+            continue
+
+        if good_operation(operation, "ManageData", filter_operation, ignore_operation):
+            data_exist = True
+            result.append((f"    ManageData {operation.data_name} = {operation.data_value} ",))
+            continue
+
+        if good_operation(operation, "SetTrustLineFlags", filter_operation, ignore_operation):
+            data_exist = True
+            result.append(("    Trustor ", AccountRef(operation.trustor), f" for asset {operation.asset.code}"))
+            if operation.clear_flags is not None:
+                result.append((f"    Clear flags: {operation.clear_flags}",))
+            if operation.set_flags is not None:
+                result.append((f"    Set flags: {operation.set_flags}",))
+            continue
+
+        if good_operation(operation, "CreateAccount", filter_operation, ignore_operation):
+            data_exist = True
+            result.append(
+                (
+                    "    Создание аккаунта ",
+                    AccountRef(operation.destination),
+                    f" с суммой {operation.starting_balance} XLM",
+                )
+            )
+            continue
+
+        if good_operation(operation, "AccountMerge", filter_operation, ignore_operation):
+            data_exist = True
+            result.append(("    Слияние аккаунта c ", AccountRef(operation.destination.account_id), " "))
+            continue
+
+        if good_operation(operation, "ClaimClaimableBalance", filter_operation, ignore_operation):
+            data_exist = True
+            result.append(("    ClaimClaimableBalance ", AccountRef(operation.balance_id)))
+            continue
+
+        if good_operation(operation, "BeginSponsoringFutureReserves", filter_operation, ignore_operation):
+            data_exist = True
+            result.append(("    BeginSponsoringFutureReserves ", AccountRef(operation.sponsored_id)))
+            continue
+
+        if good_operation(operation, "EndSponsoringFutureReserves", filter_operation, ignore_operation):
+            data_exist = True
+            result.append(("    EndSponsoringFutureReserves",))
+            continue
+
+        if type(operation).__name__ == "Clawback":
+            data_exist = True
+            result.append(
+                (
+                    f"    Возврат {operation.amount} {operation.asset.code} с аккаунта ",
+                    AccountRef(operation.from_.account_id),
+                )
+            )
+            continue
+
+        if type(operation).__name__ == "LiquidityPoolDeposit":
+            data_exist = True
+            min_price = operation.min_price.n / operation.min_price.d
+            max_price = operation.max_price.n / operation.max_price.d
+            result.append(
+                (
+                    f"    LiquidityPoolDeposit {operation.liquidity_pool_id} пополнение {operation.max_amount_a}/{operation.max_amount_b} ограничения цены {min_price}/{max_price}",
+                )
+            )
+            continue
+
+        if type(operation).__name__ == "LiquidityPoolWithdraw":
+            data_exist = True
+            result.append(
+                (
+                    f"    LiquidityPoolWithdraw {operation.liquidity_pool_id} вывод {operation.amount} минимум {operation.min_amount_a}/{operation.min_amount_b} ",
+                )
+            )
+            continue
+
+        if type(operation).__name__ in [
+            "PathPaymentStrictSend",
+            "ManageBuyOffer",
+            "ManageSellOffer",
+            "AccountMerge",
+            "PathPaymentStrictReceive",
+            "ClaimClaimableBalance",
+            "CreateAccount",
+            "CreateClaimableBalance",
+            "ChangeTrust",
+            "SetOptions",
+            "Payment",
+            "ManageData",
+            "BeginSponsoringFutureReserves",
+            "EndSponsoringFutureReserves",
+            "CreatePassiveSellOffer",
+        ]:
+            continue
+
+        data_exist = True
+        result.append(("Прости хозяин, не понимаю",))
+        logger.info(["bad xdr", idx, operation])
+
+    if not data_exist:
+        return RenderedXdr([], [])
+    accounts = list(dict.fromkeys(part.account_id for line in result for part in line if isinstance(part, AccountRef)))
+    return RenderedXdr(result, accounts)
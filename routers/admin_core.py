@@ -27,7 +27,7 @@ from aiogram.types import (
 from loguru import logger
 from sqlalchemy.orm import Session
 
-from db.repositories import ConfigRepository, ChatsRepository
+from db.repositories import ConfigEntriesRepository, ConfigRepository, ChatsRepository
 from scripts.update_report import update_top_holders_report
 from other.aiogram_tools import ChatInOption, get_username_link
 from other.config_reader import config
@@ -355,8 +355,9 @@ async def cmd_mute(message: Message, session: Session, app_context: AppContext,
 
     # Use DI service
     admin_service.set_user_mute_by_key(chat_thread_key, user_id, end_time_str, user)
-    all_mutes = admin_service.get_all_topic_mutes()
-    ConfigRepository(session).save_bot_value(0, BotValueTypes.TopicMutes, json.dumps(all_mutes))
+    ConfigEntriesRepository(session).upsert(
+        BotValueTypes.TopicMutes, chat_thread_key, str(user_id), {"end_time": end_time_str, "user": user}
+    )
 
     await message.reply(f"{user} was set mute for {delta} in topic {chat_thread_key}")
 
@@ -395,8 +396,7 @@ async def cmd_unmute(message: Message, session: Session, app_context: AppContext
         return
 
     admin_service.remove_user_mute_by_key(chat_thread_key, user_id)
-    all_mutes = admin_service.get_all_topic_mutes()
-    ConfigRepository(session).save_bot_value(0, BotValueTypes.TopicMutes, json.dumps(all_mutes))
+    ConfigEntriesRepository(session).delete(BotValueTypes.TopicMutes, chat_thread_key, str(user_id))
 
     await message.reply(f"{user} was unmuted in topic {chat_thread_key}")
 
@@ -447,10 +447,10 @@ async def cmd_show_mutes(message: Message, session: Session, app_context: AppCon
 
     # Remove expired mutes
     if users_to_remove:
+        entries = ConfigEntriesRepository(session)
         for user_id in users_to_remove:
             admin_service.remove_user_mute_by_key(chat_thread_key, user_id)
-        all_mutes = admin_service.get_all_topic_mutes()
-        ConfigRepository(session).save_bot_value(0, BotValueTypes.TopicMutes, json.dumps(all_mutes))
+            entries.delete(BotValueTypes.TopicMutes, chat_thread_key, str(user_id))
 
     if muted_users:
         mute_list = "\n".join(muted_users)
@@ -607,8 +607,9 @@ async def message_reaction(
         end_time_str = (datetime.now() + delta).isoformat()
 
         admin_service.set_user_mute_by_key(chat_thread_key, user_id, end_time_str, user)
-        all_mutes = admin_service.get_all_topic_mutes()
-        ConfigRepository(session).save_bot_value(0, BotValueTypes.TopicMutes, json.dumps(all_mutes))
+        ConfigEntriesRepository(session).upsert(
+            BotValueTypes.TopicMutes, chat_thread_key, str(user_id), {"end_time": end_time_str, "user": user}
+        )
 
         await _send_topic_message(
             bot, message_any.chat.id, thread_id, f"{user} was set mute for {delta} in topic {chat_thread_key}"
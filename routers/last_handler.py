@@ -1,6 +1,5 @@
 import asyncio
 import html
-import json
 from contextlib import suppress
 from datetime import datetime, timedelta
 from typing import Any, Optional, cast
@@ -30,7 +29,7 @@ from other.constants import MTLChats, BotValueTypes
 from other.pyro_tools import MessageInfo, pyro_update_msg_info
 from other.miniapps_tools import miniapps
 from shared.domain.user import SpamStatus
-from db.repositories import ConfigRepository
+from db.repositories import ConfigEntriesRepository, ConfigRepository
 from services.skyuser import SkyUser
 
 router = Router()
@@ -154,12 +153,9 @@ def _remove_topic_mute(app_context, chat_id: int, thread_id: int | None, user_id
     app_context.admin_service.remove_user_mute(chat_id, thread_id, user_id)
 
 
-async def _save_topic_mutes_to_db(session: Session, app_context) -> None:
-    """Save topic mutes to database using session + ConfigRepository."""
-    if not app_context or not app_context.admin_service:
-        raise ValueError("app_context with admin_service required")
-    all_mutes = app_context.admin_service.get_all_topic_mutes()
-    ConfigRepository(session).save_bot_value(0, BotValueTypes.TopicMutes, json.dumps(all_mutes))
+async def _delete_topic_mute_from_db(session: Session, chat_id: int, thread_id: int | None, user_id: int) -> None:
+    """Delete one topic mute row using session + ConfigEntriesRepository."""
+    ConfigEntriesRepository(session).delete(BotValueTypes.TopicMutes, f"{chat_id}-{thread_id}", str(user_id))
 
 
 ########################################################################################################################
@@ -494,7 +490,7 @@ async def check_mute(message, session, app_context=None):
         logger.error(f"Invalid date format for user {user_id} in chat {chat_thread_key}: {e}")
         # Remove the invalid entry
         _remove_topic_mute(app_context, chat_id, thread_id, user_id)
-        await _save_topic_mutes_to_db(session, app_context)
+        await _delete_topic_mute_from_db(session, chat_id, thread_id, user_id)
         return False
 
     if current_time < end_time:
@@ -502,7 +498,7 @@ async def check_mute(message, session, app_context=None):
         return True
     else:
         _remove_topic_mute(app_context, chat_id, thread_id, user_id)
-        await _save_topic_mutes_to_db(session, app_context)
+        await _delete_topic_mute_from_db(session, chat_id, thread_id, user_id)
         return False
 
 
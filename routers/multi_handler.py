@@ -12,7 +12,8 @@ from loguru import logger
 from other.constants import BotValueTypes
 from services.command_registry_service import update_command_info
 from services.skyuser import SkyUser
-from db.repositories import ConfigRepository
+from db.repositories import ConfigEntriesRepository, ConfigRepository
+from db.repositories.config_entries import entries_to_list, list_to_entries
 from routers.admin_panel import load_inaccessible_chats
 
 router = Router()
@@ -145,47 +146,21 @@ def command_config_loads(app_context):
     """
     from db.session import create_session
 
+    # One query for the whole bot_config table instead of a query per chat/key on first access
+    config_chats = app_context.config_service.warm_cache()
+    logger.info(f"config snapshot loaded for {config_chats} chats")
+
+    # Feature flag bit masks for every chat, built from the same snapshot
+    flag_chats = app_context.feature_flags.warm_cache()
+    logger.info(f"feature flags loaded for {flag_chats} chats")
+
     with create_session() as session:
         repo = ConfigRepository(session)
 
-        # Load feature flags (list-based) directly into feature_flags service
-        feature_flag_mappings = [
-            (BotValueTypes.ReplyOnly, "reply_only"),
-            (BotValueTypes.NoFirstLink, "no_first_link"),
-            (BotValueTypes.FullData, "full_data"),
-            (BotValueTypes.NeedDecode, "need_decode"),
-            (BotValueTypes.SaveLastMessageDate, "save_last_message_date"),
-            (BotValueTypes.FirstVote, "first_vote"),
-            (BotValueTypes.JoinRequestCaptcha, "join_request_captcha"),
-            (BotValueTypes.AutoAll, "auto_all"),
-            (BotValueTypes.Listen, "listen"),
-            (BotValueTypes.Captcha, "captcha"),
-            (BotValueTypes.Moderate, "moderate"),
-        ]
-
-        for db_key, feature_name in feature_flag_mappings:
-            for chat_id in repo.get_chat_ids_by_key(db_key):
-                app_context.feature_flags.set_feature(chat_id, feature_name, True, persist=False)
-
-        # Load dict-based features (notify_join, notify_message, delete_income, entry_channel)
-        notify_join_data = repo.get_chat_dict_by_key(BotValueTypes.NotifyJoin)
-        app_context.notification_service.load_notify_join(notify_join_data)
-        for chat_id in notify_join_data:
-            app_context.feature_flags.set_feature(chat_id, "notify_join", True, persist=False)
-
-        notify_message_data = repo.get_chat_dict_by_key(BotValueTypes.NotifyMessage)
-        app_context.notification_service.load_notify_message(notify_message_data)
-        for chat_id in notify_message_data:
-            app_context.feature_flags.set_feature(chat_id, "notify_message", True, persist=False)
-
-        delete_income_data = repo.get_chat_dict_by_key(BotValueTypes.DeleteIncome)
-        app_context.config_service.load_delete_income(delete_income_data)
-        for chat_id in delete_income_data:
-            app_context.feature_flags.set_feature(chat_id, "delete_income", True, persist=False)
-
-        entry_channel_data = repo.get_chat_dict_by_key(BotValueTypes.EntryChannel)
-        for chat_id in entry_channel_data:
-            app_context.feature_flags.set_feature(chat_id, "entry_channel", True, persist=False)
+        # Load dict-based settings (notify_join, notify_message, delete_income)
+        app_context.notification_service.load_notify_join(repo.get_chat_dict_by_key(BotValueTypes.NotifyJoin))
+        app_context.notification_service.load_notify_message(repo.get_chat_dict_by_key(BotValueTypes.NotifyMessage))
+        app_context.config_service.load_delete_income(repo.get_chat_dict_by_key(BotValueTypes.DeleteIncome))
 
         # Load JSON-based global lists (skynet_admins, skynet_img)
         skynet_admins = json.loads(repo.load_bot_value(0, BotValueTypes.SkynetAdmins, "[]"))
@@ -194,22 +169,22 @@ def command_config_loads(app_context):
         skynet_img = json.loads(repo.load_bot_value(0, BotValueTypes.SkynetImg, "[]"))
         app_context.admin_service.set_skynet_img_users(skynet_img)
 
-        # Load topic admins (JSON dict)
-        topic_admins = json.loads(repo.load_bot_value(0, BotValueTypes.TopicAdmins, "{}"))
-        app_context.admin_service.load_topic_admins(topic_admins)
-
-        # Load votes data
-        votes = json.loads(repo.load_bot_value(0, BotValueTypes.Votes, "{}"))
-        app_context.voting_service.load_votes(votes)
+        # Topic admins, vote weights, topic mutes and channel links: one query over config_entries
+        entries = ConfigEntriesRepository(session).load_all()
+        topic_admins = entries.get(BotValueTypes.TopicAdmins.value, {})
+        app_context.admin_service.load_topic_admins(
+            {scope: entries_to_list(admins) for scope, admins in topic_admins.items()}
+        )
+        app_context.voting_service.set_all_vote_weights(entries.get(BotValueTypes.Votes.value, {}))
+        app_context.admin_service.load_topic_mutes(entries.get(BotValueTypes.TopicMutes.value, {}))
+        app_context.channel_link_service.load_from_dict(
+            {scope: links[""] for scope, links in entries.get(BotValueTypes.ChannelLinks.value, {}).items()}
+        )
 
         # Load first_vote into voting service
         first_vote_chat_ids = repo.get_chat_ids_by_key(BotValueTypes.FirstVote)
         app_context.voting_service.load_first_vote(first_vote_chat_ids)
 
-        # Load topic mutes
-        topic_mute = json.loads(repo.load_bot_value(0, BotValueTypes.TopicMutes, "{}"))
-        app_context.admin_service.load_topic_mutes(topic_mute)
-
         # Load inaccessible chats for admin panel
         inaccessible_chats = json.loads(repo.load_bot_value(0, BotValueTypes.Inaccessible, "[]"))
         load_inaccessible_chats(inaccessible_chats)
@@ -238,10 +213,6 @@ def command_config_loads(app_context):
         for chat_id in repo.get_chat_ids_by_key(BotValueTypes.NeedDecode):
             app_context.bot_state_service.mark_needs_decode(chat_id)
 
-        # Load channel links
-        channel_links = json.loads(repo.load_bot_value(0, BotValueTypes.ChannelLinks, "{}"))
-        app_context.channel_link_service.load_from_dict(channel_links)
-
     # Log loaded feature flags statistics
     _log_feature_flags_stats(app_context)
 
@@ -640,7 +611,9 @@ async def list_command_handler_topic(message: Message, command_info, session, ap
             all_topic_admins[chat_thread_key].extend(command_args)
             # Update service and persist
             admin_service.load_topic_admins(all_topic_admins)
-            ConfigRepository(session).save_bot_value(0, db_value_type, json.dumps(all_topic_admins))
+            ConfigEntriesRepository(session).replace_scope(
+                db_value_type, chat_thread_key, list_to_entries(all_topic_admins[chat_thread_key])
+            )
             await message.reply(f"Added at this thread: {' '.join(command_args)}")
 
     elif action_type == "del_list_topic":
@@ -653,7 +626,9 @@ async def list_command_handler_topic(message: Message, command_info, session, ap
                         all_topic_admins[chat_thread_key].remove(arg)
                 # Update service and persist
                 admin_service.load_topic_admins(all_topic_admins)
-                ConfigRepository(session).save_bot_value(0, db_value_type, json.dumps(all_topic_admins))
+                ConfigEntriesRepository(session).replace_scope(
+                    db_value_type, chat_thread_key, list_to_entries(all_topic_admins[chat_thread_key])
+                )
                 await message.reply(f"Removed from this thread: {' '.join(command_args)}")
             else:
                 await message.reply("This thread has no items in the list.")
@@ -701,10 +676,7 @@ async def link_channel_handler(message: Message, bot: Bot, session, app_context=
         channel_link_service.unlink_channel(channel_id)
 
         # Persist to database
-        all_links = channel_link_service.get_all_links()
-        ConfigRepository(session).save_bot_value(
-            0, BotValueTypes.ChannelLinks, json.dumps({str(k): v for k, v in all_links.items()})
-        )
+        ConfigEntriesRepository(session).delete(BotValueTypes.ChannelLinks, str(channel_id))
 
         info_message = await message.reply(f"Канал {message.sender_chat.title} отвязан.")
         await utils_service.sleep_and_delete(info_message, 5)
@@ -750,9 +722,8 @@ async def link_channel_handler(message: Message, bot: Bot, session, app_context=
     channel_link_service.link_channel(channel_id, owner_id, owner_username)
 
     # Persist to database
-    all_links = channel_link_service.get_all_links()
-    ConfigRepository(session).save_bot_value(
-        0, BotValueTypes.ChannelLinks, json.dumps({str(k): v for k, v in all_links.items()})
+    ConfigEntriesRepository(session).upsert(
+        BotValueTypes.ChannelLinks, str(channel_id), "", {"user_id": owner_id, "username": owner_username}
     )
 
     info_message = await message.reply(f"Канал {message.sender_chat.title} привязан к владельцу (ID: {owner_id}).")
@@ -1,4 +1,3 @@
-import json
 import math
 from contextlib import suppress
 from typing import Any, cast
@@ -25,7 +24,7 @@ from services.app_context import AppContext
 from services.skyuser import SkyUser
 from other.grist_tools import MTLGrist
 from other.stellar import MTLAddresses
-from db.repositories import ConfigRepository
+from db.repositories import ConfigEntriesRepository
 
 router = Router()
 
@@ -328,7 +327,7 @@ async def cmd_save_votes(session: Session, app_context: AppContext):
 
             vote_list[address]["NEED"] = {"50": total // 2 + 1, "75": math.ceil(total * 0.75), "100": total}
 
-    ConfigRepository(session).save_bot_value(0, BotValueTypes.Votes, json.dumps(vote_list))
+    ConfigEntriesRepository(session).replace_key(BotValueTypes.Votes, vote_list)
     voting_service.set_all_vote_weights(vote_list)
     return vote_list
 
@@ -1,15 +1,12 @@
 import asyncio
-import json
 from datetime import datetime
 import random
 from typing import Any, Optional, cast
 from aiogram import Bot
-from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from loguru import logger
 
 from other import aiogram_tools
-from db.repositories import MessageRepository
 from other.config_reader import config
 from other.grist_tools import grist_manager, MTLGrist
 from other.loguru_tools import safe_catch_async, safe_catch
@@ -19,6 +16,7 @@ from other.stellar import (
     cmd_calc_usdm_daily,
     cmd_gen_xdr,
     cmd_send_by_list_id,
+    cmd_count_failed_by_list_id,
 )
 from other.stellar import get_balances, MTLAddresses
 from scripts.check_stellar import cmd_check_grist, cmd_check_bot
@@ -54,46 +52,6 @@ async def cmd_send_message_start_month(bot: Bot):
     )
 
 
-@safe_catch_async
-async def cmd_send_message_1m(bot: Bot, session_pool):
-    with session_pool() as session:
-        for record in MessageRepository(session).load_new_messages():
-            record_any = cast(Any, record)
-            try:
-                if record_any.update_id > 0:
-                    reply_markup = None
-                    button_json_raw = cast(str, record_any.button_json or "")
-                    if len(button_json_raw) > 10:
-                        button_json = json.loads(button_json_raw)
-                        reply_markup = InlineKeyboardMarkup(
-                            inline_keyboard=[[InlineKeyboardButton(text=button_json["text"], url=button_json["link"])]]
-                        )
-
-                    await bot.edit_message_text(
-                        chat_id=cast(int, record_any.user_id),
-                        message_id=cast(int, record_any.update_id),
-                        text=cast(str, record_any.text),
-                        disable_web_page_preview=True,
-                        reply_markup=reply_markup,
-                    )
-                else:
-                    topic_id = cast(int, record_any.topic_id) if cast(int, record_any.topic_id) > 0 else None
-                    await bot.send_message(
-                        cast(int, record_any.user_id),
-                        cast(str, record_any.text),
-                        disable_notification=cast(int, record_any.use_alarm) == 0,
-                        disable_web_page_preview=True,
-                        message_thread_id=topic_id,
-                    )
-
-                record_any.was_send = 1
-                session.commit()
-            except Exception as ex:
-                record_any.was_send = 2
-                session.commit()
-                logger.error(f"Error in cmd_send_message_1m: {ex} {record}")
-
-
 @safe_catch_async
 async def time_check_ledger(bot: Bot, session_pool):
     return  # Todo: fix it to NATS
@@ -172,24 +130,30 @@ async def time_usdm_daily(session_pool, bot: Bot):
                 if e > 20:
                     return
 
-        logger.info("All work done. Step (7/7)")
+        failed = cmd_count_failed_by_list_id(session, div_list_id)
+        if failed:
+            logger.error(f"{failed} div transactions failed, payments not made. Step (7/7)")
+        else:
+            logger.info("All work done. Step (7/7)")
         balances = cast(dict[str, Any], await get_balances(MTLAddresses.public_usdm_div) or {})
         usdm_left = float(balances.get("USDM", 0)) if balances else 0
         usdm_left_str = f"{usdm_left:.2f}"
 
+        status = f"{failed} transactions failed (tx_failed), payments not made." if failed else "All work done."
+
         msg = (
             f"Start div pays №{div_list_id}.\n"
             f"Found {len(result)} addresses.\n"
             f"Total payouts sum: {total_div_sum_str}.\n"
             f"Осталось {usdm_left_str} USDM\n"
-            f"All work done."
+            f"{status}"
         )
         await bot.send_message(MTLChats.USDMMGroup, msg)
 
 
 @safe_catch
 def scheduler_jobs(scheduler: AsyncIOScheduler, bot: Bot, session_pool, db_service: Optional[DatabaseService] = None):
-    scheduler.add_job(cmd_send_message_1m, "interval", seconds=10, args=(bot, session_pool), misfire_grace_time=360)
+    # t_message outbox is sent by services.outbox_dispatcher.OutboxDispatcher (LISTEN/NOTIFY), not polled here
 
     scheduler.add_job(
         cmd_send_message_start_month, "cron", day=1, hour=8, minute=10, args=(bot,), misfire_grace_time=360
@@ -293,23 +293,12 @@ async def new_chat_member(event: ChatMemberUpdated, session: Session, bot: Bot,
     new_user_id = event.new_chat_member.user.id
     chat_id = event.chat.id
 
-    is_spam1 = await antispam_service.combo_check_spammer(new_user_id)
+    # CAS and LOLS are queried together (cached, coalesced per user)
+    reputation = await antispam_service.check_reputation(new_user_id)
 
-    if is_spam1:
+    if reputation.is_spammer:
         await bot.ban_chat_member(chat_id, event.new_chat_member.user.id)
-        reason = f'<a href="https://cas.chat/query?u={new_user_id}">CAS ban</a>'
-        await bot.send_message(
-            MTLChats.SpamGroup,
-            build_ban_message(event.new_chat_member.user, event.chat, reason, actor=event.from_user),
-            disable_web_page_preview=True,
-        )
-        return
-
-    is_spam2 = await antispam_service.lols_check_spammer(new_user_id)
-
-    if is_spam2:
-        await bot.ban_chat_member(chat_id, event.new_chat_member.user.id)
-        reason = f'<a href="https://lols.bot/?u={new_user_id}">LOLS base</a>'
+        reason = reputation.cas_reason if reputation.cas else reputation.lols_reason
         await bot.send_message(
             MTLChats.SpamGroup,
             build_ban_message(event.new_chat_member.user, event.chat, reason, actor=event.from_user),
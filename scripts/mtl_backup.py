@@ -1,11 +1,14 @@
 import asyncio
 import json
 from datetime import datetime
+from pathlib import Path
+from typing import Optional
 
 import requests
 
 from other.config_reader import start_path, config
-from other.stellar import stellar_get_holders, MTLAssets
+from other.stellar import stellar_get_holders, fetch_holders, MTLAssets
+from other.stellar.holder_columns import HolderColumns, link_latest
 
 # MASTERASSETS = ['BTCDEBT', 'BTCMTL', 'EURDEBT', 'EURMTL', 'GRAFDRON',
 #                 'MonteAqua', 'MonteCrafto', 'MTL', 'MTLBR', 'MTLBRO', 'MTLCAMP', 'MTLCITY',
@@ -29,27 +32,26 @@ async def save_asset(asset: str):
         json.dump(accounts, fp, indent=2)
 
 
-async def save_assets(assets: list):
-    accounts = []
-    for asset in assets:
-        asset_accounts = await stellar_get_holders(asset)
-        # Добавляем аккаунты, избегая дублирования
-        for account in asset_accounts:
-            if account not in accounts:
-                accounts.append(account)
+async def save_assets(assets: list, json_export: Optional[bool] = None):
+    """
+    Crawl the holders of ``assets`` once and write them as columns to ``backup/holders.<day % 5>``,
+    with ``backup/holders.last`` pointing at it. ``all.<N>.json`` / ``all.last.json`` are written
+    only as an optional export (``json_export`` or HOLDER_BACKUP_JSON).
+    """
+    accounts = await fetch_holders(*assets)
 
     # Сохраняем данные в файл с уникальным идентификатором
     d = datetime.now().day % 5
-    import os
+    backup_dir = Path(start_path) / "backup"
+    backup_dir.mkdir(parents=True, exist_ok=True)
 
-    backup_dir = f"{start_path}/backup"
-    if not os.path.exists(backup_dir):
-        os.makedirs(backup_dir)
+    target = HolderColumns.from_accounts(accounts).save(backup_dir / f"holders.{d}")
+    link_latest(target, backup_dir / "holders.last")
 
-    with open(f"{backup_dir}/all.{d}.json", "w") as fp:
-        json.dump(accounts, fp, indent=2)
-    with open(f"{backup_dir}/all.last.json", "w") as fp:
-        json.dump(accounts, fp, indent=2)
+    if config.holder_backup_json if json_export is None else json_export:
+        for name in (f"all.{d}.json", "all.last.json"):
+            with open(backup_dir / name, "w") as fp:
+                json.dump(accounts, fp)
 
 
 if __name__ == "__main__":
@@ -1,11 +1,9 @@
 from datetime import datetime
-import json
+from pathlib import Path
 import asyncio
 import re
-from typing import Any, Optional, cast
+from typing import Any, Awaitable, Callable, Optional, cast
 
-import numpy as np
-import requests
 from gspread import WorksheetNotFound
 from sqlalchemy.orm import Session
 from stellar_sdk import Asset, AiohttpClient
@@ -15,6 +13,8 @@ from db.repositories import MessageRepository, FinanceRepository
 from other.config_reader import start_path, config
 from other.constants import MTLChats
 from other.gspread_tools import gs_copy_sheets_with_style, agcm
+from other.sheet_writer import SheetWriter
+from other.stellar.holder_columns import HolderColumns, calculate_holder_statistics
 from other.stellar import (
     stellar_get_issuer_assets,
     get_balances,
@@ -34,7 +34,7 @@ from other.stellar import (
     stellar_get_trade_cost,
 )
 
-from other.web_tools import get_debank_balance
+from other.web_tools import get_debank_balance, http_session_manager
 from scripts.mtl_backup import save_assets
 from loguru import logger
 from other.loguru_tools import safe_catch_async
@@ -95,110 +95,192 @@ async def check_eurmtl_b13_negative(session: Session, ss: Optional[Any] = None)
     return b13_value
 
 
-@safe_catch_async
-async def update_main_report(session: Session):
-    agc = await agcm.authorize()
+# Per-source limits for update_main_report, seconds
+REPORT_SOURCE_TIMEOUTS = {"currencylayer": 20.0, "coinlayer": 20.0, "kitco": 15.0, "debank": 30.0}
+REPORT_ADDRESS_TIMEOUT = 120.0
+# Address sheets built at the same time (each one is several Horizon requests)
+REPORT_ADDRESS_CONCURRENCY = 5
 
-    # Open a sheet from a spreadsheet in one go
-    ss = await agc.open_by_key("1ZaopK2DRbP5756RK2xiLVJxEEHhsfev5ULNW5Yz_EZc")
-    wks = await ss.worksheet("autodata_config")
+# Last good value of every external source, used when a source is slow or down
+_report_source_cache: dict[str, Any] = {}
 
-    # update data
-    # usd
-    rq = requests.get(f"http://api.currencylayer.com/live?access_key={config.currencylayer_id}&format=1&currencies=EUR")
-    await wks.update(range_name="D3", values=[[float(rq.json()["quotes"]["USDEUR"])]])
 
-    # BTC,XLM,ETH,XRP
-    rq = requests.get(f"http://api.coinlayer.com/api/live?access_key={config.coinlayer_id}&symbols=BTC,XLM,ETH,XRP")
-    await wks.update(range_name="D4", values=[[float(rq.json()["rates"]["BTC"])]])
-    await wks.update(range_name="D5", values=[[float(rq.json()["rates"]["XLM"])]])
-    await wks.update(range_name="D20", values=[[float(rq.json()["rates"]["ETH"])]])
-    await wks.update(range_name="D21", values=[[float(rq.json()["rates"]["XRP"])]])
-
-    # aum — gold spot price per 10g (EUR) via Kitco
+async def fetch_report_source(name: str, fetch: Callable[[], Awaitable[Any]], timeout: float) -> Any:
+    """``fetch()`` within ``timeout``; on failure the last good value of ``name`` (None if there is none)."""
     try:
-        rq = requests.get("https://proxy.kitco.com/getPM?symbol=AU&currency=EUR&unit=gram", timeout=15)
-        gold_per_gram = float(rq.text.strip().split(",")[6])  # mid price EUR/gram
-        await wks.update(range_name="D6", values=[[gold_per_gram * 10]])
+        value = await asyncio.wait_for(fetch(), timeout)
     except Exception as e:
-        logger.warning(f"Failed to fetch gold price from Kitco: {e}")
+        cached = _report_source_cache.get(name)
+        logger.warning(
+            f"Report source {name} failed: {e!r}, {'using cached value' if cached is not None else 'skipped'}"
+        )
+        return cached
+    _report_source_cache[name] = value
+    return value
 
-    # defi
-    defi_balance = await get_debank_balance("0x0358d265874b5cf002d1801949f1cee3b08fa2e9")
-    await wks.update(range_name="D8", values=[[int(defi_balance)]])
-    # sentry_sdk.capture_message(f'debank error - {debank}')
-    defi_balance = await get_debank_balance("0xDb36745AA3601E2f12b07db58fF8d91946850a36")
-    await wks.update(range_name="D11", values=[[int(defi_balance)]])
-
-    addresses = await wks.get_values("A2:A")
-    for address in addresses:
-        if address and address[0] and len(address[0]) == 56:
-            sheet_name = f"{address[0][:4]}..{address[0][-4:]}"
-            try:
-                address_sheet = await ss.worksheet(sheet_name)
-            except WorksheetNotFound:
-                address_sheet = await ss.add_worksheet(title=sheet_name, rows=100, cols=10)
 
-            assets, data = await get_balances(address[0], return_data=True)
+async def _get_json(url: str) -> dict:
+    response = await http_session_manager.get_web_request("GET", url, return_type="json")
+    if response.status != 200 or not isinstance(response.data, dict):
+        raise ValueError(f"status {response.status}")
+    return response.data
 
-            update_data = [["DATA"]]
-            for key in data:
-                decoded_value = decode_data_value(data[key])
-                try:
-                    decoded_value = float(decoded_value)
-                except ValueError:
-                    pass
-                update_data.append([key, decoded_value])
-            await address_sheet.update(range_name="C1", values=update_data)
-
-            update_data = [["ASSETS"]]
-            for key in assets:
-                update_data.append([key, float(assets.get(key, 0))])
-            await address_sheet.update(range_name="A1", values=update_data)
-
-            assets = await stellar_get_issuer_assets(address[0])
-            update_data = [["ISSUER", "AMOUNT", "COST"]]
-            for key in assets:
-                update_data.append(
-                    [key, float(assets.get(key, 0)), await stellar_get_trade_cost(Asset(code=key, issuer=address[0]))]
-                )
-            await address_sheet.update(range_name="E1", values=update_data)
-
-            pools = await get_pool_balances(address[0])
-            update_data = [["POOLS", "SHARES", "AMOUNT1", "AMOUNT2"]]
-            for pool in pools:
-                # [{'pool_id': '1b492b669959d3f082b5fb7dcc847d43371fd1f586209899603b93ac1a39b7f8', 'name': 'MTL-EURMTL', 'shares': 761437.8395765, 'token1_amount': 348606.2247324, 'token2_amount': 1685938.1857397}]
-                update_data.append(
-                    [pool["name"], float(pool["shares"]), float(pool["token1_amount"]), float(pool["token2_amount"])]
-                )
-            await address_sheet.update(range_name="H1", values=update_data)
-
-    await wks.update(range_name="D15", values=[[datetime.now().strftime("%d.%m.%Y %H:%M:%S")]])
-
-    await asyncio.sleep(5)
-    await asyncio.to_thread(
-        gs_copy_sheets_with_style,
-        "1ZaopK2DRbP5756RK2xiLVJxEEHhsfev5ULNW5Yz_EZc",
-        "1v2s2kQfciWJbzENOy4lHNx-UYX61Uctdqf1rE-2NFWc",
-        "report",
-        None,
+
+async def _fetch_usd_eur() -> float:
+    data = await _get_json(
+        f"http://api.currencylayer.com/live?access_key={config.currencylayer_id}&format=1&currencies=EUR"
     )
-    await asyncio.to_thread(
-        gs_copy_sheets_with_style,
-        "1ZaopK2DRbP5756RK2xiLVJxEEHhsfev5ULNW5Yz_EZc",
-        "1iQgWZ7vjkcN7tMJDUvTSXvLvzIxWD6ZnkmF8kx_Hu1c",
-        "usdm_report",
-        None,
+    return float(data["quotes"]["USDEUR"])
+
+
+async def _fetch_crypto_rates() -> dict[str, float]:
+    data = await _get_json(
+        f"http://api.coinlayer.com/api/live?access_key={config.coinlayer_id}&symbols=BTC,XLM,ETH,XRP"
+    )
+    return {code: float(data["rates"][code]) for code in ("BTC", "XLM", "ETH", "XRP")}
+
+
+async def _fetch_gold_per_gram() -> float:
+    """Gold spot price EUR/gram via Kitco."""
+    response = await http_session_manager.get_web_request(
+        "GET", "https://proxy.kitco.com/getPM?symbol=AU&currency=EUR&unit=gram"
+    )
+    return float(str(response.data).strip().split(",")[6])  # mid price EUR/gram
+
+
+async def _update_address_sheet(ss: Any, writer: SheetWriter, address: str) -> None:
+    sheet_name = f"{address[:4]}..{address[-4:]}"
+    try:
+        address_sheet = await ss.worksheet(sheet_name)
+    except WorksheetNotFound:
+        address_sheet = await ss.add_worksheet(title=sheet_name, rows=100, cols=10)
+
+    (assets, data), issuer_assets, pools = await asyncio.gather(
+        get_balances(address, return_data=True),
+        stellar_get_issuer_assets(address),
+        get_pool_balances(address),
     )
-    await asyncio.to_thread(
-        gs_copy_sheets_with_style,
-        "1ZaopK2DRbP5756RK2xiLVJxEEHhsfev5ULNW5Yz_EZc",
-        "1hn_GnLoClx20WcAsh0Kax3WP4SC5PGnjs4QZeDnHWec",
-        "report",
-        "B_TBL",
+    costs = await asyncio.gather(*(stellar_get_trade_cost(Asset(code=key, issuer=address)) for key in issuer_assets))
+
+    update_data = [["DATA"]]
+    for key in data:
+        decoded_value = decode_data_value(data[key])
+        try:
+            decoded_value = float(decoded_value)
+        except ValueError:
+            pass
+        update_data.append([key, decoded_value])
+    writer.update(address_sheet, "C1", update_data)
+
+    update_data = [["ASSETS"]]
+    for key in assets:
+        update_data.append([key, float(assets.get(key, 0))])
+    writer.update(address_sheet, "A1", update_data)
+
+    update_data = [["ISSUER", "AMOUNT", "COST"]]
+    for key, cost in zip(issuer_assets, costs):
+        update_data.append([key, float(issuer_assets.get(key, 0)), cost])
+    writer.update(address_sheet, "E1", update_data)
+
+    update_data = [["POOLS", "SHARES", "AMOUNT1", "AMOUNT2"]]
+    for pool in pools:
+        # [{'pool_id': '1b492b669959d3f082b5fb7dcc847d43371fd1f586209899603b93ac1a39b7f8', 'name': 'MTL-EURMTL', 'shares': 761437.8395765, 'token1_amount': 348606.2247324, 'token2_amount': 1685938.1857397}]
+        update_data.append(
+            [pool["name"], float(pool["shares"]), float(pool["token1_amount"]), float(pool["token2_amount"])]
+        )
+    writer.update(address_sheet, "H1", update_data)
+
+
+async def update_address_sheets(ss: Any, writer: SheetWriter, addresses: list[str]) -> None:
+    """Per-address sheets, built concurrently; an address that fails or times out keeps its old sheet."""
+    semaphore = asyncio.Semaphore(REPORT_ADDRESS_CONCURRENCY)
+
+    async def run(address: str) -> None:
+        async with semaphore:
+            try:
+                await asyncio.wait_for(_update_address_sheet(ss, writer, address), REPORT_ADDRESS_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"Report sheet for {address} skipped: {e!r}")
+
+    await asyncio.gather(*(run(address) for address in addresses))
+
+
+@safe_catch_async
+async def update_main_report(session: Session, dry_run: bool = False):
+    agc = await agcm.authorize()
+
+    # Open a sheet from a spreadsheet in one go
+    ss = await agc.open_by_key("1ZaopK2DRbP5756RK2xiLVJxEEHhsfev5ULNW5Yz_EZc")
+    wks = await ss.worksheet("autodata_config")
+    writer = SheetWriter(ss, dry_run=dry_run)
+
+    rows = await wks.get_values("A2:A")
+    addresses = [row[0] for row in rows if row and row[0] and len(row[0]) == 56]
+
+    # Rates, gold, defi and address sheets at once; a slow source falls back to its last value
+    timeouts = REPORT_SOURCE_TIMEOUTS
+    usd_eur, crypto_rates, gold_per_gram, defi_bsc, defi_second, _ = await asyncio.gather(
+        fetch_report_source("currencylayer", _fetch_usd_eur, timeouts["currencylayer"]),
+        fetch_report_source("coinlayer", _fetch_crypto_rates, timeouts["coinlayer"]),
+        fetch_report_source("kitco", _fetch_gold_per_gram, timeouts["kitco"]),
+        fetch_report_source(
+            "debank:0x0358",
+            lambda: get_debank_balance("0x0358d265874b5cf002d1801949f1cee3b08fa2e9"),
+            timeouts["debank"],
+        ),
+        fetch_report_source(
+            "debank:0xDb36",
+            lambda: get_debank_balance("0xDb36745AA3601E2f12b07db58fF8d91946850a36"),
+            timeouts["debank"],
+        ),
+        update_address_sheets(ss, writer, addresses),
     )
 
-    await update_main_report_additional(session=session)
+    # usd
+    if usd_eur is not None:
+        writer.cell(wks, "D3", usd_eur)
+    # BTC,XLM,ETH,XRP
+    if crypto_rates is not None:
+        for cell, code in (("D4", "BTC"), ("D5", "XLM"), ("D20", "ETH"), ("D21", "XRP")):
+            writer.cell(wks, cell, crypto_rates[code])
+    # aum — gold spot price per 10g (EUR)
+    if gold_per_gram is not None:
+        writer.cell(wks, "D6", gold_per_gram * 10)
+    # defi
+    if defi_bsc is not None:
+        writer.cell(wks, "D8", int(defi_bsc))
+    if defi_second is not None:
+        writer.cell(wks, "D11", int(defi_second))
+
+    writer.cell(wks, "D15", datetime.now().strftime("%d.%m.%Y %H:%M:%S"))
+    await writer.commit()
+
+    # Копии листов берут уже записанные значения; в dry-run ничего не копируем
+    if not dry_run:
+        await asyncio.sleep(5)
+        await asyncio.to_thread(
+            gs_copy_sheets_with_style,
+            "1ZaopK2DRbP5756RK2xiLVJxEEHhsfev5ULNW5Yz_EZc",
+            "1v2s2kQfciWJbzENOy4lHNx-UYX61Uctdqf1rE-2NFWc",
+            "report",
+            None,
+        )
+        await asyncio.to_thread(
+            gs_copy_sheets_with_style,
+            "1ZaopK2DRbP5756RK2xiLVJxEEHhsfev5ULNW5Yz_EZc",
+            "1iQgWZ7vjkcN7tMJDUvTSXvLvzIxWD6ZnkmF8kx_Hu1c",
+            "usdm_report",
+            None,
+        )
+        await asyncio.to_thread(
+            gs_copy_sheets_with_style,
+            "1ZaopK2DRbP5756RK2xiLVJxEEHhsfev5ULNW5Yz_EZc",
+            "1hn_GnLoClx20WcAsh0Kax3WP4SC5PGnjs4QZeDnHWec",
+            "report",
+            "B_TBL",
+        )
+
+    await update_main_report_additional(session=session, dry_run=dry_run)
 
     # Проверка B13 на отрицательное значение
     await check_eurmtl_b13_negative(session=session, ss=ss)
@@ -207,11 +289,12 @@ async def update_main_report(session: Session):
 
 
 @safe_catch_async
-async def update_main_report_additional(session: Session):
+async def update_main_report_additional(session: Session, dry_run: bool = False):
     agc = await agcm.authorize()
     ss = await agc.open_by_key("1hn_GnLoClx20WcAsh0Kax3WP4SC5PGnjs4QZeDnHWec")
     wks_all = await ss.worksheet("IND_ALL")
     wks_monitoring = await ss.worksheet("MONITORING")
+    writer = SheetWriter(ss, dry_run=dry_run)
 
     # Проверка значения в первой ячейке столбца D
     value_cell = await wks_all.acell("D1")
@@ -220,14 +303,13 @@ async def update_main_report_additional(session: Session):
 
     # add data
     statistic = calculate_statistics()
-    await wks_all.update(
-        range_name="D19:D21", values=[[statistic["EURMTL"]], [statistic["SATSMTL"]], [statistic["USDM"]]]
-    )
-
-    await wks_all.update(range_name="D24", values=[[statistic["Median"]]])
-    await wks_all.update(range_name="D25", values=[[statistic["EURMTL_NONE_ZERO"]]])
-    await wks_all.update(range_name="D28", values=[[statistic["MTL_MTLRECT"]]])
-    await wks_all.update(range_name="D41", values=[[statistic["MTLAP"]]])
+    writer.update(wks_all, "D19:D21", [[statistic["EURMTL"]], [statistic["SATSMTL"]], [statistic["USDM"]]])
+    writer.cell(wks_all, "D24", statistic["Median"])
+    writer.cell(wks_all, "D25", statistic["EURMTL_NONE_ZERO"])
+    writer.cell(wks_all, "D28", statistic["MTL_MTLRECT"])
+    writer.cell(wks_all, "D41", statistic["MTLAP"])
+    # Столбец D ниже читается уже с новыми значениями
+    await writer.commit()
 
     # Получение данных из столбца D
     column_d_values = await wks_all.col_values(4)
@@ -244,60 +326,12 @@ async def update_main_report_additional(session: Session):
     row_update = [current_date] + column_d_values[1:]
 
     # Обновление данных за один запрос
-    await wks_monitoring.update(range_name=f"A{last_row}", values=[row_update], value_input_option="USER_ENTERED")
+    writer.update(wks_monitoring, f"A{last_row}", [row_update], value_input_option="USER_ENTERED")
+    await writer.commit()
 
 
 def calculate_statistics():
-    with open(f"{start_path}/backup/all.last.json", "r") as file:
-        accounts = json.load(file)
-
-    usdm_count = 0
-    mtlap_count = 0
-    satsmtl_count = 0
-    eurmtl_count = 0
-    mtl_mtlrect_count = 0
-    mtl_mtlrect_amounts = []
-    eurmtl_none_zero_count = 0
-
-    for account in accounts:
-        has_usdm = has_satsmtl = has_eurmtl = False
-        mtl_mtlrect_balance = 0
-
-        for balance in account.get("balances", []):
-            asset_code = balance.get("asset_code", "")
-            balance_amount = float(balance.get("balance", "0"))
-
-            if asset_code == "USDM":
-                has_usdm = True
-            elif asset_code == "SATSMTL":
-                has_satsmtl = True
-            elif asset_code == "EURMTL":
-                has_eurmtl = True
-                if balance_amount > 0:
-                    eurmtl_none_zero_count += 1
-            elif asset_code == "MTLAP" and balance_amount > 0:
-                mtlap_count += 1
-            if asset_code in ["MTL", "MTLRECT"]:
-                mtl_mtlrect_balance += balance_amount
-
-        if mtl_mtlrect_balance > 1:
-            mtl_mtlrect_count += 1
-            mtl_mtlrect_amounts.append(mtl_mtlrect_balance)
-            usdm_count += has_usdm
-            satsmtl_count += has_satsmtl
-            eurmtl_count += has_eurmtl
-
-    median_mtl_mtlrect = np.median(mtl_mtlrect_amounts) if mtl_mtlrect_amounts else 0
-
-    return {
-        "USDM": usdm_count,
-        "SATSMTL": satsmtl_count,
-        "EURMTL": eurmtl_count,
-        "MTL_MTLRECT": mtl_mtlrect_count,
-        "Median": median_mtl_mtlrect,
-        "MTLAP": mtlap_count - 1,
-        "EURMTL_NONE_ZERO": eurmtl_none_zero_count,
-    }
+    return calculate_holder_statistics(HolderColumns.load(Path(start_path) / "backup" / "holders.last"))
 
 
 @safe_catch_async
@@ -403,7 +437,7 @@ async def update_guarantors_report():
 
 
 @safe_catch_async
-async def update_top_holders_report(session: Session):
+async def update_top_holders_report(session: Session, dry_run: bool = False):
     agc = await agcm.authorize()
 
     now = datetime.now()
@@ -411,6 +445,7 @@ async def update_top_holders_report(session: Session):
     ss = await agc.open("MTL_TopHolders")
     wks = await ss.worksheet("TopHolders")
     wks_d = await ss.worksheet("Delegate")
+    writer = SheetWriter(ss, dry_run=dry_run)
 
     delegate_list = {}
     vote_list = await cmd_gen_mtl_vote_list(trim_count=30, delegate_list=delegate_list)
@@ -430,7 +465,7 @@ async def update_top_holders_report(session: Session):
             ]
         )
 
-    await wks.update(range_name="B2", values=update_data)
+    writer.update(wks, "B2", update_data)
 
     update_data = []
     for key in delegate_list:
@@ -439,9 +474,10 @@ async def update_top_holders_report(session: Session):
     for _ in range(1, 5):
         update_data.append(["", ""])
 
-    await wks_d.update(range_name="A2", values=update_data)
-
-    await wks.update(range_name="I1", values=[[now.strftime("%d.%m.%Y %H:%M:%S")]])
+    writer.update(wks_d, "A2", update_data)
+    writer.cell(wks, "I1", now.strftime("%d.%m.%Y %H:%M:%S"))
+    # I2:I21 считается по записанным голосам
+    await writer.commit()
 
     records = await wks.get_values("I2:I21")
     gd_link = "https://docs.google.com/spreadsheets/d/1HSgK_QvK4YmVGwFXuW5CmqgszDxe99FAS2btN3FlQsI/edit#gid=171831156"
@@ -477,13 +513,14 @@ async def update_bdm_report():
     logger.info(f"update bdm_report all done {now}")
 
 
-async def update_mmwb_report(session: Session):
+async def update_mmwb_report(session: Session, dry_run: bool = False):
     agc = await agcm.authorize()
 
     now = datetime.now()
 
     ss = await agc.open("MMWB MM TABLE")
     wks = await ss.worksheet("DATA")
+    writer = SheetWriter(ss, dry_run=dry_run)
 
     # check structure
     records = await wks.get_values("O1")
@@ -557,7 +594,10 @@ async def update_mmwb_report(session: Session):
     balances = await get_balances(MTLAddresses.public_fire)
     update_data.append([balances.get("EURMTL", 0), None, None, None, balances.get("MTL", 0)])
 
-    await wks.update(range_name="E2", values=update_data)
+    writer.update(wks, "E2", update_data)
+    writer.cell(wks, "Q1", now.strftime("%d.%m.%Y %H:%M:%S"))
+    # O2:O6 - формулы от E2, читаем после записи
+    await writer.commit()
 
     records = await wks.get_values("O2:O6")
     for record in records:
@@ -565,7 +605,6 @@ async def update_mmwb_report(session: Session):
         if value < 0.2 or value > 0.8:
             MessageRepository(session).send_admin_message(f"update_mmwb_report balance error {value}")
 
-    await wks.update(range_name="Q1", values=[[now.strftime("%d.%m.%Y %H:%M:%S")]])
     logger.info(f"update mmwb_report all done {now}")
 
 
@@ -574,13 +613,14 @@ def my_float(s):
     return result
 
 
-async def update_airdrop():
+async def update_airdrop(dry_run: bool = False):
     agc = await agcm.authorize()
     client = AiohttpClient()
 
     # Open a sheet from a spreadsheet in one go
     ss = await agc.open("MTL_Airdrop_register")
     wks = await ss.worksheet("EUR_GNRL")
+    writer = SheetWriter(ss, dry_run=dry_run)
 
     # Update a range of cells using the top left corner address
     now = datetime.now()
@@ -610,7 +650,7 @@ async def update_airdrop():
                     # print(address_list[idx], fed_address_list[idx])
                     address = await resolve_stellar_address_async(fed_address_list[idx], client=client)
                     # print(address.account_id)
-                    await wks.update(range_name=f"D{idx + 1}", values=[[address.account_id]])
+                    writer.cell(wks, f"D{idx + 1}", address.account_id)
                 except Exception:
                     logger.info("Resolving error", address_list[idx], fed_address_list[idx])
         else:  # if federal more that address
@@ -618,8 +658,10 @@ async def update_airdrop():
                 # print(fed_address_list[idx], '***')
                 address = await resolve_stellar_address_async(fed_address_list[idx], client=client)
                 # print(address.account_id)
-                await wks.update(range_name=f"D{idx + 1}", values=[[address.account_id]])
+                writer.cell(wks, f"D{idx + 1}", address.account_id)
 
+    # Столбец D перечитывается с адресами, найденными выше
+    await writer.commit()
     address_list = await wks.col_values(4)
     address_list.pop(0)
     address_list.pop(0)
@@ -646,8 +688,9 @@ async def update_airdrop():
         update_list.append([xlm_sum, eurmtl_sum, mtl_sum, sats_sum])
 
     # print(update_list)
-    await wks.update(range_name=f"K{start_pos + 3}", values=update_list)
-    await wks.update(range_name="O2", values=[[now.strftime("%d.%m.%Y %H:%M:%S")]])
+    writer.update(wks, f"K{start_pos + 3}", update_list)
+    writer.cell(wks, "O2", now.strftime("%d.%m.%Y %H:%M:%S"))
+    await writer.commit()
     await client.close()
 
     logger.info(f"report 3 all done {now}")
@@ -852,16 +895,16 @@ async def main_report():
 
 
 @safe_catch_async
-async def lite_report(session_pool):
+async def lite_report(session_pool, dry_run: bool = False):
     await save_assets([MTLAssets.mtl_asset, MTLAssets.mtlap_asset, MTLAssets.mtlrect_asset, MTLAssets.eurmtl_asset])
     await asyncio.sleep(10)
 
     with session_pool() as session:
-        await update_main_report(session)
+        await update_main_report(session, dry_run=dry_run)
         await asyncio.sleep(10)
-        await update_top_holders_report(session)
+        await update_top_holders_report(session, dry_run=dry_run)
         await asyncio.sleep(10)
-        await update_mmwb_report(session)
+        await update_mmwb_report(session, dry_run=dry_run)
         session.commit()
         # await update_wallet_report(session)
         # await update_wallet_report2(session)
@@ -24,8 +24,14 @@ from services.admin_service import AdminManagementService
 from services.command_registry_service import CommandRegistryService
 from services.database_service import DatabaseService
 from services.repositories.chats_repo_adapter import ChatsRepositoryAdapter
+from services.repositories.config_repo_adapter import ConfigRepositoryAdapter
 from services.channel_link_service import ChannelLinkService
 from services.stellar_notification_service import StellarNotificationService
+from services.bot_user_writer import BotUserWriteBuffer
+from services.outbox_dispatcher import OutboxDispatcher
+from services.deferred_delete import DeferredDeleteScheduler, set_deferred_delete_scheduler
+from other.stellar.horizon_client import HorizonClient, set_horizon_client
+from other.spam_reputation import SpamReputationService, set_spam_reputation_service
 
 
 class AppContext:
@@ -57,6 +63,11 @@ class AppContext:
         self.channel_link_service = None
         self.stellar_notification_service = None
         self.message_thread_cache_service = None
+        self.bot_user_writer = None
+        self.outbox_dispatcher = None
+        self.horizon_client = None
+        self.deferred_delete = None
+        self.spam_reputation = None
 
     def check_user(self, user_id: int):
         """Check user status for antispam. Uses spam_status_service cache."""
@@ -85,15 +96,17 @@ class AppContext:
         ctx.group_service = GroupService()
         ctx.utils_service = UtilsService()
 
-        # Services with in-memory state (no DB access needed)
-        ctx.config_service = ConfigService()
+        ctx.db_service = DatabaseService()
+        ctx.config_service = ConfigService(ConfigRepositoryAdapter(ctx.db_service.session_pool))
+        ctx.config_service.track_repository_writes()
         ctx.feature_flags = FeatureFlagsService(ctx.config_service)
+
+        # Services with in-memory state (no DB access needed)
         ctx.bot_state_service = BotStateService()
         ctx.voting_service = VotingService()
         ctx.admin_service = AdminManagementService()
         ctx.notification_service = NotificationService()
         ctx.command_registry = CommandRegistryService()
-        ctx.db_service = DatabaseService()
         ctx.spam_status_service = SpamStatusService(ChatsRepositoryAdapter(ctx.db_service.session_pool))
         ctx.channel_link_service = ChannelLinkService()
         # stellar_notification_service is initialized later in start.py
@@ -101,15 +114,79 @@ class AppContext:
 
         return ctx
 
-    def init_stellar_notification_service(self, bot, session_pool):
-        """Initialize stellar notification service with bot and session pool.
+    def init_stellar_notification_service(self, bot, session_pool, redis=None):
+        """Initialize stellar notification service with bot, async session pool and Redis for dedup.
 
         Called from start.py after session_pool is created.
         """
         from other.config_reader import config
 
         if config.notifier_url:
-            self.stellar_notification_service = StellarNotificationService(bot, session_pool)
+            self.stellar_notification_service = StellarNotificationService(
+                bot,
+                session_pool,
+                redis=redis,
+                queue_size=config.webhook_queue_size,
+                workers=config.webhook_workers,
+                dedup_ttl=config.webhook_dedup_ttl,
+            )
+
+    def init_bot_user_writer(self, async_session_pool):
+        """Initialize write-behind buffer for bot_users.
+
+        Called from start.py after the async session pool is created.
+        """
+        self.bot_user_writer = BotUserWriteBuffer(async_session_pool, self.spam_status_service)
+        if self.spam_status_service:
+            self.spam_status_service.attach_write_buffer(self.bot_user_writer)
+        self.bot_user_writer.start()
+
+    def init_outbox_dispatcher(self, bot, async_session_pool):
+        """Initialize t_message outbox sender.
+
+        Called from start.py after the async session pool is created; started outside test mode.
+        """
+        self.outbox_dispatcher = OutboxDispatcher(bot, async_session_pool)
+
+    def init_horizon_client(self) -> HorizonClient:
+        """Create the shared Horizon client used by every other.stellar call.
+
+        Called from start.py; closed with ``horizon_client.shutdown()`` in on_shutdown.
+        """
+        from other.config_reader import config
+
+        self.horizon_client = HorizonClient(
+            pool_size=config.horizon_pool_size,
+            max_concurrency=config.horizon_max_concurrency,
+            request_timeout=config.horizon_timeout,
+            max_retries=config.horizon_max_retries,
+        )
+        set_horizon_client(self.horizon_client)
+        return self.horizon_client
+
+    def init_deferred_delete(self, bot, redis) -> DeferredDeleteScheduler:
+        """Create the Redis-backed scheduler behind cmd_sleep_and_delete / utils_service.sleep_and_delete.
+
+        Called from start.py; started there and stopped in on_shutdown.
+        """
+        self.deferred_delete = DeferredDeleteScheduler(bot, redis)
+        set_deferred_delete_scheduler(self.deferred_delete)
+        return self.deferred_delete
+
+    def init_spam_reputation(self, redis) -> SpamReputationService:
+        """Create the CAS/LOLS lookup service with its Redis verdict cache.
+
+        Called from start.py; its HTTP pool is closed in on_shutdown.
+        """
+        from other.config_reader import config
+
+        self.spam_reputation = SpamReputationService(
+            redis,
+            positive_ttl=config.spam_reputation_positive_ttl,
+            negative_ttl=config.spam_reputation_negative_ttl,
+        )
+        set_spam_reputation_service(self.spam_reputation)
+        return self.spam_reputation
 
 
 # Singleton instance for backwards compatibility
@@ -0,0 +1,121 @@
+# services/bot_user_writer.py
+"""Write-behind buffer for bot_users updates."""
+
+import asyncio
+from typing import Optional
+
+from loguru import logger
+
+from db.repositories import AsyncChatsRepository
+from shared.domain.user import SpamStatus
+
+
+class BotUserWriteBuffer:
+    """
+    Coalesces (user_id, username, user_type) updates in memory and flushes them
+    as one INSERT ... ON CONFLICT DO UPDATE batch.
+
+    Writes that match the SpamStatusService cache are dropped, so a known user
+    posting text messages costs no database round-trip at all.
+    Marking a user BAD, or any SpamStatusService.set_status call, triggers an
+    immediate flush.
+    """
+
+    def __init__(
+        self,
+        async_session_pool,
+        spam_status_service,
+        flush_interval: float = 5.0,
+        max_pending: int = 500,
+    ):
+        self._session_pool = async_session_pool
+        self._spam_status = spam_status_service
+        self._flush_interval = flush_interval
+        self._max_pending = max_pending
+        self._pending: dict[int, tuple[Optional[str], int]] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_requested = False
+        self._loop_task: Optional[asyncio.Task] = None
+        self.flushed_count = 0
+        self.skipped_count = 0
+
+    def add(self, user_id: int, username: Optional[str], user_type: int = 0, flush: bool = False) -> bool:
+        """Queue a bot_users write. Returns False when it was a no-op."""
+        if self._is_unchanged(user_id, username, user_type):
+            self.skipped_count += 1
+            return False
+
+        self._spam_status.preload_statuses({user_id: user_type})
+        if username:
+            self._spam_status.cache_username(user_id, username)
+
+        previous = self._pending.get(user_id)
+        if not username and previous:
+            username = previous[0]
+        self._pending[user_id] = (username, user_type)
+
+        if flush or len(self._pending) >= self._max_pending or user_type == SpamStatus.BAD:
+            self._schedule_flush()
+        return True
+
+    def get_pending_count(self) -> int:
+        return len(self._pending)
+
+    async def flush(self) -> int:
+        """Write all pending updates in one batch. Returns number of rows written."""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+            rows = [(user_id, username, user_type) for user_id, (username, user_type) in batch.items()]
+            try:
+                async with self._session_pool() as session:
+                    await AsyncChatsRepository(session).upsert_bot_users(rows)
+                    await session.commit()
+            except Exception as e:
+                logger.warning(f"bot_users flush failed, {len(rows)} rows requeued: {e}")
+                for user_id, entry in batch.items():
+                    self._pending.setdefault(user_id, entry)
+                return 0
+
+            self.flushed_count += len(rows)
+            return len(rows)
+
+    def start(self) -> None:
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """Stop the periodic flush and write whatever is still pending."""
+        if self._loop_task:
+            self._loop_task.cancel()
+            self._loop_task = None
+        await self.flush()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            await self.flush()
+
+    def _schedule_flush(self) -> None:
+        self._flush_requested = True
+        if self._flush_task and not self._flush_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Called outside the event loop; the periodic flush will pick it up
+            return
+        self._flush_task = loop.create_task(self._flush_requested_batches())
+
+    async def _flush_requested_batches(self) -> None:
+        # Writes queued during a running flush get their own batch instead of waiting for the interval
+        while self._flush_requested:
+            self._flush_requested = False
+            await self.flush()
+
+    def _is_unchanged(self, user_id: int, username: Optional[str], user_type: int) -> bool:
+        if self._spam_status.get_cached_status(user_id) != user_type:
+            return False
+        return not username or self._spam_status.get_cached_username(user_id) == username
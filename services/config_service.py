@@ -1,13 +1,19 @@
 # services/config_service.py
 """Configuration service with dependency injection."""
 
+import asyncio
+import json
+from contextlib import suppress
 from enum import Enum
-from typing import Any, Optional, Union
+from typing import Any, Callable, Optional, Union
 from threading import Lock
+from uuid import uuid4
 
+from loguru import logger
 from sqlalchemy.orm import Session
 
 from db.repositories import ConfigRepository
+from db.repositories.config import add_bot_config_listener, decode_bot_value, prepare_chat_value
 from other.constants import BotValueTypes
 from services.interfaces.repositories import IConfigRepository
 from shared.domain.config import BotConfig
@@ -29,11 +35,25 @@ def _resolve_key(key: Union[str, Enum, int]) -> Union[Enum, int, str]:
     return key
 
 
-def _cache_key(key: Union[str, Enum, int]) -> str:
-    """Normalize key to cache-compatible string."""
-    if isinstance(key, Enum):
-        return key.name
-    return str(key)
+def _key_value(key: Union[str, Enum, int]) -> Union[int, str]:
+    """Normalize key to the bot_config.chat_key value used in snapshots."""
+    resolved = _resolve_key(key)
+    if isinstance(resolved, Enum):
+        return resolved.value
+    return resolved
+
+
+# Redis pub/sub channel used to keep config snapshots of bot replicas in sync
+CONFIG_INVALIDATION_CHANNEL = "skynet:config:invalidate"
+
+# Called with (chat_id, chat_key value, decoded value); key None means "reload the chat"
+ConfigChangeListener = Callable[[int, Optional[Union[int, str]], Any], None]
+# Called after the whole snapshot was reloaded, e.g. when the listener reconnected to Redis
+ConfigReloadListener = Callable[[], Any]
+
+# Resubscribe delays of the invalidation listener after a Redis disconnect (seconds, doubled up to the max)
+LISTENER_RETRY_DELAY = 1.0
+LISTENER_MAX_RETRY_DELAY = 60.0
 
 
 class ConfigService:
@@ -41,6 +61,8 @@ class ConfigService:
     Service for bot configuration management.
 
     Replaces direct global_data.db_service access.
+    Keeps a decoded snapshot of bot_config rows per chat, loaded with one query
+    per chat (or one query for all chats via warm_cache).
     """
 
     def __init__(self, config_repo: Optional[IConfigRepository] = None):
@@ -53,6 +75,22 @@ class ConfigService:
         self._welcome_buttons: dict[int, Any] = {}
         self._delete_income: dict[int, Any] = {}
 
+        # Decoded bot_config snapshot: chat_id -> {chat_key: value}
+        self._values: dict[int, dict[Any, Any]] = {}
+        # After warm_cache a chat missing from _values has no rows, unless it was invalidated
+        self._values_complete = False
+        self._stale_chats: set[int] = set()
+
+        # Redis pub/sub invalidation between replicas
+        self._instance_id = uuid4().hex
+        self._redis: Any = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listener_task: Optional[asyncio.Task] = None
+        self._publish_tasks: set[asyncio.Task] = set()
+        self._change_listeners: list[ConfigChangeListener] = []
+        self._reload_listeners: list[ConfigReloadListener] = []
+        self._tracks_repository_writes = False
+
     def get_config(self, chat_id: int) -> BotConfig:
         """
         Get configuration for chat (cached).
@@ -64,12 +102,12 @@ class ConfigService:
                 return self._cache[chat_id]
 
         # Load all settings for chat
+        values = self._chat_values(chat_id)
         settings = {}
-        if self._repo:
-            for key in self._get_common_keys():
-                value = self._repo.load_bot_value(chat_id, _resolve_key(key))
-                if value is not None:
-                    settings[key] = value
+        for key in self._get_common_keys():
+            value = values.get(_key_value(key))
+            if value is not None:
+                settings[key] = value
 
         config = BotConfig(chat_id=chat_id, settings=settings)
 
@@ -83,19 +121,15 @@ class ConfigService:
         if not self._repo:
             return False
         result = self._repo.save_bot_value(chat_id, _resolve_key(key), value)
-
-        # Update cache
-        with self._lock:
-            if chat_id in self._cache:
-                self._cache[chat_id].set(_cache_key(key), value)
-
+        if not self._tracks_repository_writes:
+            self.apply_value(chat_id, key, value)
         return result
 
     def load_value(self, chat_id: int, key: Union[str, Enum, int], default: Any = None) -> Any:
         """Load configuration value."""
         if not self._repo:
             return default
-        return self._repo.load_bot_value(chat_id, _resolve_key(key), default)
+        return self._chat_values(chat_id).get(_key_value(key), default)
 
     def remove_value(self, chat_id: int, key: str) -> bool:
         """Remove configuration value."""
@@ -103,29 +137,127 @@ class ConfigService:
             return False
         # Save None to effectively remove
         result = self._repo.save_bot_value(chat_id, _resolve_key(key), None)
+        if not self._tracks_repository_writes:
+            self.apply_value(chat_id, key, None)
+        return result
 
-        # Update cache
+    def apply_value(self, chat_id: int, key: Union[str, Enum, int], value: Any) -> None:
+        """
+        Update cached config after a value was written to bot_config.
+
+        Called for every committed ConfigRepository write once track_repository_writes is on,
+        otherwise by save_value/remove_value. The change is broadcast to other replicas via Redis.
+        """
+        decoded = None if value is None else decode_bot_value(prepare_chat_value(value))
+        self._apply_local(chat_id, _key_value(key), decoded)
+
+        # get_config rebuilds the chat from the snapshot with its own key names
         with self._lock:
-            if chat_id in self._cache:
-                self._cache[chat_id].remove(key)
+            self._cache.pop(chat_id, None)
 
-        return result
+        self._notify(chat_id, _key_value(key), decoded)
+        self._publish({"chat_id": chat_id, "key": _key_value(key), "value": decoded})
+
+    def track_repository_writes(self) -> None:
+        """Apply bot_config writes committed through any ConfigRepository session, not only save_value."""
+        if not self._tracks_repository_writes:
+            add_bot_config_listener(self.apply_value)
+            self._tracks_repository_writes = True
 
     def get_chats_with_feature(self, feature_key: Union[str, Enum, int]) -> list[int]:
         """Get all chat IDs with specific feature enabled."""
         if not self._repo:
             return []
-        chat_ids = self._repo.get_chat_ids_by_key(_resolve_key(feature_key))
+        key_value = _key_value(feature_key)
+
+        with self._lock:
+            use_snapshot = self._values_complete and not self._stale_chats
+            if use_snapshot:
+                return [cid for cid, values in self._values.items() if values.get(key_value)]
+
         # Filter to only those with truthy values
-        return [cid for cid in chat_ids if self.load_value(cid, feature_key)]
+        return [cid for cid, value in self._repo.load_key_values(_resolve_key(feature_key)).items() if value]
+
+    def warm_cache(self) -> int:
+        """Load the whole bot_config table in one query. Returns number of chats with settings."""
+        if not self._repo:
+            return 0
+        snapshot = self._repo.load_all_values()
+        with self._lock:
+            self._values = snapshot
+            self._values_complete = True
+            self._stale_chats.clear()
+            self._cache.clear()
+        return len(snapshot)
+
+    def get_all_values(self) -> dict[int, dict[Any, Any]]:
+        """Decoded values of every chat: {chat_id: {chat_key: value}}, warming the snapshot if needed."""
+        if not self._repo:
+            return {}
+        with self._lock:
+            if self._values_complete and not self._stale_chats:
+                return {chat_id: dict(values) for chat_id, values in self._values.items()}
+        self.warm_cache()
+        with self._lock:
+            return {chat_id: dict(values) for chat_id, values in self._values.items()}
+
+    def add_change_listener(self, listener: ConfigChangeListener) -> None:
+        """Call ``listener`` for every value change, local or received from another replica."""
+        self._change_listeners.append(listener)
+
+    def add_reload_listener(self, listener: ConfigReloadListener) -> None:
+        """Call ``listener`` after the snapshot was reloaded because invalidations may have been missed."""
+        self._reload_listeners.append(listener)
 
     def invalidate_cache(self, chat_id: Optional[int] = None) -> None:
         """Invalidate cache for specific chat or all."""
         with self._lock:
             if chat_id is not None:
                 self._cache.pop(chat_id, None)
+                self._values.pop(chat_id, None)
+                self._stale_chats.add(chat_id)
             else:
                 self._cache.clear()
+                self._values.clear()
+                self._values_complete = False
+                self._stale_chats.clear()
+
+    async def start_invalidation_listener(self, redis: Any) -> None:
+        """Subscribe to config changes made by other replicas and publish our own."""
+        self._redis = redis
+        self._loop = asyncio.get_running_loop()
+        pubsub = redis.pubsub()
+        await pubsub.subscribe(CONFIG_INVALIDATION_CHANNEL)
+        self._listener_task = asyncio.create_task(self._listen(pubsub))
+
+    async def stop_invalidation_listener(self) -> None:
+        """Stop listening and wait for pending publishes."""
+        if self._listener_task:
+            self._listener_task.cancel()
+            self._listener_task = None
+        if self._publish_tasks:
+            await asyncio.gather(*self._publish_tasks, return_exceptions=True)
+        self._redis = None
+
+    def handle_invalidation(self, raw_message: Union[str, bytes]) -> None:
+        """Apply a change published by another replica."""
+        try:
+            payload = json.loads(raw_message)
+            chat_id = int(payload["chat_id"])
+        except (ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Bad config invalidation message {raw_message!r}: {e}")
+            return
+
+        if payload.get("origin") == self._instance_id:
+            return
+        if "key" in payload:
+            self._apply_local(chat_id, payload["key"], payload.get("value"))
+            with self._lock:
+                self._cache.pop(chat_id, None)
+            self._notify(chat_id, payload["key"], payload.get("value"))
+        else:
+            self.invalidate_cache(chat_id)
+            self._notify(chat_id, None, None)
 
     def is_feature_enabled(self, chat_id: int, feature: str) -> bool:
         """Check if feature is enabled for chat."""
@@ -233,3 +365,114 @@ class ConfigService:
             "join_request_captcha",
             "full_data",
         ]
+
+    def _chat_values(self, chat_id: int) -> dict[Any, Any]:
+        """Decoded bot_config values of a chat, loaded with one query on a cache miss."""
+        with self._lock:
+            values = self._values.get(chat_id)
+            if values is not None:
+                return values
+            if self._values_complete and chat_id not in self._stale_chats:
+                return {}
+
+        if not self._repo:
+            return {}
+        values = self._repo.load_chat_values(chat_id)
+
+        with self._lock:
+            self._values[chat_id] = values
+            self._stale_chats.discard(chat_id)
+        return values
+
+    def _apply_local(self, chat_id: int, key_value: Union[int, str], value: Any) -> None:
+        with self._lock:
+            values = self._values.get(chat_id)
+            if values is None:
+                if not self._values_complete or chat_id in self._stale_chats:
+                    # Not loaded yet - the next lookup reads the fresh row from DB
+                    return
+                values = self._values[chat_id] = {}
+            if value is None:
+                values.pop(key_value, None)
+            else:
+                values[key_value] = value
+
+    def _notify(self, chat_id: int, key_value: Optional[Union[int, str]], value: Any) -> None:
+        for listener in self._change_listeners:
+            try:
+                listener(chat_id, key_value, value)
+            except Exception as e:
+                logger.error(f"Config change listener failed for chat {chat_id}: {e}")
+
+    def _publish(self, payload: dict[str, Any]) -> None:
+        if self._redis is None or self._loop is None or self._loop.is_closed():
+            return
+        payload["origin"] = self._instance_id
+        message = json.dumps(payload, default=str)
+        # save_value may run in a worker thread (asyncio.to_thread)
+        self._loop.call_soon_threadsafe(self._spawn_publish, message)
+
+    def _spawn_publish(self, message: str) -> None:
+        task = asyncio.ensure_future(self._send_invalidation(message))
+        self._publish_tasks.add(task)
+        task.add_done_callback(self._publish_tasks.discard)
+
+    async def _send_invalidation(self, message: str) -> None:
+        try:
+            await self._redis.publish(CONFIG_INVALIDATION_CHANNEL, message)
+        except Exception as e:
+            logger.warning(f"Config invalidation publish failed: {e}")
+
+    async def _listen(self, pubsub: Any) -> None:
+        try:
+            while True:
+                try:
+                    async for message in pubsub.listen():
+                        if message.get("type") == "message":
+                            self.handle_invalidation(message["data"])
+                    logger.warning("Config invalidation subscription closed, resubscribing")
+                except Exception as e:
+                    logger.error(f"Config invalidation listener lost Redis: {e}")
+                with suppress(Exception):
+                    await pubsub.aclose()
+                pubsub = await self._resubscribe()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            with suppress(Exception):
+                await pubsub.aclose()
+
+    async def _resubscribe(self) -> Any:
+        """Subscribe again with backoff, then reload the snapshot: invalidations sent meanwhile are lost."""
+        delay = LISTENER_RETRY_DELAY
+        while True:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, LISTENER_MAX_RETRY_DELAY)
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.subscribe(CONFIG_INVALIDATION_CHANNEL)
+            except Exception as e:
+                logger.warning(f"Config invalidation resubscribe failed, next try in {delay:.0f}s: {e}")
+                with suppress(Exception):
+                    await pubsub.aclose()
+                continue
+            try:
+                await asyncio.to_thread(self._reload)
+            except asyncio.CancelledError:
+                with suppress(Exception):
+                    await pubsub.aclose()
+                raise
+            except Exception as e:
+                # Fall back to per-chat loads instead of serving the old snapshot
+                logger.error(f"Config snapshot reload after reconnect failed: {e}")
+                self.invalidate_cache()
+            return pubsub
+
+    def _reload(self) -> None:
+        chats = self.warm_cache()
+        for listener in self._reload_listeners:
+            try:
+                listener()
+            except Exception as e:
+                logger.error(f"Config reload listener failed: {e}")
+        logger.info(f"Config invalidation listener resubscribed, snapshot reloaded for {chats} chats")
@@ -0,0 +1,160 @@
+# services/deferred_delete.py
+"""Persistent deferred message deletion on a Redis sorted set."""
+
+import asyncio
+import time
+from collections import defaultdict
+from contextlib import suppress
+from typing import Any, Optional
+
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError, TelegramRetryAfter
+from loguru import logger
+
+
+# Telegram deleteMessages accepts up to 100 ids per call
+MAX_BULK_DELETE = 100
+
+# Remove and return up to ARGV[2] members due by ARGV[1], so replicas never claim the same message
+CLAIM_DUE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+if #due > 0 then
+    redis.call('ZREM', KEYS[1], unpack(due))
+end
+return due
+"""
+
+
+def deferred_delete_key(bot_id: int) -> str:
+    """Sorted set of "chat_id:message_id" members scored by the unix time they are due, one per bot token."""
+    return f"skynet:{bot_id}:deferred_delete"
+
+
+class DeferredDeleteScheduler:
+    """
+    Deletes messages after a delay without a sleeping task per message.
+
+    Pending deletions live in the bot's ``deferred_delete_key`` sorted set, so they
+    survive restarts and are shared by replicas of the same bot (a bot started
+    with another token, e.g. in test mode, never claims them). Once per ``tick`` the due ones
+    are claimed atomically, grouped by chat and removed with ``deleteMessages``
+    in chunks of ``MAX_BULK_DELETE``.
+    """
+
+    def __init__(self, bot: Any, redis: Any, tick: float = 1.0, claim_limit: int = 1000):
+        self._bot = bot
+        self._redis = redis
+        self.key = deferred_delete_key(bot.id)
+        self._tick = tick
+        self._claim_limit = claim_limit
+        self._claim = redis.register_script(CLAIM_DUE_SCRIPT)
+        self._wakeup = asyncio.Event()
+        self._loop_task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.pending_count = 0
+        self.overdue_count = 0
+        self.deleted_count = 0
+        self.failed_count = 0
+        self.batch_count = 0
+
+    async def schedule(self, chat_id: int, message_id: int, delay: float) -> None:
+        """Delete ``message_id`` in ``chat_id`` after ``delay`` seconds."""
+        await self._redis.zadd(self.key, {f"{chat_id}:{message_id}": time.time() + max(delay or 0, 0)})
+        if not delay or delay <= 0:
+            self._wakeup.set()
+
+    async def schedule_message(self, message: Any, delay: float) -> None:
+        await self.schedule(message.chat.id, message.message_id, delay)
+
+    def get_metrics(self) -> dict[str, Any]:
+        return {
+            "pending": self.pending_count,
+            "overdue": self.overdue_count,
+            "deleted": self.deleted_count,
+            "failed": self.failed_count,
+            "batches": self.batch_count,
+        }
+
+    async def start(self) -> None:
+        self._stopping = False
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Let the tick in flight finish, then stop; pending deletions stay in Redis for the next start."""
+        if self._loop_task:
+            self._stopping = True
+            self._wakeup.set()
+            _, pending = await asyncio.wait({self._loop_task}, timeout=timeout)
+            for task in pending:
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+            self._loop_task = None
+
+    async def run_due(self, now: Optional[float] = None) -> int:
+        """Delete every message due by ``now``. Returns the number of claimed messages."""
+        now = time.time() if now is None else now
+        claimed = 0
+        while True:
+            members = await self._claim(keys=[self.key], args=[now, self._claim_limit])
+            if not members:
+                break
+            claimed += len(members)
+            by_chat: dict[int, list[int]] = defaultdict(list)
+            for member in members:
+                if isinstance(member, bytes):
+                    member = member.decode()
+                chat_id, message_id = member.rsplit(":", 1)
+                by_chat[int(chat_id)].append(int(message_id))
+            await asyncio.gather(*(self._delete_chat(chat_id, ids) for chat_id, ids in by_chat.items()))
+            if len(members) < self._claim_limit:
+                break
+
+        self.pending_count = await self._redis.zcard(self.key)
+        self.overdue_count = await self._redis.zcount(self.key, "-inf", now)
+        return claimed
+
+    async def _delete_chat(self, chat_id: int, message_ids: list[int]) -> None:
+        message_ids = sorted(set(message_ids))
+        for start in range(0, len(message_ids), MAX_BULK_DELETE):
+            chunk = message_ids[start : start + MAX_BULK_DELETE]
+            self.batch_count += 1
+            try:
+                await self._bot.delete_messages(chat_id=chat_id, message_ids=chunk)
+                self.deleted_count += len(chunk)
+            except TelegramRetryAfter as e:
+                # Put the rest of this chat back for when flood control ends
+                retry_at = time.time() + e.retry_after
+                rest = message_ids[start:]
+                await self._redis.zadd(self.key, {f"{chat_id}:{mid}": retry_at for mid in rest})
+                return
+            except (TelegramBadRequest, TelegramForbiddenError) as e:
+                # Already deleted, too old, or no rights - nothing to retry
+                self.failed_count += len(chunk)
+                logger.debug(f"deleteMessages {chat_id} {chunk}: {e}")
+            except Exception as e:
+                self.failed_count += len(chunk)
+                logger.warning(f"deleteMessages {chat_id} failed: {e}")
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            self._wakeup.clear()
+            try:
+                await self.run_due()
+            except Exception as e:
+                logger.error(f"Deferred delete tick failed: {e}")
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._tick)
+
+
+_deferred_delete_scheduler: Optional[DeferredDeleteScheduler] = None
+
+
+def get_deferred_delete_scheduler() -> Optional[DeferredDeleteScheduler]:
+    """The process-wide scheduler, or None before start.py set it up (tests, scripts)."""
+    return _deferred_delete_scheduler
+
+
+def set_deferred_delete_scheduler(scheduler: Optional[DeferredDeleteScheduler]) -> None:
+    global _deferred_delete_scheduler
+    _deferred_delete_scheduler = scheduler
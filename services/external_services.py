@@ -325,6 +325,16 @@ class AntispamService:
 
         return await lols_check_spammer(message)
 
+    async def check_reputation(self, user_id):
+        from other.spam_reputation import get_spam_reputation_service
+
+        return await get_spam_reputation_service().check(user_id)
+
+    async def check_reputation_many(self, user_ids):
+        from other.spam_reputation import get_spam_reputation_service
+
+        return await get_spam_reputation_service().check_many(user_ids)
+
     async def delete_and_log_spam(self, message, session=None, rules_name="spam"):
         from other.antispam_logic import delete_and_log_spam
 
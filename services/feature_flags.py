@@ -1,7 +1,7 @@
 # services/feature_flags.py
 """Feature flags service replacing global_data feature lists."""
 
-from typing import Optional
+from typing import Any, Optional, Union
 from dataclasses import dataclass
 from threading import Lock
 
@@ -50,6 +50,21 @@ FEATURE_TO_ENUM = {
     "notify_message": BotValueTypes.NotifyMessage,
 }
 
+# One bit per feature in the per-chat mask
+FEATURE_BITS = {feature: 1 << i for i, feature in enumerate(FEATURE_TO_ENUM)}
+# bot_config.chat_key value -> feature name
+_KEY_TO_FEATURE: dict[Any, str] = {enum_key.value: feature for feature, enum_key in FEATURE_TO_ENUM.items()}
+
+
+def features_mask(values: dict[Any, Any]) -> int:
+    """Bit mask of the features set (truthy) in a chat's decoded bot_config values."""
+    mask = 0
+    for key_value, value in values.items():
+        feature = _KEY_TO_FEATURE.get(key_value)
+        if feature is not None and value:
+            mask |= FEATURE_BITS[feature]
+    return mask
+
 
 class FeatureFlagsService:
     """
@@ -57,39 +72,56 @@ class FeatureFlagsService:
 
     Replaces global_data lists like captcha, moderate, no_first_link, etc.
     Provides a clean interface for checking and toggling features.
+
+    Flags are kept as one int bit mask per chat plus an inverted index
+    (feature -> chat ids). warm_cache() builds both from the ConfigService
+    snapshot; afterwards a chat without a mask has no features. Changes made
+    through ConfigService, including ones received from other replicas over
+    Redis, are applied through a change listener, and the masks are rebuilt
+    when ConfigService reloads its snapshot after a Redis reconnect.
     """
 
     FEATURE_KEYS = list(FEATURE_TO_ENUM.keys())
 
     def __init__(self, config_service: ConfigService):
         self._config = config_service
-        self._cache: dict[int, ChatFeatures] = {}
+        self._masks: dict[int, int] = {}
+        self._index: dict[str, set[int]] = {feature: set() for feature in FEATURE_TO_ENUM}
+        # After warm_cache a chat missing from _masks has no flags, unless it was invalidated
+        self._complete = False
+        self._stale_chats: set[int] = set()
         self._lock = Lock()
-
-    def get_features(self, chat_id: int) -> ChatFeatures:
-        """Get all feature flags for chat."""
-        with self._lock:
-            if chat_id in self._cache:
-                return self._cache[chat_id]
-
-        features = ChatFeatures(chat_id=chat_id)
-
-        for key in self.FEATURE_KEYS:
-            enum_key = FEATURE_TO_ENUM[key]
-            value = self._config.load_value(chat_id, enum_key, False)
-            setattr(features, key, bool(value))
+        config_service.add_change_listener(self._on_config_change)
+        config_service.add_reload_listener(self.warm_cache)
+
+    def warm_cache(self) -> int:
+        """Build masks for every chat from the config snapshot. Returns number of chats with a feature."""
+        values = self._config.get_all_values()
+        masks = {chat_id: mask for chat_id, chat_values in values.items() if (mask := features_mask(chat_values))}
+        index: dict[str, set[int]] = {feature: set() for feature in FEATURE_TO_ENUM}
+        for chat_id, mask in masks.items():
+            for feature, bit in FEATURE_BITS.items():
+                if mask & bit:
+                    index[feature].add(chat_id)
 
         with self._lock:
-            self._cache[chat_id] = features
+            self._masks = masks
+            self._index = index
+            self._complete = True
+            self._stale_chats.clear()
+        return len(masks)
 
-        return features
+    def get_features(self, chat_id: int) -> ChatFeatures:
+        """Get all feature flags for chat."""
+        mask = self._mask(chat_id)
+        return ChatFeatures(chat_id=chat_id, **{feature: bool(mask & bit) for feature, bit in FEATURE_BITS.items()})
 
     def is_enabled(self, chat_id: int, feature: str) -> bool:
         """Check if specific feature is enabled for chat."""
-        if feature not in self.FEATURE_KEYS:
+        bit = FEATURE_BITS.get(feature)
+        if bit is None:
             return False
-        features = self.get_features(chat_id)
-        return getattr(features, feature, False)
+        return bool(self._mask(chat_id) & bit)
 
     def enable(self, chat_id: int, feature: str) -> bool:
         """Enable feature for chat."""
@@ -108,11 +140,10 @@ class FeatureFlagsService:
             enum_key = FEATURE_TO_ENUM[feature]
             self._config.save_value(chat_id, enum_key, enabled)
 
-        # Update cache (create entry if not exists)
+        # Load the chat first so a new mask does not hide its other flags
+        self._mask(chat_id)
         with self._lock:
-            if chat_id not in self._cache:
-                self._cache[chat_id] = ChatFeatures(chat_id=chat_id)
-            setattr(self._cache[chat_id], feature, enabled)
+            self._set_bit(chat_id, feature, enabled)
 
         return True
 
@@ -123,11 +154,11 @@ class FeatureFlagsService:
         return not current
 
     def get_chats_with_feature(self, feature: str) -> list[int]:
-        """Get all chat IDs with feature enabled from cache."""
+        """Get all chat IDs with feature enabled (every chat after warm_cache, cached ones before)."""
         if feature not in FEATURE_TO_ENUM:
             return []
         with self._lock:
-            return [chat_id for chat_id, features in self._cache.items() if getattr(features, feature, False)]
+            return list(self._index[feature])
 
     def get_feature_list(self, feature: str) -> list[int]:
         """Get list of chat IDs with feature enabled.
@@ -140,9 +171,14 @@ class FeatureFlagsService:
         """Invalidate cache."""
         with self._lock:
             if chat_id is not None:
-                self._cache.pop(chat_id, None)
+                self._drop(chat_id)
+                self._stale_chats.add(chat_id)
             else:
-                self._cache.clear()
+                self._masks.clear()
+                for chats in self._index.values():
+                    chats.clear()
+                self._complete = False
+                self._stale_chats.clear()
 
     # Convenience methods for common features
     def is_captcha_enabled(self, chat_id: int) -> bool:
@@ -172,4 +208,52 @@ class FeatureFlagsService:
     def get_cached_count(self) -> int:
         """Get number of cached feature sets (for monitoring)."""
         with self._lock:
-            return len(self._cache)
+            return len(self._masks)
+
+    def _mask(self, chat_id: int) -> int:
+        with self._lock:
+            mask = self._masks.get(chat_id)
+            if mask is not None:
+                return mask
+            if self._complete and chat_id not in self._stale_chats:
+                return 0
+
+        mask = 0
+        for feature, enum_key in FEATURE_TO_ENUM.items():
+            if self._config.load_value(chat_id, enum_key, False):
+                mask |= FEATURE_BITS[feature]
+
+        with self._lock:
+            self._store(chat_id, mask)
+            self._stale_chats.discard(chat_id)
+        return mask
+
+    def _set_bit(self, chat_id: int, feature: str, enabled: bool) -> None:
+        bit = FEATURE_BITS[feature]
+        mask = self._masks.get(chat_id, 0)
+        self._store(chat_id, mask | bit if enabled else mask & ~bit)
+
+    def _store(self, chat_id: int, mask: int) -> None:
+        self._drop(chat_id)
+        self._masks[chat_id] = mask
+        for feature, bit in FEATURE_BITS.items():
+            if mask & bit:
+                self._index[feature].add(chat_id)
+
+    def _drop(self, chat_id: int) -> None:
+        mask = self._masks.pop(chat_id, 0)
+        for feature, bit in FEATURE_BITS.items():
+            if mask & bit:
+                self._index[feature].discard(chat_id)
+
+    def _on_config_change(self, chat_id: int, key_value: Optional[Union[int, str]], value: Any) -> None:
+        if key_value is None:
+            self.invalidate_cache(chat_id)
+            return
+        feature = _KEY_TO_FEATURE.get(key_value)
+        if feature is None:
+            return
+        with self._lock:
+            # A chat that is not loaded yet reads the new value on first access
+            if chat_id in self._masks or (self._complete and chat_id not in self._stale_chats):
+                self._set_bit(chat_id, feature, bool(value))
@@ -1,6 +1,7 @@
 """Health check HTTP server for Docker healthcheck."""
 
 from datetime import datetime
+from typing import Any, Callable, Optional
 
 from aiohttp import web
 from loguru import logger
@@ -28,10 +29,21 @@ async def health_handler(request: web.Request) -> web.Response:
     return web.json_response({"status": "healthy", "last_ping_age": age})
 
 
-async def start_health_server(bot_state: BotStateService, port: int = 8080) -> web.AppRunner:
+async def metrics_handler(request: web.Request) -> web.Response:
+    providers: dict[str, Callable[[], dict[str, Any]]] = request.app["metrics"]
+    return web.json_response({name: provider() for name, provider in providers.items()})
+
+
+async def start_health_server(
+    bot_state: BotStateService,
+    port: int = 8080,
+    metrics: Optional[dict[str, Callable[[], dict[str, Any]]]] = None,
+) -> web.AppRunner:
     app = web.Application()
     app["bot_state"] = bot_state
+    app["metrics"] = metrics or {}
     app.router.add_get("/health", health_handler)
+    app.router.add_get("/metrics", metrics_handler)
 
     runner = web.AppRunner(app)
     await runner.setup()
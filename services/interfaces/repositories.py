@@ -74,6 +74,18 @@ class IConfigRepository(Protocol):
         """Get all chat IDs with specific config key."""
         ...
 
+    def load_chat_values(self, chat_id: int) -> dict[int, Any]:
+        """Load all configuration values of a chat in one query."""
+        ...
+
+    def load_key_values(self, chat_key: str | int | Enum) -> dict[int, Any]:
+        """Load one configuration key for every chat in one query."""
+        ...
+
+    def load_all_values(self) -> dict[int, dict[int, Any]]:
+        """Load every configuration value, grouped by chat."""
+        ...
+
 
 class IPaymentsRepository(Protocol):
     """Interface for payment data access."""
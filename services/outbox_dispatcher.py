@@ -0,0 +1,231 @@
+# services/outbox_dispatcher.py
+"""Notify-driven sender for the t_message outbox."""
+
+import asyncio
+import json
+import time
+from collections import defaultdict
+from contextlib import suppress
+from datetime import datetime, timedelta
+from typing import Any, Optional
+from uuid import uuid4
+
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+from loguru import logger
+
+from db.repositories import AsyncMessageRepository
+from services.telegram_rate_limiter import RequestPriority, request_priority
+
+# pg_notify channel fired by the t_message AFTER INSERT trigger (alembic c3f1a9d2e7b4)
+OUTBOX_NOTIFY_CHANNEL = "t_message_new"
+
+# t_message.was_send values
+SEND_OK = 1
+SEND_FAILED = 2
+
+
+class OutboxDispatcher:
+    """
+    Sends queued t_message rows as soon as they are inserted.
+
+    Wakes on PostgreSQL LISTEN/NOTIFY (falls back to polling) and leases a batch to
+    itself in a short committed transaction, so no row lock or pooled connection is
+    held while Telegram is slow. Chats are sent concurrently, in order inside a chat,
+    and the outcomes of the batch are written together, one UPDATE per status in one
+    transaction. Rows whose lease runs out (the process died mid-batch) are claimed again.
+    """
+
+    def __init__(
+        self,
+        bot: Any,
+        async_session_pool,
+        batch_size: int = 50,
+        max_concurrency: int = 8,
+        poll_interval: float = 10.0,
+        lease_seconds: float = 300.0,
+    ):
+        self._bot = bot
+        self._session_pool = async_session_pool
+        self._batch_size = batch_size
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._poll_interval = poll_interval
+        self._lease_seconds = lease_seconds
+        self._owner = uuid4().hex
+        # Chats under Telegram flood control (RetryAfter): chat_id -> monotonic time when allowed again
+        self._flood_until: dict[int, float] = {}
+        self._wakeup = asyncio.Event()
+        self._loop_task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._listen_connection: Any = None
+        self.sent_count = 0
+        self.failed_count = 0
+        self.deferred_count = 0
+        self.queue_depth = 0
+        self.lag_seconds = 0.0
+
+    def notify(self) -> None:
+        """Wake the dispatcher, e.g. right after a row was queued in this process."""
+        self._wakeup.set()
+
+    def get_metrics(self) -> dict[str, Any]:
+        return {
+            "queue_depth": self.queue_depth,
+            "lag_seconds": round(self.lag_seconds, 1),
+            "sent": self.sent_count,
+            "failed": self.failed_count,
+            "deferred": self.deferred_count,
+        }
+
+    async def start(self) -> None:
+        self._stopping = False
+        await self._start_listener()
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Let the batch in flight record its outcomes, then stop the loop."""
+        if self._loop_task:
+            self._stopping = True
+            self._wakeup.set()
+            _, pending = await asyncio.wait({self._loop_task}, timeout=timeout)
+            for task in pending:
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+            self._loop_task = None
+        if self._listen_connection is not None:
+            await self._listen_connection.close()
+            self._listen_connection = None
+
+    async def dispatch_once(self) -> tuple[int, int]:
+        """Claim and send one batch. Returns (claimed rows, rows with a final outcome)."""
+        now = time.monotonic()
+        self._flood_until = {chat_id: ts for chat_id, ts in self._flood_until.items() if ts > now}
+
+        async with self._session_pool() as session:
+            records = await AsyncMessageRepository(session).claim_new_messages(
+                self._owner, self._lease_seconds, self._batch_size, exclude_chat_ids=list(self._flood_until)
+            )
+            await session.commit()
+
+        outcomes = await self._send_batch(records) if records else {}
+
+        async with self._session_pool() as session:
+            repo = AsyncMessageRepository(session)
+            by_status: dict[int, list[int]] = defaultdict(list)
+            for message_id, status in outcomes.items():
+                by_status[status].append(message_id)
+            for status, message_ids in by_status.items():
+                await repo.set_send_status(message_ids, status)
+            deferred: dict[Any, list[Any]] = defaultdict(list)
+            for record in records:
+                if record.id not in outcomes:
+                    deferred[record.user_id].append(record.id)
+            for chat_id, message_ids in deferred.items():
+                # Other replicas skip the chat while Telegram flood control lasts
+                await repo.release_messages(message_ids, self._flood_deadline(chat_id))
+            self.queue_depth, oldest = await repo.get_outbox_stats()
+            await session.commit()
+
+        self.lag_seconds = (datetime.now() - oldest).total_seconds() if oldest else 0.0
+        return len(records), len(outcomes)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            self._wakeup.clear()
+            try:
+                claimed, processed = await self.dispatch_once()
+            except Exception as e:
+                logger.error(f"Outbox dispatch failed: {e}")
+                claimed = processed = 0
+            if self._stopping:
+                break
+            if claimed >= self._batch_size and processed:
+                # Backlog: keep draining without waiting for the next notification
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _send_batch(self, records: list) -> dict[int, int]:
+        by_chat: dict[int, list] = defaultdict(list)
+        for record in records:
+            by_chat[record.user_id].append(record)
+
+        outcomes: dict[int, int] = {}
+        # Pacing is done by the session RateLimitRequestMiddleware; notifications yield to interactive traffic
+        with request_priority(RequestPriority.LOW):
+            await asyncio.gather(*(self._send_chat(chat_records, outcomes) for chat_records in by_chat.values()))
+        return outcomes
+
+    async def _send_chat(self, records: list, outcomes: dict[int, int]) -> None:
+        async with self._semaphore:
+            for record in records:
+                try:
+                    await self._send_record(record)
+                    outcomes[record.id] = SEND_OK
+                    self.sent_count += 1
+                except TelegramRetryAfter as e:
+                    # Keep this and later rows of the chat pending, so order inside the chat is preserved
+                    self._flood_until[record.user_id] = time.monotonic() + e.retry_after
+                    self.deferred_count += 1
+                    logger.warning(f"Outbox flood control for chat {record.user_id}, retry after {e.retry_after}s")
+                    return
+                except Exception as ex:
+                    outcomes[record.id] = SEND_FAILED
+                    self.failed_count += 1
+                    logger.error(f"Outbox send failed: {ex} {record}")
+
+    def _flood_deadline(self, chat_id: int) -> Optional[datetime]:
+        flood_until = self._flood_until.get(chat_id)
+        if flood_until is None:
+            return None
+        return datetime.now() + timedelta(seconds=max(0.0, flood_until - time.monotonic()))
+
+    async def _send_record(self, record: Any) -> None:
+        if record.update_id and record.update_id > 0:
+            reply_markup = None
+            button_json_raw = record.button_json or ""
+            if len(button_json_raw) > 10:
+                button_json = json.loads(button_json_raw)
+                reply_markup = InlineKeyboardMarkup(
+                    inline_keyboard=[[InlineKeyboardButton(text=button_json["text"], url=button_json["link"])]]
+                )
+
+            await self._bot.edit_message_text(
+                chat_id=record.user_id,
+                message_id=record.update_id,
+                text=record.text,
+                disable_web_page_preview=True,
+                reply_markup=reply_markup,
+            )
+        else:
+            topic_id = record.topic_id if record.topic_id and record.topic_id > 0 else None
+            await self._bot.send_message(
+                record.user_id,
+                record.text,
+                disable_notification=record.use_alarm == 0,
+                disable_web_page_preview=True,
+                message_thread_id=topic_id,
+            )
+
+    async def _start_listener(self) -> None:
+        engine = self._session_pool.kw["bind"]
+        if engine.dialect.name != "postgresql":
+            return
+        try:
+            # A dedicated connection kept out of the pool for the dispatcher lifetime
+            self._listen_connection = await engine.connect()
+            raw_connection = await self._listen_connection.get_raw_connection()
+            await raw_connection.driver_connection.add_listener(OUTBOX_NOTIFY_CHANNEL, self._on_notify)
+            logger.info(f"Outbox dispatcher listening on {OUTBOX_NOTIFY_CHANNEL}")
+        except Exception as e:
+            logger.warning(f"LISTEN {OUTBOX_NOTIFY_CHANNEL} unavailable, polling every {self._poll_interval}s: {e}")
+            if self._listen_connection is not None:
+                await self._listen_connection.close()
+                self._listen_connection = None
+
+    def _on_notify(self, *_args) -> None:
+        self._wakeup.set()
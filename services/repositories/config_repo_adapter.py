@@ -0,0 +1,43 @@
+class ConfigRepositoryAdapter:
+    """SessionPool-backed adapter for ConfigService repository access."""
+
+    def __init__(self, session_pool):
+        self._session_pool = session_pool
+
+    def save_bot_value(self, chat_id: int, chat_key, chat_value):
+        from db.repositories import ConfigRepository
+
+        with self._session_pool() as session:
+            ConfigRepository(session).save_bot_value(chat_id, chat_key, chat_value)
+            session.commit()
+            return True
+
+    def load_bot_value(self, chat_id: int, chat_key, default_value=None):
+        from db.repositories import ConfigRepository
+
+        with self._session_pool() as session:
+            return ConfigRepository(session).load_bot_value(chat_id, chat_key, default_value)
+
+    def get_chat_ids_by_key(self, chat_key):
+        from db.repositories import ConfigRepository
+
+        with self._session_pool() as session:
+            return ConfigRepository(session).get_chat_ids_by_key(chat_key)
+
+    def load_chat_values(self, chat_id: int):
+        from db.repositories import ConfigRepository
+
+        with self._session_pool() as session:
+            return ConfigRepository(session).load_chat_values(chat_id)
+
+    def load_key_values(self, chat_key):
+        from db.repositories import ConfigRepository
+
+        with self._session_pool() as session:
+            return ConfigRepository(session).load_key_values(chat_key)
+
+    def load_all_values(self):
+        from db.repositories import ConfigRepository
+
+        with self._session_pool() as session:
+            return ConfigRepository(session).load_all_values()
@@ -20,8 +20,15 @@ class SpamStatusService:
         self._repo = chats_repo
         self._cache: dict[int, SpamStatus] = {}
         self._name_cache: dict[str, str] = {}
+        self._username_cache: dict[int, str] = {}
+        self._write_buffer = None
         self._lock = Lock()
 
+    def attach_write_buffer(self, write_buffer) -> None:
+        """Send status writes through the bot_users write-behind buffer (BotUserWriteBuffer)."""
+        with self._lock:
+            self._write_buffer = write_buffer
+
     def get_status(self, user_id: int) -> SpamStatus:
         """Get spam status with caching (thread-safe)."""
         with self._lock:
@@ -43,6 +50,11 @@ class SpamStatusService:
 
         return status
 
+    def get_cached_status(self, user_id: int) -> Optional[SpamStatus]:
+        """Get spam status from cache only, without touching the database."""
+        with self._lock:
+            return self._cache.get(user_id)
+
     def get_user(self, user_id: int, username: Optional[str] = None) -> User:
         """Get User domain object with spam status."""
         status = self.get_status(user_id)
@@ -51,7 +63,14 @@ class SpamStatusService:
     def set_status(self, user_id: int, status: SpamStatus) -> None:
         """Update spam status in cache and database."""
         with self._lock:
-            self._cache[user_id] = status
+            write_buffer = self._write_buffer
+            if write_buffer is None:
+                self._cache[user_id] = status
+        if write_buffer is not None:
+            # A direct write could be overwritten by an older buffered one for this user,
+            # so the status replaces the pending entry and is flushed right away
+            write_buffer.add(user_id, None, status.value, flush=True)
+            return
         self._repo.save_user_type(user_id, status.value)
 
     def is_good(self, user_id: int) -> bool:
@@ -97,6 +116,21 @@ class SpamStatusService:
                 except ValueError:
                     self._cache[user_id] = SpamStatus.NEW
 
+    def cache_username(self, user_id: int, username: str) -> None:
+        """Remember the last known Telegram username for user_id."""
+        with self._lock:
+            self._username_cache[user_id] = username
+
+    def get_cached_username(self, user_id: int) -> Optional[str]:
+        """Get last known Telegram username for user_id."""
+        with self._lock:
+            return self._username_cache.get(user_id)
+
+    def preload_usernames(self, usernames: dict[int, str]) -> None:
+        """Bulk load known usernames (skips empty values)."""
+        with self._lock:
+            self._username_cache.update({user_id: name for user_id, name in usernames.items() if name})
+
     def get_cached_count(self) -> int:
         """Get number of cached users (for monitoring)."""
         with self._lock:
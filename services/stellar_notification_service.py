@@ -2,6 +2,8 @@
 Stellar notification service for handling operations webhooks from operations-notifier.
 
 This service replaces the polling mechanism with webhook-based notifications.
+Webhooks are acknowledged as soon as they are queued; a pool of workers decodes
+them and writes the outbox rows.
 """
 
 import asyncio
@@ -9,8 +11,9 @@ import hashlib
 import json
 from collections import OrderedDict
 from collections import deque
+from contextlib import asynccontextmanager, suppress
 from decimal import Decimal, InvalidOperation
-from typing import Any
+from typing import Any, AsyncIterator, Optional
 from urllib.parse import quote
 
 import aiohttp
@@ -25,29 +28,60 @@ from other.utils import float2str
 
 SAFE = "-_.!~*'()"
 
+# Redis key prefix of delivered (transaction or operation, chat, topic) keys, kept for ``dedup_ttl``
+NOTIFIED_KEY_PREFIX = "skynet:stellar_notified:"
+
 
 class StellarNotificationService:
     """Service for receiving and processing Stellar operation notifications via webhooks."""
 
-    def __init__(self, bot: Any, session_pool: Any):
+    def __init__(
+        self,
+        bot: Any,
+        session_pool: Any,
+        redis: Any = None,
+        queue_size: int = 1000,
+        workers: int = 4,
+        dedup_ttl: int = 7 * 24 * 3600,
+    ):
         """
         Initialize the notification service.
 
         Args:
             bot: Telegram bot instance
-            session_pool: SQLAlchemy session pool for database access
+            session_pool: async SQLAlchemy session pool for outbox writes
+            redis: Redis client for dedup that survives restarts (memory only when None)
+            queue_size: webhooks waiting for a worker before the handler answers 503
+            workers: number of worker tasks draining the queue
+            dedup_ttl: seconds a delivered key is remembered in Redis
         """
         self.bot = bot
         self.session_pool = session_pool
         self.runner: web.AppRunner | None = None
         self.site: web.TCPSite | None = None
 
-        # Deduplication: track notified operation IDs
+        # Ingestion queue of (payload, subscription_id) and its workers
+        self._queue: asyncio.Queue[tuple[dict[str, Any], str | None]] = asyncio.Queue(maxsize=queue_size)
+        self.worker_count = workers
+        self._workers: list[asyncio.Task] = []
+
+        # Deduplication: recent keys in memory in front of Redis (SET NX with dedup_ttl)
+        self._redis = redis
+        self.dedup_ttl = dedup_ttl
         self.notified_operations: set[tuple[Any, ...]] = set()
         self._notified_order: deque[tuple[Any, ...]] = deque()
-        self._notified_lock = asyncio.Lock()
         self.max_cache_size = 1024
 
+        # One HTTP pool for notifier API calls
+        self._http: Optional[aiohttp.ClientSession] = None
+        self._http_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.accepted_count = 0
+        self.rejected_count = 0
+        self.processed_count = 0
+        self.duplicate_count = 0
+        self.error_count = 0
+
         # Mapping: subscription_id -> destination info
         # {subscription_id: {"chat_id": int, "topic_id": int, "type": str, "asset": str, "min": int}}
         self.subscriptions_map: dict[str, dict[str, Any]] = {}
@@ -68,6 +102,8 @@ class StellarNotificationService:
             logger.info("Test mode: Webhook server will not start")
             return
 
+        await self.start_workers()
+
         app = web.Application()
         app.router.add_post("/webhook", self.handle_webhook)
 
@@ -80,20 +116,61 @@ class StellarNotificationService:
         logger.info(f"Starting Stellar webhook server on port {port}")
         await self.site.start()
 
-    async def stop(self) -> None:
-        """Stop the webhook server gracefully."""
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Stop accepting webhooks, let the workers drain the queue for up to ``timeout`` seconds, then stop."""
         if self.site:
             await self.site.stop()
         if self.runner:
             await self.runner.cleanup()
+        if self._workers:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._queue.join(), timeout=timeout)
+            for task in self._workers:
+                task.cancel()
+            await asyncio.gather(*self._workers, return_exceptions=True)
+            self._workers = []
+        if self._http is not None and not self._http.closed:
+            await self._http.close()
+        self._http = None
         logger.info("Stellar webhook server stopped")
 
+    async def start_workers(self) -> None:
+        """Start the workers that process queued webhooks."""
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+
+    def get_metrics(self) -> dict[str, Any]:
+        return {
+            "queued": self._queue.qsize(),
+            "accepted": self.accepted_count,
+            "rejected": self.rejected_count,
+            "processed": self.processed_count,
+            "duplicates": self.duplicate_count,
+            "errors": self.error_count,
+            "subscriptions": len(self.subscriptions_map),
+        }
+
+    async def _worker(self) -> None:
+        while True:
+            payload, subscription_id = await self._queue.get()
+            try:
+                await self.process_notification(payload, subscription_id)
+                self.processed_count += 1
+            except Exception as e:
+                self.error_count += 1
+                logger.exception(f"Error processing webhook (sub={subscription_id}): {e}")
+            finally:
+                self._queue.task_done()
+
     # === Webhook Handler ===
 
     async def handle_webhook(self, request: web.Request) -> web.Response:
         """
         Handle incoming webhook POST requests from operations-notifier.
 
+        The payload is only parsed and queued; workers process it. When the
+        queue is full the notifier gets 503 and retries later.
+
         Args:
             request: aiohttp web request
 
@@ -117,7 +194,13 @@ class StellarNotificationService:
                 f"account={op.get('account', '')[:8]} dest={op.get('destination', '')[:8]}"
             )
 
-            await self.process_notification(payload, subscription_id)
+            try:
+                self._queue.put_nowait((payload, subscription_id))
+            except asyncio.QueueFull:
+                self.rejected_count += 1
+                logger.warning(f"Webhook queue full ({self._queue.qsize()}), rejecting sub={subscription_id}")
+                return web.Response(text="Busy", status=503, headers={"Retry-After": "5"})
+            self.accepted_count += 1
             return web.Response(text="OK")
 
         except Exception as e:
@@ -177,6 +260,7 @@ class StellarNotificationService:
             payload=payload,
         )
         if await self._is_duplicate_and_remember(dedup_key):
+            self.duplicate_count += 1
             logger.debug(
                 "Skipping duplicate notification: sub=%s chat=%s topic=%s tx=%s op=%s",
                 subscription_id,
@@ -231,20 +315,35 @@ class StellarNotificationService:
         return ("payload", digest, int(chat_id), topic)
 
     async def _is_duplicate_and_remember(self, key: tuple[Any, ...]) -> bool:
-        """Return True if key already seen; otherwise remember it with LRU eviction."""
-        async with self._notified_lock:
-            if key in self.notified_operations:
-                return True
+        """
+        Return True if key already seen; otherwise remember it.
 
-            self.notified_operations.add(key)
-            self._notified_order.append(key)
+        Recent keys are checked in memory (bounded, oldest evicted first), then
+        claimed in Redis with SET NX so retries after a restart, or delivered
+        to another replica, are dropped too. Without Redis, or when it fails,
+        only the memory check applies.
+        """
+        if key in self.notified_operations:
+            return True
+
+        self.notified_operations.add(key)
+        self._notified_order.append(key)
 
-            # LRU eviction: keep bounded memory without wiping the entire cache.
-            while len(self._notified_order) > self.max_cache_size:
-                oldest = self._notified_order.popleft()
-                self.notified_operations.discard(oldest)
+        # LRU eviction: keep bounded memory without wiping the entire cache.
+        while len(self._notified_order) > self.max_cache_size:
+            oldest = self._notified_order.popleft()
+            self.notified_operations.discard(oldest)
 
+        if self._redis is None:
             return False
+        try:
+            claimed = await self._redis.set(
+                NOTIFIED_KEY_PREFIX + ":".join(str(part) for part in key), 1, nx=True, ex=self.dedup_ttl
+            )
+        except Exception as e:
+            logger.warning(f"Notification dedup in Redis failed, using memory only: {e}")
+            return False
+        return not claimed
 
     def _should_skip_by_min(self, payload: dict[str, Any], destination: dict[str, Any]) -> bool:
         """Apply min amount filter for non-XDR payloads (best-effort)."""
@@ -438,28 +537,33 @@ class StellarNotificationService:
             topic_id: Message thread ID for topics
             message: HTML-formatted message
         """
-        from db.repositories import MessageRepository
+        from db.repositories import AsyncMessageRepository
 
         try:
-            with self.session_pool() as session:
-                repo = MessageRepository(session)
-                repo.add_message(chat_id, message, topic_id=topic_id or 0)
-                session.commit()
+            async with self.session_pool() as session:
+                await AsyncMessageRepository(session).add_message(chat_id, message, topic_id=topic_id or 0)
+                await session.commit()
                 logger.debug(f"Queued notification for chat {chat_id}")
         except Exception as e:
             logger.exception(f"Failed to queue notification: {e}")
 
     # === Subscription Management ===
 
-    async def _get_next_nonce(self) -> int:
-        """Get next sequential nonce for API calls."""
+    @asynccontextmanager
+    async def _next_nonce(self) -> AsyncIterator[int]:
+        """
+        Next sequential nonce for an API call.
+
+        The lock is held until the call signed with it has been answered: the notifier
+        expects growing nonces, and concurrent requests could reach it out of order.
+        """
         async with self._nonce_lock:
             if self._nonce == 0:
                 import time
 
                 self._nonce = int(time.time() * 1000)
             self._nonce += 1
-            return self._nonce
+            yield self._nonce
 
     def _encode_url_params(self, pairs: list[tuple[str, Any]]) -> str:
         """Encode parameters for URL query string."""
@@ -488,19 +592,19 @@ class StellarNotificationService:
         url = f"{config.notifier_url}/api/subscription"
         webhook = config.webhook_public_url
 
-        nonce = await self._get_next_nonce()
-        pairs = [
-            ("asset_code", asset_code),
-            ("asset_issuer", asset_issuer),
-            ("nonce", nonce),
-            ("operation_types", [1]),
-            ("reaction_url", webhook),
-        ]
+        async with self._next_nonce() as nonce:
+            pairs = [
+                ("asset_code", asset_code),
+                ("asset_issuer", asset_issuer),
+                ("nonce", nonce),
+                ("operation_types", [1]),
+                ("reaction_url", webhook),
+            ]
 
-        body_json = json.dumps(OrderedDict(pairs), separators=(",", ":"))
-        headers = self._get_auth_headers()
+            body_json = json.dumps(OrderedDict(pairs), separators=(",", ":"))
+            headers = self._get_auth_headers()
 
-        async with aiohttp.ClientSession() as session:
+            session = await self._get_http()
             try:
                 async with session.post(url, data=body_json, headers=headers) as resp:
                     if resp.status in (200, 201):
@@ -536,17 +640,17 @@ class StellarNotificationService:
         url = f"{config.notifier_url}/api/subscription"
         webhook = config.webhook_public_url
 
-        nonce = await self._get_next_nonce()
-        pairs = [
-            ("account", account_id),
-            ("nonce", nonce),
-            ("reaction_url", webhook),
-        ]
+        async with self._next_nonce() as nonce:
+            pairs = [
+                ("account", account_id),
+                ("nonce", nonce),
+                ("reaction_url", webhook),
+            ]
 
-        body_json = json.dumps(OrderedDict(pairs), separators=(",", ":"))
-        headers = self._get_auth_headers()
+            body_json = json.dumps(OrderedDict(pairs), separators=(",", ":"))
+            headers = self._get_auth_headers()
 
-        async with aiohttp.ClientSession() as session:
+            session = await self._get_http()
             try:
                 async with session.post(url, data=body_json, headers=headers) as resp:
                     if resp.status in (200, 201):
@@ -578,10 +682,10 @@ class StellarNotificationService:
             return False
 
         url = f"{config.notifier_url}/api/subscription/{subscription_id}"
-        nonce = await self._get_next_nonce()
-        headers = self._get_auth_headers()
+        async with self._next_nonce() as nonce:
+            headers = self._get_auth_headers()
 
-        async with aiohttp.ClientSession() as session:
+            session = await self._get_http()
             try:
                 async with session.delete(f"{url}?nonce={nonce}", headers=headers) as resp:
                     if resp.status == 200:
@@ -606,24 +710,34 @@ class StellarNotificationService:
         if not config.notifier_url:
             return []
 
-        nonce = await self._get_next_nonce()
-        headers = self._get_auth_headers()
-        url = f"{config.notifier_url}/api/subscription?nonce={nonce}"
+        try:
+            return await self._fetch_active_subscriptions()
+        except Exception as e:
+            logger.exception(f"Error fetching subscriptions: {e}")
+            return []
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(url, headers=headers) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        if isinstance(data, list):
-                            return data
-                        return []
-                    else:
-                        logger.error(f"Failed to get subscriptions: {resp.status} {await resp.text()}")
-                        return []
-            except Exception as e:
-                logger.exception(f"Error fetching subscriptions: {e}")
-                return []
+    async def _fetch_active_subscriptions(self) -> list[dict[str, Any]]:
+        """Active subscriptions; raises when the notifier does not answer, so a failure never reads as 'none'."""
+        async with self._next_nonce() as nonce:
+            headers = self._get_auth_headers()
+            url = f"{config.notifier_url}/api/subscription?nonce={nonce}"
+
+            session = await self._get_http()
+            async with session.get(url, headers=headers) as resp:
+                if resp.status != 200:
+                    raise RuntimeError(f"Failed to get subscriptions: {resp.status} {await resp.text()}")
+                data = await resp.json()
+                return data if isinstance(data, list) else []
+
+    async def _get_http(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._http_loop is not loop:
+            # The session belongs to one event loop (tests run a loop per case)
+            self._http_loop = loop
+            self._http = None
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30))
+        return self._http
 
     def _get_auth_headers(self) -> dict[str, str]:
         """Get authorization headers for notifier API calls."""
@@ -636,28 +750,66 @@ class StellarNotificationService:
 
     async def load_grist_config(self) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
         """
-        Load notification config from Grist tables.
+        Load notification config from Grist tables (both at once).
+
+        Raises on a Grist error: an empty config would unsubscribe everything.
 
         Returns:
             Tuple of (assets_config, accounts_config)
         """
-        try:
-            assets_config = await grist_manager.load_table_data(MTLGrist.NOTIFY_ASSETS)
-            accounts_config = await grist_manager.load_table_data(MTLGrist.NOTIFY_ACCOUNTS)
-            return assets_config, accounts_config
-        except Exception as e:
-            logger.exception(f"Failed to load Grist config: {e}")
-            return [], []
+        assets_config, accounts_config = await asyncio.gather(
+            grist_manager.fetch_data(MTLGrist.NOTIFY_ASSETS), grist_manager.fetch_data(MTLGrist.NOTIFY_ACCOUNTS)
+        )
+        return assets_config, accounts_config
+
+    @staticmethod
+    def _desired_subscriptions(
+        assets_config: list[dict[str, Any]], accounts_config: list[dict[str, Any]]
+    ) -> dict[str, dict[str, Any]]:
+        """Routing entry per resource ("CODE-ISSUER" or account id) for every enabled Grist row."""
+        desired: dict[str, dict[str, Any]] = {}
+        for asset_cfg in assets_config:
+            asset = asset_cfg.get("asset", "")
+            if not asset_cfg.get("enabled") or "-" not in asset:
+                continue
+            desired[asset] = {
+                "chat_id": int(asset_cfg.get("chat_id", 0)),
+                "topic_id": asset_cfg.get("topic_id"),
+                "type": "asset",
+                "asset": asset,
+                "min": int(asset_cfg.get("min", 0)),
+            }
+        for account_cfg in accounts_config:
+            account_id = account_cfg.get("account_id", "")
+            if not account_cfg.get("enabled") or not account_id or not account_id.startswith("G"):
+                continue
+            desired[account_id] = {
+                "chat_id": int(account_cfg.get("chat_id", 0)),
+                "topic_id": account_cfg.get("topic_id"),
+                "type": "account",
+                "account": account_id,
+                "min": 0,
+            }
+        return desired
+
+    async def _subscribe_resource(self, destination: dict[str, Any]) -> str | None:
+        if destination["type"] == "asset":
+            asset_code, asset_issuer = destination["asset"].split("-", 1)
+            return await self.subscribe_token(asset_code, asset_issuer)
+        return await self.subscribe_account(destination["account"])
 
     async def sync_subscriptions(self) -> None:
         """
         Synchronize subscriptions with Grist config.
 
         This method:
-        1. Loads current config from Grist
-        2. Gets active subscriptions from notifier
-        3. Subscribes to new items
-        4. Updates the subscriptions_map for routing
+        1. Loads current config from Grist and active subscriptions from notifier
+        2. Diffs them: a remote subscription is kept when its resource is wanted
+           (asset ones only with the payment-only filter); the rest of those with
+           our webhook URL are stale, subscriptions without a URL are left alone
+        3. Unsubscribes stale ones, then subscribes missing resources, one call at a
+           time (every call takes the next nonce)
+        4. Replaces the subscriptions_map used for routing
         """
         if not config.notifier_url or not config.webhook_public_url:
             logger.warning("Notifier not configured, skipping subscription sync")
@@ -670,125 +822,51 @@ class StellarNotificationService:
         logger.info("Starting subscription sync...")
 
         try:
-            # Load Grist config
-            assets_config, accounts_config = await self.load_grist_config()
-
-            # Get current subscriptions from notifier
-            current_subs = await self.get_active_subscriptions()
-            current_sub_resources: set[str] = set()
-            current_sub_map: dict[str, str] = {}  # resource -> subscription_id
-
-            current_sub_details: dict[str, dict[str, Any]] = {}  # resource -> full sub dict
+            (assets_config, accounts_config), remote_subs = await asyncio.gather(
+                self.load_grist_config(), self._fetch_active_subscriptions()
+            )
+            desired = self._desired_subscriptions(assets_config, accounts_config)
 
-            for sub in current_subs:
+            kept: dict[str, str] = {}  # resource -> subscription_id
+            stale: list[str] = []
+            for sub in remote_subs:
                 sub_id = sub.get("id") or sub.get("subscription_id")
                 # Resource can be account or asset
                 resource = sub.get("account") or sub.get("resource_id")
                 if sub.get("asset_code") and sub.get("asset_issuer"):
                     resource = f"{sub['asset_code']}-{sub['asset_issuer']}"
-                if resource and sub_id:
-                    current_sub_resources.add(resource)
-                    current_sub_map[resource] = sub_id
-                    current_sub_details[resource] = sub
-
-            # Process asset subscriptions
-            for asset_cfg in assets_config:
-                if not asset_cfg.get("enabled"):
-                    continue
-
-                asset = asset_cfg.get("asset", "")
-                if "-" not in asset:
+                reaction_url = sub.get("reaction_url")
+                # Subscriptions of other webhooks on the same notifier are not ours to touch
+                if not sub_id or not resource or reaction_url not in (None, config.webhook_public_url):
                     continue
-
-                asset_code, asset_issuer = asset.split("-", 1)
-                resource_key = f"{asset_code}-{asset_issuer}"
-
-                chat_id = int(asset_cfg.get("chat_id", 0))
-                topic_id = asset_cfg.get("topic_id")
-                min_amount = int(asset_cfg.get("min", 0))
-
-                if resource_key in current_sub_resources:
-                    # Check if existing subscription has correct operation_types filter
-                    existing_sub = current_sub_details.get(resource_key, {})
-                    existing_op_types = existing_sub.get("operation_types")
-                    if existing_op_types != [1]:
-                        # Recreate subscription with payment-only filter
-                        old_sub_id = current_sub_map[resource_key]
-                        logger.info(
-                            f"Recreating asset subscription {asset_code}: operation_types {existing_op_types} -> [1]"
-                        )
-                        await self.unsubscribe(old_sub_id)
-                        await asyncio.sleep(0.1)
-                        sub_id = await self.subscribe_token(asset_code, asset_issuer)
-                        if sub_id:
-                            self.subscriptions_map[sub_id] = {
-                                "chat_id": chat_id,
-                                "topic_id": topic_id,
-                                "type": "asset",
-                                "asset": asset,
-                                "min": min_amount,
-                            }
-                    else:
-                        # Already subscribed with correct filter, just update map
-                        sub_id = current_sub_map[resource_key]
-                        self.subscriptions_map[sub_id] = {
-                            "chat_id": chat_id,
-                            "topic_id": topic_id,
-                            "type": "asset",
-                            "asset": asset,
-                            "min": min_amount,
-                        }
-                        logger.debug(f"Asset {asset_code} already subscribed: {sub_id}")
+                wanted = resource in desired and resource not in kept
+                if wanted and desired[resource]["type"] == "asset" and sub.get("operation_types") != [1]:
+                    logger.info(f"Recreating asset subscription {resource}: operation_types -> [1]")
+                    wanted = False
+                if wanted:
+                    kept[resource] = sub_id
+                elif reaction_url == config.webhook_public_url:
+                    stale.append(sub_id)
                 else:
-                    # Need to subscribe
-                    sub_id = await self.subscribe_token(asset_code, asset_issuer)
-                    if sub_id:
-                        self.subscriptions_map[sub_id] = {
-                            "chat_id": chat_id,
-                            "topic_id": topic_id,
-                            "type": "asset",
-                            "asset": asset,
-                            "min": min_amount,
-                        }
-                    await asyncio.sleep(0.1)  # Rate limiting
-
-            # Process account subscriptions
-            for account_cfg in accounts_config:
-                if not account_cfg.get("enabled"):
-                    continue
+                    # Without a URL it may belong to another bot: usable, but never removed
+                    logger.info(f"Leaving subscription {sub_id} ({resource}) without reaction_url in place")
+            missing = [resource for resource in desired if resource not in kept]
 
-                account_id = account_cfg.get("account_id", "")
-                if not account_id or not account_id.startswith("G"):
-                    continue
+            for sub_id in stale:
+                await self.unsubscribe(sub_id)
+            created = [await self._subscribe_resource(desired[resource]) for resource in missing]
 
-                chat_id = int(account_cfg.get("chat_id", 0))
-                topic_id = account_cfg.get("topic_id")
-
-                if account_id in current_sub_resources:
-                    # Already subscribed, just update map
-                    sub_id = current_sub_map[account_id]
-                    self.subscriptions_map[sub_id] = {
-                        "chat_id": chat_id,
-                        "topic_id": topic_id,
-                        "type": "account",
-                        "account": account_id,
-                        "min": 0,
-                    }
-                    logger.debug(f"Account {shorten_address(account_id)} already subscribed: {sub_id}")
-                else:
-                    # Need to subscribe
-                    sub_id = await self.subscribe_account(account_id)
-                    if sub_id:
-                        self.subscriptions_map[sub_id] = {
-                            "chat_id": chat_id,
-                            "topic_id": topic_id,
-                            "type": "account",
-                            "account": account_id,
-                            "min": 0,
-                        }
-                    await asyncio.sleep(0.1)  # Rate limiting
-
-            logger.info(f"Subscription sync completed: {len(self.subscriptions_map)} active subscriptions")
+            subscriptions_map = {sub_id: desired[resource] for resource, sub_id in kept.items()}
+            for resource, sub_id in zip(missing, created):
+                if sub_id:
+                    subscriptions_map[sub_id] = desired[resource]
+            self.subscriptions_map = subscriptions_map
+
+            logger.info(
+                f"Subscription sync completed: {len(subscriptions_map)} active subscriptions "
+                f"(kept {len(kept)}, removed {len(stale)}, created {sum(1 for sub_id in created if sub_id)}"
+                f" of {len(missing)})"
+            )
 
         except Exception as e:
             logger.exception(f"Subscription sync failed: {e}")
@@ -0,0 +1,199 @@
+# services/telegram_rate_limiter.py
+"""Client-side token buckets for outgoing Telegram API calls."""
+
+import asyncio
+import heapq
+import itertools
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Iterator, Optional, Union
+
+ChatKey = Union[int, str]
+
+# Upper bounds (seconds) of the queue-wait histogram buckets
+WAIT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+TOKEN_EPSILON = 1e-9
+
+
+class RequestPriority(IntEnum):
+    HIGH = 0  # moderation actions, callback answers
+    NORMAL = 1  # replies and regular sends
+    LOW = 2  # bulk notifications
+
+
+_current_priority: ContextVar[Optional[RequestPriority]] = ContextVar("telegram_request_priority", default=None)
+
+
+@contextmanager
+def request_priority(priority: RequestPriority) -> Iterator[None]:
+    """Send Telegram calls made inside the block with the given priority."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def get_request_priority(default: RequestPriority = RequestPriority.NORMAL) -> RequestPriority:
+    priority = _current_priority.get()
+    return default if priority is None else priority
+
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated", "paused_until")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+        self.paused_until = 0.0
+
+    def delay(self, now: float) -> float:
+        """Seconds until one token is available."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if now < self.paused_until:
+            return self.paused_until - now
+        # Refill arithmetic can leave a full token a rounding error short
+        if self.tokens >= 1 - TOKEN_EPSILON:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+    def is_idle(self, now: float) -> bool:
+        return self.delay(now) == 0.0 and self.tokens >= self.capacity
+
+
+class WaitHistogram:
+    __slots__ = ("counts", "count", "total_seconds")
+
+    def __init__(self):
+        self.counts = [0] * (len(WAIT_BUCKETS) + 1)
+        self.count = 0
+        self.total_seconds = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(WAIT_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total_seconds += seconds
+
+    def as_dict(self) -> dict[str, Any]:
+        buckets: dict[str, int] = {}
+        cumulative = 0
+        for bound, count in zip([*map(str, WAIT_BUCKETS), "+Inf"], self.counts):
+            cumulative += count
+            buckets[bound] = cumulative
+        return {"buckets": buckets, "count": self.count, "sum": round(self.total_seconds, 3)}
+
+
+class TelegramRateLimiter:
+    """
+    Schedules outgoing Telegram calls under the Bot API flood limits.
+
+    A call first waits for its chat bucket (1 msg/s in private chats, 20 msg/min in
+    groups and channels), FIFO inside the chat, then for the global bucket (~30/s),
+    where waiters are served by priority. HIGH calls skip the chat bucket: deleting a
+    spam burst must not be spread over minutes.
+
+    ``clock`` and ``sleep`` default to the event loop's monotonic time; tests pass a fake clock.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = 30.0,
+        private_rate: float = 1.0,
+        group_rate: float = 20 / 60,
+        group_burst: float = 20.0,
+        max_chat_buckets: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ):
+        self._clock = clock
+        self._sleep = sleep
+        self._global = TokenBucket(global_rate, global_rate, clock())
+        self._private_rate = private_rate
+        self._group_rate = group_rate
+        self._group_burst = group_burst
+        self._max_chat_buckets = max_chat_buckets
+        self._chat_buckets: dict[ChatKey, TokenBucket] = {}
+        self._chat_locks: dict[ChatKey, asyncio.Lock] = {}
+        self._queue: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._pump_task: Optional[asyncio.Task] = None
+        self._histograms = {priority: WaitHistogram() for priority in RequestPriority}
+
+    async def acquire(self, chat_id: Optional[ChatKey], priority: RequestPriority = RequestPriority.NORMAL) -> float:
+        """Wait until the call may be sent. Returns the time spent waiting."""
+        started = self._clock()
+        if chat_id is not None and priority != RequestPriority.HIGH:
+            await self._acquire_chat(chat_id)
+        await self._acquire_global(priority)
+        waited = self._clock() - started
+        self._histograms[priority].observe(waited)
+        return waited
+
+    def pause(self, chat_id: Optional[ChatKey], seconds: float) -> None:
+        """Hold back a chat (or every call, when chat_id is None) after a RetryAfter."""
+        bucket = self._global if chat_id is None else self._chat_buckets.get(chat_id)
+        if bucket is not None:
+            bucket.paused_until = max(bucket.paused_until, self._clock() + seconds)
+
+    def get_metrics(self) -> dict[str, Any]:
+        return {
+            "queued": len(self._queue),
+            "chat_buckets": len(self._chat_buckets),
+            "wait_seconds": {priority.name.lower(): hist.as_dict() for priority, hist in self._histograms.items()},
+        }
+
+    async def _acquire_chat(self, chat_id: ChatKey) -> None:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self._chat_buckets) >= self._max_chat_buckets:
+                self._prune_chat_buckets()
+            if isinstance(chat_id, int) and chat_id > 0:
+                bucket = TokenBucket(self._private_rate, 1.0, self._clock())
+            else:
+                bucket = TokenBucket(self._group_rate, self._group_burst, self._clock())
+            self._chat_buckets[chat_id] = bucket
+            self._chat_locks[chat_id] = asyncio.Lock()
+
+        async with self._chat_locks[chat_id]:
+            while (delay := bucket.delay(self._clock())) > 0:
+                await self._sleep(delay)
+            bucket.take()
+
+    async def _acquire_global(self, priority: RequestPriority) -> None:
+        if not self._queue and self._global.delay(self._clock()) == 0:
+            self._global.take()
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._sequence), future))
+        if self._pump_task is None or self._pump_task.done():
+            self._pump_task = asyncio.create_task(self._pump())
+        await future
+
+    async def _pump(self) -> None:
+        while self._queue:
+            delay = self._global.delay(self._clock())
+            if delay > 0:
+                await self._sleep(delay)
+                continue
+            _, _, future = heapq.heappop(self._queue)
+            # A cancelled waiter does not consume a token
+            if not future.done():
+                self._global.take()
+                future.set_result(None)
+
+    def _prune_chat_buckets(self) -> None:
+        now = self._clock()
+        for chat_id in [key for key, bucket in self._chat_buckets.items() if bucket.is_idle(now)]:
+            if not self._chat_locks[chat_id].locked():
+                del self._chat_buckets[chat_id]
+                del self._chat_locks[chat_id]
@@ -0,0 +1,115 @@
+"""config_entries: topic mutes, votes, topic admins and channel links one row per entry
+
+Revision ID: 346bd0c0df75
+Revises: c3f1a9d2e7b4
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+
+import json
+from typing import Any, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "346bd0c0df75"
+down_revision: Union[str, Sequence[str], None] = "c3f1a9d2e7b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# BotValueTypes kept as whole JSON dicts under chat_id 0 before this revision
+VOTES, TOPIC_ADMINS, TOPIC_MUTES, CHANNEL_LINKS = 16, 42, 43, 46
+
+JSON_VARIANT = sa.JSON().with_variant(postgresql.JSONB(astext_type=sa.Text()), "postgresql")
+
+bot_config = sa.table(
+    "bot_config",
+    sa.column("chat_id", sa.BigInteger()),
+    sa.column("chat_key", sa.BigInteger()),
+    sa.column("chat_key_name", sa.String()),
+    sa.column("chat_value", JSON_VARIANT),
+)
+config_entries = sa.table(
+    "config_entries",
+    sa.column("chat_key", sa.BigInteger()),
+    sa.column("scope", sa.String()),
+    sa.column("entry", sa.String()),
+    sa.column("value", JSON_VARIANT),
+)
+
+
+def _blob(value: Any) -> dict:
+    """Stored blob as a dict, whatever wrapping it went through (JSON string, {"value": "..."})."""
+    while isinstance(value, str) or (isinstance(value, dict) and set(value) == {"value"}):
+        value = json.loads(value) if isinstance(value, str) else value["value"]
+    return value if isinstance(value, dict) else {}
+
+
+def _blob_rows(chat_key: int, blob: dict) -> list[dict]:
+    rows = []
+    for scope, value in blob.items():
+        if chat_key == CHANNEL_LINKS:
+            entries = {"": value}
+        elif chat_key == TOPIC_ADMINS:
+            entries = {username: position for position, username in enumerate(dict.fromkeys(value or []))}
+        else:
+            entries = value or {}
+        for entry, entry_value in entries.items():
+            rows.append({"chat_key": chat_key, "scope": str(scope), "entry": str(entry), "value": entry_value})
+    return rows
+
+
+def upgrade() -> None:
+    """Create config_entries and move the four chat_id 0 blobs into it."""
+    op.create_table(
+        "config_entries",
+        sa.Column("chat_key", sa.BigInteger(), nullable=False),
+        sa.Column("scope", sa.String(), nullable=False),
+        sa.Column("entry", sa.String(), nullable=False),
+        sa.Column("value", JSON_VARIANT, nullable=True),
+        sa.PrimaryKeyConstraint("chat_key", "scope", "entry"),
+    )
+
+    keys = (VOTES, TOPIC_ADMINS, TOPIC_MUTES, CHANNEL_LINKS)
+    connection = op.get_bind()
+    blobs = connection.execute(
+        sa.select(bot_config.c.chat_key, bot_config.c.chat_value).where(
+            bot_config.c.chat_id == 0, bot_config.c.chat_key.in_(keys)
+        )
+    )
+    rows = [row for chat_key, chat_value in blobs for row in _blob_rows(chat_key, _blob(chat_value))]
+    if rows:
+        op.bulk_insert(config_entries, rows)
+    connection.execute(sa.delete(bot_config).where(bot_config.c.chat_id == 0, bot_config.c.chat_key.in_(keys)))
+
+
+def downgrade() -> None:
+    """Fold config_entries back into chat_id 0 blobs and drop the table."""
+    connection = op.get_bind()
+    blobs: dict[int, dict] = {}
+    for chat_key, scope, entry, value in connection.execute(
+        sa.select(config_entries.c.chat_key, config_entries.c.scope, config_entries.c.entry, config_entries.c.value)
+    ):
+        scopes = blobs.setdefault(chat_key, {})
+        if chat_key == CHANNEL_LINKS:
+            scopes[scope] = value
+        else:
+            scopes.setdefault(scope, {})[entry] = value
+    if TOPIC_ADMINS in blobs:
+        blobs[TOPIC_ADMINS] = {
+            scope: sorted(entries, key=lambda username: entries[username])
+            for scope, entries in blobs[TOPIC_ADMINS].items()
+        }
+    names = {VOTES: "Votes", TOPIC_ADMINS: "TopicAdmins", TOPIC_MUTES: "TopicMutes", CHANNEL_LINKS: "ChannelLinks"}
+    if blobs:
+        op.bulk_insert(
+            bot_config,
+            [
+                {"chat_id": 0, "chat_key": chat_key, "chat_key_name": names.get(chat_key), "chat_value": blob}
+                for chat_key, blob in blobs.items()
+            ],
+        )
+    op.drop_table("config_entries")
@@ -0,0 +1,30 @@
+"""t_transaction.tx_hash: hash of the signed envelope for resumable dividend submission
+
+Revision ID: 5e2b7c9a41d3
+Revises: 346bd0c0df75
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5e2b7c9a41d3"
+down_revision: Union[str, Sequence[str], None] = "346bd0c0df75"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add tx_hash; was_send gains states 2 (signed, sequence and hash recorded) and 3 (tx_failed)."""
+    op.add_column("t_transaction", sa.Column("tx_hash", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Drop tx_hash; signed but unconfirmed rows go back to unsent."""
+    op.execute("UPDATE t_transaction SET was_send = 0 WHERE was_send = 2")
+    op.drop_column("t_transaction", "tx_hash")
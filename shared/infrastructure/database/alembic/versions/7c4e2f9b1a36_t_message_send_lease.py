@@ -0,0 +1,31 @@
+"""t_message: send lease columns for OutboxDispatcher
+
+Revision ID: 7c4e2f9b1a36
+Revises: 9a7d3e51c0b2
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c4e2f9b1a36"
+down_revision: Union[str, Sequence[str], None] = "9a7d3e51c0b2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Rows are leased to a sender with a committed claim instead of row locks held while sending."""
+    op.add_column("t_message", sa.Column("sending_owner", sa.String(length=32), nullable=True))
+    op.add_column("t_message", sa.Column("sending_until", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Drop the lease columns."""
+    op.drop_column("t_message", "sending_until")
+    op.drop_column("t_message", "sending_owner")
@@ -0,0 +1,73 @@
+"""t_operations: numeric amounts and (code, dt) / (operation, dt) indexes
+
+Revision ID: 9a7d3e51c0b2
+Revises: 5e2b7c9a41d3
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9a7d3e51c0b2"
+down_revision: Union[str, Sequence[str], None] = "5e2b7c9a41d3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+AMOUNT = sa.Numeric(20, 7)
+AMOUNT_COLUMNS = ("amount1", "amount2")
+INDEXES = {
+    "ix_t_operations_code1_dt": ["code1", "dt"],
+    "ix_t_operations_code2_dt": ["code2", "dt"],
+    "ix_t_operations_operation_dt": ["operation", "dt"],
+}
+
+
+def upgrade() -> None:
+    """Convert amount1/amount2 from strings to NUMERIC(20, 7) and index the analytics filters."""
+    if op.get_bind().dialect.name == "postgresql":
+        for column in AMOUNT_COLUMNS:
+            # Decimal commas are accepted; anything that is not a number becomes NULL instead of failing
+            op.alter_column(
+                "t_operations",
+                column,
+                type_=AMOUNT,
+                existing_type=sa.String(length=32),
+                existing_nullable=True,
+                postgresql_using=(
+                    f"CASE WHEN replace({column}, ',', '.') ~ '^\\s*-?[0-9]+(\\.[0-9]+)?\\s*$' "
+                    f"THEN replace({column}, ',', '.')::numeric(20, 7) END"
+                ),
+            )
+    else:
+        with op.batch_alter_table("t_operations") as batch:
+            for column in AMOUNT_COLUMNS:
+                batch.alter_column(column, type_=AMOUNT, existing_type=sa.String(length=32), existing_nullable=True)
+
+    for name, columns in INDEXES.items():
+        op.create_index(name, "t_operations", columns)
+
+
+def downgrade() -> None:
+    """Drop the indexes and store the amounts as strings again."""
+    for name in INDEXES:
+        op.drop_index(name, table_name="t_operations")
+
+    if op.get_bind().dialect.name == "postgresql":
+        for column in AMOUNT_COLUMNS:
+            op.alter_column(
+                "t_operations",
+                column,
+                type_=sa.String(length=32),
+                existing_type=AMOUNT,
+                existing_nullable=True,
+                postgresql_using=f"trim(trailing '.' from trim(trailing '0' from {column}::text))",
+            )
+    else:
+        with op.batch_alter_table("t_operations") as batch:
+            for column in AMOUNT_COLUMNS:
+                batch.alter_column(column, type_=sa.String(length=32), existing_type=AMOUNT, existing_nullable=True)
@@ -0,0 +1,48 @@
+"""t_message outbox: NOTIFY trigger and partial index on unsent rows
+
+Revision ID: c3f1a9d2e7b4
+Revises: fdbd5d0bbfcb
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c3f1a9d2e7b4"
+down_revision: Union[str, Sequence[str], None] = "fdbd5d0bbfcb"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Wake OutboxDispatcher via pg_notify on every insert into t_message."""
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION t_message_notify() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('t_message_new', '');
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER t_message_notify
+        AFTER INSERT ON t_message
+        FOR EACH STATEMENT EXECUTE FUNCTION t_message_notify()
+        """
+    )
+    op.create_index("ix_t_message_unsent", "t_message", ["id"], postgresql_where=sa.text("was_send = 0"))
+
+
+def downgrade() -> None:
+    """Drop the outbox trigger and index."""
+    op.drop_index("ix_t_message_unsent", table_name="t_message")
+    op.execute("DROP TRIGGER IF EXISTS t_message_notify ON t_message")
+    op.execute("DROP FUNCTION IF EXISTS t_message_notify()")
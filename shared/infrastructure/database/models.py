@@ -1,4 +1,17 @@
-from sqlalchemy import Column, Integer, BigInteger, String, DateTime, SmallInteger, Float, ForeignKey, Text, JSON
+from sqlalchemy import (
+    Column,
+    Integer,
+    BigInteger,
+    String,
+    DateTime,
+    SmallInteger,
+    Float,
+    ForeignKey,
+    Text,
+    JSON,
+    Index,
+    Numeric,
+)
 from sqlalchemy.dialects.postgresql import JSONB, ARRAY
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
@@ -46,6 +59,9 @@ class TMessage(Base):
     use_alarm = Column(Integer, default=0)
     update_id = Column(BigInteger, default=0)
     button_json = Column(Text)  # Changed from String(4000) to Text
+    # Send lease: the OutboxDispatcher that claimed the row and until when
+    sending_owner = Column(String(32))
+    sending_until = Column(DateTime)
 
 
 class TDivList(Base):
@@ -65,12 +81,19 @@ class TLedgers(Base):
 
 class TOperations(Base):
     __tablename__ = "t_operations"
+    # Asset filters are code1 OR code2, so each side has its own index
+    __table_args__ = (
+        Index("ix_t_operations_code1_dt", "code1", "dt"),
+        Index("ix_t_operations_code2_dt", "code2", "dt"),
+        Index("ix_t_operations_operation_dt", "operation", "dt"),
+    )
     id = Column(String(32), primary_key=True)
     dt = Column(DateTime)
     operation = Column(String(32))
-    amount1 = Column(String(32))
+    # Stellar amounts: int64 stroops, 7 decimal places
+    amount1 = Column(Numeric(20, 7))
     code1 = Column(String(64))
-    amount2 = Column(String(32))
+    amount2 = Column(Numeric(20, 7))
     code2 = Column(String(64))
     from_account = Column(String(64))
     for_account = Column(String(64))
@@ -102,6 +125,7 @@ class TTransaction(Base):
     xdr_id = Column(BigInteger)
     xdr = Column(Text)
     was_send = Column(SmallInteger, default=0)
+    tx_hash = Column(String(64))
 
     div_list = relationship("TDivList", back_populates="transactions")
 
@@ -162,6 +186,16 @@ class BotConfig(Base):
     chat_value = Column(JSON_VARIANT)  # Using JSONB variant for flexibility
 
 
+class ConfigEntry(Base):
+    """One entry of a keyed setting: a topic mute, a topic admin, a vote weight or a channel link."""
+
+    __tablename__ = "config_entries"
+    chat_key = Column(BigInteger, primary_key=True)  # BotValueTypes value
+    scope = Column(String, primary_key=True)  # "chat_id-thread_id", Stellar address or channel_id
+    entry = Column(String, primary_key=True)  # user_id, username, voter; "" for one value per scope
+    value = Column(JSON_VARIANT)
+
+
 class Chat(Base):
     __tablename__ = "chats"
     chat_id = Column(BigInteger, primary_key=True)
@@ -21,13 +21,16 @@ from aiogram.types import (
 from loguru import logger
 from redis.asyncio import Redis
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import Session, sessionmaker
 
 # Local application imports
-from db.repositories import ChatsRepository
-from middlewares.db import DbSessionMiddleware
+from db.repositories import AsyncChatsRepository, ChatsRepository
+from db.session import create_async_session_pool, dispose_async_session_pool
+from middlewares.db import AsyncDbSessionMiddleware, DbSessionMiddleware
 from middlewares.emoji_reaction import EmojiReactionMiddleware
 from middlewares.message_thread_cache import MessageThreadCacheMiddleware
+from middlewares.rate_limit import RateLimitRequestMiddleware
 from middlewares.retry import RetryRequestMiddleware
 from middlewares.sentry_error_handler import sentry_error_handler
 from middlewares.throttling import ThrottlingMiddleware
@@ -36,6 +39,9 @@ from middlewares.user_resolver import UserResolverMiddleware
 from other.config_reader import config
 from other.constants import MTLChats
 from other.pyro_tools import pyro_start
+from other.spam_rules import get_spam_verdict_cache
+from other.stellar.name_resolver import get_account_name_resolver
+from other.stellar.xdr_decoder import get_xdr_decoder
 from services.command_registry_service import get_pending_commands
 from services.health_server import start_health_server
 from services.message_thread_cache import RedisMessageThreadCacheService
@@ -98,19 +104,42 @@ async def on_startup(bot: Bot, dispatcher: Dispatcher):
         await pyro_start()
 
 
-async def on_shutdown(bot: Bot):
+async def on_shutdown(bot: Bot, async_session_pool: async_sessionmaker[AsyncSession] | None = None):
     with suppress(TelegramBadRequest):
         await bot.send_message(chat_id=MTLChats.ITolstov, text="Bot stopped")
 
     # Stop stellar notification service
     import services.app_context as app_context_module
 
+    if app_context_module.app_context and app_context_module.app_context.bot_user_writer:
+        await app_context_module.app_context.bot_user_writer.stop()
+
+    if app_context_module.app_context and app_context_module.app_context.outbox_dispatcher:
+        await app_context_module.app_context.outbox_dispatcher.stop()
+
+    if app_context_module.app_context and app_context_module.app_context.deferred_delete:
+        await app_context_module.app_context.deferred_delete.stop()
+
+    if app_context_module.app_context and app_context_module.app_context.spam_reputation:
+        await app_context_module.app_context.spam_reputation.close()
+
     if app_context_module.app_context and app_context_module.app_context.stellar_notification_service:
         await app_context_module.app_context.stellar_notification_service.stop()
 
+    if app_context_module.app_context and app_context_module.app_context.config_service:
+        await app_context_module.app_context.config_service.stop_invalidation_listener()
+
+    get_xdr_decoder().close()
+
+    if app_context_module.app_context and app_context_module.app_context.horizon_client:
+        await app_context_module.app_context.horizon_client.shutdown()
+
     for task in global_tasks:
         task.cancel()
 
+    if async_session_pool is not None:
+        await dispose_async_session_pool(async_session_pool)
+
 
 async def load_routers(dp: Dispatcher, bot: Bot):
     """Динамическая загрузка и регистрация роутеров"""
@@ -163,6 +192,8 @@ async def main():
     engine = create_engine(config.postgres_url, pool_pre_ping=True, max_overflow=50)
     # Creating DB connections pool
     db_pool = sessionmaker(bind=engine)
+    # asyncpg-backed pool for handlers that declare `async_session`
+    async_db_pool = create_async_session_pool(config.postgres_url)
 
     # Creating bot and its dispatcher
     if config.telegram_api_url:
@@ -172,6 +203,9 @@ async def main():
     else:
         session = AiohttpSession()
     session.middleware(RetryRequestMiddleware())
+    # Inner to retry: every attempt takes a token, a RetryAfter pauses the chat bucket
+    rate_limit_middleware = RateLimitRequestMiddleware()
+    session.middleware(rate_limit_middleware)
     if config.test_mode:
         bot = Bot(
             token=config.test_token.get_secret_value(), default=DefaultBotProperties(parse_mode="HTML"), session=session
@@ -197,6 +231,16 @@ async def main():
     dp.poll_answer.middleware(DbSessionMiddleware(db_pool))
     dp.message_reaction.middleware(DbSessionMiddleware(db_pool))
 
+    async_db_middleware = AsyncDbSessionMiddleware(async_db_pool)
+    dp.message.middleware(async_db_middleware)
+    dp.callback_query.middleware(async_db_middleware)
+    dp.inline_query.middleware(async_db_middleware)
+    dp.chat_member.middleware(async_db_middleware)
+    dp.channel_post.middleware(async_db_middleware)
+    dp.edited_channel_post.middleware(async_db_middleware)
+    dp.poll_answer.middleware(async_db_middleware)
+    dp.message_reaction.middleware(async_db_middleware)
+
     dp.message.middleware(app_context_middleware)
     dp.callback_query.middleware(app_context_middleware)
     dp.inline_query.middleware(app_context_middleware)
@@ -220,6 +264,7 @@ async def main():
     dp.message.middleware(EmojiReactionMiddleware())
 
     dp["dbsession_pool"] = db_pool
+    dp["async_session_pool"] = async_db_pool
     dp["app_context"] = app_context_middleware.app_context
 
     # Update global singleton for modules that import app_context directly
@@ -227,14 +272,49 @@ async def main():
 
     app_context_module.app_context = app_context_middleware.app_context
 
-    global_tasks.append(asyncio.create_task(load_globals(db_pool(), bot, app_context_middleware.app_context)))
+    app_context_middleware.app_context.init_bot_user_writer(async_db_pool)
+    horizon_client = app_context_middleware.app_context.init_horizon_client()
+    await app_context_middleware.app_context.config_service.start_invalidation_listener(redis)
+    global_tasks.append(asyncio.create_task(load_globals(async_db_pool, bot, app_context_middleware.app_context)))
 
-    # Start health server for Docker healthcheck
-    _health_runner = await start_health_server(app_context_middleware.app_context.bot_state_service)
+    # t_message outbox sender (replaces the 10-second polling job)
+    app_context_middleware.app_context.init_outbox_dispatcher(bot, async_db_pool)
+    outbox_dispatcher = app_context_middleware.app_context.outbox_dispatcher
+    if not config.test_mode:
+        await outbox_dispatcher.start()
 
-    # Initialize and start Stellar notification service
-    app_context_middleware.app_context.init_stellar_notification_service(bot, db_pool)
+    # CAS/LOLS lookups share one HTTP pool and a Redis verdict cache
+    spam_reputation = app_context_middleware.app_context.init_spam_reputation(redis)
+
+    # Deferred deletes (sleep_and_delete) persisted in Redis and sent as bulk deleteMessages
+    deferred_delete = app_context_middleware.app_context.init_deferred_delete(bot, redis)
+    await deferred_delete.start()
+
+    # Stellar notification service: webhooks queued for workers, dedup in Redis, outbox via the async pool
+    app_context_middleware.app_context.init_stellar_notification_service(bot, async_db_pool, redis)
     stellar_service = app_context_middleware.app_context.stellar_notification_service
+
+    # decode_xdr renders large envelopes in worker processes; spawn them before the first one arrives
+    xdr_decoder = get_xdr_decoder()
+    if not config.test_mode:
+        xdr_decoder.start()
+
+    # Start health server for Docker healthcheck
+    metrics = {
+        "outbox": outbox_dispatcher.get_metrics,
+        "telegram_rate_limit": rate_limit_middleware.limiter.get_metrics,
+        "horizon": horizon_client.get_metrics,
+        "deferred_delete": deferred_delete.get_metrics,
+        "spam_reputation": spam_reputation.get_metrics,
+        "spam_verdicts": get_spam_verdict_cache().get_metrics,
+        "grist_names": get_account_name_resolver().get_metrics,
+        "xdr_decoder": xdr_decoder.get_metrics,
+    }
+    if stellar_service:
+        metrics["stellar_webhooks"] = stellar_service.get_metrics
+    _health_runner = await start_health_server(app_context_middleware.app_context.bot_state_service, metrics=metrics)
+
+    # Start Stellar notification service
     if stellar_service:
         await stellar_service.start_server()
         if not config.test_mode:
@@ -264,11 +344,13 @@ async def main():
     await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
 
 
-async def load_globals(session: Session, bot: Bot, app_context):
-    users = ChatsRepository(session).load_bot_users()
+async def load_globals(async_session_pool: async_sessionmaker[AsyncSession], bot: Bot, app_context):
+    async with async_session_pool() as session:
+        users = await AsyncChatsRepository(session).load_bot_users()
     if app_context and app_context.spam_status_service:
         try:
             app_context.spam_status_service.preload_statuses({user.user_id: user.user_type for user in users})
+            app_context.spam_status_service.preload_usernames({user.user_id: user.user_name for user in users})
         except ValueError as e:
             logger.warning(f"spam_status_service preload failed: {e}")
     with suppress(TelegramBadRequest):
@@ -277,9 +359,15 @@ async def load_globals(session: Session, bot: Bot, app_context):
 
 def add_bot_users(session: Session, user_id: int, username: str | None, new_user_type: int = 0):
     """Добавляет или обновляет пользователя в списке с логированием"""
-    try:
-        from services import app_context as app_context_module
+    from services import app_context as app_context_module
 
+    # Write-behind path: coalesced and flushed in batches, no DB round-trip here
+    bot_user_writer = getattr(app_context_module.app_context, "bot_user_writer", None)
+    if bot_user_writer is not None:
+        bot_user_writer.add(user_id, username, new_user_type)
+        return
+
+    try:
         if app_context_module.app_context and app_context_module.app_context.spam_status_service:
             app_context_module.app_context.spam_status_service.preload_statuses({user_id: new_user_type})
     except Exception as e:
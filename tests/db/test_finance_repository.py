@@ -0,0 +1,169 @@
+import importlib.util
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+import sqlalchemy as sa
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from db.repositories.finance import FinanceRepository
+from shared.infrastructure.database.models import TOperations
+
+DAY = date(2026, 10, 1)
+CODES = [f"TOK{n}" for n in range(40)]
+OPERATIONS = ["account_credited", "account_debited", "trade", "trustline_created", "payment"]
+
+
+@pytest.fixture
+def session():
+    """t_operations seeded with 8000 rows over 40 assets and 8 days, with planner statistics."""
+    engine = create_engine("sqlite:///:memory:")
+    TOperations.__table__.create(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            TOperations.__table__.insert(),
+            [
+                {
+                    "id": f"{n:012d}-1",
+                    "dt": datetime.combine(DAY, datetime.min.time()) - timedelta(hours=n // 40),
+                    "operation": OPERATIONS[n % len(OPERATIONS)],
+                    "amount1": Decimal(n % 1000) / 10,
+                    "code1": CODES[n % len(CODES)],
+                    "amount2": Decimal(n % 777) / 10,
+                    "code2": "EURMTL" if n % 3 else CODES[(n + 1) % len(CODES)],
+                    "for_account": f"G{n % 50}",
+                }
+                for n in range(8000)
+            ],
+        )
+        connection.exec_driver_sql("ANALYZE")
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _plans(session, call) -> list[str]:
+    """EXPLAIN QUERY PLAN of every statement ``call`` runs."""
+    statements = []
+
+    def capture(connection, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(session.bind, "before_cursor_execute", capture)
+    try:
+        call()
+    finally:
+        event.remove(session.bind, "before_cursor_execute", capture)
+    return [
+        " | ".join(row[3] for row in session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", params))
+        for statement, params in statements
+    ]
+
+
+def test_operations_by_asset_uses_code_dt_indexes(session):
+    repo = FinanceRepository(session)
+
+    [plan] = _plans(session, lambda: repo.get_operations_by_asset("TOK7", DAY - timedelta(days=3)))
+
+    assert "ix_t_operations_code1_dt (code1=? AND dt>? AND dt<?)" in plan
+    assert "ix_t_operations_code2_dt (code2=? AND dt>? AND dt<?)" in plan
+    assert "SCAN t_operations" not in plan
+
+
+def test_new_effects_for_token_walk_code_dt_indexes(session):
+    repo = FinanceRepository(session)
+
+    # Primary key lookup of the last seen operation, then the query itself
+    [_, plan] = _plans(session, lambda: repo.get_new_effects_for_token("TOK7", "000000007000-1", 50))
+
+    assert "ix_t_operations_code1_dt (code1=? AND dt>?)" in plan
+    assert "ix_t_operations_code2_dt (code2=? AND dt>?)" in plan
+    assert "SCAN t_operations" not in plan
+
+
+def test_last_trade_operation_walks_code_dt_index_per_side(session):
+    repo = FinanceRepository(session)
+
+    plans = _plans(session, lambda: repo.get_last_trade_operation("TOK7", 10))
+
+    assert len(plans) == 2
+    for plan in plans:
+        assert plan.startswith("SEARCH t_operations USING INDEX ix_t_operations_code")
+        assert "TEMP B-TREE" not in plan
+
+
+def test_operations_by_asset_selects_whole_day(session):
+    day = DAY - timedelta(days=3)
+
+    rows = FinanceRepository(session).get_operations_by_asset("TOK7", day)
+
+    assert rows
+    assert all(row.dt.date() == day and "TOK7" in (row.code1, row.code2) for row in rows)
+    assert isinstance(rows[0].amount1, Decimal)
+
+
+def test_amount_filters_compare_numbers(session):
+    for n, (amount1, amount2) in enumerate([("9.5", "19"), ("100", "250")], start=1):
+        session.add(
+            TOperations(
+                id=f"90000000000{n}-1",
+                dt=datetime(2026, 10, 1 + n),
+                operation="trade",
+                amount1=Decimal(amount1),
+                code1="NEW",
+                amount2=Decimal(amount2),
+                code2="EURMTL",
+            )
+        )
+    session.commit()
+    repo = FinanceRepository(session)
+
+    # As strings "9.5" > "10" would hold and "100" > "10" would not
+    assert [row.id for row in repo.get_new_effects_for_token("NEW", "900000000000-1", 10)] == ["900000000002-1"]
+    assert repo.get_last_trade_operation("NEW", 10) == 2.5
+
+
+def test_numeric_amounts_migration_round_trip():
+    engine = create_engine("sqlite:///:memory:")
+    metadata = sa.MetaData()
+    sa.Table(
+        "t_operations",
+        metadata,
+        sa.Column("id", sa.String(32), primary_key=True),
+        sa.Column("dt", sa.DateTime),
+        sa.Column("operation", sa.String(32)),
+        sa.Column("amount1", sa.String(32)),
+        sa.Column("code1", sa.String(64)),
+        sa.Column("amount2", sa.String(32)),
+        sa.Column("code2", sa.String(64)),
+    )
+    metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO t_operations (id, dt, operation, amount1, code1, amount2, code2) "
+            "VALUES ('1-1', '2026-10-01 10:00:00', 'trade', '12.5000000', 'MTL', '3.0000001', 'EURMTL')"
+        )
+    path = Path(__file__).parents[2] / (
+        "shared/infrastructure/database/alembic/versions/9a7d3e51c0b2_t_operations_numeric_amounts.py"
+    )
+    spec = importlib.util.spec_from_file_location("numeric_amounts_migration", path)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+
+    with engine.begin() as connection:
+        with Operations.context(MigrationContext.configure(connection)):
+            migration.upgrade()
+    indexes = {index["name"] for index in sa.inspect(engine).get_indexes("t_operations")}
+    assert indexes == set(migration.INDEXES)
+    amounts = sa.table("t_operations", sa.column("amount1", sa.Numeric(20, 7)), sa.column("amount2", sa.Numeric(20, 7)))
+    with engine.connect() as connection:
+        assert connection.execute(sa.select(amounts)).one() == (Decimal("12.5"), Decimal("3.0000001"))
+
+    with engine.begin() as connection:
+        with Operations.context(MigrationContext.configure(connection)):
+            migration.downgrade()
+    assert sa.inspect(engine).get_indexes("t_operations") == []
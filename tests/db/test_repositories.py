@@ -1,11 +1,18 @@
+import importlib.util
 import json
+from pathlib import Path
+
 import pytest
-from sqlalchemy import create_engine
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
-from shared.infrastructure.database.models import Base, Chat, ChatMember, BotUsers
+from shared.infrastructure.database.models import Base, BotConfig, Chat, ChatMember, BotUsers
 from db.repositories.config import ConfigRepository
+from db.repositories.config_entries import ConfigEntriesRepository, entries_to_list, list_to_entries
 from db.repositories.chats import ChatsRepository
 from other.pyro_tools import GroupMember
+from other.constants import BotValueTypes
 from datetime import datetime
 
 # --- Fixtures ---
@@ -72,6 +79,23 @@ def test_json_handling(db_session):
     assert json.loads(loaded_value) == json_value
 
 
+def test_bulk_config_loaders(db_session):
+    repo = ConfigRepository(db_session)
+    repo.save_bot_value(1, BotValueTypes.Captcha, "1")
+    repo.save_bot_value(1, BotValueTypes.EntryChannel, "@channel")
+    repo.save_bot_value(2, BotValueTypes.Captcha, json.dumps([1, 2]))
+    db_session.commit()
+
+    assert repo.load_chat_values(1) == {BotValueTypes.Captcha.value: "1", BotValueTypes.EntryChannel.value: "@channel"}
+    assert repo.load_chat_values(3) == {}
+    assert repo.load_key_values(BotValueTypes.Captcha) == {1: "1", 2: "[1, 2]"}
+    assert repo.load_all_values() == {
+        1: {BotValueTypes.Captcha.value: "1", BotValueTypes.EntryChannel.value: "@channel"},
+        2: {BotValueTypes.Captcha.value: "[1, 2]"},
+    }
+    assert repo.load_key_values(BotValueTypes.Captcha)[2] == repo.load_bot_value(2, BotValueTypes.Captcha)
+
+
 def test_dict_value_operations(db_session):
     repo = ConfigRepository(db_session)
     chat_id = 789
@@ -159,6 +183,60 @@ def test_update_chat_info(db_session):
     assert 1 in chat.admins  # Since we didn't process user 1 in second call to remove him or unset admin
 
 
+def test_update_chat_info_restores_left_member_and_keeps_user_name(db_session):
+    repo = ChatsRepository(db_session)
+    chat_id = 1002
+    db_session.add(BotUsers(user_id=3, user_name="known", user_type=2))
+    repo.update_chat_info(chat_id, [GroupMember(user_id=3, username="renamed", full_name="Three", is_admin=False)])
+    db_session.commit()
+
+    repo.remove_user_from_chat(chat_id, 3)
+    db_session.commit()
+
+    repo.update_chat_info(chat_id, [GroupMember(user_id=3, username="renamed", full_name="Three", is_admin=True)])
+    db_session.commit()
+
+    member = db_session.query(ChatMember).filter_by(chat_id=chat_id, user_id=3).one()
+    db_session.refresh(member)
+    assert member.left_at is None
+    assert member.metadata_["is_admin"] is True
+    user = db_session.query(BotUsers).filter_by(user_id=3).one()
+    assert user.user_name == "known"
+    assert user.user_type == 2
+    assert db_session.query(Chat).filter_by(chat_id=chat_id).one().admins == [3]
+
+
+def test_update_chat_info_bulk_skips_unchanged_rows(db_session):
+    repo = ChatsRepository(db_session)
+    chat_id = 1003
+    members = [
+        GroupMember(user_id=user_id, username=f"u{user_id}", full_name=f"User {user_id}", is_admin=user_id % 500 == 0)
+        for user_id in range(1, 2501)
+    ]
+    repo.update_chat_info(chat_id, members)
+    db_session.commit()
+
+    assert db_session.query(ChatMember).filter_by(chat_id=chat_id).count() == 2500
+    assert db_session.query(BotUsers).count() == 2500
+    assert sorted(db_session.query(Chat).filter_by(chat_id=chat_id).one().admins) == [500, 1000, 1500, 2000, 2500]
+
+    statements = []
+    event.listen(db_session.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    repo.update_chat_info(chat_id, members)
+    db_session.commit()
+
+    assert not any(sql.lstrip().upper().startswith("INSERT") for sql in statements)
+
+    members[0] = GroupMember(user_id=1, username="u1", full_name="User One", is_admin=True)
+    repo.update_chat_info(chat_id, members)
+    db_session.commit()
+
+    member = db_session.query(ChatMember).filter_by(chat_id=chat_id, user_id=1).one()
+    db_session.refresh(member)
+    assert member.metadata_["full_name"] == "User One"
+    assert 1 in db_session.query(Chat).filter_by(chat_id=chat_id).one().admins
+
+
 def test_add_and_remove_user(db_session):
     repo = ChatsRepository(db_session)
     chat_id = 2002
@@ -201,3 +279,78 @@ def test_get_users_joined_last_day(db_session):
     joined = repo.get_users_joined_last_day(chat_id)
     assert len(joined) == 1
     assert joined[0].user_id == 100
+
+
+# --- ConfigEntriesRepository Tests ---
+
+
+def test_config_entries_upsert_delete_and_load_all(db_session):
+    repo = ConfigEntriesRepository(db_session)
+    repo.upsert(BotValueTypes.TopicMutes, "-100-5", "42", {"end_time": "2026-01-01T00:00:00", "user": "@a"})
+    repo.upsert(BotValueTypes.TopicMutes, "-100-5", "43", {"end_time": "2026-01-01T00:00:00", "user": "@b"})
+    repo.upsert(BotValueTypes.TopicMutes, "-100-5", "42", {"end_time": "2027-01-01T00:00:00", "user": "@a"})
+    repo.upsert(BotValueTypes.ChannelLinks, "-1001", "", {"user_id": 7, "username": "owner"})
+    repo.replace_scope(BotValueTypes.TopicAdmins, "-100-5", list_to_entries(["bob", "alice", "bob"]))
+    db_session.commit()
+
+    repo.delete(BotValueTypes.TopicMutes, "-100-5", "43")
+    db_session.commit()
+    entries = repo.load_all()
+
+    assert entries[BotValueTypes.TopicMutes.value] == {
+        "-100-5": {"42": {"end_time": "2027-01-01T00:00:00", "user": "@a"}}
+    }
+    assert entries[BotValueTypes.ChannelLinks.value] == {"-1001": {"": {"user_id": 7, "username": "owner"}}}
+    assert entries_to_list(repo.load_scope(BotValueTypes.TopicAdmins, "-100-5")) == ["bob", "alice"]
+
+
+def test_config_entries_replace_key_drops_stale_scopes(db_session):
+    repo = ConfigEntriesRepository(db_session)
+    repo.replace_key(BotValueTypes.Votes, {"GOLD": {"alice": 2, "NEED": {"50": 2}}, "GOLD2": {"bob": 1}})
+    repo.replace_key(BotValueTypes.Votes, {"GOLD": {"alice": 3, "NEED": {"50": 2}}})
+    db_session.commit()
+
+    assert repo.load_all() == {BotValueTypes.Votes.value: {"GOLD": {"alice": 3, "NEED": {"50": 2}}}}
+
+
+def test_config_entries_migration_moves_blobs_and_back():
+    engine = create_engine("sqlite:///:memory:")
+    BotConfig.__table__.create(engine)
+    path = Path(__file__).parents[2] / "shared/infrastructure/database/alembic/versions/346bd0c0df75_config_entries.py"
+    spec = importlib.util.spec_from_file_location("config_entries_migration", path)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+
+    mutes = {"-100-5": {"42": {"end_time": "2026-01-01T00:00:00", "user": "@a"}}}
+    with engine.begin() as connection:
+        connection.execute(
+            BotConfig.__table__.insert(),
+            [
+                {"chat_id": 0, "chat_key": BotValueTypes.TopicMutes.value, "chat_value": json.dumps(mutes)},
+                {"chat_id": 0, "chat_key": BotValueTypes.TopicAdmins.value, "chat_value": {"-100-5": ["b", "a"]}},
+                {"chat_id": 0, "chat_key": BotValueTypes.Votes.value, "chat_value": {"value": '{"G": {"x": 1}}'}},
+                {"chat_id": 0, "chat_key": BotValueTypes.ChannelLinks.value, "chat_value": {"-1001": 7}},
+                {"chat_id": 0, "chat_key": BotValueTypes.SkynetAdmins.value, "chat_value": '["@admin"]'},
+            ],
+        )
+
+    with engine.begin() as connection:
+        with Operations.context(MigrationContext.configure(connection)):
+            migration.upgrade()
+    with sessionmaker(bind=engine)() as session:
+        entries = ConfigEntriesRepository(session).load_all()
+        assert entries[BotValueTypes.TopicMutes.value] == mutes
+        assert entries_to_list(entries[BotValueTypes.TopicAdmins.value]["-100-5"]) == ["b", "a"]
+        assert entries[BotValueTypes.Votes.value] == {"G": {"x": 1}}
+        assert entries[BotValueTypes.ChannelLinks.value] == {"-1001": {"": 7}}
+        assert ConfigRepository(session).load_bot_value(0, BotValueTypes.TopicMutes, "{}") == "{}"
+        assert ConfigRepository(session).load_bot_value(0, BotValueTypes.SkynetAdmins) == '["@admin"]'
+
+    with engine.begin() as connection:
+        with Operations.context(MigrationContext.configure(connection)):
+            migration.downgrade()
+    with sessionmaker(bind=engine)() as session:
+        repo = ConfigRepository(session)
+        assert json.loads(repo.load_bot_value(0, BotValueTypes.TopicMutes)) == mutes
+        assert json.loads(repo.load_bot_value(0, BotValueTypes.TopicAdmins)) == {"-100-5": ["b", "a"]}
+        assert json.loads(repo.load_bot_value(0, BotValueTypes.ChannelLinks)) == {"-1001": 7}
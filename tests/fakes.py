@@ -1,5 +1,7 @@
+import asyncio
 import inspect
 from contextlib import suppress
+from types import SimpleNamespace
 
 from other.aiogram_tools import add_text, answer_text_file, multi_answer, multi_reply
 from services.bot_state_service import BotStateService
@@ -94,6 +96,21 @@ class FakeSyncMethod:
         assert self.call_count == 0, f"Expected 0 calls, got {self.call_count}"
 
 
+class FakeClock:
+    """Monotonic clock whose sleep() advances time instead of waiting; concurrent sleeps add up."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        # Let tasks woken so far read the clock before it moves on
+        await asyncio.sleep(0)
+        self.now += seconds
+
+
 class FakeBotConfig:
     """Fake BotConfig model for testing."""
 
@@ -172,6 +189,9 @@ class FakeSession:
     ConfigRepository and ChatsRepository operations.
     """
 
+    # Dialect used to build upserts (ConfigEntriesRepository); their statements are not stored
+    bind = SimpleNamespace(dialect=SimpleNamespace(name="sqlite"))
+
     def __init__(self):
         self.committed = False
         self.rolled_back = False
@@ -623,6 +643,15 @@ class FakeConfigService:
         """Synchronous load_value for DI service interface."""
         return self._bot_values.get((chat_id, key), default)
 
+    def apply_value(self, chat_id, key, value):
+        if value is None:
+            self._bot_values.pop((chat_id, key), None)
+        else:
+            self._bot_values[(chat_id, key)] = value
+
+    def warm_cache(self):
+        return 0
+
 
 class FakeAIService:
     def __init__(self):
@@ -650,9 +679,23 @@ class FakeAntispamService:
         self.check_spam = FakeAsyncMethod(return_value=False)
         self.combo_check_spammer = FakeAsyncMethod(return_value=False)
         self.lols_check_spammer = FakeAsyncMethod(return_value=False)
+        self.check_reputation = FakeAsyncMethod(side_effect=self._check_reputation)
+        self.check_reputation_many = FakeAsyncMethod(side_effect=self._check_reputation_many)
         self.delete_and_log_spam = FakeAsyncMethod(return_value=True)
         self.set_vote = FakeAsyncMethod(return_value=True)
 
+    async def _check_reputation(self, user_id):
+        from other.spam_reputation import ReputationVerdict
+
+        return ReputationVerdict(
+            user_id,
+            cas=bool(await self.combo_check_spammer(user_id)),
+            lols=bool(await self.lols_check_spammer(user_id)),
+        )
+
+    async def _check_reputation_many(self, user_ids):
+        return {user_id: await self._check_reputation(user_id) for user_id in user_ids}
+
 
 class FakePollServiceMethod:
     """Wrapper to track method calls with .called property and optional return_value override."""
@@ -915,6 +958,9 @@ class FakeFeatureFlagsService:
     def __init__(self):
         self._features = {}  # chat_id -> {feature -> bool}
 
+    def warm_cache(self):
+        return len(self._features)
+
     def is_enabled(self, chat_id, feature):
         if feature not in self.FEATURE_KEYS:
             return False
@@ -1314,6 +1360,7 @@ class FakeSpamStatusService:
 
         self._cache: dict = {}  # user_id -> SpamStatus
         self._name_cache: dict = {}
+        self._username_cache: dict = {}
         self.SpamStatus = SpamStatus
 
     def get_status(self, user_id: int):
@@ -1372,6 +1419,18 @@ class FakeSpamStatusService:
         for user_id, status in statuses.items():
             self._cache[user_id] = SpamStatus(status)
 
+    def get_cached_status(self, user_id: int):
+        return self._cache.get(user_id)
+
+    def cache_username(self, user_id: int, username: str) -> None:
+        self._username_cache[user_id] = username
+
+    def get_cached_username(self, user_id: int):
+        return self._username_cache.get(user_id)
+
+    def preload_usernames(self, usernames: dict) -> None:
+        self._username_cache.update({user_id: name for user_id, name in usernames.items() if name})
+
     def get_cached_count(self) -> int:
         return len(self._cache)
 
@@ -1637,6 +1696,20 @@ class FakeConfigRepositoryProtocol:
         key = self._normalize_key(chat_key)
         return [k[0] for k in self.config.keys() if k[1] == key]
 
+    def load_chat_values(self, chat_id: int):
+        return {k[1]: v for k, v in self.config.items() if k[0] == chat_id and v is not None}
+
+    def load_key_values(self, chat_key):
+        key = self._normalize_key(chat_key)
+        return {k[0]: v for k, v in self.config.items() if k[1] == key and v is not None}
+
+    def load_all_values(self):
+        snapshot = {}
+        for (chat_id, key), value in self.config.items():
+            if value is not None:
+                snapshot.setdefault(chat_id, {})[key] = value
+        return snapshot
+
 
 class FakeChatsRepositoryProtocol:
     """Fake implementation of IChatsRepository Protocol."""
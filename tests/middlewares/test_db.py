@@ -0,0 +1,98 @@
+from aiogram import Router, types
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from middlewares.db import AsyncDbSessionMiddleware, DbSessionMiddleware
+from tests.conftest import create_message_update
+from tests.fakes import FakeSession
+
+
+class CountingPool:
+    """Sync session pool that records how many sessions were opened."""
+
+    def __init__(self):
+        self.opened = 0
+        self.sessions = []
+
+    def __call__(self):
+        self.opened += 1
+        session = FakeSession()
+        self.sessions.append(session)
+        return self
+
+    def __enter__(self):
+        return self.sessions[-1]
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class CountingAsyncPool:
+    def __init__(self):
+        self.opened = 0
+
+    def __call__(self):
+        self.opened += 1
+        return self
+
+    async def __aenter__(self):
+        return _FakeAsyncSession()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class _FakeAsyncSession:
+    committed = False
+
+    async def commit(self):
+        self.committed = True
+
+
+async def test_session_opened_only_for_handlers_that_declare_it(router_bot, dp):
+    pool = CountingPool()
+    seen = {}
+    router = Router()
+
+    @router.message(lambda m: m.text == "/db")
+    async def with_session(message: types.Message, session):
+        seen["session"] = session
+
+    @router.message()
+    async def without_session(message: types.Message):
+        seen["plain"] = True
+
+    dp.include_router(router)
+    dp.message.middleware(DbSessionMiddleware(pool))
+
+    await dp.feed_update(router_bot, create_message_update(1, "hello"))
+    assert seen == {"plain": True}
+    assert pool.opened == 0
+
+    await dp.feed_update(router_bot, create_message_update(1, "/db"))
+    assert pool.opened == 1
+    assert seen["session"] is pool.sessions[0]
+    assert pool.sessions[0].committed is True
+
+
+async def test_async_session_injected_only_when_declared(router_bot, dp):
+    pool = CountingAsyncPool()
+    seen = {}
+    router = Router()
+
+    @router.message(lambda m: m.text == "/async")
+    async def with_async_session(message: types.Message, async_session: AsyncSession):
+        seen["async_session"] = async_session
+
+    @router.message()
+    async def without_session(message: types.Message):
+        seen["plain"] = True
+
+    dp.include_router(router)
+    dp.message.middleware(AsyncDbSessionMiddleware(pool))
+
+    await dp.feed_update(router_bot, create_message_update(1, "hello"))
+    assert pool.opened == 0
+
+    await dp.feed_update(router_bot, create_message_update(1, "/async"))
+    assert pool.opened == 1
+    assert seen["async_session"].committed is True
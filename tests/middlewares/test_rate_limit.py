@@ -0,0 +1,91 @@
+import pytest
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.exceptions import TelegramRetryAfter
+
+from middlewares.rate_limit import RateLimitRequestMiddleware
+from services.telegram_rate_limiter import TelegramRateLimiter
+from tests.conftest import TEST_BOT_TOKEN
+from tests.fakes import FakeClock
+
+
+@pytest.fixture
+async def limited_bot(mock_telegram):
+    clock = FakeClock()
+    limiter = TelegramRateLimiter(
+        global_rate=1000.0, private_rate=10.0, group_rate=0.01, group_burst=1.0, clock=clock, sleep=clock.sleep
+    )
+    session = AiohttpSession(api=TelegramAPIServer.from_base(mock_telegram.base_url))
+    session.middleware(RateLimitRequestMiddleware(limiter))
+    bot = Bot(token=TEST_BOT_TOKEN, session=session)
+    yield bot, limiter, clock
+    await bot.session.close()
+
+
+@pytest.mark.asyncio
+async def test_private_chat_sends_are_spaced(mock_telegram, limited_bot):
+    bot, limiter, clock = limited_bot
+
+    started = clock.now
+    for i in range(3):
+        await bot.send_message(chat_id=555, text=f"msg {i}")
+
+    assert clock.now - started == pytest.approx(0.2)
+    assert [r["data"]["text"] for r in mock_telegram.get_requests()] == ["msg 0", "msg 1", "msg 2"]
+    assert limiter.get_metrics()["wait_seconds"]["normal"]["count"] == 3
+
+
+@pytest.mark.asyncio
+async def test_moderation_and_reads_bypass_chat_bucket(mock_telegram, limited_bot):
+    bot, limiter, clock = limited_bot
+    mock_telegram.add_response("deleteMessage", {"ok": True, "result": True})
+
+    await bot.send_message(chat_id=-100123, text="first")
+    # The group bucket is empty for ~100s now; deletes and reads must not wait for it
+    started = clock.now
+    await bot.delete_message(chat_id=-100123, message_id=1)
+    await bot.delete_message(chat_id=-100123, message_id=2)
+    await bot.get_me()
+
+    assert clock.now == started
+    metrics = limiter.get_metrics()["wait_seconds"]
+    assert metrics["high"]["count"] == 2
+    assert metrics["normal"]["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_chat_action_does_not_use_message_tokens(mock_telegram, limited_bot):
+    bot, limiter, clock = limited_bot
+    mock_telegram.add_response("sendChatAction", {"ok": True, "result": True})
+
+    started = clock.now
+    await bot.send_chat_action(chat_id=-100123, action="typing")
+    await bot.send_chat_action(chat_id=-100123, action="typing")
+    await bot.send_message(chat_id=-100123, text="answer")
+
+    # The one-message group burst is still there for the reply
+    assert clock.now == started
+    assert limiter.get_metrics()["wait_seconds"]["normal"]["count"] == 3
+
+
+@pytest.mark.asyncio
+async def test_retry_after_pauses_chat(mock_telegram, limited_bot):
+    bot, limiter, clock = limited_bot
+    mock_telegram.add_response(
+        "sendMessage",
+        {
+            "ok": False,
+            "error_code": 429,
+            "description": "Too Many Requests: retry after 1",
+            "parameters": {"retry_after": 1},
+        },
+    )
+
+    with pytest.raises(TelegramRetryAfter):
+        await bot.send_message(chat_id=777, text="flood")
+
+    mock_telegram.custom_responses.pop("sendMessage")
+    started = clock.now
+    await bot.send_message(chat_id=777, text="after pause")
+    assert clock.now - started == pytest.approx(1.0)
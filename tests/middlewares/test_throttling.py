@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+from aiogram import Bot, Dispatcher, Router, types
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from fakeredis import FakeAsyncRedis
+
+from middlewares.throttling import ThrottleManager, Throttled, ThrottlingMiddleware, rate_limit
+from tests.conftest import TEST_BOT_TOKEN, create_message_update
+
+
+class ScriptRedis(FakeAsyncRedis):
+    """fakeredis with Lua: runs the real THROTTLE_SCRIPT and counts script runs (the one-off NOSCRIPT miss aside)."""
+
+    script_calls = 0
+
+    async def evalsha(self, *args, **kwargs):
+        result = await super().evalsha(*args, **kwargs)
+        self.script_calls += 1
+        return result
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("middlewares.throttling.time.time", lambda: now[0])
+    return now
+
+
+@pytest.mark.asyncio
+async def test_throttle_single_round_trip_with_ttl(clock):
+    redis = ScriptRedis()
+    manager = ThrottleManager(redis)
+
+    assert await manager.throttle("links", rate=5, user_id=1, chat_id=2) is True
+    clock[0] += 2
+    with pytest.raises(Throttled) as exc:
+        await manager.throttle("links", rate=5, user_id=1, chat_id=2)
+    assert exc.value.rate - exc.value.delta == pytest.approx(3)
+    assert exc.value.exceeded_count == 1
+
+    clock[0] += 3
+    assert await manager.throttle("links", rate=5, user_id=1, chat_id=2) is True
+
+    assert redis.script_calls == 3
+    assert await redis.hgetall("throttle_links_1_2") == {b"tat": b"1010", b"exceeded": b"0"}
+    assert 5000 < await redis.pttl("throttle_links_1_2") <= 6000
+
+
+@pytest.mark.asyncio
+async def test_throttle_rate_zero_skips_redis():
+    redis = ScriptRedis()
+
+    assert await ThrottleManager(redis).throttle("listen", rate=0, chat_id=2) is True
+    assert redis.script_calls == 0
+
+
+@pytest.mark.asyncio
+async def test_middleware_fast_path_and_throttled_answer(mock_telegram, dp: Dispatcher, clock):
+    session = AiohttpSession(api=TelegramAPIServer.from_base(mock_telegram.base_url))
+    bot = Bot(token=TEST_BOT_TOKEN, session=session)
+    redis = ScriptRedis()
+    router = Router()
+    handled = []
+
+    @router.message(lambda m: m.text == "listen")
+    @rate_limit(0, "listen")
+    async def listen(message: types.Message):
+        handled.append("listen")
+
+    @router.message()
+    @rate_limit(5, "links")
+    async def links(message: types.Message):
+        handled.append("links")
+
+    dp.include_router(router)
+    dp.message.middleware(ThrottlingMiddleware(redis=redis))
+
+    for text in ("listen", "listen", "link", "link"):
+        await dp.feed_update(bot=bot, update=create_message_update(user_id=42, text=text))
+    await asyncio.sleep(0.01)
+
+    assert handled == ["listen", "listen", "links"]
+    assert redis.script_calls == 2
+    answers = [r for r in mock_telegram.get_requests() if r["method"] == "sendMessage"]
+    assert len(answers) == 1
+    assert "Try again in 5.00 seconds" in answers[0]["data"]["text"]
+
+    await bot.session.close()
@@ -0,0 +1,189 @@
+import base64
+import types
+
+import pytest
+
+import other.stellar.voting_utils as voting_utils
+from other.stellar.constants import MTLAddresses, MTLAssets
+from other.stellar.delegation import DelegationGraph, fetch_missing_delegates
+
+
+def _data(key, account_id):
+    return {key: base64.b64encode(account_id.encode()).decode()}
+
+
+def _mtlap_account(account_id, vote, delegate=None):
+    return {
+        "id": account_id,
+        "account_id": account_id,
+        "data": _data("mtla_a_delegate", delegate) if delegate else {},
+        "balances": [
+            {
+                "asset_type": "credit_alphanum12",
+                "asset_code": MTLAssets.mtlap_asset.code,
+                "asset_issuer": MTLAssets.mtlap_asset.issuer,
+                "balance": f"{vote}.0000000",
+            }
+        ],
+    }
+
+
+def _rect_account(account_id, rect, delegate=None):
+    return {
+        "account_id": account_id,
+        "data": _data("delegate", delegate) if delegate else {},
+        "balances": [
+            {
+                "asset_type": "credit_alphanum12",
+                "asset_code": "MTLRECT",
+                "asset_issuer": MTLAddresses.public_issuer,
+                "balance": f"{rect}.0000000",
+            }
+        ],
+    }
+
+
+def test_chains_resolve_to_roots():
+    graph = DelegationGraph({"A": "B", "B": "C", "C": None, "D": "C", "E": "X", "F": None})
+
+    assert graph.root_of("A") == "C"
+    assert graph.chain("A") == ["A", "B", "C"]
+    assert graph.tree() == {"C": ["A", "B", "D"]}
+    assert graph.resolved() == {"A": "C", "B": "C", "D": "C"}
+    # Delegation to an unknown account is ignored
+    assert graph.root_of("E") == "E"
+    assert graph.missing == {"X"}
+    assert graph.broken == []
+
+
+def test_cycles_are_broken_at_the_closing_node():
+    graph = DelegationGraph({"A": "B", "B": "C", "C": "B", "S": "S", "T": "S"})
+
+    assert graph.broken == ["C", "S"]
+    assert graph.delegate_of("C") is None
+    assert graph.delegate_of("B") == "C"
+    assert graph.tree() == {"C": ["A", "B"], "S": ["T"]}
+    assert graph.delegators("B") == []
+
+
+def test_long_chain_is_resolved_without_recursion():
+    count = 100_000
+    graph = DelegationGraph({f"N{n}": f"N{n + 1}" if n + 1 < count else None for n in range(count)})
+
+    assert graph.root_of("N0") == f"N{count - 1}"
+    assert len(graph.delegators(f"N{count - 1}")) == count - 1
+
+
+async def test_missing_delegates_are_fetched_in_concurrent_rounds():
+    remote = {"B": {"delegate": "C"}, "C": {"delegate": None}, "D": {"delegate": "C"}}
+    calls = []
+
+    async def fetch(account_id):
+        calls.append(account_id)
+        return remote.get(account_id)
+
+    nodes = {"A": {"delegate": "B"}, "E": {"delegate": "D"}, "G": {"delegate": "GONE"}}
+    unavailable = await fetch_missing_delegates(nodes, lambda node: node["delegate"], fetch)
+
+    assert unavailable == {"GONE"}
+    assert set(nodes) == {"A", "E", "G", "B", "C", "D"}
+    # B, D and GONE in the first round, C (delegate of both) once in the second
+    assert sorted(calls[:3]) == ["B", "D", "GONE"]
+    assert calls[3:] == ["C"]
+
+
+@pytest.fixture
+def mtlap_holders(monkeypatch):
+    holders = [
+        _mtlap_account("A", 1, delegate="B"),
+        _mtlap_account("B", 1, delegate="C"),
+        _mtlap_account("D", 5, delegate="C"),
+        _mtlap_account("E", 3),
+        _mtlap_account("F", 1),
+        _mtlap_account("L1", 2, delegate="L2"),
+        _mtlap_account("L2", 1, delegate="L1"),
+    ]
+    remote = {"C": {"id": "C", "data": {}, "balances": []}}
+
+    async def fake_get_holders(asset):
+        return holders
+
+    async def fake_get_account(account_id):
+        return remote.get(account_id, {"type": "not_found"})
+
+    monkeypatch.setattr(voting_utils, "stellar_get_holders", fake_get_holders)
+    monkeypatch.setattr(voting_utils, "stellar_get_account", fake_get_account)
+
+
+async def test_get_mtlap_votes_resolves_delegation(mtlap_holders):
+    votes = await voting_utils.get_mtlap_votes()
+
+    assert set(votes) == {"C", "D", "E", "L1", "L2"}
+    # C holds no MTLAP but votes for D (5 MTLAP) at the end of A -> B -> C
+    assert votes["C"]["can_vote"]
+    assert votes["C"]["delegated_list"] == ["A", "B", "D"]
+    assert votes["D"]["was_delegate"] == "C"
+    # L2 closes the L1 <-> L2 cycle
+    assert votes["L2"]["delegate"] is None
+    assert votes["L1"]["was_delegate"] == "L2"
+
+
+async def test_vote_list_moves_whole_chains_to_the_final_delegate(monkeypatch):
+    accounts = [
+        _rect_account("GROOT", 1000),
+        _rect_account("GMID", 600, delegate="GROOT"),
+        _rect_account("GLEAF", 700, delegate="GMID"),
+        _rect_account("GLEAF2", 800, delegate="GLEAF"),
+        _rect_account("GSOLO", 900, delegate="GDUST"),
+    ]
+
+    async def fake_load_account(account_id):
+        return types.SimpleNamespace(load_ed25519_public_key_signers=lambda: [])
+
+    async def fake_holders():
+        return accounts
+
+    async def fake_blacklist():
+        return {}
+
+    monkeypatch.setattr(voting_utils, "load_account_async", fake_load_account)
+    monkeypatch.setattr(voting_utils, "stellar_get_all_mtl_holders", fake_holders)
+    monkeypatch.setattr(voting_utils, "cmd_get_blacklist", fake_blacklist)
+
+    delegate_list = {}
+    vote_list = await voting_utils.cmd_gen_mtl_vote_list(delegate_list=delegate_list)
+    by_id = {sh.account_id: sh for sh in vote_list}
+
+    assert by_id["GROOT"].balance_delegated == 600 + 700 + 800
+    assert by_id["GROOT"].balance == 3100
+    assert by_id["GLEAF2"].balance == 0
+    assert by_id["GSOLO"].balance == 900
+    assert delegate_list == {"GMID": "GROOT", "GLEAF": "GROOT", "GLEAF2": "GROOT"}
+
+
+async def test_vote_list_counts_each_chain_balance_once(monkeypatch):
+    # A -> B -> C; the pre-graph three-pass loop gave C 500 + 2600 (B's delegated 1000 counted twice)
+    accounts = [
+        _rect_account("GA", 1000, delegate="GB"),
+        _rect_account("GB", 600, delegate="GC"),
+        _rect_account("GC", 500),
+        _rect_account("GD", 1500),
+    ]
+
+    async def fake_load_account(account_id):
+        return types.SimpleNamespace(load_ed25519_public_key_signers=lambda: [])
+
+    async def fake_holders():
+        return accounts
+
+    async def fake_blacklist():
+        return {}
+
+    monkeypatch.setattr(voting_utils, "load_account_async", fake_load_account)
+    monkeypatch.setattr(voting_utils, "stellar_get_all_mtl_holders", fake_holders)
+    monkeypatch.setattr(voting_utils, "cmd_get_blacklist", fake_blacklist)
+
+    vote_list = await voting_utils.cmd_gen_mtl_vote_list()
+    weights = {sh.account_id: (sh.balance, sh.calculated_votes) for sh in vote_list if sh.account_id.startswith("G")}
+
+    assert weights == {"GC": (2100, 2), "GD": (1500, 2), "GA": (0, 0), "GB": (0, 0)}
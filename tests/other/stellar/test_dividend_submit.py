@@ -0,0 +1,227 @@
+# tests/other/stellar/test_dividend_submit.py
+"""DividendSubmitter against a local fake Horizon: pipelining, retries and resuming."""
+
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from stellar_sdk import Account, Asset, Keypair, TransactionBuilder, TransactionEnvelope
+
+from db.repositories import FinanceRepository
+from other.config_reader import config
+from other.stellar.dividend_submit import FAILED, PENDING, SENT, SIGNED, DividendSubmitError, DividendSubmitter
+from other.stellar.horizon_client import HorizonClient, set_horizon_client
+from other.stellar.sdk_utils import get_network_passphrase
+from shared.infrastructure.database.models import Base, TDivList, TTransaction
+
+SIGNER = Keypair.random()
+SOURCE = SIGNER.public_key
+LIST_ID = 1
+
+
+def _error(status: int, code: str) -> web.Response:
+    body = {"type": "transaction_failed", "title": code, "status": status, "extras": {"result_codes": {}}}
+    if code.startswith("tx_"):
+        body["extras"]["result_codes"]["transaction"] = code
+    return web.json_response(body, status=status)
+
+
+class FakeHorizon:
+    """
+    One source account. A transaction is queued when its sequence follows the last
+    queued one (like stellar-core), otherwise tx_bad_seq; it lands after ``delay``.
+    """
+
+    def __init__(self, sequence: int, delay: float = 0.02):
+        self.sequence = sequence
+        self.queued = sequence
+        self.delay = delay
+        self.ledger: dict[str, dict] = {}
+        self.applied: list[int] = []
+        self.posts = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail_sequences: set[int] = set()
+        self.timeout_after_apply: set[int] = set()
+        self.reject: dict[int, str] = {}
+        self.hang: asyncio.Event | None = None
+
+    async def account(self, request: web.Request) -> web.Response:
+        account_id = request.match_info["account_id"]
+        return web.json_response({"id": account_id, "account_id": account_id, "sequence": str(self.sequence)})
+
+    async def transaction(self, request: web.Request) -> web.Response:
+        record = self.ledger.get(request.match_info["tx_hash"])
+        return web.json_response(record) if record else _error(404, "not_found")
+
+    async def submit(self, request: web.Request) -> web.Response:
+        self.posts += 1
+        envelope = TransactionEnvelope.from_xdr((await request.post())["tx"], get_network_passphrase())
+        sequence, tx_hash = envelope.transaction.sequence, envelope.hash_hex()
+        if sequence in self.reject:
+            return _error(400, self.reject[sequence])
+        if sequence != self.queued + 1:
+            return _error(400, "tx_bad_seq")
+        self.queued = sequence
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            successful = sequence not in self.fail_sequences
+            self.sequence = sequence
+            self.applied.append(sequence)
+            self.ledger[tx_hash] = {"hash": tx_hash, "successful": successful}
+            if self.hang is not None:
+                await self.hang.wait()
+        finally:
+            self.in_flight -= 1
+        if sequence in self.timeout_after_apply:
+            self.timeout_after_apply.discard(sequence)
+            return _error(504, "timeout")
+        if not successful:
+            return _error(400, "tx_failed")
+        return web.json_response(self.ledger[tx_hash])
+
+    def spend_sequence(self) -> None:
+        """Another transaction of the source account lands."""
+        self.sequence += 1
+        self.queued = self.sequence
+
+
+@pytest.fixture
+async def horizon(monkeypatch):
+    fake = FakeHorizon(sequence=1000)
+    app = web.Application()
+    app.router.add_get("/accounts/{account_id}", fake.account)
+    app.router.add_get("/transactions/{tx_hash}", fake.transaction)
+    app.router.add_post("/transactions", fake.submit)
+    server = TestServer(app)
+    await server.start_server()
+    monkeypatch.setattr(config, "stellar_testnet", False)
+    monkeypatch.setattr(config, "horizon_url", str(server.make_url("")).rstrip("/"))
+    client = HorizonClient()
+    set_horizon_client(client)
+    yield fake
+    set_horizon_client(None)
+    await client.shutdown()
+    await server.close()
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine, tables=[TDivList.__table__, TTransaction.__table__])
+    session = sessionmaker(bind=engine)()
+    session.add(TDivList(id=LIST_ID, memo="div", pay_type=0))
+    session.commit()
+    yield session
+    session.close()
+
+
+def _pack(session, count: int) -> list[TTransaction]:
+    """Transactions as cmd_gen_xdr stores them: unsigned, sequence from when they were built."""
+    rows = []
+    for _ in range(count):
+        tb = TransactionBuilder(Account(SOURCE, 1), network_passphrase=get_network_passphrase(), base_fee=100)
+        tb.append_payment_op(destination=Keypair.random().public_key, amount="1", asset=Asset.native())
+        tb.add_text_memo("div").set_timeout(3600)
+        rows.append(TTransaction(xdr=tb.build().to_xdr(), id_div_list=LIST_ID, xdr_id=0))
+    session.add_all(rows)
+    session.commit()
+    return rows
+
+
+def _submitter(session, **kwargs) -> DividendSubmitter:
+    return DividendSubmitter(session, sign_key=SIGNER.secret, retry_delay=0.01, **kwargs)
+
+
+async def test_transactions_are_pipelined_with_local_sequences(horizon, session):
+    rows = _pack(session, 8)
+
+    unsent = await _submitter(session, window=4).run(LIST_ID)
+
+    assert unsent == 0
+    assert [row.was_send for row in rows] == [SENT] * 8
+    assert [row.xdr_id for row in rows] == list(range(1001, 1009))
+    assert horizon.applied == list(range(1001, 1009))
+    assert all(horizon.ledger[row.tx_hash]["successful"] for row in rows)
+    assert horizon.max_in_flight > 1
+
+
+async def test_timeout_after_apply_is_resolved_by_hash_without_resubmitting(horizon, session):
+    rows = _pack(session, 3)
+    horizon.timeout_after_apply = {1002}
+    submitter = _submitter(session, window=1)
+
+    await submitter.run(LIST_ID)
+
+    assert [row.was_send for row in rows] == [SENT] * 3
+    assert horizon.posts == 3
+    assert horizon.applied == [1001, 1002, 1003]
+
+
+async def test_interrupted_run_resumes_without_paying_twice(horizon, session):
+    rows = _pack(session, 6)
+    horizon.hang = asyncio.Event()
+    run = asyncio.create_task(_submitter(session, window=2).run(LIST_ID))
+    while not horizon.applied:
+        await asyncio.sleep(0.01)
+    # The process dies while the first transactions are in the ledger but unconfirmed
+    run.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await run
+    horizon.hang = None
+    session.expire_all()
+    assert {row.was_send for row in rows} <= {PENDING, SIGNED}
+    assert FinanceRepository(session).count_unsent_transactions(LIST_ID) == 6
+
+    unsent = await _submitter(session, window=2).run(LIST_ID)
+
+    assert unsent == 0
+    assert [row.was_send for row in rows] == [SENT] * 6
+    assert horizon.applied == list(range(1001, 1007))
+    assert len(horizon.ledger) == 6
+
+
+async def test_signed_transaction_whose_sequence_was_spent_is_resigned(horizon, session):
+    rows = _pack(session, 2)
+    rows[0].was_send, rows[0].xdr_id, rows[0].tx_hash = SIGNED, 1001, "0" * 64
+    session.commit()
+    horizon.spend_sequence()
+
+    await _submitter(session).run(LIST_ID)
+
+    assert [row.was_send for row in rows] == [SENT, SENT]
+    assert sorted(row.xdr_id for row in rows) == [1002, 1003]
+
+
+async def test_failed_transaction_is_recorded_and_the_rest_are_sent(horizon, session):
+    rows = _pack(session, 3)
+    horizon.fail_sequences = {1002}
+
+    submitter = _submitter(session, window=1)
+
+    unsent = await submitter.run(LIST_ID)
+
+    assert unsent == 0
+    assert [row.was_send for row in rows] == [SENT, FAILED, SENT]
+    assert submitter.failed == 1
+    assert FinanceRepository(session).count_failed_transactions(LIST_ID) == 1
+
+
+async def test_rejected_transaction_stops_the_run_and_stays_resumable(horizon, session):
+    rows = _pack(session, 3)
+    horizon.reject = {1002: "tx_insufficient_fee"}
+
+    with pytest.raises(DividendSubmitError, match="tx_insufficient_fee"):
+        await _submitter(session, window=1).run(LIST_ID)
+
+    assert rows[0].was_send == SENT
+    assert FinanceRepository(session).count_unsent_transactions(LIST_ID) == 2
+
+    horizon.reject = {}
+    assert await _submitter(session, window=1).run(LIST_ID) == 0
+    assert horizon.applied == [1001, 1002, 1003]
@@ -0,0 +1,121 @@
+import json
+import random
+
+import numpy as np
+import pytest
+
+import scripts.mtl_backup as mtl_backup
+from other.stellar.holder_columns import HolderColumns, calculate_holder_statistics, to_stroops
+
+ISSUER = "GACKTN5DAZGWXRWB2WLM6OPBDHAMT6SJNGLJZPQMEZBUR4JUGBX2UK7V"
+
+
+def _balance(code, amount, issuer=ISSUER):
+    return {"asset_type": "credit_alphanum4", "asset_code": code, "asset_issuer": issuer, "balance": f"{amount:.7f}"}
+
+
+def _accounts(count, seed=1):
+    rng = random.Random(seed)
+    accounts = []
+    for n in range(count):
+        balances = [{"asset_type": "native", "balance": f"{rng.uniform(1, 100):.7f}"}]
+        for code in ("MTL", "MTLRECT", "EURMTL", "USDM", "SATSMTL", "MTLAP"):
+            if rng.random() < 0.5:
+                balances.append(_balance(code, rng.choice([0, 0.5, 1, rng.uniform(0, 500)])))
+        if rng.random() < 0.1:
+            balances.append({"asset_type": "liquidity_pool_shares", "liquidity_pool_id": "ab" * 32, "balance": "1.0"})
+        accounts.append({"account_id": f"G{n:055d}", "balances": balances})
+    return accounts
+
+
+def _legacy_statistics(accounts):
+    """The JSON-based calculate_statistics this format replaces."""
+    usdm_count = mtlap_count = satsmtl_count = eurmtl_count = mtl_mtlrect_count = eurmtl_none_zero_count = 0
+    mtl_mtlrect_amounts = []
+    for account in accounts:
+        has_usdm = has_satsmtl = has_eurmtl = False
+        mtl_mtlrect_balance = 0
+        for balance in account.get("balances", []):
+            asset_code = balance.get("asset_code", "")
+            balance_amount = float(balance.get("balance", "0"))
+            if asset_code == "USDM":
+                has_usdm = True
+            elif asset_code == "SATSMTL":
+                has_satsmtl = True
+            elif asset_code == "EURMTL":
+                has_eurmtl = True
+                if balance_amount > 0:
+                    eurmtl_none_zero_count += 1
+            elif asset_code == "MTLAP" and balance_amount > 0:
+                mtlap_count += 1
+            if asset_code in ["MTL", "MTLRECT"]:
+                mtl_mtlrect_balance += balance_amount
+        if mtl_mtlrect_balance > 1:
+            mtl_mtlrect_count += 1
+            mtl_mtlrect_amounts.append(mtl_mtlrect_balance)
+            usdm_count += has_usdm
+            satsmtl_count += has_satsmtl
+            eurmtl_count += has_eurmtl
+    return {
+        "USDM": usdm_count,
+        "SATSMTL": satsmtl_count,
+        "EURMTL": eurmtl_count,
+        "MTL_MTLRECT": mtl_mtlrect_count,
+        "Median": np.median(mtl_mtlrect_amounts) if mtl_mtlrect_amounts else 0,
+        "MTLAP": mtlap_count - 1,
+        "EURMTL_NONE_ZERO": eurmtl_none_zero_count,
+    }
+
+
+def test_to_stroops_is_exact():
+    assert to_stroops("12.3456789") == 123456789
+    assert to_stroops("0.0000001") == 1
+    assert to_stroops("922337203685.4775807") == 9223372036854775807
+    assert to_stroops("5") == 50_000_000
+
+
+def test_statistics_match_json_version(tmp_path):
+    accounts = _accounts(2000)
+    HolderColumns.from_accounts(accounts).save(tmp_path)
+
+    stats = calculate_holder_statistics(HolderColumns.load(tmp_path))
+    legacy = _legacy_statistics(accounts)
+
+    assert stats.pop("Median") == pytest.approx(legacy.pop("Median"))
+    assert stats == legacy
+    # Plain Python numbers, ready for the Sheets batch body
+    assert json.dumps(stats)
+
+
+def test_load_is_memory_mapped_and_counts_holders(tmp_path):
+    accounts = [
+        {"account_id": "GA", "balances": [_balance("MTL", 10), _balance("EURMTL", 0)]},
+        {"account_id": "GB", "balances": [_balance("MTL", 2), {"asset_type": "native", "balance": "1.5000000"}]},
+    ]
+    HolderColumns.from_accounts(accounts).save(tmp_path)
+
+    columns = HolderColumns.load(tmp_path)
+
+    assert isinstance(columns.stroops, np.memmap)
+    assert columns.per_asset_holders() == {f"MTL:{ISSUER}": 2, f"EURMTL:{ISSUER}": 0, "native": 1}
+    assert columns.balances_by_code("MTL").tolist() == [10.0, 2.0]
+
+
+async def test_save_assets_writes_columns_and_optional_json(tmp_path, monkeypatch):
+    accounts = _accounts(50)
+
+    async def fetch_holders(*assets):
+        return accounts
+
+    monkeypatch.setattr(mtl_backup, "fetch_holders", fetch_holders)
+    monkeypatch.setattr(mtl_backup, "start_path", str(tmp_path))
+
+    await mtl_backup.save_assets([], json_export=False)
+    backup = tmp_path / "backup"
+    assert not list(backup.glob("*.json"))
+    assert HolderColumns.load(backup / "holders.last").account_ids.astype(str).tolist() == [
+        a["account_id"] for a in accounts
+    ]
+
+    await mtl_backup.save_assets([], json_export=True)
+    assert json.loads((backup / "all.last.json").read_text()) == accounts
@@ -0,0 +1,229 @@
+# tests/other/stellar/test_holder_snapshot.py
+import asyncio
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from stellar_sdk import Asset, Keypair
+
+from other.config_reader import config
+from other.stellar import dividend_calc, dividend_commands
+from other.stellar.constants import MTLAddresses, MTLAssets
+from other.stellar.holder_snapshot import (
+    HolderBalances,
+    HolderSnapshot,
+    HolderSnapshotStore,
+    PoolReserves,
+    set_holder_snapshot_store,
+)
+from other.stellar.horizon_client import HorizonClient, set_horizon_client
+
+ISSUER = Keypair.random().public_key
+ASSET_A = Asset("AAA", ISSUER)
+OTHER = Asset("XLMX", Keypair.random().public_key)
+POOL_ID = "ab" * 32
+
+
+def _record(account_id: str, balance: str, pool_shares: str | None = None) -> dict:
+    balances = [
+        {"asset_type": "native", "balance": "5.0000000"},
+        {"asset_type": "credit_alphanum4", "asset_code": "AAA", "asset_issuer": ISSUER, "balance": balance},
+    ]
+    if pool_shares:
+        balances.append({"asset_type": "liquidity_pool_shares", "liquidity_pool_id": POOL_ID, "balance": pool_shares})
+    return {
+        "account_id": account_id,
+        "paging_token": account_id,
+        "balances": balances,
+        "data": {"mtl_donate": "MQ=="},
+    }
+
+
+class SnapshotHorizon:
+    """Serves /, /accounts?asset=... and /liquidity_pools?reserves=... like Horizon."""
+
+    def __init__(self, holders: list[dict]):
+        self.holders = sorted(holders, key=lambda r: r["paging_token"])
+        self.account_requests = 0
+
+    async def root(self, request: web.Request) -> web.Response:
+        return web.json_response({"history_latest_ledger": 1000})
+
+    async def accounts(self, request: web.Request) -> web.Response:
+        self.account_requests += 1
+        await asyncio.sleep(0.01)
+        cursor = request.query.get("cursor", "")
+        records = [r for r in self.holders if r["paging_token"] > cursor][: int(request.query.get("limit", 10))]
+        next_cursor = records[-1]["paging_token"] if records else cursor
+        next_href = f"{request.url.origin()}/accounts?asset={request.query['asset']}&cursor={next_cursor}"
+        return web.json_response({"_embedded": {"records": records}, "_links": {"next": {"href": next_href}}})
+
+    async def liquidity_pools(self, request: web.Request) -> web.Response:
+        pool = {
+            "id": POOL_ID,
+            "paging_token": POOL_ID,
+            "total_shares": "100.0000000",
+            "reserves": [
+                {"asset": f"AAA:{ISSUER}", "amount": "50.0000000"},
+                {"asset": f"{OTHER.code}:{OTHER.issuer}", "amount": "20.0000000"},
+            ],
+        }
+        records = [] if request.query.get("cursor") else [pool]
+        next_href = f"{request.url.origin()}/liquidity_pools?reserves={request.query['reserves']}&cursor={POOL_ID}"
+        return web.json_response({"_embedded": {"records": records}, "_links": {"next": {"href": next_href}}})
+
+
+@pytest.fixture
+async def snapshot_horizon(monkeypatch):
+    accounts = sorted(Keypair.random().public_key for _ in range(3))
+    horizon = SnapshotHorizon(
+        [
+            _record(accounts[0], "10.0000000"),
+            _record(accounts[1], "2.5000000", pool_shares="40.0000000"),
+            _record(accounts[2], "0.0000000"),
+        ]
+    )
+    app = web.Application()
+    app.router.add_get("/", horizon.root)
+    app.router.add_get("/accounts", horizon.accounts)
+    app.router.add_get("/liquidity_pools", horizon.liquidity_pools)
+    server = TestServer(app)
+    await server.start_server()
+    url = str(server.make_url("")).rstrip("/")
+    monkeypatch.setattr(config, "horizon_url", url)
+    monkeypatch.setattr(config, "stellar_testnet", False)
+    monkeypatch.setattr("other.stellar.holders.get_horizon_url", lambda: url)
+    client = HorizonClient()
+    set_horizon_client(client)
+    yield horizon, accounts
+    set_horizon_client(None)
+    await client.shutdown()
+    await server.close()
+
+
+def test_holder_balances_from_record():
+    holder = HolderBalances.from_record(_record("GA", "1.5000000", pool_shares="3.0000000"))
+
+    assert holder.balance(ASSET_A) == 1.5
+    assert holder.balance(OTHER) is None
+    assert holder.balance(Asset.native()) == 5.0
+    assert holder.balance_by_code("AAA") == 1.5
+    assert holder.pool_shares == {POOL_ID: 3.0}
+    assert holder.to_record() == {"account_id": "GA", "data": {"mtl_donate": "MQ=="}}
+
+
+def test_holder_balances_keep_exact_amounts():
+    holder = HolderBalances.from_record(_record("GA", "9876543210.1234567"))
+
+    # A float cannot hold ten integer digits plus seven decimals
+    assert Decimal(repr(holder.balance(ASSET_A))) != Decimal("9876543210.1234567")
+    assert holder.amount(ASSET_A) == Decimal("9876543210.1234567")
+    assert holder.amount(OTHER) is None
+    assert HolderBalances("GB", {f"AAA:{ISSUER}": 2.5}).amount(ASSET_A) == Decimal("2.5")
+
+
+def test_balance_by_code_last_match_wins():
+    record = _record("GA", "1.0000000")
+    record["balances"].append(
+        {"asset_type": "credit_alphanum4", "asset_code": "AAA", "asset_issuer": OTHER.issuer, "balance": "7.0000000"}
+    )
+
+    assert HolderBalances.from_record(record).balance_by_code("AAA") == 7.0
+
+
+def test_pooled_balance_adds_pool_share():
+    holder = HolderBalances("GA", {f"AAA:{ISSUER}": 2.0}, {POOL_ID: 25.0})
+    snapshot = HolderSnapshot(
+        assets=[f"AAA:{ISSUER}"],
+        pool_assets=[f"AAA:{ISSUER}"],
+        ledger=1,
+        taken_at=datetime.now(timezone.utc),
+        accounts={"GA": holder},
+        pools={POOL_ID: PoolReserves(POOL_ID, 100.0, {f"AAA:{ISSUER}": 40.0})},
+    )
+
+    assert snapshot.pooled_balance(holder, ASSET_A) == pytest.approx(12.0)
+    assert snapshot.pooled_balance(holder, OTHER) == 0.0
+
+
+async def test_take_snapshot_crawls_accounts_and_pools(snapshot_horizon, tmp_path):
+    horizon, accounts = snapshot_horizon
+    store = HolderSnapshotStore(directory=str(tmp_path))
+
+    snapshot = await store.get(ASSET_A, pool_assets=[ASSET_A])
+
+    assert snapshot.ledger == 1000
+    assert list(snapshot.accounts) == accounts
+    assert snapshot.pooled_balance(snapshot.accounts[accounts[1]], ASSET_A) == pytest.approx(22.5)
+
+    (saved,) = tmp_path.glob("AAA_1000_*.json.gz")
+    loaded = HolderSnapshot.load(saved)
+    assert loaded.accounts == snapshot.accounts
+    assert loaded.pools == snapshot.pools
+    assert loaded.taken_at == snapshot.taken_at
+
+
+async def test_store_reuses_and_coalesces_crawls(snapshot_horizon):
+    horizon, accounts = snapshot_horizon
+    store = HolderSnapshotStore(max_age=60)
+
+    first, second = await asyncio.gather(store.get(ASSET_A), store.get(ASSET_A))
+    third = await store.get(ASSET_A)
+
+    assert first is second is third
+    assert store.crawl_count == 1
+    # Pools were not crawled for the first snapshot, so it does not cover this request
+    await store.get(ASSET_A, pool_assets=[ASSET_A])
+    assert store.crawl_count == 2
+    await store.get(ASSET_A, max_age=0)
+    assert store.crawl_count == 3
+
+
+async def test_pinned_snapshot_is_served_without_crawling():
+    store = HolderSnapshotStore(max_age=0)
+    eurmtl_key = f"EURMTL:{MTLAssets.eurmtl_asset.issuer}"
+    snapshot = HolderSnapshot(
+        assets=[eurmtl_key],
+        pool_assets=[],
+        ledger=7,
+        taken_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        accounts={
+            "GA": HolderBalances("GA", {eurmtl_key: 30.0}),
+            "GB": HolderBalances("GB", {eurmtl_key: 10.0}),
+            MTLAddresses.public_div: HolderBalances(MTLAddresses.public_div, {eurmtl_key: 1000.0}),
+        },
+    )
+    store.pin(snapshot)
+    set_holder_snapshot_store(store)
+    try:
+        result = await dividend_calc.calculate_eurmtl_dividends(Decimal("100"))
+    finally:
+        set_holder_snapshot_store(None)
+
+    assert store.crawl_count == 0
+    assert {p.address: p.amount for p in result.payments} == {"GA": Decimal("75"), "GB": Decimal("25")}
+
+
+async def test_usdm_balances_include_pool_share():
+    usdm_key = f"{MTLAssets.usdm_asset.code}:{MTLAssets.usdm_asset.issuer}"
+    store = HolderSnapshotStore()
+    store.pin(
+        HolderSnapshot(
+            assets=[usdm_key],
+            pool_assets=[usdm_key],
+            ledger=7,
+            taken_at=datetime.now(timezone.utc),
+            accounts={"GA": HolderBalances("GA", {usdm_key: 1.0}, {POOL_ID: 50.0})},
+            pools={POOL_ID: PoolReserves(POOL_ID, 100.0, {usdm_key: 8.0})},
+        )
+    )
+    set_holder_snapshot_store(store)
+    try:
+        rows, total = await dividend_commands._usdm_holder_balances(5)
+    finally:
+        set_holder_snapshot_store(None)
+
+    assert rows == [["GA", 5.0, 0, 0, 5]]
+    assert total == 5.0
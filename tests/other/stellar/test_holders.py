@@ -0,0 +1,139 @@
+# tests/other/stellar/test_holders.py
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from stellar_sdk import Asset, Keypair
+
+from other.config_reader import config
+from other.stellar.balance_utils import stellar_get_all_mtl_holders
+from other.stellar.constants import MTLAssets
+from other.stellar.holders import fetch_holders, iter_holders
+from other.stellar.horizon_client import HorizonClient, set_horizon_client
+
+ISSUER = Keypair.random().public_key
+ASSET_A = Asset("AAA", ISSUER)
+ASSET_B = Asset("BBB", ISSUER)
+
+
+def _account(account_id: str, *assets: Asset) -> dict:
+    balances = [
+        {"asset_type": "credit_alphanum4", "asset_code": a.code, "asset_issuer": a.issuer, "balance": "1.0"}
+        for a in assets
+    ]
+    return {"id": account_id, "account_id": account_id, "paging_token": account_id, "balances": balances}
+
+
+class PagedHorizon:
+    """Serves /accounts?asset=... with cursor paging, like Horizon."""
+
+    def __init__(self, holders: dict[str, list[dict]], delay: float = 0.0):
+        self.holders = holders
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.pages_served = 0
+        self.gate: asyncio.Event | None = None
+        self.server: TestServer | None = None
+
+    async def accounts(self, request: web.Request) -> web.Response:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            cursor = request.query.get("cursor", "")
+            if cursor and self.gate is not None:
+                await self.gate.wait()
+            asset = request.query["asset"]
+            limit = int(request.query.get("limit", 10))
+            records = [r for r in self.holders.get(asset, []) if r["paging_token"] > cursor][:limit]
+            self.pages_served += 1
+            next_cursor = records[-1]["paging_token"] if records else cursor
+            next_href = f"{request.url.origin()}/accounts?asset={asset}&cursor={next_cursor}&limit={limit}"
+            return web.json_response({"_embedded": {"records": records}, "_links": {"next": {"href": next_href}}})
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+async def paged_horizon(monkeypatch):
+    accounts = sorted(Keypair.random().public_key for _ in range(7))
+    horizon = PagedHorizon(
+        {
+            f"AAA:{ISSUER}": [_account(a, ASSET_A) for a in accounts[:5]],
+            # accounts[3] and accounts[4] hold both assets
+            f"BBB:{ISSUER}": [_account(a, ASSET_A, ASSET_B) for a in accounts[3:]],
+        },
+        delay=0.02,
+    )
+    app = web.Application()
+    app.router.add_get("/accounts", horizon.accounts)
+    server = TestServer(app)
+    await server.start_server()
+    horizon.server = server
+    monkeypatch.setattr(config, "horizon_url", str(server.make_url("")).rstrip("/"))
+    client = HorizonClient()
+    set_horizon_client(client)
+    yield horizon, accounts
+    set_horizon_client(None)
+    await client.shutdown()
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_fetch_holders_dedupes_by_account_id(paged_horizon):
+    horizon, accounts = paged_horizon
+
+    holders = await fetch_holders(ASSET_A, ASSET_B, limit=2)
+
+    assert [h["account_id"] for h in holders] == accounts
+    # Both crawls ran at the same time
+    assert horizon.max_in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_fetch_holders_mini_returns_first_page(paged_horizon):
+    _, accounts = paged_horizon
+
+    holders = await fetch_holders(ASSET_A, limit=2, mini=True)
+
+    assert [h["account_id"] for h in holders] == accounts[:2]
+
+
+@pytest.mark.asyncio
+async def test_iter_holders_streams_before_last_page(paged_horizon):
+    horizon, accounts = paged_horizon
+    horizon.gate = asyncio.Event()
+
+    stream = iter_holders(ASSET_A, ASSET_B, limit=2)
+    first = await asyncio.wait_for(anext(stream), timeout=1)
+    assert first["account_id"] in accounts
+
+    horizon.gate.set()
+    rest = [account async for account in stream]
+    ids = [first["account_id"], *(a["account_id"] for a in rest)]
+    assert sorted(ids) == accounts
+
+
+@pytest.mark.asyncio
+async def test_iter_holders_propagates_errors(paged_horizon):
+    horizon, _ = paged_horizon
+    horizon.holders[f"BBB:{ISSUER}"] = [{"no_account_id": True, "paging_token": "x"}]
+
+    with pytest.raises(KeyError):
+        async for _ in iter_holders(ASSET_B):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_stellar_get_all_mtl_holders_unique(paged_horizon):
+    horizon, accounts = paged_horizon
+    horizon.holders = {
+        f"MTL:{MTLAssets.mtl_asset.issuer}": [_account(a, MTLAssets.mtl_asset) for a in accounts[:4]],
+        f"MTLRECT:{MTLAssets.mtlrect_asset.issuer}": [_account(a, MTLAssets.mtlrect_asset) for a in accounts[2:]],
+    }
+
+    holders = await stellar_get_all_mtl_holders()
+
+    assert [h["account_id"] for h in holders] == accounts
@@ -0,0 +1,145 @@
+# tests/other/stellar/test_horizon_client.py
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from stellar_sdk.server_async import ServerAsync
+
+from other.config_reader import config
+from other.stellar.balance_utils import stellar_get_account
+from other.stellar.horizon_client import HorizonClient, endpoint_name, get_horizon_client, set_horizon_client
+
+ACCOUNT = "GACKTN5DAZGWXRWB2WLM6OPBDHAMT6SJNGLJZPQMEZBUR4JUGBX2UK7V"
+
+
+@pytest.fixture
+async def horizon_client(monkeypatch, horizon_server_config):
+    monkeypatch.setattr(config, "horizon_url", horizon_server_config["url"])
+    client = HorizonClient(backoff=0.01)
+    set_horizon_client(client)
+    yield client
+    set_horizon_client(None)
+    await client.shutdown()
+
+
+@pytest.fixture
+async def flaky_server():
+    state = {"fail": 2, "calls": 0, "in_flight": 0, "max_in_flight": 0}
+
+    async def flaky(request):
+        state["calls"] += 1
+        if state["fail"] > 0:
+            state["fail"] -= 1
+            return web.json_response({"status": 429}, status=429, headers={"Retry-After": "0"})
+        return web.json_response({"ok": True})
+
+    async def slow(request):
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        await asyncio.sleep(0.05)
+        state["in_flight"] -= 1
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_get("/flaky", flaky)
+    app.router.add_post("/flaky", flaky)
+    app.router.add_get("/slow", slow)
+    server = TestServer(app)
+    await server.start_server()
+    yield server, state
+    await server.close()
+
+
+def test_endpoint_name():
+    assert endpoint_name(f"https://h.example/accounts/{ACCOUNT}/offers?limit=200") == "accounts/:id/offers"
+    assert endpoint_name("https://h.example/ledgers/12345") == "ledgers/:id"
+    assert endpoint_name("https://h.example/fee_stats") == "fee_stats"
+
+
+@pytest.mark.asyncio
+async def test_calls_share_one_session(mock_horizon, horizon_client):
+    mock_horizon.set_account(ACCOUNT)
+
+    assert (await stellar_get_account(ACCOUNT))["id"] == ACCOUNT
+    session = horizon_client._session
+    async with ServerAsync(horizon_url=config.horizon_url, client=get_horizon_client()) as server:
+        await server.load_account(ACCOUNT)
+    # ServerAsync.__aexit__ must not close the shared pool
+    assert (await stellar_get_account(ACCOUNT))["id"] == ACCOUNT
+
+    assert horizon_client._session is session
+    assert session is not None and not session.closed
+    assert horizon_client.get_metrics()["GET accounts/:id"]["count"] == 3
+
+
+@pytest.mark.asyncio
+async def test_retries_429(flaky_server):
+    server, state = flaky_server
+    client = HorizonClient(backoff=0.01)
+    try:
+        assert await client.get_json(str(server.make_url("/flaky"))) == {"ok": True}
+    finally:
+        await client.shutdown()
+
+    assert state["calls"] == 3
+    metrics = client.get_metrics()["GET flaky"]
+    assert metrics["retries"] == 2
+    assert metrics["errors"] == 2
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_retries(flaky_server):
+    server, state = flaky_server
+    state["fail"] = 10
+    client = HorizonClient(backoff=0.01, max_retries=1)
+    try:
+        response = await client.get(str(server.make_url("/flaky")))
+    finally:
+        await client.shutdown()
+
+    assert response.status_code == 429
+    assert state["calls"] == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrency_cap(flaky_server):
+    server, state = flaky_server
+    client = HorizonClient(max_concurrency=2)
+    try:
+        await asyncio.gather(*(client.get(str(server.make_url("/slow"))) for _ in range(6)))
+    finally:
+        await client.shutdown()
+
+    assert state["max_in_flight"] == 2
+
+
+@pytest.mark.asyncio
+async def test_post_is_not_retried(flaky_server):
+    server, state = flaky_server
+    client = HorizonClient(backoff=0.01)
+    try:
+        response = await client.post(str(server.make_url("/flaky")), data={"tx": "AAAA"})
+    finally:
+        await client.shutdown()
+
+    assert response.status_code == 429
+    assert state["calls"] == 1
+    assert client.get_metrics()["POST flaky"]["retries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_new_loop_closes_old_sessions(flaky_server):
+    server, _ = flaky_server
+    client = HorizonClient()
+    try:
+        await client.get(str(server.make_url("/slow")))
+        old_session = client._session
+        client._loop = None  # as if the previous request ran on another loop
+
+        await client.get(str(server.make_url("/slow")))
+    finally:
+        await client.shutdown()
+
+    assert old_session is not None and old_session.closed
+    assert client._session is None
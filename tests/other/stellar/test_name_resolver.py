@@ -0,0 +1,120 @@
+import asyncio
+import types
+
+import pytest
+from stellar_sdk import Account, Asset, Keypair, Network, TransactionBuilder
+
+from other.grist_tools import MTLGrist
+from other.stellar.address_utils import address_id_to_username
+from other.stellar.name_resolver import AccountNameResolver, set_account_name_resolver
+from other.stellar.xdr_utils import decode_xdr
+
+ALICE = Keypair.random().public_key
+BOB = Keypair.random().public_key
+ISSUER = Keypair.random().public_key
+
+
+def _key(table):
+    return table.access_id, table.table_name
+
+
+class FakeGrist:
+    def __init__(self):
+        self.tables = {
+            _key(MTLGrist.MTLA_USERS): [{"Stellar": ALICE, "Telegram": "@alice"}],
+            _key(MTLGrist.EURMTL_users): [
+                {"account_id": ALICE, "username": "alice_eurmtl"},
+                {"account_id": BOB, "username": "bob"},
+            ],
+            _key(MTLGrist.EURMTL_accounts): [{"account_id": BOB, "description": "Bob's account"}],
+            _key(MTLGrist.EURMTL_assets): [{"issuer": ISSUER, "code": "EURMTL"}],
+        }
+        self.calls = []
+        self.failing = set()
+
+    async def fetch_data(self, table, sort=None, filter_dict=None):
+        self.calls.append(_key(table))
+        if _key(table) in self.failing:
+            raise Exception("Ошибка запроса: Статус 502")
+        return self.tables[_key(table)]
+
+
+@pytest.fixture(autouse=True)
+def reset_resolver():
+    yield
+    set_account_name_resolver(None)
+
+
+async def test_tables_are_loaded_once_with_precedence():
+    grist = FakeGrist()
+    resolver = AccountNameResolver(grist)
+
+    names = await resolver.resolve([ALICE, BOB, ISSUER, "GUNKNOWN"])
+    await resolver.resolve([ALICE])
+
+    assert names == {ALICE: "@alice", BOB: "bob", ISSUER: "Issuer of EURMTL"}
+    assert len(grist.calls) == 4
+    assert resolver.get_metrics()["hits"] == 4
+    assert resolver.get_metrics()["misses"] == 1
+
+
+async def test_stale_tables_refresh_in_background_and_keep_rows_on_error():
+    grist = FakeGrist()
+    resolver = AccountNameResolver(grist, ttl=0)
+    await resolver.resolve([BOB])
+
+    grist.tables[_key(MTLGrist.EURMTL_users)] = [{"account_id": BOB, "username": "bob2"}]
+    grist.failing = {_key(MTLGrist.MTLA_USERS)}
+    # Served from memory while the refresh runs
+    assert await resolver.name(BOB) == "bob"
+    while resolver.get_metrics()["refreshes"] < 2:
+        await asyncio.sleep(0)
+
+    assert await resolver.name(BOB) == "bob2"
+    assert await resolver.name(ALICE) == "@alice"
+    assert resolver.get_metrics()["refresh_errors"] == 1
+
+
+async def test_failed_first_load_is_not_cached():
+    grist = FakeGrist()
+    grist.failing = set(grist.tables)
+    resolver = AccountNameResolver(grist)
+
+    with pytest.raises(Exception, match="502"):
+        await resolver.resolve([ALICE])
+    assert resolver.get_metrics()["age"] is None
+
+    grist.failing = set()
+    assert await resolver.name(ALICE) == "@alice"
+    assert len(grist.calls) == 8
+    assert resolver.get_metrics()["refresh_errors"] == 4
+
+
+async def test_address_id_to_username_prefers_global_name_list():
+    grist = FakeGrist()
+    global_data = types.SimpleNamespace(name_list={ALICE: "Alice (manual)"})
+
+    assert await address_id_to_username(ALICE, full_data=True, grist_manager=grist, global_data=global_data) == (
+        "Alice (manual)"
+    )
+    assert await address_id_to_username(BOB, full_data=True, grist_manager=grist) == "bob"
+    assert (await address_id_to_username(ISSUER[::-1], full_data=True, grist_manager=grist)).endswith(
+        "не найден, возможно скам"
+    )
+    assert await address_id_to_username(BOB) == f"{BOB[:4]}..{BOB[-4:]}"
+
+
+async def test_decode_xdr_resolves_whole_transaction_with_one_table_load():
+    grist = FakeGrist()
+    builder = TransactionBuilder(Account(ALICE, 1), network_passphrase=Network.PUBLIC_NETWORK_PASSPHRASE, base_fee=100)
+    for _ in range(99):
+        builder.append_payment_op(destination=BOB, amount="1", asset=Asset("EURMTL", ISSUER), source=ALICE)
+    builder.append_change_trust_op(asset=Asset("EURMTL", ISSUER))
+    xdr = builder.set_timeout(0).build().to_xdr()
+
+    result = await decode_xdr(xdr, full_data=True, grist_manager=grist)
+
+    assert len(grist.calls) == 4
+    assert result[0] == "Операции с аккаунта @alice"
+    assert "    Перевод 1 EURMTL на аккаунт bob" in result
+    assert result[-1] == "    Открываем линию доверия к токену EURMTL от аккаунта Issuer of EURMTL"
@@ -0,0 +1,174 @@
+# tests/other/stellar/test_xdr_decoder.py
+"""Tests for the decode_xdr render cache, coalescing, size guard and process pool."""
+
+import asyncio
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from stellar_sdk import Account, Asset, Keypair, Network, TransactionBuilder
+
+from other.stellar import xdr_decoder
+from other.stellar.xdr_decoder import XdrDecoder, XdrTooLargeError, set_xdr_decoder
+from other.stellar.xdr_render import AccountRef, render_xdr
+from other.stellar.xdr_utils import decode_xdr
+
+SOURCE = Keypair.random().public_key
+DESTINATION = Keypair.random().public_key
+
+
+def _make_xdr(op_count: int = 1, amount: str = "1") -> str:
+    tb = TransactionBuilder(
+        source_account=Account(account=SOURCE, sequence=1),
+        network_passphrase=Network.PUBLIC_NETWORK_PASSPHRASE,
+        base_fee=100,
+    )
+    tb.set_timeout(0)
+    for _ in range(op_count):
+        tb.append_payment_op(destination=DESTINATION, amount=amount, asset=Asset.native())
+    return tb.build().to_xdr()
+
+
+@pytest.fixture(autouse=True)
+def reset_decoder():
+    yield
+    set_xdr_decoder(None)
+
+
+def test_render_uses_placeholders_for_accounts():
+    rendered = render_xdr(_make_xdr())
+
+    assert rendered.lines[0] == ("Операции с аккаунта ", AccountRef(SOURCE))
+    assert rendered.accounts == [SOURCE, DESTINATION]
+
+
+async def test_repeated_render_is_served_from_cache():
+    decoder = XdrDecoder(workers=0)
+    xdr = _make_xdr()
+
+    first = await decoder.render(xdr)
+    second = await decoder.render(xdr)
+    filtered = await decoder.render(xdr, filter_sum=10)
+
+    assert second is first
+    assert filtered.lines == []
+    assert decoder.get_metrics()["hits"] == 1
+    assert decoder.inline_renders == 2
+
+
+async def test_cache_evicts_least_recently_used():
+    decoder = XdrDecoder(workers=0, cache_size=2)
+    first, second, third = _make_xdr(1), _make_xdr(2), _make_xdr(3)
+
+    await decoder.render(first)
+    await decoder.render(second)
+    await decoder.render(first)
+    await decoder.render(third)
+    await decoder.render(first)
+
+    assert decoder.hits == 2
+    assert decoder.get_metrics()["cached"] == 2
+
+
+async def test_concurrent_renders_of_one_envelope_share_a_single_render():
+    decoder = XdrDecoder(workers=0)
+    xdr = _make_xdr()
+    renders = []
+
+    async def slow_render(args):
+        renders.append(args)
+        await asyncio.sleep(0.01)
+        return render_xdr(*args)
+
+    with patch.object(decoder, "_render", side_effect=slow_render):
+        results = await asyncio.gather(*(decoder.render(xdr) for _ in range(5)))
+
+    assert len(renders) == 1
+    assert all(result is results[0] for result in results)
+    assert decoder.coalesced == 4
+
+
+async def test_failed_render_is_not_cached():
+    decoder = XdrDecoder(workers=0)
+
+    with pytest.raises(ValueError):
+        await decoder.render("not-an-xdr")
+    with pytest.raises(ValueError):
+        await decoder.render("not-an-xdr")
+
+    assert decoder.get_metrics()["cached"] == 0
+
+
+async def test_oversized_envelope_is_rejected_before_parsing():
+    decoder = XdrDecoder(workers=0, max_size=100)
+
+    with pytest.raises(XdrTooLargeError):
+        await decoder.render(_make_xdr(10))
+
+    assert decoder.too_large == 1
+    assert decoder.inline_renders == 0
+
+
+async def test_large_envelope_is_rendered_in_worker_process():
+    decoder = XdrDecoder(workers=1, inline_size=1000)
+    xdr = _make_xdr(50)
+    try:
+        rendered = await decoder.render(xdr)
+    finally:
+        decoder.close()
+
+    assert decoder.pool_renders == 1
+    assert rendered == render_xdr(xdr)
+
+
+async def test_render_over_timeout_raises():
+    decoder = XdrDecoder(workers=1, inline_size=0, timeout=0.001)
+
+    async def never_done(*args):
+        await asyncio.sleep(1)
+
+    loop = asyncio.get_running_loop()
+    with patch.object(loop, "run_in_executor", side_effect=never_done):
+        with pytest.raises(asyncio.TimeoutError):
+            await decoder.render(_make_xdr())
+
+    assert decoder.timeouts == 1
+    assert decoder.get_metrics()["cached"] == 0
+
+
+async def test_broken_pool_is_replaced_on_next_render():
+    decoder = XdrDecoder(workers=1, inline_size=0)
+    broken = decoder._get_pool()
+
+    loop = asyncio.get_running_loop()
+    with patch.object(loop, "run_in_executor", side_effect=BrokenProcessPool("worker died")):
+        with pytest.raises(BrokenProcessPool):
+            await decoder.render(_make_xdr())
+
+    assert decoder._get_pool() is not broken
+    decoder.close()
+
+
+async def test_decode_xdr_resolves_names_only_for_rendered_lines():
+    set_xdr_decoder(XdrDecoder(workers=0))
+    usernames = AsyncMock(side_effect=lambda keys, **kwargs: {key: f"@{key[:4]}" for key in keys})
+
+    with patch("other.stellar.xdr_utils.address_ids_to_usernames", new=usernames):
+        lines = await decode_xdr(_make_xdr())
+        skipped = await decode_xdr(_make_xdr(), filter_sum=10)
+
+    assert lines[0] == f"Операции с аккаунта @{SOURCE[:4]}"
+    assert skipped == []
+    assert usernames.await_count == 1
+
+
+def test_shared_decoder_follows_config(monkeypatch):
+    monkeypatch.setattr(xdr_decoder.config, "xdr_decode_workers", 0)
+    monkeypatch.setattr(xdr_decoder.config, "xdr_decode_max_size", 1234)
+    set_xdr_decoder(None)
+
+    decoder = xdr_decoder.get_xdr_decoder()
+
+    assert decoder.workers == 0
+    assert decoder.max_size == 1234
+    assert xdr_decoder.get_xdr_decoder() is decoder
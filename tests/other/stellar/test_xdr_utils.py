@@ -6,9 +6,21 @@ from unittest.mock import AsyncMock, patch
 import pytest
 from stellar_sdk import Account, Asset, Keypair, Network, TransactionBuilder
 
+from other.stellar.xdr_decoder import XdrDecoder, set_xdr_decoder
 from other.stellar.xdr_utils import decode_xdr
 
 
+@pytest.fixture(autouse=True)
+def inline_decoder():
+    set_xdr_decoder(XdrDecoder(workers=0))
+    yield
+    set_xdr_decoder(None)
+
+
+async def _usernames(keys, **kwargs):
+    return {key: "@user" for key in keys}
+
+
 def _make_test_xdr(*, source: str, destination: str, op_count: int) -> str:
     source_account = Account(account=source, sequence=1)
     tb = TransactionBuilder(
@@ -30,7 +42,7 @@ async def test_mass_filter_skips_from_50_when_not_from_filter_account():
     dst = Keypair.random().public_key
     xdr = _make_test_xdr(source=src, destination=dst, op_count=50)
 
-    with patch("other.stellar.xdr_utils.address_id_to_username", new=AsyncMock(return_value="@user")):
+    with patch("other.stellar.xdr_utils.address_ids_to_usernames", new=AsyncMock(side_effect=_usernames)):
         # Account is involved (as destination) but is not the tx source.
         res = await decode_xdr(xdr, ignore_operation=["MASS"], filter_account=dst)
 
@@ -43,7 +55,7 @@ async def test_mass_filter_does_not_skip_when_from_filter_account():
     dst = Keypair.random().public_key
     xdr = _make_test_xdr(source=src, destination=dst, op_count=50)
 
-    with patch("other.stellar.xdr_utils.address_id_to_username", new=AsyncMock(return_value="@user")):
+    with patch("other.stellar.xdr_utils.address_ids_to_usernames", new=AsyncMock(side_effect=_usernames)):
         res = await decode_xdr(xdr, ignore_operation=["MASS"], filter_account=src)
 
     assert res != []
@@ -0,0 +1,124 @@
+import asyncio
+import json
+
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from other.chat_memory import CHAT_MEMORY_KEY_PREFIX, TOKENS_PER_MESSAGE, TOKENS_PER_REPLY, ChatMemory
+
+
+class LoggedRedis(FakeAsyncRedis):
+    """fakeredis with Lua that logs the round trips ChatMemory makes."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.commands: list[str] = []
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        self.commands.append("pipeline")
+        return super().pipeline(transaction, shard_hint)
+
+    async def lrange(self, *args):
+        self.commands.append("lrange")
+        return await super().lrange(*args)
+
+    async def evalsha(self, *args):
+        result = await super().evalsha(*args)
+        self.commands.append("evalsha")
+        return result
+
+
+async def _entries(redis, chat_id: int) -> list[dict]:
+    return [json.loads(raw) for raw in await redis.lrange(f"{CHAT_MEMORY_KEY_PREFIX}{chat_id}", 0, -1)]
+
+
+def count_words(text: str) -> int:
+    return len(text.split())
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("other.chat_memory.time.time", lambda: now[0])
+    return now
+
+
+async def test_append_stores_token_count_once(clock):
+    redis = LoggedRedis()
+    memory = ChatMemory(redis, count_words, ttl=60)
+
+    await memory.append(1, "привет как дела")
+    await memory.append(1, "хорошо", role="assistant")
+
+    entries = await _entries(redis, 1)
+    assert [e["tokens"] for e in entries] == [TOKENS_PER_MESSAGE + 1 + 3, TOKENS_PER_MESSAGE + 1 + 1]
+    assert await redis.ttl(f"{CHAT_MEMORY_KEY_PREFIX}1") == 60
+    redis.commands.clear()
+    assert await memory.load(1) == [
+        {"role": "user", "content": "привет как дела"},
+        {"role": "assistant", "content": "хорошо"},
+    ]
+    assert redis.commands == ["lrange"]
+
+
+async def test_load_trims_oldest_by_running_total(clock):
+    redis = LoggedRedis()
+    # Every entry costs 3 + 1 (role) + 4 (content) = 8 tokens
+    memory = ChatMemory(redis, count_words, max_tokens=TOKENS_PER_REPLY + 3 * 8)
+    for n in range(5):
+        await memory.append(1, f"message {n} a b")
+
+    messages = await memory.load(1)
+
+    assert [m["content"] for m in messages] == ["message 2 a b", "message 3 a b", "message 4 a b"]
+    # Trimmed entries are removed from Redis as well
+    assert redis.commands[-2:] == ["lrange", "evalsha"]
+    assert len(await _entries(redis, 1)) == 3
+
+
+async def test_concurrent_loads_trim_once(clock):
+    readers = asyncio.Barrier(2)
+
+    class RacingRedis(LoggedRedis):
+        racing = False
+
+        async def lrange(self, *args):
+            result = await super().lrange(*args)
+            if self.racing:
+                # Both loads have read the list before either trims it
+                await readers.wait()
+            return result
+
+    redis = RacingRedis()
+    memory = ChatMemory(redis, count_words, max_tokens=TOKENS_PER_REPLY + 3 * 8)
+    for n in range(5):
+        await memory.append(1, f"message {n} a b")
+
+    redis.racing = True
+    first, second = await asyncio.gather(memory.load(1), memory.load(1))
+    redis.racing = False
+
+    assert first == second
+    assert [e["content"] for e in await _entries(redis, 1)] == ["message 2 a b", "message 3 a b", "message 4 a b"]
+
+
+async def test_expired_entries_are_skipped(clock):
+    redis = LoggedRedis()
+    memory = ChatMemory(redis, count_words, ttl=100)
+    await memory.append(1, "old")
+    clock[0] += 90
+    await memory.append(1, "new")
+    clock[0] += 20
+
+    assert await memory.load(1) == [{"role": "user", "content": "new"}]
+
+
+async def test_pop_last_and_cap(clock):
+    redis = LoggedRedis()
+    memory = ChatMemory(redis, count_words, max_entries=2)
+    for text in ("a", "b", "c"):
+        await memory.append(7, text)
+
+    assert await memory.pop_last(7) == {"role": "user", "content": "c"}
+    assert await memory.load(7) == [{"role": "user", "content": "b"}]
+    assert await memory.pop_last(8) is None
@@ -0,0 +1,124 @@
+import types
+
+import pytest
+from gspread.exceptions import APIError
+
+from other.sheet_writer import SheetWriter, a1_range
+
+
+class FakeResponse:
+    def __init__(self, code):
+        self.code = code
+        self.text = ""
+
+    def json(self):
+        return {"error": {"code": self.code, "message": "quota", "status": "RESOURCE_EXHAUSTED"}}
+
+
+class FakeSpreadsheet:
+    def __init__(self, failures=()):
+        self.bodies = []
+        self.failures = list(failures)
+
+    async def values_batch_update(self, body=None):
+        if self.failures:
+            raise APIError(FakeResponse(self.failures.pop(0)))
+        self.bodies.append(body)
+        return {}
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr("other.sheet_writer.asyncio.sleep", fake_sleep)
+    return delays
+
+
+def test_a1_range_quotes_title():
+    assert a1_range("IND_ALL", "D3") == "'IND_ALL'!D3"
+    assert a1_range("Bob's", "A1:B2") == "'Bob''s'!A1:B2"
+
+
+async def test_commit_sends_one_batch_per_input_option():
+    ss = FakeSpreadsheet()
+    wks = types.SimpleNamespace(title="autodata_config")
+    writer = SheetWriter(ss)
+
+    writer.cell(wks, "D3", 1.5)
+    writer.cell(wks, "D4", 2)
+    writer.update("GBQ..ABCD", "A1", [["ASSETS"], ["MTL", 10.0]])
+    writer.cell(wks, "D3", 1.6)
+    writer.update("MONITORING", "A5", [["01.01.2026", "=D1"]], value_input_option="USER_ENTERED")
+    assert writer.pending_count == 4
+
+    await writer.commit()
+
+    assert ss.bodies == [
+        {
+            "valueInputOption": "RAW",
+            "data": [
+                {"range": "'autodata_config'!D3", "values": [[1.6]]},
+                {"range": "'autodata_config'!D4", "values": [[2]]},
+                {"range": "'GBQ..ABCD'!A1", "values": [["ASSETS"], ["MTL", 10.0]]},
+            ],
+        },
+        {"valueInputOption": "USER_ENTERED", "data": [{"range": "'MONITORING'!A5", "values": [["01.01.2026", "=D1"]]}]},
+    ]
+    assert writer.pending_count == 0
+    assert await writer.commit() == []
+
+
+async def test_dry_run_renders_without_sending():
+    ss = FakeSpreadsheet()
+    writer = SheetWriter(ss, dry_run=True)
+    writer.cell("DATA", "Q1", "01.01.2026 08:10:00")
+    writer.update("DATA", "E2", [[1, None]])
+
+    assert writer.render() == ["'DATA'!Q1 = [[\"01.01.2026 08:10:00\"]]", "'DATA'!E2 = [[1, null]]"]
+    bodies = await writer.commit()
+
+    assert ss.bodies == []
+    assert writer.committed == bodies
+    assert len(bodies[0]["data"]) == 2
+
+
+async def test_quota_errors_are_retried_with_backoff(sleeps):
+    ss = FakeSpreadsheet(failures=[429, 503])
+    writer = SheetWriter(ss, base_delay=1.0)
+    writer.cell("DATA", "A1", 1)
+
+    await writer.commit()
+
+    assert len(ss.bodies) == 1
+    assert sleeps == [1.0, 2.0]
+
+
+async def test_other_errors_and_exhausted_retries_raise(sleeps):
+    writer = SheetWriter(FakeSpreadsheet(failures=[400]))
+    writer.cell("DATA", "A1", 1)
+    with pytest.raises(APIError):
+        await writer.commit()
+    assert sleeps == []
+
+    writer = SheetWriter(FakeSpreadsheet(failures=[429] * 3), max_attempts=3)
+    writer.cell("DATA", "A1", 1)
+    with pytest.raises(APIError):
+        await writer.commit()
+    assert len(sleeps) == 2
+
+
+async def test_context_manager_skips_commit_on_error():
+    ss = FakeSpreadsheet()
+    with pytest.raises(RuntimeError):
+        async with SheetWriter(ss) as writer:
+            writer.cell("DATA", "A1", 1)
+            raise RuntimeError("report failed")
+    assert ss.bodies == []
+
+    async with SheetWriter(ss) as writer:
+        writer.cell("DATA", "A1", 1)
+    assert len(ss.bodies) == 1
@@ -0,0 +1,147 @@
+import asyncio
+import json
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from other.spam_reputation import REPUTATION_KEY_PREFIX, SpamReputationService
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+
+    async def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+        self.ttls[key] = ex
+
+
+class BanLists:
+    """Serves CAS /check and LOLS /account; CAS bans ``cas``, LOLS bans ``lols``."""
+
+    def __init__(self, cas=(), lols=(), delay=0.0):
+        self.cas = set(cas)
+        self.lols = set(lols)
+        self.delay = delay
+        self.hits = {"cas": 0, "lols": 0}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lols_status = 200
+
+    async def _enter(self, source):
+        self.hits[source] += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+
+    async def cas_check(self, request):
+        await self._enter("cas")
+        user_id = int(request.query["user_id"])
+        if user_id in self.cas:
+            return web.json_response({"ok": True, "result": {"offenses": 1}})
+        return web.json_response({"ok": False, "description": "Record not found."})
+
+    async def lols_account(self, request):
+        await self._enter("lols")
+        if self.lols_status != 200:
+            return web.Response(status=self.lols_status)
+        user_id = int(request.query["id"])
+        return web.json_response({"ok": True, "user_id": user_id, "banned": user_id in self.lols})
+
+
+@pytest.fixture
+async def ban_lists():
+    lists = BanLists(cas={1}, lols={2}, delay=0.05)
+    app = web.Application()
+    app.router.add_get("/check", lists.cas_check)
+    app.router.add_get("/account", lists.lols_account)
+    server = TestServer(app)
+    await server.start_server()
+    yield lists, str(server.make_url("/check")), str(server.make_url("/account"))
+    await server.close()
+
+
+def _service(ban_lists, redis=None, **kwargs):
+    _, cas_url, lols_url = ban_lists
+    return SpamReputationService(redis, cas_url=cas_url, lols_url=lols_url, **kwargs)
+
+
+async def test_sources_are_queried_concurrently(ban_lists):
+    lists = ban_lists[0]
+    service = _service(ban_lists)
+    try:
+        verdict = await service.check(1)
+    finally:
+        await service.close()
+
+    assert verdict.cas is True and verdict.lols is False
+    assert "CAS ban" in verdict.cas_reason
+    assert lists.max_in_flight == 2
+
+
+async def test_verdicts_cached_with_separate_ttls(ban_lists):
+    lists = ban_lists[0]
+    redis = FakeRedis()
+    service = _service(ban_lists, redis, positive_ttl=1000, negative_ttl=10)
+    try:
+        assert (await service.check(2)).lols is True
+        assert (await service.check(3)).is_spammer is False
+        assert (await service.check(2)).lols is True
+    finally:
+        await service.close()
+
+    assert lists.hits == {"cas": 2, "lols": 2}
+    assert redis.ttls == {f"{REPUTATION_KEY_PREFIX}2": 1000, f"{REPUTATION_KEY_PREFIX}3": 10}
+    assert json.loads(redis.values[f"{REPUTATION_KEY_PREFIX}2"]) == {"cas": False, "lols": True}
+    assert service.get_metrics()["cache_hits"] == 1
+
+
+async def test_failed_source_is_not_cached_as_clean(ban_lists):
+    lists = ban_lists[0]
+    lists.lols_status = 502
+    redis = FakeRedis()
+    service = _service(ban_lists, redis)
+    try:
+        assert (await service.check(3)).is_spammer is False
+        assert (await service.check(1)).cas is True
+    finally:
+        await service.close()
+
+    # A CAS hit is enough to cache, a "clean" answer with LOLS down is not
+    assert list(redis.values) == [f"{REPUTATION_KEY_PREFIX}1"]
+    assert service.errors == 2
+
+
+async def test_duplicate_lookups_are_coalesced(ban_lists):
+    lists = ban_lists[0]
+    service = _service(ban_lists)
+    try:
+        verdicts = await asyncio.gather(*(service.check(1) for _ in range(5)))
+    finally:
+        await service.close()
+
+    assert all(v.cas for v in verdicts)
+    assert lists.hits == {"cas": 1, "lols": 1}
+    assert service.coalesced == 4
+
+
+async def test_check_many_uses_cache_and_runs_misses_concurrently(ban_lists):
+    lists = ban_lists[0]
+    redis = FakeRedis()
+    redis.values[f"{REPUTATION_KEY_PREFIX}1"] = json.dumps({"cas": True, "lols": False})
+    service = _service(ban_lists, redis)
+    try:
+        verdicts = await service.check_many([1, 2, 3, 4, 2])
+    finally:
+        await service.close()
+
+    assert sorted(verdicts) == [1, 2, 3, 4]
+    assert [uid for uid, v in sorted(verdicts.items()) if v.is_spammer] == [1, 2]
+    assert lists.hits == {"cas": 3, "lols": 3}
+    assert lists.max_in_flight == 6
@@ -0,0 +1,93 @@
+import asyncio
+import re
+
+import pytest
+
+from other.spam_cheker import contains_spam_phrases, is_mixed_word
+from other.spam_rules import PhraseAutomaton, SpamRuleEngine, SpamVerdictCache, spam_phrases
+
+
+def _legacy_is_mixed_word(word):
+    contains_cyrillic = bool(re.search("[а-яА-Я]", word))
+    contains_digit = bool(re.search("[0-9@]", word))
+    contains_latin = bool(re.search("[a-zA-Z]", word))
+    return contains_cyrillic and (contains_digit or contains_latin)
+
+
+def _legacy_phrase_count(text):
+    words = re.findall(r"\b\w+\b", text.lower())
+    return sum(phrase in words for phrase in spam_phrases) + ("+" in text)
+
+
+SAMPLES = [
+    "Ищу людей, кто заинтересован в дополнительном доходе, онлайн формат, от 18 лет. За деталями пишите в лс",
+    "Пpибыль 3OO$ в день, пишите в личку +",
+    "Кто знает, где в Баре обменять EURMTL на евро?",
+    "Нужна кoмaндa нa пpoeкт, 5oo в нeдeлю @manager",
+    "проект проект проект",
+    "",
+]
+
+
+@pytest.mark.parametrize("text", SAMPLES)
+def test_engine_matches_legacy_rules(text):
+    engine = SpamRuleEngine()
+
+    assert engine.mixed_word_count(text) == sum(_legacy_is_mixed_word(word) for word in text.split())
+    assert engine.phrase_score(text) == _legacy_phrase_count(text)
+
+
+def test_wrappers_keep_old_api():
+    assert is_mixed_word("пpибыль") is True
+    assert is_mixed_word("прибыль") is False
+    assert contains_spam_phrases(SAMPLES[0]) is True
+    assert contains_spam_phrases("доход и прибыль", phrases=["доход", "прибыль"], threshold=2) is True
+
+
+def test_automaton_matches_whole_words_and_phrases():
+    automaton = PhraseAutomaton(["лс", "без опыта", "опыта нет", "a b c", "b"])
+    found = automaton.find("работа без опыта нет a b c лсд".split())
+
+    assert {" ".join(automaton.phrases[i]) for i in found} == {"без опыта", "опыта нет", "a b c", "b"}
+
+
+def test_match_reports_first_rule():
+    engine = SpamRuleEngine()
+
+    assert engine.match("Зaрaбoтoк oнлaйн бeз вложeний") == "mixed"
+    assert engine.match("Доход без опыта, подробности в лс") == "spam_phrases"
+    assert engine.match("Доброе утро, чат") is None
+
+
+async def test_verdict_cache_calls_llm_once_per_text():
+    calls = []
+
+    async def llm(text):
+        calls.append(text)
+        await asyncio.sleep(0.01)
+        return 90
+
+    cache = SpamVerdictCache()
+    results = await asyncio.gather(*(cache.get_or_check("Заработок  в ЛС", llm) for _ in range(3)))
+    results.append(await cache.get_or_check("заработок в лс", llm))
+
+    assert results == [90, 90, 90, 90]
+    assert len(calls) == 1
+    assert cache.get_metrics() == {"size": 1, "hits": 1, "llm_calls": 1, "coalesced": 2}
+
+
+async def test_verdict_cache_expires_and_evicts(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr("other.spam_rules.time.monotonic", lambda: now[0])
+
+    async def llm(text):
+        return len(text)
+
+    cache = SpamVerdictCache(max_size=2, ttl=60)
+    for text in ("a", "bb", "ccc"):
+        await cache.get_or_check(text, llm)
+
+    assert cache.get("a") is None
+    assert cache.get("ccc") == 3
+    now[0] = 61
+    assert cache.get("ccc") is None
@@ -19,43 +19,6 @@ def make_session_pool(session):
     return Pool()
 
 
-@pytest.mark.asyncio
-async def test_cmd_send_message_1m(mock_telegram, router_app_context, monkeypatch):
-    bot = router_app_context.bot
-
-    mock_session = FakeSession()
-    mock_pool = make_session_pool(mock_session)
-
-    class Record:
-        update_id = 0
-        text = "Scheduled msg"
-        user_id = 123
-        use_alarm = 1
-        was_send = 0
-        topic_id = 0
-        button_json = "{}"
-
-    mock_record = Record()
-
-    class FakeMessageRepository:
-        def __init__(self, session):
-            self.session = session
-
-        def load_new_messages(self):
-            return [mock_record]
-
-    monkeypatch.setattr(time_handlers, "MessageRepository", FakeMessageRepository)
-
-    await time_handlers.cmd_send_message_1m(bot, mock_pool)
-
-    requests = mock_telegram.get_requests()
-    req = next((r for r in requests if r["method"] == "sendMessage" and r["data"]["text"] == "Scheduled msg"), None)
-    assert req is not None
-    assert str(req["data"]["chat_id"]) == "123"
-    assert mock_record.was_send == 1
-    assert mock_session.committed is True
-
-
 @pytest.mark.asyncio
 async def test_time_clear(mock_telegram, router_app_context, mock_grist, grist_server_config, monkeypatch):
     bot = router_app_context.bot
@@ -114,6 +77,7 @@ async def test_time_usdm_daily_sends_summary(mock_telegram, router_app_context,
     monkeypatch.setattr(time_handlers, "cmd_calc_usdm_daily", mock_calc_daily)
     monkeypatch.setattr(time_handlers, "cmd_gen_xdr", mock_gen_xdr)
     monkeypatch.setattr(time_handlers, "cmd_send_by_list_id", mock_send_by_list)
+    monkeypatch.setattr(time_handlers, "cmd_count_failed_by_list_id", FakeSyncMethod(return_value=0))
     monkeypatch.setattr(time_handlers, "get_balances", mock_get_balances)
 
     await time_handlers.time_usdm_daily(mock_pool, bot)
@@ -133,6 +97,32 @@ async def test_time_usdm_daily_sends_summary(mock_telegram, router_app_context,
     assert "All work done." in text
 
 
+@pytest.mark.asyncio
+async def test_time_usdm_daily_reports_failed_transactions(mock_telegram, router_app_context, monkeypatch):
+    bot = router_app_context.bot
+
+    mock_pool = make_session_pool(FakeSession())
+
+    monkeypatch.setattr(time_handlers, "cmd_create_list", FakeSyncMethod(return_value=7))
+    monkeypatch.setattr(time_handlers, "cmd_calc_usdm_daily", FakeAsyncMethod(return_value=[("addr1", "x", 5.0)]))
+    monkeypatch.setattr(time_handlers, "cmd_gen_xdr", FakeSyncMethod(return_value=0))
+    monkeypatch.setattr(time_handlers, "cmd_send_by_list_id", FakeAsyncMethod(return_value=0))
+    monkeypatch.setattr(time_handlers, "cmd_count_failed_by_list_id", FakeSyncMethod(return_value=2))
+    monkeypatch.setattr(time_handlers, "get_balances", FakeAsyncMethod(return_value={"USDM": "1.00"}))
+
+    await time_handlers.time_usdm_daily(mock_pool, bot)
+
+    requests = mock_telegram.get_requests()
+    msg_req = next(
+        (r for r in requests if r["method"] == "sendMessage" and str(r["data"]["chat_id"]) == str(MTLChats.USDMMGroup)),
+        None,
+    )
+    assert msg_req is not None
+    text = msg_req["data"]["text"]
+    assert "2 transactions failed (tx_failed), payments not made." in text
+    assert "All work done." not in text
+
+
 @pytest.mark.asyncio
 async def test_time_usdm_daily_retries_send_on_error(mock_telegram, router_app_context, monkeypatch):
     bot = router_app_context.bot
@@ -160,6 +150,7 @@ async def test_time_usdm_daily_retries_send_on_error(mock_telegram, router_app_c
     monkeypatch.setattr(time_handlers, "cmd_calc_usdm_daily", mock_calc_daily)
     monkeypatch.setattr(time_handlers, "cmd_gen_xdr", mock_gen_xdr)
     monkeypatch.setattr(time_handlers, "cmd_send_by_list_id", mock_send_by_list)
+    monkeypatch.setattr(time_handlers, "cmd_count_failed_by_list_id", FakeSyncMethod(return_value=0))
     monkeypatch.setattr(time_handlers, "get_balances", mock_get_balances)
     monkeypatch.setattr(time_handlers.asyncio, "sleep", mock_sleep)
 
@@ -196,6 +187,7 @@ async def test_time_usdm_daily_gives_up_after_many_errors(mock_telegram, router_
     monkeypatch.setattr(time_handlers, "cmd_calc_usdm_daily", mock_calc_daily)
     monkeypatch.setattr(time_handlers, "cmd_gen_xdr", mock_gen_xdr)
     monkeypatch.setattr(time_handlers, "cmd_send_by_list_id", mock_send_by_list)
+    monkeypatch.setattr(time_handlers, "cmd_count_failed_by_list_id", FakeSyncMethod(return_value=0))
     monkeypatch.setattr(time_handlers, "get_balances", mock_get_balances)
     monkeypatch.setattr(time_handlers.asyncio, "sleep", mock_sleep)
 
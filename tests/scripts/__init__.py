@@ -0,0 +1 @@
+# tests/scripts/__init__.py
@@ -0,0 +1,92 @@
+import asyncio
+import types
+
+import pytest
+from stellar_sdk import Keypair
+
+import scripts.update_report as update_report
+from other.sheet_writer import SheetWriter
+
+ADDRESSES = [Keypair.random().public_key for _ in range(4)]
+
+
+def _sheet_name(address):
+    return f"{address[:4]}..{address[-4:]}"
+
+
+@pytest.fixture(autouse=True)
+def clean_source_cache():
+    update_report._report_source_cache.clear()
+    yield
+    update_report._report_source_cache.clear()
+
+
+async def test_slow_source_falls_back_to_last_value():
+    async def fresh():
+        return 1.07
+
+    async def hanging():
+        await asyncio.sleep(10)
+
+    assert await update_report.fetch_report_source("currencylayer", fresh, 1) == 1.07
+    assert await update_report.fetch_report_source("currencylayer", hanging, 0.01) == 1.07
+    assert await update_report.fetch_report_source("kitco", hanging, 0.01) is None
+
+
+class FakeSpreadsheet:
+    def __init__(self):
+        self.added = []
+
+    async def worksheet(self, title):
+        if title == _sheet_name(ADDRESSES[0]):
+            raise update_report.WorksheetNotFound(title)
+        return types.SimpleNamespace(title=title)
+
+    async def add_worksheet(self, title, rows, cols):
+        self.added.append(title)
+        return types.SimpleNamespace(title=title)
+
+
+async def test_address_sheets_are_built_concurrently(monkeypatch):
+    in_flight = 0
+    max_in_flight = 0
+
+    async def horizon_call(result):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return result
+
+    async def get_balances(address, return_data=False):
+        if address == ADDRESSES[3]:
+            raise RuntimeError("horizon down")
+        return await horizon_call(({"EURMTL": "5"}, {"name": "dGVzdA=="}))
+
+    async def issuer_assets(address):
+        return await horizon_call({"MTL": 100.0})
+
+    async def pools(address):
+        return await horizon_call([])
+
+    async def trade_cost(asset):
+        return await horizon_call(0.5)
+
+    monkeypatch.setattr(update_report, "get_balances", get_balances)
+    monkeypatch.setattr(update_report, "stellar_get_issuer_assets", issuer_assets)
+    monkeypatch.setattr(update_report, "get_pool_balances", pools)
+    monkeypatch.setattr(update_report, "stellar_get_trade_cost", trade_cost)
+
+    ss = FakeSpreadsheet()
+    writer = SheetWriter(ss, dry_run=True)
+    await update_report.update_address_sheets(ss, writer, ADDRESSES)
+
+    # Three addresses written (four ranges each), the failing one skipped
+    assert writer.pending_count == 12
+    assert ss.added == [_sheet_name(ADDRESSES[0])]
+    assert max_in_flight > 3
+    assert (
+        f"'{_sheet_name(ADDRESSES[1])}'!E1 = " + '[["ISSUER", "AMOUNT", "COST"], ["MTL", 100.0, 0.5]]'
+        in writer.render()
+    )
@@ -0,0 +1,148 @@
+"""Tests for BotUserWriteBuffer (write-behind for bot_users)."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from db.session import create_async_session_pool, dispose_async_session_pool
+from services.bot_user_writer import BotUserWriteBuffer
+from services.spam_status_service import SpamStatusService
+from shared.domain.user import SpamStatus
+from shared.infrastructure.database.models import Base, BotUsers
+from tests.fakes import FakeChatsRepositoryProtocol
+
+
+@pytest.fixture
+async def async_session_pool():
+    pool = create_async_session_pool("sqlite:///:memory:")
+    async with pool.kw["bind"].begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield pool
+    await dispose_async_session_pool(pool)
+
+
+@pytest.fixture
+def spam_status_service():
+    return SpamStatusService(FakeChatsRepositoryProtocol())
+
+
+async def _load_users(pool) -> dict:
+    async with pool() as session:
+        users = (await session.execute(select(BotUsers))).scalars().all()
+        return {user.user_id: (user.user_name, user.user_type) for user in users}
+
+
+async def test_coalesces_updates_into_one_row(async_session_pool, spam_status_service):
+    writer = BotUserWriteBuffer(async_session_pool, spam_status_service)
+
+    writer.add(1, "alice", 0)
+    writer.add(1, None, 1)
+    writer.add(2, "bob", 1)
+
+    assert writer.get_pending_count() == 2
+    assert await writer.flush() == 2
+    assert writer.get_pending_count() == 0
+    assert await _load_users(async_session_pool) == {1: ("alice", 1), 2: ("bob", 1)}
+    assert spam_status_service.get_cached_status(1) == SpamStatus.GOOD
+
+
+async def test_drops_writes_matching_cache(async_session_pool, spam_status_service):
+    spam_status_service.preload_statuses({1: 1})
+    spam_status_service.preload_usernames({1: "alice"})
+    writer = BotUserWriteBuffer(async_session_pool, spam_status_service)
+
+    assert writer.add(1, "alice", 1) is False
+    assert writer.add(1, None, 1) is False
+    assert writer.add(1, "alice_renamed", 1) is True
+
+    assert writer.skipped_count == 2
+    assert writer.get_pending_count() == 1
+
+
+async def test_upsert_keeps_stored_username(async_session_pool, spam_status_service):
+    async with async_session_pool() as session:
+        session.add(BotUsers(user_id=1, user_name="alice", user_type=0))
+        await session.commit()
+
+    writer = BotUserWriteBuffer(async_session_pool, spam_status_service)
+    writer.add(1, None, 1)
+    await writer.flush()
+
+    assert await _load_users(async_session_pool) == {1: ("alice", 1)}
+
+
+async def test_flushes_when_batch_is_full(async_session_pool, spam_status_service):
+    writer = BotUserWriteBuffer(async_session_pool, spam_status_service, max_pending=3)
+
+    for user_id in range(3):
+        writer.add(user_id, None, 1)
+    await asyncio.sleep(0.05)
+
+    assert writer.get_pending_count() == 0
+    assert len(await _load_users(async_session_pool)) == 3
+
+
+async def test_bad_status_flushes_immediately(async_session_pool, spam_status_service):
+    writer = BotUserWriteBuffer(async_session_pool, spam_status_service)
+
+    writer.add(7, None, SpamStatus.BAD.value)
+    await asyncio.sleep(0.05)
+
+    assert await _load_users(async_session_pool) == {7: (None, 2)}
+
+
+async def test_set_status_is_not_overwritten_by_buffered_write(async_session_pool, spam_status_service):
+    writer = BotUserWriteBuffer(async_session_pool, spam_status_service, flush_interval=3600)
+    spam_status_service.attach_write_buffer(writer)
+    writer.add(1, "alice", 0)
+    in_flight = asyncio.create_task(writer.flush())
+    await asyncio.sleep(0)
+
+    spam_status_service.mark_bad(1)
+    await in_flight
+    await asyncio.sleep(0.05)
+
+    assert await _load_users(async_session_pool) == {1: ("alice", 2)}
+    assert writer.get_pending_count() == 0
+    assert spam_status_service.get_cached_status(1) == SpamStatus.BAD
+
+
+async def test_stop_flushes_pending(async_session_pool, spam_status_service):
+    writer = BotUserWriteBuffer(async_session_pool, spam_status_service, flush_interval=3600)
+    writer.start()
+    writer.add(5, "eve", 0)
+
+    await writer.stop()
+
+    assert await _load_users(async_session_pool) == {5: ("eve", 0)}
+
+
+async def test_failed_flush_requeues(spam_status_service):
+    class BrokenPool:
+        def __call__(self):
+            raise RuntimeError("db down")
+
+    writer = BotUserWriteBuffer(BrokenPool(), spam_status_service)
+    writer.add(1, "alice", 1)
+
+    assert await writer.flush() == 0
+    assert writer.get_pending_count() == 1
+
+
+async def test_add_bot_users_goes_through_writer(async_session_pool, spam_status_service, monkeypatch):
+    from services import app_context as app_context_module
+    from services.app_context import AppContext
+    from start import add_bot_users
+    from tests.fakes import FakeSession
+
+    ctx = AppContext()
+    ctx.spam_status_service = spam_status_service
+    ctx.bot_user_writer = BotUserWriteBuffer(async_session_pool, spam_status_service)
+    monkeypatch.setattr(app_context_module, "app_context", ctx)
+    session = FakeSession()
+
+    add_bot_users(session, 3, "carol", 1)
+
+    assert session._bot_users == {}
+    assert ctx.bot_user_writer.get_pending_count() == 1
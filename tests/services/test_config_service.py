@@ -1,11 +1,24 @@
 # tests/services/test_config_service.py
 """Tests for ConfigService."""
 
+import asyncio
+import json
+
 import pytest
 from unittest.mock import Mock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
 
+from db.repositories import ConfigRepository
+from db.repositories.config import remove_bot_config_listener
+from other.constants import BotValueTypes
+from services import config_service
 from services.config_service import ConfigService
+from services.feature_flags import FeatureFlagsService
 from services.interfaces.repositories import IConfigRepository
+from services.repositories.config_repo_adapter import ConfigRepositoryAdapter
+from shared.infrastructure.database.models import Base
+from tests.fakes import FakeConfigRepositoryProtocol
 
 
 @pytest.fixture
@@ -196,3 +209,307 @@ class TestDeleteIncome:
         assert service.get_delete_income(3) == "string"
         assert service.get_delete_income(4) == [1, 2, 3]
         assert service.get_delete_income(5) == {"nested": {"data": True}}
+
+
+class CountingConfigRepository(FakeConfigRepositoryProtocol):
+    """Fake repository that records which loader was used."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def load_bot_value(self, chat_id, chat_key, default_value=None):
+        self.calls.append("load_bot_value")
+        return super().load_bot_value(chat_id, chat_key, default_value)
+
+    def load_chat_values(self, chat_id):
+        self.calls.append("load_chat_values")
+        return super().load_chat_values(chat_id)
+
+    def load_key_values(self, chat_key):
+        self.calls.append("load_key_values")
+        return super().load_key_values(chat_key)
+
+    def load_all_values(self):
+        self.calls.append("load_all_values")
+        return super().load_all_values()
+
+
+class FakePubSub:
+    def __init__(self, redis):
+        self._redis = redis
+        self.queue = asyncio.Queue()
+        self.closed = False
+
+    async def subscribe(self, channel):
+        self._redis.subscribers.setdefault(channel, []).append(self)
+
+    async def listen(self):
+        while True:
+            message = await self.queue.get()
+            if isinstance(message, Exception):
+                raise message
+            yield message
+
+    async def aclose(self):
+        self.closed = True
+        for subscribers in self._redis.subscribers.values():
+            if self in subscribers:
+                subscribers.remove(self)
+
+
+class FakePubSubRedis:
+    """In-memory Redis pub/sub shared by several ConfigService replicas."""
+
+    def __init__(self):
+        self.subscribers = {}
+        self.published = []
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+        for pubsub in self.subscribers.get(channel, []):
+            pubsub.queue.put_nowait({"type": "message", "channel": channel, "data": message.encode()})
+        return len(self.subscribers.get(channel, []))
+
+    def disconnect(self):
+        """Drop every subscription like a lost connection; messages published meanwhile are lost."""
+        for subscribers in self.subscribers.values():
+            for pubsub in list(subscribers):
+                pubsub.queue.put_nowait(ConnectionError("Connection closed by server."))
+                subscribers.remove(pubsub)
+
+
+@pytest.fixture
+def counting_repo():
+    repo = CountingConfigRepository()
+    repo.save_bot_value(100, BotValueTypes.Captcha, True)
+    repo.save_bot_value(100, BotValueTypes.EntryChannel, "@channel")
+    repo.save_bot_value(200, BotValueTypes.Captcha, True)
+    repo.save_bot_value(300, BotValueTypes.Captcha, "")
+    return repo
+
+
+class TestConfigSnapshot:
+    """Tests for bulk-loaded config snapshots."""
+
+    def test_get_config_uses_single_chat_query(self, counting_repo):
+        service = ConfigService(counting_repo)
+
+        config = service.get_config(100)
+
+        assert config.get("captcha") is True
+        assert config.get("entry_channel") == "@channel"
+        assert counting_repo.calls == ["load_chat_values"]
+
+    def test_load_value_reuses_chat_snapshot(self, counting_repo):
+        service = ConfigService(counting_repo)
+
+        assert service.load_value(100, "entry_channel") == "@channel"
+        assert service.load_value(100, BotValueTypes.Captcha) is True
+        assert service.load_value(100, "moderate", "default") == "default"
+        assert counting_repo.calls == ["load_chat_values"]
+
+    def test_get_chats_with_feature_uses_single_key_query(self, counting_repo):
+        service = ConfigService(counting_repo)
+
+        assert sorted(service.get_chats_with_feature("captcha")) == [100, 200]
+        assert counting_repo.calls == ["load_key_values"]
+
+    def test_warm_cache_serves_everything_from_memory(self, counting_repo):
+        service = ConfigService(counting_repo)
+
+        assert service.warm_cache() == 3
+
+        assert service.load_value(100, "entry_channel") == "@channel"
+        assert service.load_value(999, "captcha", False) is False
+        assert service.get_config(200).get("captcha") is True
+        assert sorted(service.get_chats_with_feature("captcha")) == [100, 200]
+        assert counting_repo.calls == ["load_all_values"]
+
+    def test_save_and_remove_update_warm_snapshot(self, counting_repo):
+        service = ConfigService(counting_repo)
+        service.warm_cache()
+
+        service.save_value(999, "captcha", "1")
+        service.remove_value(100, "captcha")
+
+        assert sorted(service.get_chats_with_feature("captcha")) == [200, 999]
+        assert service.load_value(100, "captcha") is None
+        assert counting_repo.calls == ["load_all_values"]
+
+    def test_invalidated_chat_is_reloaded(self, counting_repo):
+        service = ConfigService(counting_repo)
+        service.warm_cache()
+        counting_repo.config[(100, BotValueTypes.EntryChannel.value)] = "@other"
+
+        service.invalidate_cache(100)
+
+        assert service.load_value(100, "entry_channel") == "@other"
+        assert counting_repo.calls == ["load_all_values", "load_chat_values"]
+
+    def test_apply_value_without_repo_write(self, counting_repo):
+        service = ConfigService(counting_repo)
+        service.warm_cache()
+
+        # Handler wrote the row through its own session
+        counting_repo.config[(100, BotValueTypes.Moderate.value)] = "1"
+        service.apply_value(100, BotValueTypes.Moderate, "1")
+
+        assert service.load_value(100, "moderate") == "1"
+        assert service.get_chats_with_feature(BotValueTypes.Moderate) == [100]
+
+    def test_apply_value_refreshes_get_config_under_snake_case_keys(self, counting_repo):
+        service = ConfigService(counting_repo)
+        service.warm_cache()
+        assert service.get_config(100).get("entry_channel") == "@channel"
+
+        service.apply_value(100, BotValueTypes.EntryChannel, "@other")
+        service.apply_value(100, "captcha", None)
+
+        config = service.get_config(100)
+        assert config.settings == {"entry_channel": "@other"}
+
+    def test_handle_invalidation_ignores_own_messages(self, counting_repo):
+        service = ConfigService(counting_repo)
+        service.warm_cache()
+
+        service.handle_invalidation(
+            json.dumps({"chat_id": 100, "key": BotValueTypes.Captcha.value, "value": None, "origin": "other"})
+        )
+        service.handle_invalidation(
+            json.dumps(
+                {"chat_id": 200, "key": BotValueTypes.Captcha.value, "value": None, "origin": service._instance_id}
+            )
+        )
+
+        assert service.get_chats_with_feature("captcha") == [200]
+
+    def test_handle_invalidation_without_key_reloads_chat(self, counting_repo):
+        service = ConfigService(counting_repo)
+        service.warm_cache()
+        counting_repo.config[(200, BotValueTypes.Captcha.value)] = None
+
+        service.handle_invalidation(b'{"chat_id": 200, "origin": "other"}')
+        service.handle_invalidation(b"not json")
+
+        assert service.load_value(200, "captcha") is None
+        assert counting_repo.calls == ["load_all_values", "load_chat_values"]
+
+    @pytest.mark.asyncio
+    async def test_replicas_stay_consistent_through_pubsub(self, counting_repo):
+        redis = FakePubSubRedis()
+        replica_a = ConfigService(counting_repo)
+        replica_b = ConfigService(counting_repo)
+        replica_a.warm_cache()
+        replica_b.warm_cache()
+        await replica_a.start_invalidation_listener(redis)
+        await replica_b.start_invalidation_listener(redis)
+
+        replica_a.save_value(500, "captcha", "1")
+        replica_a.remove_value(100, "captcha")
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+        assert sorted(replica_b.get_chats_with_feature("captcha")) == [200, 500]
+        assert sorted(replica_a.get_chats_with_feature("captcha")) == [200, 500]
+        assert len(redis.published) == 2
+
+        await replica_a.stop_invalidation_listener()
+        await replica_b.stop_invalidation_listener()
+
+    @pytest.mark.asyncio
+    async def test_listener_resubscribes_and_reloads_after_disconnect(self, counting_repo, monkeypatch):
+        monkeypatch.setattr(config_service, "LISTENER_RETRY_DELAY", 0)
+        redis = FakePubSubRedis()
+        replica_a = ConfigService(counting_repo)
+        replica_b = ConfigService(counting_repo)
+        replica_b.warm_cache()
+        flags = FeatureFlagsService(replica_b)
+        flags.warm_cache()
+        reloads = []
+        replica_b.add_reload_listener(lambda: reloads.append(True))
+        await replica_a.start_invalidation_listener(redis)
+        await replica_b.start_invalidation_listener(redis)
+
+        redis.disconnect()
+        # Written while replica_b had no subscription: its invalidation is lost
+        replica_a.save_value(600, "captcha", "1")
+        for _ in range(20):
+            await asyncio.sleep(0.01)
+            if reloads and len(redis.subscribers[config_service.CONFIG_INVALIDATION_CHANNEL]) == 2:
+                break
+
+        assert reloads == [True]
+        assert sorted(replica_b.get_chats_with_feature("captcha")) == [100, 200, 600]
+        assert flags.is_enabled(600, "captcha")
+
+        replica_a.remove_value(100, "captcha")
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert sorted(replica_b.get_chats_with_feature("captcha")) == [200, 600]
+
+        await replica_a.stop_invalidation_listener()
+        await replica_b.stop_invalidation_listener()
+
+
+@pytest.fixture
+def db_session_pool():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def tracking_service(db_session_pool):
+    service = ConfigService(ConfigRepositoryAdapter(db_session_pool))
+    service.track_repository_writes()
+    service.warm_cache()
+    yield service
+    remove_bot_config_listener(service.apply_value)
+
+
+class TestRepositoryWrites:
+    """Writers that use ConfigRepository directly keep the production snapshot current."""
+
+    def test_committed_write_reaches_snapshot(self, db_session_pool, tracking_service):
+        with db_session_pool() as session:
+            ConfigRepository(session).save_bot_value(100, BotValueTypes.EntryChannel, "@channel")
+            ConfigRepository(session).update_dict_value(100, BotValueTypes.Sync, "key", 1)
+            # Not committed yet
+            assert tracking_service.load_value(100, "entry_channel") is None
+            session.commit()
+
+        assert tracking_service.load_value(100, "entry_channel") == "@channel"
+        assert tracking_service.get_config(100).entry_channel == "@channel"
+        fresh = ConfigService(ConfigRepositoryAdapter(db_session_pool))
+        assert tracking_service.load_value(100, BotValueTypes.Sync) == fresh.load_value(100, BotValueTypes.Sync)
+
+    def test_rolled_back_write_is_dropped(self, db_session_pool, tracking_service):
+        with db_session_pool() as session:
+            ConfigRepository(session).save_bot_value(100, BotValueTypes.Captcha, "1")
+            session.rollback()
+            session.commit()
+
+        assert tracking_service.get_chats_with_feature("captcha") == []
+
+    def test_save_value_applies_once(self, tracking_service):
+        changes = []
+        tracking_service.add_change_listener(lambda *change: changes.append(change))
+
+        tracking_service.save_value(100, "captcha", "1")
+        tracking_service.remove_value(100, "captcha")
+
+        assert changes == [(100, BotValueTypes.Captcha.value, "1"), (100, BotValueTypes.Captcha.value, None)]
+        assert tracking_service.get_chats_with_feature("captcha") == []
+
+    def test_entry_channel_set_by_command_is_enforced(self, db_session_pool, tracking_service):
+        # ConfigService used to run without a repository in production, so load_value
+        # returned None and entry_channel gating never triggered
+        with db_session_pool() as session:
+            ConfigRepository(session).save_bot_value(100, BotValueTypes.EntryChannel, "-100123")
+            session.commit()
+
+        assert tracking_service.load_value(100, "entry_channel") == "-100123"
@@ -0,0 +1,156 @@
+"""Tests for DeferredDeleteScheduler (Redis sorted set + deleteMessages)."""
+
+import asyncio
+import json
+import types
+
+import pytest
+
+from other.aiogram_tools import cmd_sleep_and_delete
+from services.deferred_delete import DeferredDeleteScheduler, set_deferred_delete_scheduler
+
+
+class FakeZsetRedis:
+    """Sorted sets in a dict; register_script runs CLAIM_DUE_SCRIPT semantics in Python."""
+
+    def __init__(self):
+        self.zsets: dict[str, dict[str, float]] = {}
+
+    async def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    async def zcard(self, key):
+        return len(self.zsets.get(key, {}))
+
+    async def zcount(self, key, low, high):
+        return sum(1 for score in self.zsets.get(key, {}).values() if score <= float(high))
+
+    def register_script(self, script):
+        assert "ZREM" in script
+
+        async def run(keys, args):
+            zset = self.zsets.setdefault(keys[0], {})
+            now, limit = args
+            due = sorted((score, member) for member, score in zset.items() if score <= now)[:limit]
+            for _, member in due:
+                del zset[member]
+            return [member.encode() for _, member in due]
+
+        return run
+
+
+def _deleted(mock_telegram) -> list[tuple[int, list[int]]]:
+    return [
+        (int(r["data"]["chat_id"]), json.loads(r["data"]["message_ids"]))
+        for r in mock_telegram.get_requests()
+        if r["method"] == "deleteMessages"
+    ]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("services.deferred_delete.time.time", lambda: now[0])
+    return now
+
+
+async def test_due_messages_are_grouped_by_chat(mock_telegram, router_bot, clock):
+    mock_telegram.add_response("deleteMessages", {"ok": True, "result": True})
+    redis = FakeZsetRedis()
+    scheduler = DeferredDeleteScheduler(router_bot, redis)
+
+    await scheduler.schedule(-100, 2, 60)
+    await scheduler.schedule(-100, 1, 30)
+    await scheduler.schedule(-200, 7, 10)
+    await scheduler.schedule(-100, 3, 300)
+
+    clock[0] += 61
+    assert await scheduler.run_due() == 3
+
+    assert sorted(_deleted(mock_telegram)) == [(-200, [7]), (-100, [1, 2])]
+    assert scheduler.get_metrics() == {"pending": 1, "overdue": 0, "deleted": 3, "failed": 0, "batches": 2}
+    assert list(redis.zsets[scheduler.key]) == ["-100:3"]
+
+
+async def test_large_chat_is_split_into_bulk_calls(mock_telegram, router_bot, clock):
+    mock_telegram.add_response("deleteMessages", {"ok": True, "result": True})
+    scheduler = DeferredDeleteScheduler(router_bot, FakeZsetRedis(), claim_limit=150)
+    for message_id in range(1, 251):
+        await scheduler.schedule(-100, message_id, 5)
+
+    clock[0] += 5
+    assert await scheduler.run_due() == 250
+
+    sizes = [len(ids) for _, ids in _deleted(mock_telegram)]
+    assert sum(sizes) == 250
+    assert max(sizes) == 100
+
+
+async def test_retry_after_reschedules_chat(mock_telegram, router_bot, clock):
+    mock_telegram.add_response(
+        "deleteMessages",
+        {"ok": False, "error_code": 429, "description": "Too Many Requests", "parameters": {"retry_after": 30}},
+    )
+    redis = FakeZsetRedis()
+    scheduler = DeferredDeleteScheduler(router_bot, redis)
+    await scheduler.schedule(-100, 1, 0)
+
+    await scheduler.run_due()
+
+    assert redis.zsets[scheduler.key] == {"-100:1": 1030.0}
+    assert scheduler.deleted_count == 0
+
+
+async def test_bad_request_is_not_retried(mock_telegram, router_bot, clock):
+    mock_telegram.add_response(
+        "deleteMessages", {"ok": False, "error_code": 400, "description": "Bad Request: message can't be deleted"}
+    )
+    redis = FakeZsetRedis()
+    scheduler = DeferredDeleteScheduler(router_bot, redis)
+    await scheduler.schedule(-100, 1, 0)
+
+    await scheduler.run_due()
+
+    assert redis.zsets[scheduler.key] == {}
+    assert scheduler.failed_count == 1
+
+
+async def test_pending_deletes_survive_restart(mock_telegram, router_bot, clock):
+    mock_telegram.add_response("deleteMessages", {"ok": True, "result": True})
+    redis = FakeZsetRedis()
+    await DeferredDeleteScheduler(router_bot, redis).schedule(-100, 1, 60)
+
+    clock[0] += 120
+    restarted = DeferredDeleteScheduler(router_bot, redis)
+    assert await restarted.run_due() == 1
+    assert _deleted(mock_telegram) == [(-100, [1])]
+
+
+async def test_other_bot_does_not_claim_deletes(mock_telegram, router_bot, clock):
+    redis = FakeZsetRedis()
+    await DeferredDeleteScheduler(router_bot, redis).schedule(-100, 1, 0)
+
+    # Same Redis, another token (a test-mode bot)
+    other = DeferredDeleteScheduler(types.SimpleNamespace(id=router_bot.id + 1), redis)
+    assert await other.run_due() == 0
+    assert other.pending_count == 0
+    assert _deleted(mock_telegram) == []
+
+
+async def test_sleep_and_delete_uses_scheduler(mock_telegram, router_bot, clock):
+    mock_telegram.add_response("deleteMessages", {"ok": True, "result": True})
+    scheduler = DeferredDeleteScheduler(router_bot, FakeZsetRedis(), tick=0.01)
+    message = types.SimpleNamespace(chat=types.SimpleNamespace(id=-100), message_id=5)
+    set_deferred_delete_scheduler(scheduler)
+    await scheduler.start()
+    try:
+        assert await cmd_sleep_and_delete(message, 0) is None
+        for _ in range(100):
+            if scheduler.deleted_count:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await scheduler.stop()
+        set_deferred_delete_scheduler(None)
+
+    assert _deleted(mock_telegram) == [(-100, [5])]
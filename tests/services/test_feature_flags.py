@@ -0,0 +1,135 @@
+# tests/services/test_feature_flags.py
+"""Tests for FeatureFlagsService bit masks and inverted index."""
+
+import json
+
+import pytest
+
+from other.constants import BotValueTypes
+from services.config_service import ConfigService
+from services.feature_flags import FEATURE_BITS, FeatureFlagsService, features_mask
+from tests.fakes import FakeConfigRepositoryProtocol
+
+
+class CountingConfigRepository(FakeConfigRepositoryProtocol):
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def load_chat_values(self, chat_id):
+        self.calls.append("load_chat_values")
+        return super().load_chat_values(chat_id)
+
+    def load_all_values(self):
+        self.calls.append("load_all_values")
+        return super().load_all_values()
+
+
+@pytest.fixture
+def repo():
+    repo = CountingConfigRepository()
+    repo.save_bot_value(100, BotValueTypes.Captcha, True)
+    repo.save_bot_value(100, BotValueTypes.Moderate, "1")
+    repo.save_bot_value(200, BotValueTypes.Captcha, True)
+    repo.save_bot_value(200, BotValueTypes.NotifyJoin, {"chat": 1})
+    repo.save_bot_value(300, BotValueTypes.Listen, "")
+    repo.save_bot_value(300, BotValueTypes.WelcomeMessage, "hi")
+    return repo
+
+
+def test_features_mask_ignores_unknown_and_falsy_values():
+    values = {
+        BotValueTypes.Captcha.value: True,
+        BotValueTypes.Listen.value: "",
+        BotValueTypes.WelcomeMessage.value: "hi",
+    }
+
+    assert features_mask(values) == FEATURE_BITS["captcha"]
+
+
+def test_warm_cache_answers_everything_with_one_query(repo):
+    config_service = ConfigService(repo)
+    flags = FeatureFlagsService(config_service)
+
+    assert flags.warm_cache() == 2
+    assert flags.is_enabled(100, "moderate") is True
+    assert flags.is_enabled(300, "listen") is False
+    assert flags.get_features(200).notify_join is True
+    assert flags.is_enabled(999, "captcha") is False
+    assert sorted(flags.get_chats_with_feature("captcha")) == [100, 200]
+    assert repo.calls == ["load_all_values"]
+
+
+def test_lookup_before_warm_cache_loads_one_chat(repo):
+    flags = FeatureFlagsService(ConfigService(repo))
+
+    assert flags.is_enabled(100, "captcha") is True
+    assert flags.is_enabled(100, "moderate") is True
+    assert repo.calls == ["load_chat_values"]
+    # Only loaded chats are indexed before warm_cache
+    assert flags.get_chats_with_feature("captcha") == [100]
+
+
+def test_set_feature_updates_index(repo):
+    flags = FeatureFlagsService(ConfigService(repo))
+    flags.warm_cache()
+
+    flags.disable(100, "captcha")
+    flags.enable(500, "captcha")
+
+    assert sorted(flags.get_chats_with_feature("captcha")) == [200, 500]
+    assert flags.is_enabled(100, "moderate") is True
+    assert repo.load_bot_value(500, BotValueTypes.Captcha) is True
+
+
+def test_enable_on_unloaded_chat_keeps_other_flags(repo):
+    flags = FeatureFlagsService(ConfigService(repo))
+
+    flags.set_feature(100, "listen", True, persist=False)
+
+    assert flags.get_features(100).captcha is True
+    assert flags.get_features(100).listen is True
+
+
+def test_apply_value_from_handler_reaches_flags(repo):
+    config_service = ConfigService(repo)
+    flags = FeatureFlagsService(config_service)
+    flags.warm_cache()
+
+    # What the committed-write hook of ConfigRepository calls for handler writes
+    config_service.apply_value(300, BotValueTypes.ReplyOnly, "1")
+    config_service.apply_value(200, BotValueTypes.Captcha, None)
+
+    assert flags.get_chats_with_feature("reply_only") == [300]
+    assert flags.get_chats_with_feature("captcha") == [100]
+
+
+def test_changes_from_other_replica_are_applied(repo):
+    config_service = ConfigService(repo)
+    flags = FeatureFlagsService(config_service)
+    flags.warm_cache()
+
+    config_service.handle_invalidation(
+        json.dumps({"chat_id": 400, "key": BotValueTypes.FullData.value, "value": "1", "origin": "other"})
+    )
+    config_service.handle_invalidation(
+        json.dumps({"chat_id": 100, "key": BotValueTypes.Moderate.value, "value": None, "origin": "other"})
+    )
+
+    assert flags.get_chats_with_feature("full_data") == [400]
+    assert flags.is_enabled(100, "moderate") is False
+    assert flags.is_enabled(100, "captcha") is True
+    assert repo.calls == ["load_all_values"]
+
+
+def test_reload_message_from_other_replica_reloads_chat(repo):
+    config_service = ConfigService(repo)
+    flags = FeatureFlagsService(config_service)
+    flags.warm_cache()
+    repo.save_bot_value(300, BotValueTypes.Listen, "1")
+
+    config_service.handle_invalidation(json.dumps({"chat_id": 300, "origin": "other"}))
+
+    assert flags.is_enabled(300, "listen") is True
+    assert flags.get_chats_with_feature("listen") == [300]
+    assert repo.calls == ["load_all_values", "load_chat_values"]
@@ -0,0 +1,204 @@
+"""Tests for OutboxDispatcher (t_message sender)."""
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, select, update
+
+from db.repositories import AsyncMessageRepository
+from db.session import create_async_session_pool, dispose_async_session_pool
+from services.outbox_dispatcher import OutboxDispatcher
+from shared.infrastructure.database.models import Base, TMessage
+
+
+@pytest.fixture
+async def async_session_pool():
+    pool = create_async_session_pool("sqlite:///:memory:")
+    async with pool.kw["bind"].begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield pool
+    await dispose_async_session_pool(pool)
+
+
+async def _queue(pool, *messages: tuple[int, str], **kwargs) -> None:
+    async with pool() as session:
+        repo = AsyncMessageRepository(session)
+        for chat_id, text in messages:
+            await repo.add_message(chat_id, text, **kwargs)
+        await session.commit()
+
+
+async def _statuses(pool) -> dict[str, int]:
+    async with pool() as session:
+        rows = (await session.execute(select(TMessage))).scalars().all()
+        return {row.text: row.was_send for row in rows}
+
+
+def _sent_texts(mock_telegram, method="sendMessage") -> list[tuple[str, str]]:
+    return [
+        (str(r["data"]["chat_id"]), r["data"]["text"]) for r in mock_telegram.get_requests() if r["method"] == method
+    ]
+
+
+async def test_sends_pending_rows_and_marks_them(mock_telegram, router_bot, async_session_pool):
+    await _queue(async_session_pool, (123, "first"), (-100, "second"), (123, "third"))
+    dispatcher = OutboxDispatcher(router_bot, async_session_pool)
+
+    assert await dispatcher.dispatch_once() == (3, 3)
+
+    sent = _sent_texts(mock_telegram)
+    assert sorted(sent) == [("-100", "second"), ("123", "first"), ("123", "third")]
+    # Order inside a chat is preserved
+    assert [text for chat, text in sent if chat == "123"] == ["first", "third"]
+    assert await _statuses(async_session_pool) == {"first": 1, "second": 1, "third": 1}
+    assert dispatcher.get_metrics()["queue_depth"] == 0
+    assert dispatcher.sent_count == 3
+
+
+async def test_edit_rows_use_edit_message_text(mock_telegram, router_bot, async_session_pool):
+    button = json.dumps({"text": "Open", "link": "https://example.com"})
+    await _queue(async_session_pool, (123, "edited"), update_id=55, button_json=button)
+
+    await OutboxDispatcher(router_bot, async_session_pool).dispatch_once()
+
+    request = next(r for r in mock_telegram.get_requests() if r["method"] == "editMessageText")
+    assert str(request["data"]["message_id"]) == "55"
+    assert "https://example.com" in str(request["data"]["reply_markup"])
+
+
+async def test_failed_send_is_marked_and_not_retried(mock_telegram, router_bot, async_session_pool):
+    mock_telegram.add_response(
+        "sendMessage", {"ok": False, "error_code": 400, "description": "Bad Request: chat not found"}
+    )
+    await _queue(async_session_pool, (123, "lost"))
+    dispatcher = OutboxDispatcher(router_bot, async_session_pool)
+
+    assert await dispatcher.dispatch_once() == (1, 1)
+    assert await dispatcher.dispatch_once() == (0, 0)
+
+    assert await _statuses(async_session_pool) == {"lost": 2}
+    assert dispatcher.failed_count == 1
+
+
+async def test_flood_control_keeps_rows_pending_and_skips_chat(mock_telegram, router_bot, async_session_pool):
+    mock_telegram.add_response(
+        "sendMessage",
+        {
+            "ok": False,
+            "error_code": 429,
+            "description": "Too Many Requests: retry after 30",
+            "parameters": {"retry_after": 30},
+        },
+    )
+    await _queue(async_session_pool, (123, "a"), (123, "b"))
+    dispatcher = OutboxDispatcher(router_bot, async_session_pool)
+
+    assert await dispatcher.dispatch_once() == (2, 0)
+    # The chat is under flood control: its rows are not claimed again
+    assert await dispatcher.dispatch_once() == (0, 0)
+
+    assert await _statuses(async_session_pool) == {"a": 0, "b": 0}
+    assert len(_sent_texts(mock_telegram)) == 1
+    metrics = dispatcher.get_metrics()
+    assert metrics["deferred"] == 1
+    assert metrics["queue_depth"] == 2
+    assert metrics["lag_seconds"] >= 0
+
+
+async def test_notify_wakes_the_loop(mock_telegram, router_bot, async_session_pool):
+    dispatcher = OutboxDispatcher(router_bot, async_session_pool, poll_interval=60.0)
+    await dispatcher.start()
+    try:
+        await asyncio.sleep(0.05)
+        await _queue(async_session_pool, (123, "wake"))
+        dispatcher.notify()
+        for _ in range(100):
+            if dispatcher.sent_count:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await dispatcher.stop()
+
+    assert _sent_texts(mock_telegram) == [("123", "wake")]
+
+
+async def test_large_backlog_is_drained_in_batches(mock_telegram, router_bot, async_session_pool):
+    await _queue(async_session_pool, *((chat_id, f"m{chat_id}") for chat_id in range(1, 8)))
+    dispatcher = OutboxDispatcher(router_bot, async_session_pool, batch_size=3, poll_interval=60.0)
+    await dispatcher.start()
+    try:
+        for _ in range(200):
+            if dispatcher.sent_count == 7:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await dispatcher.stop()
+
+    assert dispatcher.sent_count == 7
+    assert set((await _statuses(async_session_pool)).values()) == {1}
+
+
+async def test_flood_control_is_shared_through_the_lease(mock_telegram, router_bot, async_session_pool):
+    mock_telegram.add_response(
+        "sendMessage",
+        {
+            "ok": False,
+            "error_code": 429,
+            "description": "Too Many Requests: retry after 30",
+            "parameters": {"retry_after": 30},
+        },
+    )
+    await _queue(async_session_pool, (123, "a"))
+    await OutboxDispatcher(router_bot, async_session_pool).dispatch_once()
+
+    # Another replica has no flood state of its own but skips the chat
+    assert await OutboxDispatcher(router_bot, async_session_pool).dispatch_once() == (0, 0)
+
+
+async def test_live_lease_skips_chat_and_expired_lease_is_claimed(mock_telegram, router_bot, async_session_pool):
+    await _queue(async_session_pool, (123, "leased"), (123, "next"), (456, "free"))
+    async with async_session_pool() as session:
+        await session.execute(
+            update(TMessage)
+            .where(TMessage.text == "leased")
+            .values(sending_owner="other", sending_until=datetime.now() + timedelta(minutes=5))
+        )
+        await session.commit()
+    dispatcher = OutboxDispatcher(router_bot, async_session_pool)
+
+    assert await dispatcher.dispatch_once() == (1, 1)
+    assert _sent_texts(mock_telegram) == [("456", "free")]
+
+    # The other sender died: its lease runs out
+    async with async_session_pool() as session:
+        await session.execute(update(TMessage).values(sending_until=datetime.now() - timedelta(seconds=1)))
+        await session.commit()
+
+    assert await dispatcher.dispatch_once() == (2, 2)
+    assert [text for _, text in _sent_texts(mock_telegram)] == ["free", "leased", "next"]
+
+
+async def test_outcomes_of_a_batch_are_written_in_one_transaction(async_session_pool):
+    seen = []
+
+    class Bot:
+        async def send_message(self, chat_id, text, **kwargs):
+            async with async_session_pool() as session:
+                rows = (await session.execute(select(TMessage).order_by(TMessage.id))).scalars().all()
+                seen.append([(row.was_send, row.sending_owner is not None) for row in rows])
+            if text == "bad":
+                raise RuntimeError("chat not found")
+
+    await _queue(async_session_pool, (123, "first"), (123, "second"), (-100, "bad"))
+    dispatcher = OutboxDispatcher(Bot(), async_session_pool)
+    commits = []
+    event.listen(async_session_pool.kw["bind"].sync_engine, "commit", lambda conn: commits.append(True))
+
+    assert await dispatcher.dispatch_once() == (3, 3)
+
+    # The claim is committed before sending; outcomes are written once the batch is done
+    assert all(rows == [(0, True)] * 3 for rows in seen)
+    assert len(commits) == 2
+    assert await _statuses(async_session_pool) == {"first": 1, "second": 1, "bad": 2}
@@ -5,8 +5,8 @@ All external I/O (Telegram, Horizon, the operations-notifier HTTP API) is stubbe
 at the service boundary: tests patch ``_send_to_telegram`` and never populate
 ``envelope_xdr`` (which would trigger the XDR decode path), and none of the
 notifier HTTP methods (``subscribe_token``/``subscribe_account``/``unsubscribe``/
-``get_active_subscriptions``/``sync_subscriptions``/``start_server``) are
-exercised here. The ``Mock()`` bot is therefore safe — no code path under test
+``get_active_subscriptions``/``start_server``) are exercised here;
+``sync_subscriptions`` is tested for its diff with those methods patched. The ``Mock()`` bot is therefore safe — no code path under test
 calls ``self.bot.<method>(...)``, so there is no serialization surface to hide.
 
 This file intentionally does not use ``mock_telegram``/``mock_horizon``/
@@ -17,6 +17,8 @@ be added to a separate file and use the canonical fixtures from
 ``tests/conftest.py``.
 """
 
+import asyncio
+
 import pytest
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
 import json
@@ -456,18 +458,197 @@ class TestNonce:
 
     @pytest.mark.asyncio
     async def test_nonce_increments(self, service):
-        nonce1 = await service._get_next_nonce()
-        nonce2 = await service._get_next_nonce()
+        async with service._next_nonce() as nonce1:
+            pass
+        async with service._next_nonce() as nonce2:
+            pass
 
         assert nonce2 == nonce1 + 1
 
+    @pytest.mark.asyncio
+    async def test_nonce_is_held_until_the_call_is_answered(self, service):
+        sent = []
+
+        async def call(delay):
+            async with service._next_nonce() as nonce:
+                await asyncio.sleep(delay)
+                sent.append(nonce)
+
+        # The first caller answers last; its nonce must still reach the notifier first
+        await asyncio.gather(call(0.02), call(0), call(0))
+
+        assert sent == sorted(sent)
+
     @pytest.mark.asyncio
     async def test_nonce_initializes_from_time(self, service):
         import time
 
         before = int(time.time() * 1000)
-        nonce = await service._get_next_nonce()
+        async with service._next_nonce() as nonce:
+            pass
         after = int(time.time() * 1000) + 1
 
         # Nonce should be time-based + 1
         assert before < nonce <= after + 1
+
+
+class FakeRedis:
+    """SET NX EX on a dict; ``fail`` makes every call raise."""
+
+    def __init__(self):
+        self.values = {}
+        self.fail = False
+
+    async def set(self, key, value, nx=False, ex=None):
+        if self.fail:
+            raise ConnectionError("redis down")
+        if nx and key in self.values:
+            return None
+        self.values[key] = (value, ex)
+        return True
+
+
+class TestPersistentDeduplication:
+    """Dedup keys claimed in Redis survive a restart (a new service instance)."""
+
+    @pytest.mark.asyncio
+    async def test_retry_after_restart_is_dropped(self, mock_bot, mock_session_pool):
+        redis = FakeRedis()
+        payload = {
+            "subscription": "sub-1",
+            "operation": {"id": "op-1", "type": "payment", "amount": "100"},
+            "transaction": {"hash": "tx-1"},
+        }
+        sent = []
+        for _ in range(2):
+            service = StellarNotificationService(mock_bot, mock_session_pool, redis=redis, dedup_ttl=60)
+            service.subscriptions_map["sub-1"] = {"chat_id": 123, "topic_id": 5, "type": "asset", "min": 0}
+            with patch.object(service, "_send_to_telegram", new_callable=AsyncMock) as mock_send:
+                await service.process_notification(payload, "sub-1")
+                sent.append(mock_send.call_count)
+
+        assert sent == [1, 0]
+        assert redis.values == {"skynet:stellar_notified:tx:tx-1:123:5": (1, 60)}
+        assert service.get_metrics()["duplicates"] == 1
+
+    @pytest.mark.asyncio
+    async def test_redis_failure_falls_back_to_memory(self, service):
+        service._redis = FakeRedis()
+        service._redis.fail = True
+        key = ("op", "op-1", 123, 0)
+
+        assert await service._is_duplicate_and_remember(key) is False
+        assert await service._is_duplicate_and_remember(key) is True
+
+
+class TestIngestionQueue:
+    """The handler only queues; workers process; a full queue answers 503."""
+
+    @staticmethod
+    def _request(payload):
+        request = MagicMock()
+        request.read = AsyncMock(return_value=json.dumps(payload).encode())
+        request.headers = {}
+        return request
+
+    @pytest.mark.asyncio
+    async def test_workers_process_queued_webhooks(self, mock_bot, mock_session_pool):
+        service = StellarNotificationService(mock_bot, mock_session_pool, workers=3)
+        service.subscriptions_map["sub-1"] = {"chat_id": 123, "topic_id": None, "type": "asset", "min": 0}
+        release = asyncio.Event()
+        sent = []
+
+        async def slow_send(chat_id, topic_id, message):
+            await release.wait()
+            sent.append(chat_id)
+
+        with patch.object(service, "_send_to_telegram", side_effect=slow_send):
+            await service.start_workers()
+            for i in range(5):
+                payload = {"subscription": "sub-1", "operation": {"id": f"op-{i}", "type": "payment"}}
+                response = await service.handle_webhook(self._request(payload))
+                assert response.status == 200
+            assert sent == []
+            release.set()
+            await service.stop()
+
+        assert len(sent) == 5
+        assert service.get_metrics()["processed"] == 5
+        assert service.get_metrics()["queued"] == 0
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejects_with_503(self, mock_bot, mock_session_pool):
+        service = StellarNotificationService(mock_bot, mock_session_pool, queue_size=2)
+        payload = {"subscription": "sub-1", "operation": {"id": "op-1", "type": "payment"}}
+
+        statuses = [(await service.handle_webhook(self._request(payload))).status for _ in range(3)]
+
+        assert statuses == [200, 200, 503]
+        assert service.get_metrics()["rejected"] == 1
+
+
+class TestSyncSubscriptionsDiff:
+    """sync_subscriptions keeps matching subscriptions, removes stale ones and creates missing ones."""
+
+    @pytest.mark.asyncio
+    async def test_diff_applied(self, service):
+        account = "G" + "A" * 55
+        old_account = "G" + "B" * 55
+        assets = [
+            {"enabled": True, "asset": "MTL-GISSUER", "chat_id": 1, "topic_id": 2, "min": 10},
+            {"enabled": True, "asset": "EURMTL-GISSUER", "chat_id": 1, "topic_id": None, "min": 0},
+            {"enabled": False, "asset": "OFF-GISSUER", "chat_id": 1},
+        ]
+        accounts = [{"enabled": True, "account_id": account, "chat_id": 3, "topic_id": None}]
+        webhook = "http://skynet:8081/webhook"
+        remote = [
+            {"id": "keep-mtl", "asset_code": "MTL", "asset_issuer": "GISSUER", "operation_types": [1]},
+            {
+                "id": "old-filter",
+                "asset_code": "EURMTL",
+                "asset_issuer": "GISSUER",
+                "operation_types": [0, 1],
+                "reaction_url": webhook,
+            },
+            {"id": "stale", "account": old_account, "reaction_url": webhook},
+            {"id": "foreign", "account": old_account, "reaction_url": "http://other/webhook"},
+            {"id": "no-url", "account": old_account},
+        ]
+
+        with (
+            patch("services.stellar_notification_service.config") as mock_config,
+            patch.object(service, "load_grist_config", AsyncMock(return_value=(assets, accounts))),
+            patch.object(service, "_fetch_active_subscriptions", AsyncMock(return_value=remote)),
+            patch.object(service, "unsubscribe", AsyncMock(return_value=True)) as unsubscribe,
+            patch.object(service, "subscribe_token", AsyncMock(return_value="new-eurmtl")) as subscribe_token,
+            patch.object(service, "subscribe_account", AsyncMock(return_value="new-account")) as subscribe_account,
+        ):
+            mock_config.notifier_url = "http://notifier:8000"
+            mock_config.webhook_public_url = webhook
+            mock_config.test_mode = False
+            await service.sync_subscriptions()
+
+        assert sorted(call.args[0] for call in unsubscribe.await_args_list) == ["old-filter", "stale"]
+        subscribe_token.assert_awaited_once_with("EURMTL", "GISSUER")
+        subscribe_account.assert_awaited_once_with(account)
+        assert set(service.subscriptions_map) == {"keep-mtl", "new-eurmtl", "new-account"}
+        assert service.subscriptions_map["keep-mtl"]["min"] == 10
+        assert service.subscriptions_map["new-account"]["account"] == account
+
+    @pytest.mark.asyncio
+    async def test_notifier_error_keeps_subscriptions(self, service):
+        service.subscriptions_map["sub-1"] = {"chat_id": 1, "type": "asset"}
+
+        with (
+            patch("services.stellar_notification_service.config") as mock_config,
+            patch.object(service, "load_grist_config", AsyncMock(return_value=([], []))),
+            patch.object(service, "_fetch_active_subscriptions", AsyncMock(side_effect=RuntimeError("502"))),
+            patch.object(service, "unsubscribe", AsyncMock()) as unsubscribe,
+        ):
+            mock_config.notifier_url = "http://notifier:8000"
+            mock_config.webhook_public_url = "http://skynet:8081/webhook"
+            mock_config.test_mode = False
+            await service.sync_subscriptions()
+
+        assert not unsubscribe.called
+        assert service.subscriptions_map == {"sub-1": {"chat_id": 1, "type": "asset"}}
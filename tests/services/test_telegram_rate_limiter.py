@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from services.telegram_rate_limiter import (
+    RequestPriority,
+    TelegramRateLimiter,
+    TokenBucket,
+    get_request_priority,
+    request_priority,
+)
+from tests.fakes import FakeClock
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_token_bucket_refill():
+    bucket = TokenBucket(rate=2.0, capacity=2.0, now=0.0)
+    bucket.take()
+    bucket.take()
+
+    assert bucket.delay(0.0) == pytest.approx(0.5)
+    assert bucket.delay(0.5) == 0.0
+    assert bucket.delay(10.0) == 0.0
+    assert bucket.tokens == 2.0
+
+
+def test_request_priority_context():
+    assert get_request_priority() == RequestPriority.NORMAL
+    with request_priority(RequestPriority.LOW):
+        assert get_request_priority() == RequestPriority.LOW
+    assert get_request_priority() == RequestPriority.NORMAL
+
+
+@pytest.mark.asyncio
+async def test_global_queue_serves_by_priority(clock):
+    limiter = TelegramRateLimiter(global_rate=20.0, clock=clock, sleep=clock.sleep)
+    for _ in range(20):
+        await limiter.acquire(None)
+
+    order = []
+
+    async def call(name, priority):
+        await limiter.acquire(None, priority)
+        order.append(name)
+
+    tasks = [
+        asyncio.create_task(call("notify-1", RequestPriority.LOW)),
+        asyncio.create_task(call("reply", RequestPriority.NORMAL)),
+        asyncio.create_task(call("notify-2", RequestPriority.LOW)),
+        asyncio.create_task(call("delete", RequestPriority.HIGH)),
+    ]
+    await asyncio.sleep(0)
+    assert limiter.get_metrics()["queued"] == 4
+
+    await asyncio.gather(*tasks)
+    assert order == ["delete", "reply", "notify-1", "notify-2"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_take_token(clock):
+    limiter = TelegramRateLimiter(global_rate=10.0, clock=clock, sleep=clock.sleep)
+    for _ in range(10):
+        await limiter.acquire(None)
+
+    waiter = asyncio.create_task(limiter.acquire(None, RequestPriority.LOW))
+    await asyncio.sleep(0)
+    waiter.cancel()
+
+    started = clock.now
+    await limiter.acquire(None)
+    # One token, not two
+    assert clock.now - started == pytest.approx(0.1)
+
+
+@pytest.mark.asyncio
+async def test_group_burst_then_steady_rate(clock):
+    limiter = TelegramRateLimiter(global_rate=1000.0, group_rate=20.0, group_burst=3.0, clock=clock, sleep=clock.sleep)
+
+    started = clock.now
+    for _ in range(3):
+        await limiter.acquire(-100500)
+    assert clock.now == started
+
+    await limiter.acquire(-100500)
+    assert clock.now - started == pytest.approx(0.05)
+
+    histogram = limiter.get_metrics()["wait_seconds"]["normal"]
+    assert histogram["count"] == 4
+    assert histogram["buckets"]["+Inf"] == 4
+    assert histogram["buckets"]["0.05"] == 4
+
+
+@pytest.mark.asyncio
+async def test_idle_chat_buckets_are_pruned(clock):
+    limiter = TelegramRateLimiter(private_rate=1000.0, max_chat_buckets=2, clock=clock, sleep=clock.sleep)
+    await limiter.acquire(1)
+    await limiter.acquire(2)
+    clock.now += 0.01
+
+    await limiter.acquire(3)
+    assert limiter.get_metrics()["chat_buckets"] == 1
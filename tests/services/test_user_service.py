@@ -98,3 +98,27 @@ class TestNameCache:
         service = SpamStatusService(repo)
 
         assert service.get_all_names() == {}
+
+
+class TestUsernameCache:
+    """Tests for cache-only lookups used by the bot_users write-behind buffer."""
+
+    def test_get_cached_status_does_not_hit_repo(self):
+        repo = FakeChatsRepositoryProtocol()
+        service = SpamStatusService(repo)
+
+        assert service.get_cached_status(1) is None
+        service.preload_statuses({1: 2})
+        assert service.get_cached_status(1) == 2
+
+    def test_preload_usernames_skips_empty(self):
+        repo = FakeChatsRepositoryProtocol()
+        service = SpamStatusService(repo)
+
+        service.preload_usernames({1: "alice", 2: None, 3: ""})
+        service.cache_username(4, "bob")
+
+        assert service.get_cached_username(1) == "alice"
+        assert service.get_cached_username(2) is None
+        assert service.get_cached_username(3) is None
+        assert service.get_cached_username(4) == "bob"